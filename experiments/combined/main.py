@@ -1,3 +1,4 @@
+import glob
 import argparse
 
 from common.json_configuration import JsonConfiguration
@@ -5,8 +6,11 @@ from common.json_configuration import JsonConfiguration
 from common.keys import *
 from common.engines import *
 from common.logging import *
+from common import profiler
+from common.result import VoidResult
+from base.output_manifest import OutputManifest
 
-from tools import protobuf, git, file_system
+from tools import protobuf, git, file_system, batch, python
 from tools.compilers import cmake, javac
 
 argument_parser = argparse.ArgumentParser(description='DTIG generator')
@@ -16,8 +20,16 @@ argument_parser.add_argument('-g', action="store_false", dest="compile", help='O
 argument_parser.add_argument('--proto', action="store_true", dest="compile_proto", help='Compile protobuf files', default=False)
 argument_parser.add_argument('--client', action="store_true", dest="no_server", help='Only generate the client', default=False)
 argument_parser.add_argument('--server', action="store_true", dest="no_client", help='Only generate the server', default=False)
+argument_parser.add_argument('-f', action="store_true", dest="force", help='Generate everything, even if nothing changed', default=False)
+argument_parser.add_argument('--no-format', action="store_false", dest="format", help='Do not format the generated python code', default=True)
+argument_parser.add_argument('--profile', action="store", dest="profile", nargs="?", const="table", choices=["table", "json"], help='Report the time and memory of each generation phase, only for this process')
+argument_parser.add_argument('-b', action="store", dest="batch", help='Directory or manifest with the configurations to generate', type=str)
+argument_parser.add_argument('-j', action="store", dest="jobs", help='Number of processes used to generate a batch', type=int, default=1)
 args = argument_parser.parse_args()
 
+# Set at import, so the processes of a batch use it as well
+python.FORMAT_ENABLED = args.format
+
 def create_cmake_compiler(server_name, output_dir, rti_dir):
     compiler = cmake.CMakeCompiler(output_dir)
 
@@ -42,17 +54,26 @@ def create_cmake_compiler(server_name, output_dir, rti_dir):
 
     return compiler
 
-def main():
-    start_logger(LogLevel(args.log_level))
-    output_dir = file_system.current_dir() + "/generated/"
+# OpenRTI only needs to be built once per process
+compiled_rti_dirs = set()
 
-    if not args.config_file:
-        LOG_ERROR("No configuration file provided")
-        return
+def compile_rti(rti_dir) -> VoidResult:
+    if rti_dir in compiled_rti_dirs:
+        return VoidResult()
+
+    rtiCompiler = cmake.CMakeCompiler(rti_dir)
+    compiled = rtiCompiler.compile(["install"])
+    if compiled:
+        compiled_rti_dirs.add(rti_dir)
+
+    return compiled
 
-    LOG_INFO(f'Using configuration: {args.config_file}')
+def generate(config_file, name : str = "") -> bool:
+    output_dir = file_system.current_dir() + "/generated/"
+
+    LOG_INFO(f'Using configuration: {config_file}')
     config = JsonConfiguration()
-    config.parse(args.config_file)
+    config.parse(config_file)
 
     if not config.has(KEY_SERVER):
         LOG_WARNING("No server provided")
@@ -64,8 +85,17 @@ def main():
     generator = None
     compiler = None
 
-    server_output_dir = output_dir + f"/{config[KEY_SERVER]}/"
+    # Each configuration of a batch has its own directory, so their outputs and manifests do not overwrite each other
+    if name:
+        server_output_dir = output_dir + f"/{name}/{config[KEY_SERVER]}/"
+    else:
+        server_output_dir = output_dir + f"/{config[KEY_SERVER]}/"
     file_system.create_dir(server_output_dir)
+
+    # Outputs whose inputs did not change are not generated nor compiled again
+    manifest = OutputManifest(server_output_dir)
+    if args.force:
+        manifest.artifacts = dict()
     if args.no_client or not config.has(KEY_CLIENT):
         pass
     elif config[KEY_CLIENT] == ENGINE_OPENRTI1516 or config[KEY_CLIENT] == ENGINE_OPENRTI1516_CMD:
@@ -78,14 +108,13 @@ def main():
             cloned = git.Git("https://github.com/onox/OpenRTI.git").clone(rti_dir)
             if not cloned:
                 LOG_ERROR(cloned)
-                return
+                return False
 
         # Compile OpenRTI
-        rtiCompiler = cmake.CMakeCompiler(rti_dir)
-        compiled = rtiCompiler.compile(["install"])
+        compiled = compile_rti(rti_dir)
         if not compiled:
             LOG_ERROR(compiled)
-            return
+            return False
 
         if config[KEY_CLIENT] == ENGINE_OPENRTI1516:
             from engines.openrti1516.generator_openrti import ClientGeneratorRTI1516
@@ -96,32 +125,33 @@ def main():
 
         # Generate protobuf for C++
         if args.compile_proto:
-            result = protobuf.generate_cpp(server_output_dir)
+            result = manifest.generate("protos_cpp", lambda: protobuf.generate_cpp(server_output_dir),
+                                       key=protobuf.PROTOBUF_VERSION, inputs=protobuf.proto_files(), directory="dtig")
             if not result:
                 LOG_ERROR(result)
-                return
+                return False
 
         compiler = create_cmake_compiler(config[KEY_SERVER], server_output_dir, rti_dir)
     else:
         LOG_ERROR(f'Unknown server: {config[KEY_SERVER]}')
-        return
+        return False
 
     if generator:
-        generated = generator.generate(config)
+        generated = manifest.generate("client", lambda: generator.generate(config), key=f'{type(generator).__name__}\0{config}')
         if not generated.is_success():
             LOG_ERROR(f'Failed to generate server: {generated}')
-            return
+            return False
 
     if compiler and args.compile:
-        generated = compiler.generate()
+        generated = manifest.generate("cmake_lists", compiler.generate, key=repr(vars(compiler)))
         if not generated:
             LOG_ERROR(f'Failed to generated compiler file for server: {generated}')
-            return
+            return False
 
-        compiled = compiler.compile()
+        compiled = manifest.generate("cmake_build", compiler.compile, inputs=manifest.generated_files(), outputs=["build"])
         if not compiled:
             LOG_ERROR(f'Failed to compile server file: {compiled}')
-            return
+            return False
 
     # No server >>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>
     if args.no_server or not config.has(KEY_SERVER):
@@ -133,15 +163,16 @@ def main():
         generator = ServerGeneratorFMI2(server_output_dir + config[KEY_SERVER])
 
         # Ensure python protos are available
-        generated = protobuf.generate_python(server_output_dir)
+        generated = manifest.generate("protos_python", lambda: protobuf.generate_python(server_output_dir),
+                                      key=protobuf.PROTOBUF_VERSION, inputs=protobuf.proto_files(), directory="dtig")
         if not generated:
-            LOG_ERROR(result)
-            return
+            LOG_ERROR(generated)
+            return False
 
-        generated = generator.generate(config)
+        generated = manifest.generate("server", lambda: generator.generate(config), key=f'{type(generator).__name__}\0{config}')
         if not generated:
             LOG_ERROR(f'Failed to generate FMI server: {generated}')
-            return
+            return False
     # FMI2 <<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<
     # Matlab >>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>
     elif config[KEY_SERVER] == ENGINE_MATLAB_2024a or config[KEY_SERVER] == ENGINE_SIMULINK_2024a:
@@ -154,10 +185,11 @@ def main():
             generator = ServerGeneratorSimulink2024a(server_output_dir + config[KEY_SERVER])
 
         # Generate protobuf for matlab
-        result = protobuf.generate_matlab(server_output_dir)
+        result = manifest.generate("protos_java", lambda: protobuf.generate_matlab(server_output_dir),
+                                   key=protobuf.PROTOBUF_VERSION, inputs=protobuf.proto_files(), directory="dtig")
         if not result.is_success():
             LOG_ERROR(result)
-            return
+            return False
 
         java_compiler = javac.JavaCompiler(server_output_dir)
         java_compiler.set_compiler(f'{server_output_dir}/java-compiler/bin/javac')
@@ -167,23 +199,24 @@ def main():
         generated = java_compiler.generate()
         if not generated:
             LOG_ERROR(f'Failed to generated java compiler file: {generated}')
-            return
+            return False
 
         installed = java_compiler.install("8u402-b06")
         if not installed:
             LOG_ERROR(f'Failed to install java compiler: {installed}')
-            return
+            return False
 
-        compiled = java_compiler.compile()
+        java_sources = sorted(glob.glob(f'{server_output_dir}/dtig/*.java'))
+        compiled = manifest.generate("javac_build", java_compiler.compile, inputs=java_sources, outputs=["build"])
         if not compiled:
             LOG_ERROR(f'Javac failed to compile file: {compiled}')
-            return
+            return False
 
         # Generate the actual matlab server
-        generated = generator.generate(config)
+        generated = manifest.generate("server", lambda: generator.generate(config), key=f'{type(generator).__name__}\0{config}')
         if not generated:
             LOG_ERROR(f'Failed to generate server: {generated}')
-            return
+            return False
     # Matlab <<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<
     # FreeCAD >>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>
     elif config[KEY_SERVER] == ENGINE_FREECAD_021:
@@ -191,19 +224,61 @@ def main():
         generator = ServerGeneratorFreeCAD(server_output_dir + ENGINE_FREECAD_021)
 
         # Ensure python protos are available
-        generated = protobuf.generate_python(server_output_dir)
+        generated = manifest.generate("protos_python", lambda: protobuf.generate_python(server_output_dir),
+                                      key=protobuf.PROTOBUF_VERSION, inputs=protobuf.proto_files(), directory="dtig")
         if not generated:
-            LOG_ERROR(result)
-            return
+            LOG_ERROR(generated)
+            return False
 
-        generated = generator.generate(config)
+        generated = manifest.generate("server", lambda: generator.generate(config), key=f'{type(generator).__name__}\0{config}')
         if not generated:
             LOG_ERROR(f'Failed to generate FreeCAD server: {generated}')
-            return
+            return False
     # FreeCAD <<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<
     else:
         LOG_ERROR(f'Unknown engine {config[KEY_SERVER]}')
+        return False
+
+    return True
+
+# Configurations of a batch are generated in a directory named after their file
+def generate_batch_config(config_file) -> bool:
+    return generate(config_file, batch.config_name(config_file))
+
+def generate_all():
+    if args.batch:
+        configs = batch.find_configs(args.batch)
+        duplicated = batch.duplicated_names(configs)
+        if duplicated:
+            LOG_ERROR(f'Configurations of a batch must have different file names: {", ".join(duplicated)}')
+            return
+
+        results = batch.run(configs, generate_batch_config, jobs=args.jobs, initializer=start_logger, initargs=(LogLevel(args.log_level),))
+
+        failed = [config for config, generated in results.items() if not generated]
+        for config in failed:
+            LOG_ERROR(f'Failed to generate: {config}')
+
+        LOG_INFO(f'Generated {len(configs) - len(failed)} of {len(configs)} configurations')
         return
 
+    if not args.config_file:
+        LOG_ERROR("No configuration file provided")
+        return
+
+    generate(args.config_file)
+
+def main():
+    start_logger(LogLevel(args.log_level))
+
+    if args.profile:
+        profiler.start_profiler()
+
+    with profiler.phase("total"):
+        generate_all()
+
+    if args.profile:
+        print(profiler.report(args.profile))
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,9 +1,11 @@
 import os
+import sys
 from abc import abstractmethod
 
 from common.result import VoidResult
 
-ENV_DIR = os.environ['VIRTUAL_ENV'] + "/"
+# Outside of a virtual environment, use the installation of the interpreter
+ENV_DIR = os.environ.get('VIRTUAL_ENV', sys.prefix) + "/"
 INCLUDE_DIR = ENV_DIR + "include"
 LIB_DIR = ENV_DIR + "lib"
 
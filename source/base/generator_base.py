@@ -6,10 +6,14 @@ from abc import abstractmethod
 
 from common.keys import *
 from common.logging import *
+from common import profiler
 from common.result import Result, VoidResult
+from base.template_index import TemplateIndex, load_template
 from common.default_structure import create_default_structure
 from common.model_configuration_base import ModelConfigurationBase
 
+call_regex = re.compile(fr'DTIG>([A-Z_]*\b)(\(([\w_]*)\))?')
+
 class GeneratorBase():
     # Must be called from any children so members are initialized
     def __init__(self, output_file):
@@ -27,9 +31,16 @@ class GeneratorBase():
         self.callbacks = create_default_structure()
 
         self.dtig_parser = None
+        self.template_index = None
+
+        # Replacements of the DTIG> calls, they depend on the callbacks
+        self.call_table = dict()
+
+        profiler.instrument(type(self))
 
     def new_callback(self, key, data):
         self.callbacks[KEY_NEW][key] = data
+        self.call_table = dict()
 
     def get_output_file(self):
         return self.output_file
@@ -39,40 +50,32 @@ class GeneratorBase():
 
     def read_templates(self) -> VoidResult:
         self.parse_dtig_language()
+        self.call_table = dict()
         return VoidResult()
 
+    def read_template(self, file : str, reader) -> str:
+        # The index of the template is shared, so parse_template does not need to build it again
+        self.template_index = load_template(file, reader)
+        return self.template_index.data
+
     def parse_template(self, data, name: str, has_argument: bool = False, maximum: int = None) -> VoidResult:
         if not self.comment_char:
             return VoidResult.failed("No comment character defined")
 
-        # Look for the decorators
-        # regex = fr'^{self.comment_char}\s*@({name}\b)(\(([a-z_]*)\))?'
-        regex = fr'^<DTIG_({name})\b(\(([A-Z_]*)\))?.*>'
-        matches = [m for m in re.finditer(regex, data, flags=re.MULTILINE)]
+        # All the sections are found the first time the template is used
+        if self.template_index is None or self.template_index.data is not data:
+            self.template_index = TemplateIndex(data)
+
+        sections = self.template_index.find(name)
         # Small sanity checks
-        if maximum is not None and len(matches) > maximum:
+        if maximum is not None and len(sections) > maximum:
             return VoidResult.failed(f'Only {maximum} {name} is allowed in the template')
 
-        for match in matches:
-            # Get the information from the decorator
-            decorator = data[match.start():match.end()]
-            decorator_name = match[1]
-            decorator_arg = match[3]
-
+        for decorator, decorator_name, decorator_arg, function_start, function_end in sections:
             if decorator_name is None or (has_argument and decorator_arg is None):
                 return VoidResult.failed(f'{decorator} a group is missing. Name {decorator_name}, Args {decorator_arg}')
 
-            LOG_TRACE(f'{decorator}: {decorator_name} {decorator_arg}')
-
-            function_start = match.end() + 1
-            updated_data = data[function_start:]
-
-            # Search for the next decorator
-            # @ in the middle of a function are replaced later
-            # end = re.search(fr'^{self.comment_char}\s*@(?!>[^\s])', updated_data, flags=re.MULTILINE)
-            end = re.search(fr'^\s*<DTIG(?!>[^\s])', updated_data, flags=re.MULTILINE)
-            offset = (len(data) - len(updated_data))
-            function_end = len(data) - 1 if end is None else end.start() - 1 + offset
+            LOG_TRACE('%s: %s %s', decorator, decorator_name, decorator_arg)
 
             # Remove trailing whitespaces
             while data[function_end] == self.comment_char[0] or data[function_end].isspace():
@@ -92,7 +95,7 @@ class GeneratorBase():
 
                 function_id, function_args = self.function_from_key(definition, callback_name)
 
-                LOG_TRACE(f'Function {function_id} with args: {function_args}')
+                LOG_TRACE('Function %s with args: %s', function_id, function_args)
                 # Set default callback name
                 default = self.function_definition(function_id, function_args)
                 body = body[:definition.start()] + default + body[definition.end():]
@@ -115,22 +118,15 @@ class GeneratorBase():
         return VoidResult()
 
     def replace_calls(self, contents: str):
-        iter_body = contents
-        # regex = fr'{self.comment_char}\s*@>([a-z_]*\b)(\(([a-z_]*)\))?'
-        regex = fr'DTIG>([A-Z_]*\b)(\(([\w_]*)\))?'
-        while True:
-            match = re.search(regex, iter_body)
-            if not match:
-                break
+        # Single pass, the replacement of each call is only resolved once
+        return call_regex.sub(self.replace_call, contents)
 
-            offset = (len(contents) - len(iter_body))
-            replacement = self.name_from_key(match.groups())
-            # LOG_TRACE(f'Replacing: {match} -> {replacement}')
-            contents = contents[:match.start() + offset] + replacement.strip("\r\n") + contents[match.end() + offset:]
+    def replace_call(self, match):
+        groups = match.groups()
+        if groups not in self.call_table:
+            self.call_table[groups] = self.name_from_key(groups).strip("\r\n")
 
-            iter_body = iter_body[match.end():]
-
-        return contents
+        return self.call_table[groups]
 
     def is_valid_key(self, key):
         return key and key in self.callbacks.keys()
@@ -140,14 +136,14 @@ class GeneratorBase():
                         or key == KEY_PRIVATE or key == KEY_PUBLIC)
 
     def generate_imports(self) -> Result:
-        body = ""
+        body = []
         if self.callbacks[KEY_IMPORTS][KEY_BODY]:
-            body += self.callbacks[KEY_IMPORTS][KEY_BODY]
+            body.append(self.callbacks[KEY_IMPORTS][KEY_BODY])
 
         if self.callbacks[KEY_CALLBACK][KEY_IMPORTS][KEY_BODY]:
-            body += self.callbacks[KEY_CALLBACK][KEY_IMPORTS][KEY_BODY]
+            body.append(self.callbacks[KEY_CALLBACK][KEY_IMPORTS][KEY_BODY])
 
-        return Result(body + "\n")
+        return Result("".join(body) + "\n")
 
     def generate_states(self) -> Result:
         if self.callbacks[KEY_STATES][KEY_BODY]:
@@ -162,66 +158,66 @@ class GeneratorBase():
         return Result("")
 
     def generate_constructor(self) -> Result:
-        body = ""
+        body = []
         for key, access in self.callbacks[KEY_CONSTRUCTOR].items():
             if access[KEY_BODY]:
-                body += access[KEY_BODY]
+                body.append(access[KEY_BODY])
 
         if self.callbacks[KEY_CALLBACK][KEY_CONSTRUCTOR][KEY_BODY]:
-            body += self.callbacks[KEY_CALLBACK][KEY_CONSTRUCTOR][KEY_BODY]
+            body.append(self.callbacks[KEY_CALLBACK][KEY_CONSTRUCTOR][KEY_BODY])
 
-        return Result(body)
+        return Result("".join(body))
 
     def generate_destructor(self) -> Result:
-        body = ""
+        body = []
         for key, access in self.callbacks[KEY_DESTRUCTOR].items():
             if access[KEY_BODY]:
-                body += access[KEY_BODY]
+                body.append(access[KEY_BODY])
 
         if self.callbacks[KEY_CALLBACK][KEY_DESTRUCTOR][KEY_BODY]:
-            body += self.callbacks[KEY_CALLBACK][KEY_DESTRUCTOR][KEY_BODY]
+            body.append(self.callbacks[KEY_CALLBACK][KEY_DESTRUCTOR][KEY_BODY])
 
-        return Result(body)
+        return Result("".join(body))
 
     def generate_message_handler(self) -> Result:
-        body = ""
+        body = []
         if self.callbacks[KEY_MESSAGE_HANDLER][KEY_BODY]:
-            body += self.callbacks[KEY_MESSAGE_HANDLER][KEY_BODY]
+            body.append(self.callbacks[KEY_MESSAGE_HANDLER][KEY_BODY])
 
         generated = self.generate_message_parsers()
         if generated:
-            body += generated.value()
+            body.append(generated.value())
 
-        return Result(body)
+        return Result("".join(body))
 
     def generate_run(self) -> Result:
-        body = ""
+        body = []
         if self.callbacks[KEY_RUN][KEY_BODY]:
-            body += self.callbacks[KEY_RUN][KEY_BODY]
+            body.append(self.callbacks[KEY_RUN][KEY_BODY])
 
         if self.callbacks[KEY_RUN_MODEL][KEY_BODY]:
-            body += self.callbacks[KEY_RUN_MODEL][KEY_BODY]
+            body.append(self.callbacks[KEY_RUN_MODEL][KEY_BODY])
 
         if self.callbacks[KEY_CALLBACK][KEY_RUN_MODEL][KEY_BODY]:
-            body += self.callbacks[KEY_CALLBACK][KEY_RUN_MODEL][KEY_BODY]
+            body.append(self.callbacks[KEY_CALLBACK][KEY_RUN_MODEL][KEY_BODY])
 
         if self.callbacks[KEY_RUN_SERVER][KEY_BODY]:
-            body += self.callbacks[KEY_RUN_SERVER][KEY_BODY]
+            body.append(self.callbacks[KEY_RUN_SERVER][KEY_BODY])
 
         if self.callbacks[KEY_CALLBACK][KEY_RUN_SERVER][KEY_BODY]:
-            body += self.callbacks[KEY_CALLBACK][KEY_RUN_SERVER][KEY_BODY]
+            body.append(self.callbacks[KEY_CALLBACK][KEY_RUN_SERVER][KEY_BODY])
 
         if self.callbacks[KEY_RUN_CLIENT][KEY_BODY]:
-            body += self.callbacks[KEY_RUN_CLIENT][KEY_BODY]
+            body.append(self.callbacks[KEY_RUN_CLIENT][KEY_BODY])
 
         if self.callbacks[KEY_CALLBACK][KEY_RUN_CLIENT][KEY_BODY]:
-            body += self.callbacks[KEY_CALLBACK][KEY_RUN_CLIENT][KEY_BODY]
+            body.append(self.callbacks[KEY_CALLBACK][KEY_RUN_CLIENT][KEY_BODY])
 
         for key, access in self.callbacks[KEY_METHOD].items():
             for method in access[KEY_BODY]:
-                body += method
+                body.append(method)
 
-        return Result(body)
+        return Result("".join(body))
 
     def generate_main(self) -> Result:
         if self.callbacks[KEY_MAIN][KEY_BODY]:
@@ -230,15 +226,15 @@ class GeneratorBase():
         return Result("")
 
     def generate_message_parsers(self) -> Result:
-        body = ""
+        body = []
         for key, method in self.callbacks[KEY_PARSE].items():
             if method[KEY_BODY]:
-                body += method[KEY_BODY]
+                body.append(method[KEY_BODY])
 
             if self.callbacks[KEY_CALLBACK][key][KEY_BODY]:
-                body += self.callbacks[KEY_CALLBACK][key][KEY_BODY]
+                body.append(self.callbacks[KEY_CALLBACK][key][KEY_BODY])
 
-        return Result(body)
+        return Result("".join(body))
 
     def name_from_key(self, groups):
         name = groups[0]
@@ -264,11 +260,12 @@ class GeneratorBase():
     def parse_language(self, parser, outer_key):
         for key in self.callbacks[outer_key]:
             if self.callbacks[outer_key][key][KEY_BODY]:
-                if isinstance(self.callbacks[outer_key][key][KEY_BODY], str):
-                    self.callbacks[outer_key][key][KEY_BODY] = parser.parse(self.callbacks[outer_key][key][KEY_BODY]) + "\n"
-                else:
-                    for i in range(len(self.callbacks[outer_key][key][KEY_BODY])):
-                        self.callbacks[outer_key][key][KEY_BODY][i] = parser.parse(self.callbacks[outer_key][key][KEY_BODY][i]) + "\n"
+                with profiler.phase(f'section {outer_key}.{key}'):
+                    if isinstance(self.callbacks[outer_key][key][KEY_BODY], str):
+                        self.callbacks[outer_key][key][KEY_BODY] = parser.parse(self.callbacks[outer_key][key][KEY_BODY]) + "\n"
+                    else:
+                        for i in range(len(self.callbacks[outer_key][key][KEY_BODY])):
+                            self.callbacks[outer_key][key][KEY_BODY][i] = parser.parse(self.callbacks[outer_key][key][KEY_BODY][i]) + "\n"
 
     # This function should be called once the file structure is done
     def parse_dtig_language(self, parser=None):
@@ -279,7 +276,8 @@ class GeneratorBase():
         for key in self.callbacks:
             if KEY_NAME in self.callbacks[key]:
                 if self.callbacks[key][KEY_BODY]:
-                    self.callbacks[key][KEY_BODY] = parser.parse(self.callbacks[key][KEY_BODY])
+                    with profiler.phase(f'section {key}'):
+                        self.callbacks[key][KEY_BODY] = parser.parse(self.callbacks[key][KEY_BODY])
             else:
                 self.parse_language(parser, key)
 
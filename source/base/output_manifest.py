@@ -0,0 +1,116 @@
+import os
+import json
+import hashlib
+
+from common.logging import *
+from common.result import VoidResult
+from base import template_index
+from language.parser_tokens import DTIG_VERSION
+
+MANIFEST_FILE = "dtig_manifest.json"
+
+# Records for every artifact of an output directory what it was generated from
+# An artifact whose configuration, templates, inputs and DTIG version did not change is not generated again,
+# so its files keep their modification time and the compilers do not rebuild them
+class OutputManifest():
+    def __init__(self, directory : str):
+        self.directory = directory
+        self.file = os.path.join(directory, MANIFEST_FILE)
+        self.artifacts = dict()
+
+        # Whether any artifact had to be generated in this run
+        self.changed = False
+
+        if os.path.isfile(self.file):
+            try:
+                with open(self.file, "r") as file:
+                    self.artifacts = json.load(file)
+            except Exception as e:
+                LOG_WARNING(f'Ignoring invalid manifest {self.file}: {e}')
+
+    def is_current(self, name : str, key : str = "") -> bool:
+        artifact = self.artifacts.get(name)
+        if not artifact:
+            return False
+
+        if artifact["digest"] != inputs_digest(artifact["inputs"], key):
+            return False
+
+        return all([os.path.exists(os.path.join(self.directory, output)) for output in artifact["outputs"]])
+
+    # Run the function only when the artifact is out of date
+    # Templates read by the function are added to the inputs, the files it writes in the directory are its outputs
+    def generate(self, name : str, function, key : str = "", inputs = (), outputs = None, directory : str = "") -> VoidResult:
+        if self.is_current(name, key):
+            LOG_INFO(f'Skipping {name}, nothing changed')
+            return VoidResult()
+
+        before = self.snapshot(directory)
+        template_index.used_templates.clear()
+
+        generated = function()
+        if not generated:
+            return generated
+
+        if outputs is None:
+            after = self.snapshot(directory)
+            outputs = [output for output, version in after.items() if before.get(output) != version]
+
+        inputs = sorted(set(inputs) | template_index.used_templates)
+        self.artifacts[name] = {
+            "digest": inputs_digest(inputs, key),
+            "inputs": inputs,
+            "outputs": sorted(outputs)
+        }
+        self.changed = True
+
+        return self.save()
+
+    # Files produced by all the artifacts, e.g. the sources a compiler depends on
+    def generated_files(self) -> list:
+        files = set()
+        for artifact in self.artifacts.values():
+            files.update([os.path.join(self.directory, output) for output in artifact["outputs"]])
+
+        return sorted([file for file in files if os.path.isfile(file)])
+
+    def snapshot(self, directory : str = "") -> dict:
+        path = os.path.join(self.directory, directory)
+        if not os.path.isdir(path):
+            return dict()
+
+        files = dict()
+        for entry in os.scandir(path):
+            if entry.is_file() and entry.name != MANIFEST_FILE:
+                status = entry.stat()
+                files[os.path.join(directory, entry.name)] = (status.st_mtime_ns, status.st_size)
+
+        return files
+
+    def save(self) -> VoidResult:
+        try:
+            temporary = f'{self.file}.{os.getpid()}'
+            with open(temporary, "w") as file:
+                json.dump(self.artifacts, file, indent=2, sort_keys=True)
+            os.replace(temporary, self.file)
+        except Exception as e:
+            return VoidResult.failed(f'Failed to write manifest {self.file}: {e}')
+
+        return VoidResult()
+
+def inputs_digest(inputs, key : str = "") -> str:
+    digest = hashlib.sha256()
+    digest.update(f'{DTIG_VERSION}\0{key}\0'.encode())
+
+    for file in inputs:
+        digest.update(f'{file}\0'.encode())
+        try:
+            with open(file, "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            # A missing input never matches a previous digest
+            digest.update(b"\1missing")
+
+        digest.update(b"\0")
+
+    return digest.hexdigest()
@@ -0,0 +1,56 @@
+import os
+import re
+import bisect
+
+from common.logging import *
+
+decorator_regex = re.compile(r'^<DTIG_([A-Z_]+)\b(\(([A-Z_]*)\))?.*>', flags=re.MULTILINE)
+section_end_regex = re.compile(r'^\s*<DTIG(?!>[^\s])', flags=re.MULTILINE)
+
+# All the sections of a template, found in a single pass
+# Each section has the decorator, its name and argument and where its body starts and ends
+class TemplateIndex():
+    def __init__(self, data : str):
+        self.data = data
+        self.sections = dict()
+
+        ends = [match.start() for match in section_end_regex.finditer(data)]
+
+        for match in decorator_regex.finditer(data):
+            function_start = match.end() + 1
+
+            # The body goes until the next decorator, or the end of the file
+            next_end = bisect.bisect_left(ends, function_start)
+            function_end = len(data) - 1 if next_end == len(ends) else ends[next_end] - 1
+
+            section = (data[match.start():match.end()], match[1], match[3], function_start, function_end)
+            self.sections.setdefault(match[1], []).append(section)
+
+        # The index is shared by the generators, so it must not change
+        for name in self.sections:
+            self.sections[name] = tuple(self.sections[name])
+
+        LOG_TRACE('Indexed %d sections', len(self.sections))
+
+    def find(self, name : str):
+        return self.sections.get(name, ())
+
+# Indexed templates shared by all the generators of the process
+# A template is only read and indexed again when the file changes
+indexed_templates = dict()
+
+# Every template used since the last clear, so outputs can record what they were generated from
+used_templates = set()
+
+def load_template(file : str, reader) -> TemplateIndex:
+    status = os.stat(file)
+    version = (status.st_mtime_ns, status.st_size)
+
+    used_templates.add(os.path.abspath(file))
+
+    key = (file, reader)
+    if key not in indexed_templates or indexed_templates[key][0] != version:
+        LOG_DEBUG('Indexing template: %s', file)
+        indexed_templates[key] = (version, TemplateIndex(reader(file)))
+
+    return indexed_templates[key][1]
@@ -0,0 +1,48 @@
+# Collects generated code as a list of chunks instead of concatenating strings
+# Every chunk goes through the filters (e.g. replacing calls, indenting) in order
+# and is then either kept in memory or written straight to a file
+class Emitter():
+    def __init__(self, file = None, filters = None, indentation : str = ""):
+        self.file = file
+        self.filters = filters if filters else []
+        self.indentation = indentation
+
+        self.chunks = []
+
+    def write(self, contents : str, level : int = 0):
+        if not contents:
+            return
+
+        if level:
+            contents = indent(contents, self.indentation * level)
+
+        self.emit(contents, self.filters)
+
+    def emit(self, contents : str, filters):
+        for output_filter in filters:
+            contents = output_filter(contents)
+
+        if not contents:
+            return
+
+        if self.file:
+            self.file.write(contents)
+        else:
+            self.chunks.append(contents)
+
+    # Filters may hold part of the data back, e.g. an incomplete line
+    def close(self):
+        for i, output_filter in enumerate(self.filters):
+            flush = getattr(output_filter, "flush", None)
+            if flush:
+                self.emit(flush(), self.filters[i + 1:])
+
+    def value(self) -> str:
+        return "".join(self.chunks)
+
+    def write_to(self, output_file : str):
+        with open(output_file, "w") as file:
+            file.writelines(self.chunks)
+
+def indent(data : str, indentation : str) -> str:
+    return "".join([indentation + line for line in data.splitlines(keepends=True)])
@@ -1,22 +1,82 @@
+import os
+import sys
 import json
+import marshal
+import hashlib
 
+from common.logging import *
+from common.signals import Signals, SIGNAL_LISTS
 from common.model_configuration_base import ModelConfigurationBase
 
+# orjson is optional, it parses large model descriptions several times faster
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+# Parsed and validated configurations are stored next to the code, as python does with __pycache__
+# Part of the cache key, must change whenever the stored configuration does
+CONFIG_CACHE_VERSION = 2
+CONFIG_CACHE_ENABLED = True
+CACHE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__dtig_cache__")
+
 class JsonConfiguration(ModelConfigurationBase):
     def __init__(self):
         super().__init__()
 
+        # Inputs, outputs and parameters, validated and indexed once
+        self.signals = dict()
+
     def parse(self, filename : str):
-        with open(filename, "r") as file:
-            self.data = json.load(file)
+        with open(filename, "rb") as file:
+            contents = file.read()
+
+        # The same file is only parsed and validated once, afterwards only the signal rows are read back
+        digest = config_digest(contents)
+        cached = load_config(digest)
+        if cached is not None:
+            self.data, rows = cached
+            self.signals = dict()
+            for key, signal_rows in rows.items():
+                self.signals[key] = Signals.from_rows(key, signal_rows)
+                self.data[key] = self.signals[key]
+            return
+
+        self.data = json_loads(contents)
 
         super().parse(filename)
+        self.index()
+
+        data = {key: value for key, value in self.data.items() if key not in self.signals}
+        rows = {key: signals.rows() for key, signals in self.signals.items()}
+        store_config(digest, (data, rows))
+
+    def index(self):
+        self.signals = dict()
+        for key in SIGNAL_LISTS:
+            if key in self.data:
+                self.index_signals(key, self.data[key])
+
+    def index_signals(self, key, value):
+        if value is None:
+            self.signals.pop(key, None)
+            return
+
+        if not isinstance(value, list) and not isinstance(value, Signals):
+            raise Exception(f'{key} must be a list')
+
+        # Only the records are kept, the parsed dictionaries are not needed anymore
+        self.signals[key] = Signals(key, value)
+        self.data[key] = self.signals[key]
 
     def __str__(self):
-        return json.dumps(self.data, indent=2)
+        data = {key: [signal.to_dict() for signal in value] if isinstance(value, Signals) else value for key, value in self.data.items()}
+        return json.dumps(data, indent=2)
 
     def __setitem__(self, key, value):
         self.data[key] = value
+        if key in SIGNAL_LISTS:
+            self.index_signals(key, value)
 
     def __getitem__(self, key):
         if key in self.data:
@@ -26,3 +86,41 @@ class JsonConfiguration(ModelConfigurationBase):
 
     def has(self, key):
         return key in self.data
+
+def config_digest(contents : bytes) -> str:
+    digest = hashlib.sha256()
+    digest.update(f'{CONFIG_CACHE_VERSION}\0{sys.implementation.cache_tag}\0'.encode())
+    digest.update(contents)
+
+    return digest.hexdigest()
+
+def load_config(digest : str):
+    if not CONFIG_CACHE_ENABLED:
+        return None
+
+    file = os.path.join(CACHE_DIRECTORY, f'{digest}.cfgc')
+    try:
+        # Reading the whole file first is much faster than letting marshal read from it
+        with open(file, "rb") as f:
+            return marshal.loads(f.read())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        LOG_WARNING(f'Ignoring invalid configuration cache {file}: {e}')
+        return None
+
+def store_config(digest : str, config):
+    if not CONFIG_CACHE_ENABLED:
+        return
+
+    file = os.path.join(CACHE_DIRECTORY, f'{digest}.cfgc')
+    try:
+        os.makedirs(CACHE_DIRECTORY, exist_ok=True)
+
+        # Write and rename so concurrent generators never read a partial file
+        temporary = f'{file}.{os.getpid()}'
+        with open(temporary, "wb") as f:
+            marshal.dump(config, f)
+        os.replace(temporary, file)
+    except Exception as e:
+        LOG_WARNING(f'Could not store configuration cache {file}: {e}')
@@ -12,6 +12,9 @@ KEY_VERSION = "version"
 KEY_FORMALISM = "formalism"
 KEY_LOOKAHEAD = "lookahead"
 KEY_PARAMETERS = "parameters"
+KEY_RUNTIME = "runtime"
+KEY_PACING = "pacing"
+KEY_SPEED = "speed"
 KEY_MODEL_PATH = "model_path"
 KEY_MINIMUM_STEP = "minimumstep"
 KEY_SUPER_DENSE_TIME = "superdensetime"
@@ -107,4 +110,12 @@ FORMALISM_CONTINUOUS = "continuous"
 FORMALISM_DISCRETE = "discrete"
 FORMALISM_FEM = "fem"
 
+# Runtimes of the generated python servers
+RUNTIME_THREADS = "threads"
+RUNTIME_ASYNCIO = "asyncio"
+
+# Pacing of the generated simulation loops
+PACING_FREE = "free"
+PACING_REALTIME = "realtime"
+
 NUMBER_OF_MESSAGES = 11
@@ -10,6 +10,15 @@ import com.google.protobuf.Any;
 import com.google.protobuf.Message;
 
 public class Helpers {
+  // Commands of a message are fields of its oneof, so the one that is set can be found without testing each of them
+  // The oneof is found through one of its commands, so it does not depend on the order of the oneofs of the message
+  private static final com.google.protobuf.Descriptors.OneofDescriptor COMMAND = dtig.MDTMessage.getDescriptor().findFieldByName("initialize").getContainingOneof();
+
+  public static String command(dtig.MDTMessage message) {
+    com.google.protobuf.Descriptors.FieldDescriptor field = message.getOneofFieldDescriptor(COMMAND);
+    return field == null ? "" : field.getName();
+  }
+
   public static dtig.MDTMessage parseFrom(byte[] data) throws IOException {
     return dtig.MDTMessage.parseFrom(data);
   }
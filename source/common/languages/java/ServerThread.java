@@ -13,6 +13,9 @@ import com.google.protobuf.*;
 
 public class ServerThread extends Thread
 {
+  // Same limit as the other servers, larger headers come from a broken or hostile client
+  private static final int MAX_MESSAGE_SIZE = 256 * 1024 * 1024;
+
   enum State {
     UNINITIALIZED,
     INITIALIZING,
@@ -26,7 +29,7 @@ public class ServerThread extends Thread
   private Socket           socket  = null;
   private ServerSocket     server  = null;
   private DataInputStream  in      = null;
-  private OutputStream     out     = null;
+  private DataOutputStream out     = null;
   // private Matlab           matlab  = null;
   private State            state   = State.UNINITIALIZED;
 
@@ -58,46 +61,87 @@ public class ServerThread extends Thread
 
       // takes input from the client socket
       in = new DataInputStream(new BufferedInputStream(socket.getInputStream()));
-      out = socket.getOutputStream();
+      out = new DataOutputStream(new BufferedOutputStream(socket.getOutputStream()));
 
-      byte[] bytes = new byte[1024];
+      // Reused for every message, it only grows when a larger one arrives
+      byte[] bytes = new byte[64 * 1024];
 
       // Read messages from the client until the client disconnects
-      int count;
-      while ((count = in.read(bytes)) > 0) {
-        dtig.MDTMessage message = dtig.MDTMessage.parseFrom(ByteBuffer.wrap(bytes, 0, count));
+      // Every message is preceded by its length as a 4 byte big endian integer
+      while (true) {
+        int count;
+        try {
+          count = in.readInt();
+        }
+        catch (EOFException e) {
+          break;
+        }
 
-        if (message.hasStop())
-        {
-          System.out.println("Stop message");
-          Object[] args = {"STOPPED"};
-          Matlab.mtFeval("setState", args, 0);
+        // The header is signed in java, so a size above 2 GiB reads as negative
+        if (count < 0 || count > MAX_MESSAGE_SIZE) {
+          System.out.println("Invalid message size: " + Integer.toUnsignedString(count));
+          break;
         }
-        else if (message.hasStart())
-          System.out.println("Start message");
-        else if (message.hasSetInput())
-          System.out.println("Set input message");
-        else if (message.hasGetOutput())
-          System.out.println("Get output message");
-        else if (message.hasAdvance())
-          System.out.println("Advance message");
-        else if (message.hasInitialize())
+
+        if (count > bytes.length)
+          bytes = new byte[count];
+
+        in.readFully(bytes, 0, count);
+        dtig.MDTMessage message = dtig.MDTMessage.parseFrom(ByteBuffer.wrap(bytes, 0, count));
+
+        dtig.EReturnCode code = dtig.EReturnCode.SUCCESS;
+        switch (Helpers.command(message))
         {
-          System.out.println("Initialize message");
-          Object[] args = {"INITIALIZED"};
-          Matlab.mtFeval("setState", args, 0);
+          case "stop":
+          {
+            System.out.println("Stop message");
+            Object[] args = {"STOPPED"};
+            Matlab.mtFeval("setState", args, 0);
+            break;
+          }
+          case "start":
+            System.out.println("Start message");
+            break;
+          case "set_input":
+            System.out.println("Set input message");
+            break;
+          case "get_output":
+            System.out.println("Get output message");
+            break;
+          case "advance":
+            System.out.println("Advance message");
+            break;
+          case "initialize":
+          {
+            System.out.println("Initialize message");
+            Object[] args = {"INITIALIZED"};
+            Matlab.mtFeval("setState", args, 0);
+            break;
+          }
+          case "set_parameter":
+            System.out.println("Set parameter message");
+            break;
+          case "get_parameter":
+            System.out.println("Get parameter message");
+            break;
+          case "get_status":
+            System.out.println("Get status message");
+            break;
+          case "model_info":
+            System.out.println("Get model info");
+            break;
+          default:
+            System.out.println("Unknown message");
+            code = dtig.EReturnCode.UNKNOWN_COMMAND;
         }
-        else if (message.hasSetParameter())
-          System.out.println("Set parameter message");
-        else if (message.hasGetParameter())
-          System.out.println("Get parameter message");
-        else
-          System.out.println("Get model info");
 
         dtig.MReturnValue.Builder returnValue = dtig.MReturnValue.newBuilder()
-          .setCode(dtig.EReturnCode.SUCCESS);
+          .setCode(code);
 
-        out.write(returnValue.build().toByteArray());
+        byte[] reply = returnValue.build().toByteArray();
+        out.writeInt(reply.length);
+        out.write(reply);
+        out.flush();
       }
 
       System.out.println("Closing connection");
@@ -0,0 +1,50 @@
+import socket
+import struct
+
+# Every message is preceded by its length as a 4 byte big endian integer, so a message can have any size
+# and several messages arriving at once are still read one by one
+FRAME_HEADER = struct.Struct('!I')
+MAX_MESSAGE_SIZE = 256 * 1024 * 1024
+
+class FramedSocket:
+    def __init__(self, sock: socket.socket, size: int = 64 * 1024):
+        self.sock = sock
+        self.header = bytearray(FRAME_HEADER.size)
+        self.header_view = memoryview(self.header)
+
+        # Reused for every message, it only grows when a larger one arrives
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer)
+
+    def receive_into(self, view: memoryview) -> bool:
+        received = 0
+        while received < len(view):
+            count = self.sock.recv_into(view[received:])
+            if not count:
+                return False
+
+            received += count
+
+        return True
+
+    # The returned view is only valid until the next message is received
+    def receive(self) -> memoryview:
+        if not self.receive_into(self.header_view):
+            return None
+
+        size, = FRAME_HEADER.unpack(self.header)
+        if size > MAX_MESSAGE_SIZE:
+            raise ValueError(f'Message of {size} bytes is larger than {MAX_MESSAGE_SIZE}')
+
+        if size > len(self.buffer):
+            self.buffer = bytearray(max(size, 2 * len(self.buffer)))
+            self.view = memoryview(self.buffer)
+
+        message = self.view[:size]
+        if not self.receive_into(message):
+            return None
+
+        return message
+
+    def send(self, data: bytes) -> None:
+        self.sock.sendall(FRAME_HEADER.pack(len(data)) + data)
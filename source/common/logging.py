@@ -1,7 +1,11 @@
+import sys
+import queue
+import atexit
+import threading
+
 from os.path import basename
 from enum import IntEnum
 from datetime import datetime
-from inspect import getframeinfo, stack
 
 class LogLevel(IntEnum):
   ERROR     = 0
@@ -10,24 +14,63 @@ class LogLevel(IntEnum):
   DEBUG     = 3
   TRACE     = 4
 
-def start_logger(level):
-    global CURRENT_LOG_LEVEL
-    CURRENT_LOG_LEVEL = level
+# Used until start_logger is called
+CURRENT_LOG_LEVEL = LogLevel.INFO
+
+# With a background sink, records are queued and written by a thread, so the caller never waits for the output
+log_queue = None
+log_thread = None
+
+# Below warnings, each call site logs at most once per RATE_LIMIT seconds, the rest is counted
+RATE_LIMIT = 0.0
+log_sites = dict()
+
+def start_logger(level, background : bool = False, rate_limit : float = 0.0):
+    global CURRENT_LOG_LEVEL, RATE_LIMIT, log_queue, log_thread
+    CURRENT_LOG_LEVEL = LogLevel(level)
+    RATE_LIMIT = rate_limit
+
+    if background and log_queue is None:
+        log_queue = queue.SimpleQueue()
+        log_thread = threading.Thread(target=write_logs, daemon=True)
+        log_thread.start()
+        atexit.register(stop_logger)
+
+def stop_logger():
+    global log_queue, log_thread
+    if log_queue is None:
+        return
 
-def LOG_ERROR(message : str):
-  log(LogLevel.ERROR, message)
+    log_queue.put(None)
+    log_thread.join()
+    log_queue = None
+    log_thread = None
 
-def LOG_WARNING(message : str):
-  log(LogLevel.WARNING, message)
+def is_enabled(level : LogLevel) -> bool:
+    return level <= CURRENT_LOG_LEVEL
 
-def LOG_INFO(message : str):
-  log(LogLevel.INFO, message)
+# The level is checked before anything else, so a disabled message only costs a comparison
+# To avoid building it when disabled, a message can be a format string with its arguments, e.g.
+# LOG_TRACE('Found: %s', call), or a function returning the message
+def LOG_ERROR(message, *args):
+  if LogLevel.ERROR <= CURRENT_LOG_LEVEL:
+    log(LogLevel.ERROR, message, args)
 
-def LOG_DEBUG(message : str):
-  log(LogLevel.DEBUG, message)
+def LOG_WARNING(message, *args):
+  if LogLevel.WARNING <= CURRENT_LOG_LEVEL:
+    log(LogLevel.WARNING, message, args)
 
-def LOG_TRACE(message : str):
-  log(LogLevel.TRACE, message)
+def LOG_INFO(message, *args):
+  if LogLevel.INFO <= CURRENT_LOG_LEVEL:
+    log(LogLevel.INFO, message, args)
+
+def LOG_DEBUG(message, *args):
+  if LogLevel.DEBUG <= CURRENT_LOG_LEVEL:
+    log(LogLevel.DEBUG, message, args)
+
+def LOG_TRACE(message, *args):
+  if LogLevel.TRACE <= CURRENT_LOG_LEVEL:
+    log(LogLevel.TRACE, message, args)
 
 def printLevel(level : LogLevel) -> str:
     if level == LogLevel.ERROR:
@@ -41,7 +84,79 @@ def printLevel(level : LogLevel) -> str:
     elif level == LogLevel.TRACE:
         return "[\033[94mT\033[00m]"
 
-def log(level: LogLevel, message : str) -> None:
-    if level.value <= CURRENT_LOG_LEVEL.value:
-        caller = getframeinfo(stack()[2][0])
-        print(f"{datetime.now()} {printLevel(level)} {basename(caller.filename)}:{caller.lineno}: {message}")
\ No newline at end of file
+def format_message(message, args) -> str:
+    if callable(message):
+        return message()
+
+    if args:
+        return str(message) % args
+
+    return message
+
+def format_record(record) -> str:
+    time, level, file, line, message, args, suppressed = record
+    message = format_message(message, args)
+    if suppressed:
+        message = f'{message} ({suppressed} suppressed)'
+
+    return f"{time} {printLevel(level)} {basename(file)}:{line}: {message}"
+
+# In the background thread, a message that cannot be formatted is reported instead of stopping the thread
+def format_queued_record(record) -> str:
+    try:
+        return format_record(record)
+    except Exception as e:
+        time, level, file, line, message, args, suppressed = record
+        return f"{time} {printLevel(LogLevel.ERROR)} {basename(file)}:{line}: Failed to format log message {message!r}: {e}"
+
+# Returns how many records of the site were dropped since the last one, or None to drop this one
+def rate_limit(site, now : datetime):
+    last, suppressed = log_sites.get(site, (None, 0))
+    if last is not None and (now - last).total_seconds() < RATE_LIMIT:
+        log_sites[site] = (last, suppressed + 1)
+        return None
+
+    log_sites[site] = (now, 0)
+    return suppressed
+
+# Called through the LOG_* functions, so the caller is two frames up
+def log(level: LogLevel, message, args = (), depth : int = 2) -> None:
+    if level > CURRENT_LOG_LEVEL:
+        return
+
+    caller = sys._getframe(depth)
+    site = (caller.f_code.co_filename, caller.f_lineno)
+    now = datetime.now()
+
+    suppressed = 0
+    if RATE_LIMIT > 0 and level > LogLevel.WARNING:
+        suppressed = rate_limit(site, now)
+        if suppressed is None:
+            return
+
+    record = (now, level, site[0], site[1], message, args, suppressed)
+    if log_queue is None:
+        print(format_record(record))
+    else:
+        # Lazy messages are formatted by the background thread
+        log_queue.put(record)
+
+def write_logs():
+    while True:
+        record = log_queue.get()
+        lines = []
+
+        # Write everything that is already queued at once
+        while record is not None:
+            lines.append(format_queued_record(record))
+            try:
+                record = log_queue.get_nowait()
+            except queue.Empty:
+                break
+
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
+
+        if record is None:
+            return
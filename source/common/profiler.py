@@ -0,0 +1,136 @@
+import json
+import time
+import functools
+import tracemalloc
+
+from collections import OrderedDict
+
+# Profiling is off unless started, a disabled phase only checks this flag
+PROFILING = False
+TRACE_MEMORY = False
+
+# Name -> calls, wall time, cpu time and peak traced memory
+phases = OrderedDict()
+
+# Phases currently running, a phase nested in one with the same name is only counted once
+active = []
+
+# Methods of the generators measured when profiling
+PROFILED_METHODS = ["generate", "read_templates", "parse_dtig_language", "replace_calls"]
+PROFILED_PREFIXES = ["generate_"]
+instrumented_classes = set()
+
+def start_profiler(memory : bool = True):
+    global PROFILING, TRACE_MEMORY
+    PROFILING = True
+    TRACE_MEMORY = memory
+
+    if TRACE_MEMORY and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+def stop_profiler():
+    global PROFILING
+    PROFILING = False
+
+    if TRACE_MEMORY and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+def reset():
+    phases.clear()
+
+class phase():
+    def __init__(self, name : str):
+        self.name = name
+        self.counted = False
+
+    def __enter__(self):
+        if not PROFILING:
+            return self
+
+        self.counted = all([running.name != self.name for running in active])
+        self.peak = 0
+        if TRACE_MEMORY:
+            # The peak of the parent phase so far is kept before measuring this one
+            if active:
+                active[-1].peak = max(active[-1].peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+
+        active.append(self)
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exception):
+        if not PROFILING or not active or active[-1] is not self:
+            return False
+
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        active.pop()
+
+        if TRACE_MEMORY:
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            if active:
+                active[-1].peak = max(active[-1].peak, self.peak)
+            tracemalloc.reset_peak()
+
+        if self.counted:
+            record = phases.setdefault(self.name, [0, 0.0, 0.0, 0])
+            record[0] += 1
+            record[1] += wall
+            record[2] += cpu
+            record[3] = max(record[3], self.peak)
+
+        return False
+
+def profiled(name : str):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper_func(*args, **kwargs):
+            if not PROFILING:
+                return func(*args, **kwargs)
+
+            with phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper_func
+
+    return decorator
+
+# Wrap the pipeline methods of a generator class and of its bases, only done while profiling
+def instrument(cls):
+    if not PROFILING or cls in instrumented_classes:
+        return
+
+    for klass in cls.__mro__:
+        if klass in instrumented_classes or klass is object:
+            continue
+
+        for name, attribute in list(vars(klass).items()):
+            if not callable(attribute):
+                continue
+
+            if name in PROFILED_METHODS or any([name.startswith(prefix) for prefix in PROFILED_PREFIXES]):
+                setattr(klass, name, profiled(name)(attribute))
+
+        instrumented_classes.add(klass)
+
+def report(output_format : str = "table") -> str:
+    if output_format == "json":
+        return json.dumps({name: {
+            "calls": calls,
+            "wall": wall,
+            "cpu": cpu,
+            "peak_memory": peak
+        } for name, (calls, wall, cpu, peak) in phases.items()}, indent=2)
+
+    # Phases may be nested, so the times of a row include the ones of the phases it called
+    rows = sorted(phases.items(), key=lambda item: item[1][1], reverse=True)
+    width = max([len(name) for name in phases.keys()] + [len("Phase")])
+
+    lines = [f'{"Phase":<{width}} {"Calls":>7} {"Wall (s)":>10} {"CPU (s)":>10} {"Peak (MiB)":>11}']
+    for name, (calls, wall, cpu, peak) in rows:
+        memory = f'{peak / (1024 * 1024):>11.2f}' if TRACE_MEMORY else f'{"-":>11}'
+        lines.append(f'{name:<{width}} {calls:>7} {wall:>10.4f} {cpu:>10.4f} {memory}')
+
+    return "\n".join(lines)
@@ -0,0 +1,132 @@
+from operator import itemgetter
+
+from common.keys import *
+from common.logging import *
+
+# Configuration keys holding a list of signals
+SIGNAL_LISTS = (KEY_INPUTS, KEY_OUTPUTS, KEY_PARAMETERS)
+
+# Fields of an input, output or parameter, in the order they are stored
+# Any other key of the entry is kept in a dictionary stored after them, or None if there is none
+SIGNAL_FIELDS = (KEY_ID, KEY_NAME, KEY_TYPE, KEY_UNIT, KEY_DEFAULT, KEY_MODIFIER, KEY_NAMESPACE, KEY_DESCRIPTION)
+FIELD_INDEX = {field: i for i, field in enumerate(SIGNAL_FIELDS)}
+EXTRA_INDEX = len(SIGNAL_FIELDS)
+
+# Compact record of a single input, output or parameter
+# It can still be read as the dictionary of the configuration, e.g. signal[KEY_NAME], or through signal.name
+class Signal(tuple):
+    __slots__ = ()
+
+    def __new__(cls, data : dict):
+        get = data.get
+        extra = {key: value for key, value in data.items() if key not in FIELD_INDEX} or None
+        return tuple.__new__(cls, (get(KEY_ID), get(KEY_NAME), get(KEY_TYPE), get(KEY_UNIT),
+                                   get(KEY_DEFAULT), get(KEY_MODIFIER), get(KEY_NAMESPACE), get(KEY_DESCRIPTION), extra))
+
+    @staticmethod
+    def from_row(row):
+        return tuple.__new__(Signal, row)
+
+    def __getitem__(self, key):
+        if key.__class__ is str:
+            index = FIELD_INDEX.get(key)
+            if index is not None:
+                return tuple.__getitem__(self, index)
+
+            extra = tuple.__getitem__(self, EXTRA_INDEX)
+            if extra is None:
+                raise KeyError(key)
+
+            return extra[key]
+
+        return tuple.__getitem__(self, key)
+
+    def __contains__(self, key):
+        index = FIELD_INDEX.get(key)
+        if index is None:
+            extra = tuple.__getitem__(self, EXTRA_INDEX)
+            return extra is not None and extra.get(key) is not None
+
+        return tuple.__getitem__(self, index) is not None
+
+    def get(self, key, default = None):
+        index = FIELD_INDEX.get(key)
+        if index is None:
+            extra = tuple.__getitem__(self, EXTRA_INDEX)
+            value = None if extra is None else extra.get(key)
+        else:
+            value = tuple.__getitem__(self, index)
+
+        return default if value is None else value
+
+    def to_dict(self) -> dict:
+        data = {field: value for field, value in zip(SIGNAL_FIELDS, self) if value is not None}
+        extra = tuple.__getitem__(self, EXTRA_INDEX)
+        if extra is not None:
+            data.update(extra)
+
+        return data
+
+    def __repr__(self):
+        return f'Signal({self.name!r}, {self.type!r})'
+
+for field, index in FIELD_INDEX.items():
+    setattr(Signal, field, property(itemgetter(index)))
+
+# Names in configuration order, with constant time membership tests
+class Names(tuple):
+    def __new__(cls, names):
+        names = super().__new__(cls, names)
+        names.lookup = frozenset(names)
+        return names
+
+    def __contains__(self, name):
+        try:
+            return name in self.lookup
+        except TypeError:
+            return False
+
+# Inputs, outputs or parameters of a model, indexed by name, id and type
+class Signals(tuple):
+    def __new__(cls, name : str, entries):
+        signals = []
+        for i, entry in enumerate(entries):
+            if isinstance(entry, Signal):
+                signals.append(entry)
+                continue
+
+            if not isinstance(entry, dict) or not isinstance(entry.get(KEY_NAME), str):
+                raise Exception(f'Entry {i} of {name} must be an object with a name')
+
+            signals.append(Signal(entry))
+
+        return super().__new__(cls, signals)
+
+    def __init__(self, name : str, entries):
+        self.name = name
+        self.names = Names([tuple.__getitem__(signal, 1) for signal in self])
+
+        self.by_name = dict()
+        self.by_id = dict()
+        self.by_type = dict()
+        for signal in self:
+            signal_id, signal_name, signal_type, *_ = signal
+            if signal_name in self.by_name:
+                LOG_WARNING(f'Duplicated name in {name}: {signal_name}')
+            else:
+                self.by_name[signal_name] = signal
+
+            if signal_id is not None:
+                self.by_id.setdefault(signal_id, signal)
+
+            self.by_type.setdefault(signal_type, []).append(signal)
+
+    # Rows that were already validated, e.g. from the configuration cache
+    @classmethod
+    def from_rows(cls, name : str, rows):
+        signals = tuple.__new__(cls, [tuple.__new__(Signal, row) for row in rows])
+        signals.__init__(name, signals)
+        return signals
+
+    def rows(self) -> list:
+        return [tuple(signal) for signal in self]
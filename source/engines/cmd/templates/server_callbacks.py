@@ -1,6 +1,22 @@
 <DTIG_CALLBACK(CONSTRUCTOR)>
 self.previous_message = None
 
+# Proto message of the values in the replies, by name, the parameters that cannot be shown have none
+self.output_messages = {
+    DTIG_FOR(DTIG_OUTPUTS)
+    DTIG_STR(DTIG_ITEM_NAME): lambda: DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE),
+    DTIG_END_FOR
+}
+self.parameter_messages = {
+    DTIG_FOR(DTIG_PARAMETERS)
+    DTIG_IF((DTIG_ITEM_TYPE != DTIG_TYPE_MATERIAL AND DTIG_ITEM_TYPE != DTIG_TYPE_FIXTURE) AND DTIG_ITEM_TYPE != DTIG_TYPE_FORCE)
+    DTIG_STR(DTIG_ITEM_NAME): lambda: DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE),
+    DTIG_ELSE
+    DTIG_STR(DTIG_ITEM_NAME): None,
+    DTIG_END_IF
+    DTIG_END_FOR
+}
+
 <DTIG_CALLBACK(RUNCLIENT)>
 def run_client(self, sock):
     previous_option = "0"
@@ -176,16 +192,13 @@ def get_output(self, sock):
             for i in range(len(response.values.values)):
                 param = response.values.identifiers[i]
                 any_value = response.values.values[i]
-                DTIG_FOR(DTIG_OUTPUTS)
-                DTIG_IF(DTIG_INDEX == 0)
-                if param == DTIG_STR(DTIG_ITEM_NAME):
-                DTIG_ELSE
-                elif param == DTIG_STR(DTIG_ITEM_NAME):
-                DTIG_END_IF
-                    value = DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE)
-                    if any_value.Unpack(value):
-                        LOG_INFO(f'DTIG_ITEM_NAME: {value.value}')
-                DTIG_END_FOR
+                value_type = self.output_messages.get(param)
+                if value_type is None:
+                    continue
+
+                value = value_type()
+                if any_value.Unpack(value):
+                    LOG_INFO(f'{param}: {value.value}')
 
     self.send_message(sock, message, handler)
 
@@ -259,20 +272,17 @@ def get_parameter(self, sock):
             for i in range(len(response.values.values)):
                 param = response.values.identifiers[i]
                 any_value = response.values.values[i]
-                DTIG_FOR(DTIG_PARAMETERS)
-                DTIG_IF(DTIG_INDEX == 0)
-                if param == DTIG_STR(DTIG_ITEM_NAME):
-                DTIG_ELSE
-                elif param == DTIG_STR(DTIG_ITEM_NAME):
-                DTIG_END_IF
-                    DTIG_IF((DTIG_ITEM_TYPE != DTIG_TYPE_MATERIAL AND DTIG_ITEM_TYPE != DTIG_TYPE_FIXTURE) AND DTIG_ITEM_TYPE != DTIG_TYPE_FORCE)
-                    value = DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE)
-                    if any_value.Unpack(value):
-                        LOG_INFO(f'DTIG_ITEM_NAME: {value.value}')
-                    DTIG_ELSE
-                    print("get_parameter for DTIG_ITEM_NAME is not implemented")
-                    DTIG_END_IF
-                DTIG_END_FOR
+                if param not in self.parameter_messages:
+                    continue
+
+                value_type = self.parameter_messages[param]
+                if value_type is None:
+                    print(f"get_parameter for {param} is not implemented")
+                    continue
+
+                value = value_type()
+                if any_value.Unpack(value):
+                    LOG_INFO(f'{param}: {value.value}')
 
     self.send_message(sock, message, handler)
 
@@ -313,11 +323,10 @@ def status(self, sock):
 
 <DTIG_METHOD(PUBLIC)>
 def send_message(self, sock, message, handler=None):
-    data_to_send = message.SerializeToString()
-    sock.sendall(data_to_send)
+    sock.send(message.SerializeToString())
 
-    received_data = sock.recv(1024)
-    if not received_data:
+    received_data = sock.receive()
+    if received_data is None:
         print("Server stopped")
         self.running = False
         return
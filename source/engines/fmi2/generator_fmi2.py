@@ -20,6 +20,15 @@ class ServerGeneratorFMI2(ServerGenerator):
         self.config = config
         self.engine_template_file = f'{template_folder}/server_callbacks.py'
 
+        pacing = config[KEY_PACING] if config.has(KEY_PACING) else PACING_REALTIME
+        if pacing not in [PACING_FREE, PACING_REALTIME]:
+            return VoidResult.failed(f'Unknown pacing: {pacing}')
+
+        if config.has(KEY_SPEED):
+            speed = config[KEY_SPEED]
+            if isinstance(speed, bool) or not isinstance(speed, (int, float)) or speed <= 0:
+                return VoidResult.failed(f'Speed must be a positive number: {speed}')
+
         return super().generate(config)
 
     def type_to_fmi_function(self, variable_type):
@@ -7,6 +7,8 @@ import csv
 import shutil
 import numpy as np
 
+from time import monotonic
+
 <DTIG_CLASSNAME>
 FMI2Wrapper
 
@@ -16,11 +18,56 @@ self.start_time : float  = 0.0
 self.stop_time  : float  = 10.0
 self.step_size  : float  = 1e-3
 
+# Continuous runs advance speed simulated seconds per second of wall time, a speed of 0 runs as fast as possible
+DTIG_IF(DTIG_PACING == DTIG_PACING_FREE)
+self.speed : float = 0.0
+DTIG_ELSE_IF(HAS DTIG_SPEED)
+self.speed : float = DTIG_SPEED
+DTIG_ELSE
+self.speed : float = 1.0
+DTIG_END_IF
+self.missed_deadlines : int = 0
+
+# While running, missed deadlines are reported at most once per interval, in seconds
+self.deadline_warning_interval : float = 1.0
+
 self.fmu = None
 self.model_name = None
-self.parameters = {}
+self.parameters = []
 self.value_references = {}
 
+# Proto message and FMU accessors of every signal, by name, types without an FMI accessor have none
+self.input_signals = {
+    DTIG_FOR(DTIG_INPUTS)
+    DTIG_IF(DTIG_TO_TYPE(DTIG_ITEM_TYPE))
+    DTIG_STR(DTIG_ITEM_NAME): (lambda: DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE), FMU2Slave.getDTIG_TO_TYPE(DTIG_ITEM_TYPE), FMU2Slave.setDTIG_TO_TYPE(DTIG_ITEM_TYPE)),
+    DTIG_ELSE
+    DTIG_STR(DTIG_ITEM_NAME): (lambda: DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE), None, None),
+    DTIG_END_IF
+    DTIG_END_FOR
+}
+self.output_signals = {
+    DTIG_FOR(DTIG_OUTPUTS)
+    DTIG_IF(DTIG_TO_TYPE(DTIG_ITEM_TYPE))
+    DTIG_STR(DTIG_ITEM_NAME): (lambda: DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE), FMU2Slave.getDTIG_TO_TYPE(DTIG_ITEM_TYPE), FMU2Slave.setDTIG_TO_TYPE(DTIG_ITEM_TYPE)),
+    DTIG_ELSE
+    DTIG_STR(DTIG_ITEM_NAME): (lambda: DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE), None, None),
+    DTIG_END_IF
+    DTIG_END_FOR
+}
+self.parameter_signals = {
+    DTIG_FOR(DTIG_PARAMETERS)
+    DTIG_IF(DTIG_TO_TYPE(DTIG_ITEM_TYPE))
+    DTIG_STR(DTIG_ITEM_NAME): (lambda: DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE), FMU2Slave.getDTIG_TO_TYPE(DTIG_ITEM_TYPE), FMU2Slave.setDTIG_TO_TYPE(DTIG_ITEM_TYPE)),
+    DTIG_ELSE
+    DTIG_STR(DTIG_ITEM_NAME): (lambda: DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE), None, None),
+    DTIG_END_IF
+    DTIG_END_FOR
+}
+
+# Signals of each kind grouped by accessor with their value references, filled once the FMU is initialized
+self.signal_groups = {}
+
 <DTIG_CALLBACK(INITIALIZE)>
 def parse_initialize(message) -> Message:
     if message.HasField("model_name"):
@@ -48,14 +95,14 @@ def parse_start(message) -> Message:
     self.mode = message.run_mode
     self.state = dtig_state.WAITING if self.mode == dtig_run_mode.STEPPED else dtig_state.RUNNING
 
-    print(f'Starting with: {dtig_run_mode.ERunMode.Name(self.mode)}.')
-    print(f'Running from {self.start_time:0.4f} to {self.stop_time:0.4f} with {self.step_size:0.4f}')
+    logger.info(f'Starting with: {dtig_run_mode.ERunMode.Name(self.mode)}.')
+    logger.info(f'Running from {self.start_time:0.4f} to {self.stop_time:0.4f} with {self.step_size:0.4f}')
 
     return dtig_return.MReturnValue(code=dtig_code.SUCCESS)
 
 <DTIG_CALLBACK(STOP)>
 def parse_stop(message) -> Message:
-    print(f'Stopping with: {message.mode}')
+    logger.info(f'Stopping with: {message.mode}')
     return dtig_return.MReturnValue(code=dtig_code.SUCCESS)
 
 <DTIG_CALLBACK(ADVANCE)>
@@ -97,14 +144,14 @@ def run_model() -> None:
             if self.state == dtig_state.STOPPED:
                 return
 
-        print(f'Initializing FMU: {self.model_name}')
+        logger.info(f'Initializing FMU: {self.model_name}')
 
         # read the model description
         try:
             model_description = read_model_description(self.model_name)
             break
         except Exception as e:
-            print(f'Failed to open model: {self.model_name}')
+            logger.error(f'Failed to open model: {self.model_name}')
             with self.condition:
                 self.state = dtig_state.UNINITIALIZED
 
@@ -115,16 +162,24 @@ def run_model() -> None:
     # extract the FMU
     unzipdir = extract(self.model_name)
 
-    self.fmu = FMU2Slave(guid=model_description.guid,
-                         unzipDirectory=unzipdir,
-                         modelIdentifier=model_description.coSimulation.modelIdentifier,
-                         instanceName='instance1')
-
-    # initialize
-    self.fmu.instantiate()
-    self.fmu.setupExperiment(startTime=self.start_time)
-    self.fmu.enterInitializationMode()
-    self.fmu.exitInitializationMode()
+    with self.model_lock:
+        self.fmu = FMU2Slave(guid=model_description.guid,
+                             unzipDirectory=unzipdir,
+                             modelIdentifier=model_description.coSimulation.modelIdentifier,
+                             instanceName='instance1')
+
+        # initialize
+        self.fmu.instantiate()
+        self.fmu.setupExperiment(startTime=self.start_time)
+        self.fmu.enterInitializationMode()
+        self.fmu.exitInitializationMode()
+
+        # Requests only reach the FMU through its signal groups, so they are published once it is initialized
+        self.signal_groups = {
+            "input": self.group_signals(self.input_signals),
+            "output": self.group_signals(self.output_signals),
+            "parameter": self.group_signals(self.parameter_signals)
+        }
 
     first_run = True
     while self.state != dtig_state.STOPPED:
@@ -133,39 +188,66 @@ def run_model() -> None:
 
         if self.mode == dtig_run_mode.CONTINUOUS and not first_run:
             # reset() erases our current parameters, so we must save and restore them manually
-            self.store_parameters()
-            self.fmu.reset()
-            self.fmu.setupExperiment(startTime=self.start_time)
-            self.fmu.enterInitializationMode()
-            self.load_parameters()
-            self.fmu.exitInitializationMode()
+            with self.model_lock:
+                self.store_parameters()
+                self.fmu.reset()
+                self.fmu.setupExperiment(startTime=self.start_time)
+                self.fmu.enterInitializationMode()
+                self.load_parameters()
+                self.fmu.exitInitializationMode()
 
         first_run = False
         rows : list = []  # list to record the results
         time : float = self.start_time
 
-        print(f'Running with state: {dtig_state.EState.Name(self.state)} and {time} vs {self.start_time}')
+        # Every step has a deadline on the monotonic clock counted from the start of the run, so the pacing does not drift
+        # A stepped run is paced by the client instead
+        paced = self.speed > 0 and self.mode == dtig_run_mode.CONTINUOUS
+        run_start = monotonic()
+        steps = 0
+        self.missed_deadlines = 0
+        last_warning = None
+
+        logger.info(f'Running with state: {dtig_state.EState.Name(self.state)} and {time} vs {self.start_time}')
         # simulation loop
         while time < self.stop_time and self.state != dtig_state.STOPPED:
             with self.condition:
                 if self.mode == dtig_run_mode.STEPPED:
                     self.condition.wait_for(lambda: self.state == dtig_state.RUNNING or self.state == dtig_state.STOPPED)
-                    print(f'Step: {time:0.4f} out of {self.stop_time:0.4f}')
+                    logger.debug('Step: %0.4f out of %0.4f', time, self.stop_time)
 
-            # perform one step
-            self.fmu.doStep(currentCommunicationPoint=time, communicationStepSize=self.step_size)
+            # perform one step, requests reach the FMU between steps
+            with self.model_lock:
+                self.fmu.doStep(currentCommunicationPoint=time, communicationStepSize=self.step_size)
+                outputs = self.fmu.getReal(self.value_references.values())[1:]
 
             # advance the time
             time += self.step_size
 
-            outputs = self.fmu.getReal(self.value_references.values())[1:]
             rows.append((time, *outputs))
-            sleep(0.025)
+            steps += 1
+
+            if paced:
+                delay = run_start + (time - self.start_time) / self.speed - monotonic()
+                if delay > 0:
+                    with self.condition:
+                        self.condition.wait_for(lambda: self.state == dtig_state.STOPPED, timeout=delay)
+                else:
+                    self.missed_deadlines += 1
+
+                    now = monotonic()
+                    if last_warning is None or now - last_warning >= self.deadline_warning_interval:
+                        logger.warning('Behind real time by %0.4fs at %0.4f, %d of %d steps missed their deadline', -delay, time, self.missed_deadlines, steps)
+                        last_warning = now
+
             with self.condition:
                 if self.mode == dtig_run_mode.STEPPED and self.state != dtig_state.STOPPED:
                     self.state = dtig_state.WAITING
 
-        print(f'FMU simulation done')
+        if paced:
+            logger.info(f'FMU simulation done, {self.missed_deadlines} of {steps} steps missed their deadline')
+        else:
+            logger.info(f'FMU simulation done')
 
         with self.condition:
             if self.state != dtig_state.STOPPED:
@@ -179,34 +261,21 @@ def run_model() -> None:
             result = np.array(rows, dtype=np.dtype([(k, np.float64) for k in self.value_references.keys()]))
             plot_result(result)
 
-    self.fmu.terminate()
-    self.fmu.freeInstance()
+    # The FMU is freed, so requests are refused again
+    with self.model_lock:
+        self.signal_groups = {}
+        self.fmu.terminate()
+        self.fmu.freeInstance()
 
     # clean up
     shutil.rmtree(unzipdir, ignore_errors=True)
 
 <DTIG_CALLBACK(SET_INPUT)>
-def set_inputs(reference, any_value):
+def set_inputs(references, any_values):
     DTIG_IF(NOT DTIG_INPUTS_LENGTH)
     return self.return_code(dtig_code.FAILURE, "Model has no inputs")
     DTIG_ELSE
-
-    DTIG_FOR(DTIG_INPUTS)
-
-    DTIG_IF(DTIG_INDEX == 0)
-    if reference == DTIG_STR(DTIG_ITEM_NAME):
-    DTIG_ELSE
-    elif reference == DTIG_STR(DTIG_ITEM_NAME):
-    DTIG_END_IF
-        value = DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE)
-        if not any_value.Unpack(value):
-            return self.return_code(dtig_code.FAILURE, f"Failed to unpack value: {reference}")
-        self.fmu.setDTIG_TO_TYPE(DTIG_ITEM_TYPE)([self.value_references[reference]], [value.value])
-        return self.return_code(dtig_code.SUCCESS)
-
-    DTIG_END_FOR
-    else:
-        return self.return_code(dtig_code.UNKNOWN_OPTION, f"Unknown input: {reference}")
+    return self.set_values("input", references, any_values)
     DTIG_END_IF
 
 <DTIG_CALLBACK(GET_OUTPUT)>
@@ -214,50 +283,15 @@ def get_outputs(references):
     DTIG_IF(NOT DTIG_OUTPUTS_LENGTH)
     return self.return_code(dtig_code.FAILURE, "Model has no outputs")
     DTIG_ELSE
-    return_message = self.return_code(dtig_code.SUCCESS)
-    for reference in references:
-        DTIG_FOR(DTIG_OUTPUTS)
-        DTIG_IF(DTIG_INDEX == 0)
-        if reference == DTIG_STR(DTIG_ITEM_NAME):
-        DTIG_ELSE
-        elif reference == DTIG_STR(DTIG_ITEM_NAME):
-        DTIG_END_IF
-            any_value = DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE)
-            any_value.value = self.fmu.getDTIG_TO_TYPE(DTIG_ITEM_TYPE)([self.value_references[reference]])[0]
-        DTIG_END_FOR
-        else:
-            return self.return_code(dtig_code.UNKNOWN_OPTION, f"Unknown output: {reference}")
-
-        any_msg = any_pb2.Any()
-        any_msg.Pack(any_value)
-        return_message.values.identifiers.append(reference)
-        return_message.values.values.append(any_msg)
-
-    return return_message
+    return self.get_values("output", references)
     DTIG_END_IF
 
 <DTIG_CALLBACK(SET_PARAMETER)>
-def set_parameters(reference, any_value):
+def set_parameters(references, any_values):
     DTIG_IF(NOT DTIG_PARAMETERS_LENGTH)
     return self.return_code(dtig_code.FAILURE, "Model has no parameters")
     DTIG_ELSE
-
-    DTIG_FOR(DTIG_PARAMETERS)
-
-    DTIG_IF(DTIG_INDEX == 0)
-    if reference == DTIG_STR(DTIG_ITEM_NAME):
-    DTIG_ELSE
-    elif reference == DTIG_STR(DTIG_ITEM_NAME):
-    DTIG_END_IF
-        value = DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE)
-        if not any_value.Unpack(value):
-            return self.return_code(dtig_code.FAILURE, f"Failed to unpack value: {reference}")
-        self.fmu.setDTIG_TO_TYPE(DTIG_ITEM_TYPE)([self.value_references[reference]], [value.value])
-        return self.return_code(dtig_code.SUCCESS)
-
-    DTIG_END_FOR
-    else:
-        return self.return_code(dtig_code.UNKNOWN_OPTION, f"Unknown input: {reference}")
+    return self.set_values("parameter", references, any_values)
     DTIG_END_IF
 
 <DTIG_CALLBACK(GET_PARAMETER)>
@@ -265,19 +299,67 @@ def get_parameter(references):
     DTIG_IF(NOT DTIG_PARAMETERS_LENGTH)
     return self.return_code(dtig_code.FAILURE, "Model has no parameters")
     DTIG_ELSE
-    return_message = self.return_code(dtig_code.SUCCESS)
+    return self.get_values("parameter", references)
+    DTIG_END_IF
+
+<DTIG_METHOD(PUBLIC)>
+def group_signals(signals):
+    # One list of value references per accessor, each signal knows its group and its position in the list
+    # Signals the FMU does not have are left out, signals without an FMI accessor have no group
+    groups = []
+    group_of = dict()
+    index = dict()
+    for name, (message, get_value, set_value) in signals.items():
+        ref = self.value_references.get(name)
+        if ref is None:
+            continue
+
+        if get_value is None:
+            index[name] = (message, None, None)
+            continue
+
+        group = group_of.get(get_value)
+        if group is None:
+            group = group_of[get_value] = len(groups)
+            groups.append((get_value, set_value, []))
+
+        index[name] = (message, group, len(groups[group][2]))
+        groups[group][2].append(ref)
+
+    return groups, index
+
+<DTIG_METHOD(PUBLIC)>
+def get_values(kind, references):
+    signal_groups = self.signal_groups.get(kind)
+    if signal_groups is None:
+        return self.return_code(dtig_code.INVALID_STATE, "Model is not loaded yet")
+
+    groups, index = signal_groups
+
+    # Only the requested signals are read, with a single call for each FMI type
+    reads = dict()
+    signals = []
     for reference in references:
-        DTIG_FOR(DTIG_PARAMETERS)
-        DTIG_IF(DTIG_INDEX == 0)
-        if reference == DTIG_STR(DTIG_ITEM_NAME):
-        DTIG_ELSE
-        elif reference == DTIG_STR(DTIG_ITEM_NAME):
-        DTIG_END_IF
-            any_value = DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE)
-            any_value.value = self.fmu.getDTIG_TO_TYPE(DTIG_ITEM_TYPE)([self.value_references[reference]])[0]
-        DTIG_END_FOR
-        else:
-            return self.return_code(dtig_code.UNKNOWN_OPTION, f"Unknown output: {reference}")
+        signal = index.get(reference)
+        if signal is None:
+            return self.return_code(dtig_code.UNKNOWN_OPTION, f"Unknown {kind}: {reference}")
+
+        message, group, position = signal
+        if group is None:
+            return self.return_code(dtig_code.INVALID_OPTION, f"Unsupported type: {reference}")
+
+        read = reads.get(group)
+        if read is None:
+            read = reads[group] = []
+        signals.append((reference, message, group, len(read)))
+        read.append(groups[group][2][position])
+
+    values = {group: groups[group][0](self.fmu, value_references) for group, value_references in reads.items()}
+
+    return_message = self.return_code(dtig_code.SUCCESS)
+    for reference, message, group, position in signals:
+        any_value = message()
+        any_value.value = values[group][position]
 
         any_msg = any_pb2.Any()
         any_msg.Pack(any_value)
@@ -285,33 +367,49 @@ def get_parameter(references):
         return_message.values.values.append(any_msg)
 
     return return_message
-    DTIG_END_IF
+
+<DTIG_METHOD(PUBLIC)>
+def set_values(kind, references, any_values):
+    signal_groups = self.signal_groups.get(kind)
+    if signal_groups is None:
+        return self.return_code(dtig_code.INVALID_STATE, "Model is not loaded yet")
+
+    groups, index = signal_groups
+
+    # Values are grouped by accessor, so each FMI type is written with a single call
+    writes = dict()
+    for reference, any_value in zip(references, any_values):
+        signal = index.get(reference)
+        if signal is None:
+            return self.return_code(dtig_code.UNKNOWN_OPTION, f"Unknown {kind}: {reference}")
+
+        message, group, position = signal
+        if group is None:
+            return self.return_code(dtig_code.INVALID_OPTION, f"Unsupported type: {reference}")
+
+        value = message()
+        if not any_value.Unpack(value):
+            return self.return_code(dtig_code.FAILURE, f"Failed to unpack value: {reference}")
+
+        write = writes.get(group)
+        if write is None:
+            write = writes[group] = ([], [])
+        write[0].append(groups[group][2][position])
+        write[1].append(value.value)
+
+    # Nothing is written unless every value could be unpacked
+    for group, (value_references, values) in writes.items():
+        groups[group][1](self.fmu, value_references, values)
+
+    return self.return_code(dtig_code.SUCCESS)
 
 <DTIG_METHOD(PUBLIC)>
 def store_parameters():
-    DTIG_IF(DTIG_PARAMETERS)
-    for key, ref in self.value_references.items():
-        DTIG_FOR(DTIG_PARAMETERS)
-        DTIG_IF(DTIG_INDEX == 0)
-        if key == DTIG_STR(DTIG_ITEM_NAME):
-        DTIG_ELSE
-        elif key == DTIG_STR(DTIG_ITEM_NAME):
-        DTIG_END_IF
-            value = self.fmu.getDTIG_TO_TYPE(DTIG_ITEM_TYPE)([ref])[0]
-            self.parameters[ref] = value
-        DTIG_END_FOR
-    DTIG_END_IF
+    groups, _ = self.signal_groups["parameter"]
+    self.parameters = [get_value(self.fmu, value_references) for get_value, _, value_references in groups]
 
 <DTIG_METHOD(PUBLIC)>
 def load_parameters():
-    DTIG_IF(DTIG_PARAMETERS)
-    for key, ref in self.value_references.items():
-        DTIG_FOR(DTIG_PARAMETERS)
-        DTIG_IF(DTIG_INDEX == 0)
-        if key == DTIG_STR(DTIG_ITEM_NAME):
-        DTIG_ELSE
-        elif key == DTIG_STR(DTIG_ITEM_NAME):
-        DTIG_END_IF
-            self.fmu.setDTIG_TO_TYPE(DTIG_ITEM_TYPE)([ref], [self.parameters[ref]])
-        DTIG_END_FOR
-    DTIG_END_IF
\ No newline at end of file
+    groups, _ = self.signal_groups["parameter"]
+    for (_, set_value, value_references), values in zip(groups, self.parameters):
+        set_value(self.fmu, value_references, values)
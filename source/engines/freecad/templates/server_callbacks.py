@@ -38,6 +38,12 @@ self.box_object = None
 self.mesh_object = None
 self.analysis_object = None
 
+# Proto message and handler of every signal, by name
+self.input_setters = self.create_input_setters()
+self.output_getters = self.create_output_getters()
+self.parameter_setters = self.create_parameter_setters()
+self.parameter_getters = self.create_parameter_getters()
+
 <DTIG_CALLBACK(INITIALIZE)>
 def parse_initialize(message) -> Message:
     if not message.HasField("model_name"):
@@ -47,14 +53,14 @@ def parse_initialize(message) -> Message:
     try:
         self.app = FreeCAD.open(self.model_name)
 
-        print(f'Running with file: {self.model_name}')
+        logger.info(f'Running with file: {self.model_name}')
 
         # Check if an analysis object already exists
         create_solver = True
         create_analysis = True
         for obj in self.app.Objects:
             if obj.isDerivedFrom('Fem::FemAnalysis'):
-                print("Using existing analysis")
+                logger.info("Using existing analysis")
                 self.analysis_object = obj
                 create_analysis = False
             elif obj.isDerivedFrom('Fem::FemSolverObjectPython'):
@@ -63,11 +69,11 @@ def parse_initialize(message) -> Message:
 
         # Otherwise, create a new one
         if create_analysis:
-            print("Adding new analysis")
+            logger.info("Adding new analysis")
             self.analysis_object = ObjectsFem.makeAnalysis(self.app)
 
         if create_solver:
-            print("Adding new solver")
+            logger.info("Adding new solver")
             self.solver = ObjectsFem.makeSolverCalculixCcxTools(self.app)
 
         self.solver.GeometricalNonlinearity = 'linear'
@@ -82,7 +88,7 @@ def parse_initialize(message) -> Message:
 
         self.mesh_object = self.get_object("MainMesh")
         if not self.mesh_object:
-            print("No MainMesh found, adding a new one")
+            logger.info("No MainMesh found, adding a new one")
             self.mesh_object = ObjectsFem.makeMeshGmsh(self.app, "MainMesh")
 
             mesh_part = self.get_object("MainBody")
@@ -94,7 +100,7 @@ def parse_initialize(message) -> Message:
         # Here we just compute the mesh using the desired algorithm
         from femmesh.gmshtools import GmshTools
 
-        print("Computing mesh")
+        logger.info("Computing mesh")
         gmsh_mesh = GmshTools(self.mesh_object)
         error = gmsh_mesh.create_mesh()
         if error:
@@ -127,14 +133,14 @@ def parse_start(message) -> Message:
     if not self.analysis_object:
         return self.return_code(dtig_code.INVALID_OPTION, f'Model not yet initialized')
 
-    print(f'Starting with: {dtig_run_mode.ERunMode.Name(self.mode)}.')
-    print(f'Running until {self.stop_time:0.4f} with {self.step_size:0.4f}')
+    logger.info(f'Starting with: {dtig_run_mode.ERunMode.Name(self.mode)}.')
+    logger.info(f'Running until {self.stop_time:0.4f} with {self.step_size:0.4f}')
 
     return dtig_return.MReturnValue(code=dtig_code.SUCCESS)
 
 <DTIG_CALLBACK(STOP)>
 def parse_stop(message) -> Message:
-    print(f'Stopping with: {message.mode}')
+    logger.info(f'Stopping with: {message.mode}')
     return dtig_return.MReturnValue(code=dtig_code.SUCCESS)
 
 <DTIG_CALLBACK(ADVANCE)>
@@ -191,12 +197,12 @@ def run_model() -> None:
         if self.state == dtig_state.STOPPED:
             return
 
-    print(f'Initializing FreeCAD FEM model')
+    logger.info(f'Initializing FreeCAD FEM model')
 
     # Simulation loop
     from femtools import ccxtools
 
-    print("Waiting for start")
+    logger.info("Waiting for start")
     while self.state != dtig_state.STOPPED:
         with self.condition:
             self.condition.wait_for(lambda: self.state == dtig_state.RUNNING or self.state == dtig_state.STOPPED)
@@ -204,50 +210,145 @@ def run_model() -> None:
                 break
 
         if self.force_update:
-            print(f'Running with state: {dtig_state.EState.Name(self.state)}')
+            logger.debug('Running with state: %s', dtig_state.EState.Name(self.state))
 
             self.force_update = False
 
-            fea = ccxtools.FemToolsCcx(analysis=self.analysis_object, solver=self.solver)
-            fea.purge_results()
-            if not fea.run():
-                print("Simulation failed")
+            # Requests change the document, so they wait for the analysis
+            # The condition is never taken while holding the model lock
+            with self.model_lock:
+                fea = ccxtools.FemToolsCcx(analysis=self.analysis_object, solver=self.solver)
+                fea.purge_results()
+                solved = fea.run()
+                if solved:
+                    with self.results_mutex:
+                        for obj in self.analysis_object.Group:
+                            if obj.isDerivedFrom('Fem::FemResultObject'):
+                                self.results = obj
+                                self.mesh_index += 1
+                                break
+
+                # Save document with results
+                self.app.save()
+
+            if not solved:
+                logger.error("Simulation failed")
                 with self.condition:
                     self.state == dtig_state.STOPPED
-            else:
-                with self.results_mutex:
-                    for obj in self.analysis_object.Group:
-                        if obj.isDerivedFrom('Fem::FemResultObject'):
-                            self.results = obj
-                            self.mesh_index += 1
-                            break
-
-            # Save document with results
-            self.app.save()
-            print(f'FreeCAD FEM simulation done')
+
+            logger.info(f'FreeCAD FEM simulation done')
 
         with self.condition:
             if self.state != dtig_state.STOPPED:
                 self.state = dtig_state.IDLE
 
 <DTIG_CALLBACK(SET_INPUT)>
-def set_inputs(reference, any_value):
+def set_inputs(references, any_values):
     DTIG_IF(NOT DTIG_INPUTS_LENGTH)
     return self.return_code(dtig_code.FAILURE, "Model has no inputs")
     DTIG_ELSE
+    for reference, any_value in zip(references, any_values):
+        handler = self.input_setters.get(reference)
+        if handler is None:
+            return self.return_code(dtig_code.UNKNOWN_OPTION, f"Unknown input: {reference}")
 
-    DTIG_FOR(DTIG_INPUTS)
+        message, set_value = handler
+        value = message()
+        if not any_value.Unpack(value):
+            return self.return_code(dtig_code.FAILURE, f"Failed to unpack value: {reference}")
+
+        ret = set_value(reference, value)
+        if ret.code != dtig_code.SUCCESS:
+            return ret
+
+    return self.return_code(dtig_code.SUCCESS)
+    DTIG_END_IF
 
-    DTIG_IF(DTIG_INDEX == 0)
-    if reference == DTIG_STR(DTIG_ITEM_NAME):
+<DTIG_CALLBACK(GET_OUTPUT)>
+def get_output_callback(references):
+    DTIG_IF(NOT DTIG_OUTPUTS_LENGTH)
+    return self.return_code(dtig_code.FAILURE, "Model has no outputs")
     DTIG_ELSE
-    elif reference == DTIG_STR(DTIG_ITEM_NAME):
+
+    # Check whether results are available, for FreeCAD, the outputs are only available once the model finished running
+    with self.results_mutex:
+        if not self.results:
+            return self.return_code(dtig_code.FAILURE, "No output available")
+
+        return_message = self.return_code(dtig_code.SUCCESS)
+        for reference in references:
+            handler = self.output_getters.get(reference)
+            if handler is None:
+                return self.return_code(dtig_code.UNKNOWN_OPTION, f"Unknown output: {reference}")
+
+            message, get_value = handler
+            any_value = message()
+            error = get_value(reference, any_value)
+            if error is not None:
+                return error
+
+            any_msg = any_pb2.Any()
+            any_msg.Pack(any_value)
+            return_message.values.identifiers.append(reference)
+            return_message.values.values.append(any_msg)
+
+        return return_message
     DTIG_END_IF
 
-        value = DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE)
+<DTIG_CALLBACK(SET_PARAMETER)>
+def set_parameters(references, any_values):
+    DTIG_IF(NOT DTIG_PARAMETERS_LENGTH)
+    return self.return_code(dtig_code.FAILURE, "Model has no inputs")
+    DTIG_ELSE
+    for reference, any_value in zip(references, any_values):
+        handler = self.parameter_setters.get(reference)
+        if handler is None:
+            return self.return_code(dtig_code.UNKNOWN_OPTION, f"Unknown parameter: {reference}")
+
+        message, set_value = handler
+        value = message()
         if not any_value.Unpack(value):
             return self.return_code(dtig_code.FAILURE, f"Failed to unpack value: {reference}")
 
+        ret = set_value(reference, value)
+        if ret.code != dtig_code.SUCCESS:
+            return ret
+
+    return self.return_code(dtig_code.SUCCESS)
+    DTIG_END_IF
+
+<DTIG_CALLBACK(GET_PARAMETER)>
+def get_parameter(references):
+    DTIG_IF(NOT DTIG_PARAMETERS_LENGTH)
+    return self.return_code(dtig_code.FAILURE, "Model has no parameters")
+    DTIG_ELSE
+    return_message = self.return_code(dtig_code.SUCCESS)
+
+    for reference in references:
+        handler = self.parameter_getters.get(reference)
+        if handler is None:
+            return self.return_code(dtig_code.UNKNOWN_OPTION, f"Unknown parameter: {reference}")
+
+        message, get_value = handler
+        any_value = message()
+        error = get_value(reference, any_value)
+        if error is not None:
+            return error
+
+        any_msg = any_pb2.Any()
+        any_msg.Pack(any_value)
+        return_message.values.identifiers.append(reference)
+        return_message.values.values.append(any_msg)
+
+    return return_message
+    DTIG_END_IF
+
+<DTIG_METHOD(PUBLIC)>
+def create_input_setters():
+    handlers = dict()
+    DTIG_FOR(DTIG_INPUTS)
+
+    def set_input(reference, value):
         DTIG_IF(DTIG_ITEM_TYPE == TYPE_FORCE)
 
         if not value.object:
@@ -289,7 +390,7 @@ def set_inputs(reference, any_value):
             if not obj_ref:
                 return self.return_code(dtig_code.UNKNOWN_OPTION, f"Unknown output: {reference}")
 
-            print(f"Setting force magnitude to: {value.value}")
+            logger.debug('Setting force magnitude to: %s', value.value)
 
             constraint.References = [(obj_ref, "Face2")]
             # reverse, direction = self.direction_to_freecad(value.direction.value)
@@ -311,87 +412,56 @@ def set_inputs(reference, any_value):
 
         return self.return_code(dtig_code.SUCCESS)
 
+    handlers[DTIG_STR(DTIG_ITEM_NAME)] = (lambda: DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE), set_input)
     DTIG_END_FOR
-    DTIG_END_IF
-
-<DTIG_CALLBACK(GET_OUTPUT)>
-def get_output_callback(references):
-    DTIG_IF(NOT DTIG_OUTPUTS_LENGTH)
-    return self.return_code(dtig_code.FAILURE, "Model has no outputs")
-    DTIG_ELSE
-
-    # Check whether results are available, for FreeCAD, the outputs are only available once the model finished running
-    with self.results_mutex:
-        if not self.results:
-            return self.return_code(dtig_code.FAILURE, "No output available")
 
-        return_message = self.return_code(dtig_code.SUCCESS)
-        for reference in references:
-        DTIG_FOR(DTIG_OUTPUTS)
-            DTIG_IF(DTIG_INDEX == 0)
-            if reference == DTIG_STR(DTIG_ITEM_NAME):
-            DTIG_ELSE
-            elif reference == DTIG_STR(DTIG_ITEM_NAME):
-            DTIG_END_IF
-
-                any_value = DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE)
-
-                DTIG_IF(DTIG_ITEM_TYPE == TYPE_MESH)
-                import Mesh
-                from femmesh.femmesh2mesh import femmesh_2_mesh
+    return handlers
 
-                out_mesh = femmesh_2_mesh(self.mesh_object.FemMesh, self.results)
-                DTIG_IF(DTIG_ITEM_DEFAULT)
-                name_parts = DTIG_STR(DTIG_ITEM_DEFAULT).split(".")
-                DTIG_ELSE
-                name_parts = ["Results", "obj"]
-                DTIG_END_IF
-                filename = f'{name_parts[0]}.{self.mesh_index}.{name_parts[1]}'
-                Mesh.Mesh(out_mesh).write(filename)
-                any_value.value = filename
-
-                DTIG_ELSE
+<DTIG_METHOD(PUBLIC)>
+def create_output_getters():
+    handlers = dict()
+    DTIG_FOR(DTIG_OUTPUTS)
+
+    def get_output(reference, any_value):
+        DTIG_IF(DTIG_ITEM_TYPE == TYPE_MESH)
+        import Mesh
+        from femmesh.femmesh2mesh import femmesh_2_mesh
+
+        out_mesh = femmesh_2_mesh(self.mesh_object.FemMesh, self.results)
+        DTIG_IF(DTIG_ITEM_DEFAULT)
+        name_parts = DTIG_STR(DTIG_ITEM_DEFAULT).split(".")
+        DTIG_ELSE
+        name_parts = ["Results", "obj"]
+        DTIG_END_IF
+        filename = f'{name_parts[0]}.{self.mesh_index}.{name_parts[1]}'
+        Mesh.Mesh(out_mesh).write(filename)
+        any_value.value = filename
 
-                property_value = self.results.getPropertyByName(reference)
-                if not property_value:
-                    return self.return_code(dtig_code.FAILURE, f'No property: {reference}')
+        DTIG_ELSE
 
-                DTIG_IF(DTIG_ITEM_MODIFIER)
-                any_value.value = DTIG_ITEM_MODIFIER(property_value)
-                DTIG_ELSE
-                any_value.value = property_value
-                DTIG_END_IF
+        property_value = self.results.getPropertyByName(reference)
+        if not property_value:
+            return self.return_code(dtig_code.FAILURE, f'No property: {reference}')
 
-                DTIG_END_IF
+        DTIG_IF(DTIG_ITEM_MODIFIER)
+        any_value.value = DTIG_ITEM_MODIFIER(property_value)
+        DTIG_ELSE
+        any_value.value = property_value
+        DTIG_END_IF
 
-        DTIG_END_FOR
+        DTIG_END_IF
 
-            any_msg = any_pb2.Any()
-            any_msg.Pack(any_value)
-            return_message.values.identifiers.append(reference)
-            return_message.values.values.append(any_msg)
+    handlers[DTIG_STR(DTIG_ITEM_NAME)] = (lambda: DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE), get_output)
+    DTIG_END_FOR
 
-        return return_message
-    DTIG_END_IF
-
-<DTIG_CALLBACK(SET_PARAMETER)>
-def set_parameters(reference, any_value):
-    DTIG_IF(NOT DTIG_PARAMETERS_LENGTH)
-    return self.return_code(dtig_code.FAILURE, "Model has no inputs")
-    DTIG_ELSE
+    return handlers
 
+<DTIG_METHOD(PUBLIC)>
+def create_parameter_setters():
+    handlers = dict()
     DTIG_FOR(DTIG_PARAMETERS)
 
-    DTIG_IF(DTIG_INDEX == 0)
-    if reference == DTIG_STR(DTIG_ITEM_NAME):
-    DTIG_ELSE
-    elif reference == DTIG_STR(DTIG_ITEM_NAME):
-    DTIG_END_IF
-
-        value = DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE)
-        if not any_value.Unpack(value):
-            return self.return_code(dtig_code.FAILURE, f"Failed to unpack value: {reference}")
-
+    def set_parameter(reference, value):
         # If object already exists, use that
         parameter = self.get_object(reference)
         if not parameter:
@@ -446,52 +516,40 @@ def set_parameters(reference, any_value):
         self.app.recompute()
         self.app.save()
         return self.return_code(dtig_code.SUCCESS)
+
+    handlers[DTIG_STR(DTIG_ITEM_NAME)] = (lambda: DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE), set_parameter)
     DTIG_END_FOR
-    DTIG_END_IF
 
-<DTIG_CALLBACK(GET_PARAMETER)>
-def get_parameter(references):
-    DTIG_IF(NOT DTIG_PARAMETERS_LENGTH)
-    return self.return_code(dtig_code.FAILURE, "Model has no parameters")
-    DTIG_ELSE
-    return_message = self.return_code(dtig_code.SUCCESS)
+    return handlers
 
-    for reference in references:
+<DTIG_METHOD(PUBLIC)>
+def create_parameter_getters():
+    handlers = dict()
     DTIG_FOR(DTIG_PARAMETERS)
-        DTIG_IF(DTIG_INDEX == 0)
-        if reference == DTIG_STR(DTIG_ITEM_NAME):
-        DTIG_ELSE
 
-        elif reference == DTIG_STR(DTIG_ITEM_NAME):
-        DTIG_END_IF
-            any_value = DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE)
-            property_value = self.get_object(reference)
-            if not property_value:
-                return self.return_code(dtig_code.FAILURE, f'No property: {reference}')
-            DTIG_IF(DTIG_ITEM_TYPE == TYPE_MATERIAL)
-
-            any_value.name.value = property_value.Material['Name']
-            any_value.youngs_modulus.value = property_value.Material['YoungsModulus']
-            any_value.poisson_ratio.value = property_value.Material['PoissonRatio']
-            any_value.density.value = property_value.Material['Density']
+    def get_parameter(reference, any_value):
+        property_value = self.get_object(reference)
+        if not property_value:
+            return self.return_code(dtig_code.FAILURE, f'No property: {reference}')
+        DTIG_IF(DTIG_ITEM_TYPE == TYPE_MATERIAL)
 
-            DTIG_ELSE_IF(DTIG_ITEM_TYPE == TYPE_FIXTURE)
+        any_value.name.value = property_value.Material['Name']
+        any_value.youngs_modulus.value = property_value.Material['YoungsModulus']
+        any_value.poisson_ratio.value = property_value.Material['PoissonRatio']
+        any_value.density.value = property_value.Material['Density']
 
-            any_value.object.value    = property_value.References[0][0].Label
-            any_value.reference.value = ", ".join(map(str, property_value.References[0][1]))
+        DTIG_ELSE_IF(DTIG_ITEM_TYPE == TYPE_FIXTURE)
 
-            DTIG_ELSE
+        any_value.object.value    = property_value.References[0][0].Label
+        any_value.reference.value = ", ".join(map(str, property_value.References[0][1]))
 
-            any_value.value = property_value
+        DTIG_ELSE
 
-            DTIG_END_IF
+        any_value.value = property_value
 
-            any_msg = any_pb2.Any()
-            any_msg.Pack(any_value)
-            return_message.values.identifiers.append(reference)
-            return_message.values.values.append(any_msg)
+        DTIG_END_IF
 
+    handlers[DTIG_STR(DTIG_ITEM_NAME)] = (lambda: DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE), get_parameter)
     DTIG_END_FOR
 
-    return return_message
-    DTIG_END_IF
+    return handlers
@@ -221,6 +221,15 @@ DTIG_ELSE
   global DTIG_ITEM_NAME;
   DTIG_END_FOR
 
+  % Proto message of every output, by name
+  persistent outputTypes;
+  if isempty(outputTypes)
+    outputTypes = containers.Map('KeyType', 'char', 'ValueType', 'any');
+    DTIG_FOR(DTIG_OUTPUTS)
+    outputTypes('DTIG_ITEM_NAME') = @(value) DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE).newBuilder().setValue(value);
+    DTIG_END_FOR
+  end
+
   isRunning = (sm.Status == "running");
 
   if isRunning
@@ -238,19 +247,14 @@ DTIG_ELSE
       continue
     end
 
-    value = simulinkReference.Data(end);
-    DTIG_FOR(DTIG_OUTPUTS)
-    DTIG_IF(DTIG_INDEX == 0)
-    if string(reference) == DTIG_STR(DTIG_ITEM_NAME)
-    DTIG_ELSE
-    elseif string(reference) == DTIG_STR(DTIG_ITEM_NAME)
-    DTIG_END_IF
-      anyValue = DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE).newBuilder().setValue(value);
-    DTIG_END_FOR
-    else
+    name = char(reference);
+    if ~isKey(outputTypes, name)
       returnValue = createReturn(dtig.EReturnCode.UNKNOWN_OPTION, strcat("Unknown output: ", reference));
       return;
     end
+
+    createValue = outputTypes(name);
+    anyValue = createValue(simulinkReference.Data(end));
     dtigOutputs.addIdentifiers(reference);
     dtigOutputs.addValues(dtig.Helpers.pack(anyValue));
   end
@@ -273,6 +277,19 @@ DTIG_ELSE
   global DTIG_ITEM_NAME;
   DTIG_END_FOR
 
+  % Proto message of every parameter, by name, whether its value has to be evaluated and the block property holding it
+  persistent parameterTypes;
+  if isempty(parameterTypes)
+    parameterTypes = containers.Map('KeyType', 'char', 'ValueType', 'any');
+    DTIG_FOR(DTIG_PARAMETERS)
+    DTIG_IF(DTIG_ITEM_TYPE == DTIG_TYPE_STRING)
+    parameterTypes('DTIG_ITEM_NAME') = {@(value) DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE).newBuilder().setValue(value), false, DTIG_TO_TYPE(DTIG_ITEM_TYPE)};
+    DTIG_ELSE
+    parameterTypes('DTIG_ITEM_NAME') = {@(value) DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE).newBuilder().setValue(value), true, DTIG_TO_TYPE(DTIG_ITEM_TYPE)};
+    DTIG_END_IF
+    DTIG_END_FOR
+  end
+
   dtigParameters = dtig.MValues.newBuilder();
   nIds = references.size() - 1;
   returnValue = createReturn(dtig.EReturnCode.SUCCESS);
@@ -285,24 +302,20 @@ DTIG_ELSE
       return;
     end
 
-    DTIG_FOR(DTIG_PARAMETERS)
-
-    DTIG_IF(DTIG_INDEX == 0)
-    if string(reference) == DTIG_STR(DTIG_ITEM_NAME)
-    DTIG_ELSE
-    elseif string(reference) == DTIG_STR(DTIG_ITEM_NAME)
-    DTIG_END_IF
-    DTIG_IF(DTIG_ITEM_TYPE == DTIG_TYPE_STRING)
-      param_value = get_param(handle, DTIG_TO_TYPE(DTIG_ITEM_TYPE));
-    DTIG_ELSE
-      param_value = eval(get_param(handle, DTIG_TO_TYPE(DTIG_ITEM_TYPE)));
-    DTIG_END_IF
-      anyValue = DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE).newBuilder().setValue(param_value);
-    DTIG_END_FOR
-    else
-      returnValue = createReturn(dtig.EReturnCode.UNKNOWN_OPTION, strcat("Unknown output: ", reference));
+    name = char(reference);
+    if ~isKey(parameterTypes, name)
+      returnValue = createReturn(dtig.EReturnCode.UNKNOWN_OPTION, strcat("Unknown parameter: ", reference));
       return;
     end
+
+    % Evaluated here, where the parameters are declared as globals
+    parameterType = parameterTypes(name);
+    param_value = get_param(handle, parameterType{3});
+    if parameterType{2}
+      param_value = eval(param_value);
+    end
+    createValue = parameterType{1};
+    anyValue = createValue(param_value);
     dtigParameters.addIdentifiers(reference);
     dtigParameters.addValues(dtig.Helpers.pack(anyValue));
   end
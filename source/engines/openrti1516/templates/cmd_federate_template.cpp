@@ -28,7 +28,7 @@
 #include "dtig/set_parameter.pb.h"
 #include "dtig/get_parameter.pb.h"
 
-#define MSG_SIZE 1024
+#define MAX_MESSAGE_SIZE (256 * 1024 * 1024)
 
 using namespace std;
 using namespace rti1516;
@@ -275,23 +275,78 @@ void advanceTime(double timestep)
   }
 }
 
+<DTIG_METHOD(PRIVATE)>
+bool SendAll(const char* data, size_t size)
+{
+  while (size > 0)
+  {
+    auto sent = send(mClient, data, size, 0);
+    if (sent <= 0)
+      return false;
+
+    data += sent;
+    size -= sent;
+  }
+
+  return true;
+}
+
+<DTIG_METHOD(PRIVATE)>
+bool ReadAll(char* data, size_t size)
+{
+  while (size > 0)
+  {
+    auto bytesRead = read(mClient, data, size);
+    if (bytesRead <= 0)
+      return false;
+
+    data += bytesRead;
+    size -= bytesRead;
+  }
+
+  return true;
+}
+
 <DTIG_METHOD(PRIVATE)>
 dtig::MReturnValue SendMessage(const google::protobuf::Message& message)
 {
   dtig::MReturnValue result;
 
-  auto toSend = message.SerializeAsString();
-  send(mClient, toSend.c_str(), toSend.size(), 0);
+  // Every message is preceded by its length as a 4 byte big endian integer
+  uint32_t header = 0;
+  std::string toSend(sizeof(header), '\0');
+  message.AppendToString(&toSend);
+
+  header = htonl(static_cast<uint32_t>(toSend.size() - sizeof(header)));
+  toSend.replace(0, sizeof(header), reinterpret_cast<const char*>(&header), sizeof(header));
+
+  if (!SendAll(toSend.data(), toSend.size()) || !ReadAll(reinterpret_cast<char*>(&header), sizeof(header)))
+  {
+    result.set_code(dtig::ReturnCode::INVALID_STATE);
+    result.mutable_error_message()->set_value("Server disconnected");
+    return result;
+  }
+
+  uint32_t size = ntohl(header);
+  if (size > MAX_MESSAGE_SIZE)
+  {
+    result.set_code(dtig::ReturnCode::FAILURE);
+    result.mutable_error_message()->set_value("Response is too large");
+    return result;
+  }
 
-  auto bytesRead = read(mClient, mBuffer, MSG_SIZE - 1);
-  if (bytesRead <= 0)
+  // The buffer is reused for every response, it only grows when a larger one arrives
+  if (size > mBuffer.size())
+    mBuffer.resize(size);
+
+  if (!ReadAll(mBuffer.data(), size))
   {
     result.set_code(dtig::ReturnCode::INVALID_STATE);
     result.mutable_error_message()->set_value("Server disconnected");
     return result;
   }
 
-  if (!result.ParseFromArray(mBuffer, bytesRead))
+  if (!result.ParseFromArray(mBuffer.data(), size))
   {
     result.set_code(dtig::ReturnCode::FAILURE);
     result.mutable_error_message()->set_value("Failed to parse response");
@@ -308,22 +363,9 @@ DTIG_IF(NOT DTIG_INPUTS AND NOT DTIG_PARAMETERS)
   return;
 DTIG_ELSE
   std::unique_lock<std::mutex> lock(mMutex);
-  DTIG_FOR(DTIG_INPUTS)
-  DTIG_IF(DTIG_INDEX == 0)
-  if (interaction == mIDTIG_ITEM_NAME)
-  DTIG_ELSE
-  else if (interaction == mIDTIG_ITEM_NAME)
-  DTIG_END_IF
-    SetInputDTIG_ITEM_NAME(values);
-  DTIG_END_FOR
-  DTIG_FOR(DTIG_PARAMETERS)
-  DTIG_IF(DTIG_INDEX == 0 AND NOT DTIG_INPUTS)
-  if (interaction == mPDTIG_ITEM_NAME)
-  DTIG_ELSE
-  else if (interaction == mPDTIG_ITEM_NAME)
-  DTIG_END_IF
-    SetParameterDTIG_ITEM_NAME(values);
-  DTIG_END_FOR
+  auto handler = mInteractionHandlers.find(interaction);
+  if (handler != mInteractionHandlers.end())
+    handler->second(values);
 DTIG_END_IF
 }
 
@@ -337,6 +379,7 @@ void initializeHandles()
   try
   {
     mPDTIG_ITEM_NAME = rtiamb->getInteractionClassHandle(L"DTIG_ITEM_NAMESPACE.DTIG_ITEM_NAME");
+    mInteractionHandlers[mPDTIG_ITEM_NAME] = [this](const rti1516::ParameterHandleValueMap& values) { SetParameterDTIG_ITEM_NAME(values); };
     DTIG_IF(DTIG_ITEM_TYPE == DTIG_TYPE_FORCE OR DTIG_ITEM_TYPE == DTIG_TYPE_FIXTURE)
     mPsDTIG_ITEM_NAME.insert({DTIG_STR(DTIG_TYPE_PROP_MAGNITUDE), rtiamb->getParameterHandle(mPDTIG_ITEM_NAME, L"DTIG_TYPE_PROP_MAGNITUDE")});
     mPsDTIG_ITEM_NAME.insert({DTIG_STR(DTIG_TYPE_PROP_OBJECT), rtiamb->getParameterHandle(mPDTIG_ITEM_NAME, L"DTIG_TYPE_PROP_OBJECT")});
@@ -364,6 +407,7 @@ void initializeHandles()
   try
   {
     mIDTIG_ITEM_NAME = rtiamb->getInteractionClassHandle(L"DTIG_ITEM_NAMESPACE.DTIG_ITEM_NAME");
+    mInteractionHandlers[mIDTIG_ITEM_NAME] = [this](const rti1516::ParameterHandleValueMap& values) { SetInputDTIG_ITEM_NAME(values); };
     DTIG_IF(DTIG_ITEM_TYPE == DTIG_TYPE_FORCE OR DTIG_ITEM_TYPE == DTIG_TYPE_FIXTURE)
     mIsDTIG_ITEM_NAME.insert({rtiamb->getParameterHandle(mIDTIG_ITEM_NAME, L"DTIG_TYPE_PROP_MAGNITUDE"), DTIG_STR(DTIG_TYPE_PROP_MAGNITUDE)});
     mIsDTIG_ITEM_NAME.insert({rtiamb->getParameterHandle(mIDTIG_ITEM_NAME, L"DTIG_TYPE_PROP_OBJECT"), DTIG_STR(DTIG_TYPE_PROP_OBJECT)});
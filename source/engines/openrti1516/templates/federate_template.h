@@ -3,8 +3,11 @@
 #include <RTI/RTIambassador.h>
 
 #include <condition_variable>
+#include <functional>
+#include <map>
 #include <memory>
 #include <mutex>
+#include <vector>
 
 // TODO: This are platform specific
 #include <arpa/inet.h>
@@ -38,7 +41,7 @@ uint16_t mPort;
 std::string mName;
 
 int mClient = -1;
-char mBuffer[1024] = {0};
+std::vector<char> mBuffer = std::vector<char>(64 * 1024);
 
 // Parameter handles
 DTIG_FOR(DTIG_PARAMETERS)
@@ -58,6 +61,9 @@ rti1516::InteractionClassHandle mODTIG_ITEM_NAME;
 std::map<std::string, rti1516::ParameterHandle> mOsDTIG_ITEM_NAME;
 DTIG_END_FOR
 
+// Setters of the inputs and parameters, by interaction class
+std::map<rti1516::InteractionClassHandle, std::function<void(const rti1516::ParameterHandleValueMap&)>> mInteractionHandlers;
+
 enum class State
 {
   IDLE = 0,
@@ -114,6 +120,8 @@ void publishAndSubscribe();
 void sendInteraction();
 void advanceTime(double timestep);
 
+bool SendAll(const char* data, size_t size);
+bool ReadAll(char* data, size_t size);
 dtig::MReturnValue SendMessage(const google::protobuf::Message& message);
 
 DTIG_IF(DTIG_FORMALISM == DTIG_FORMALISM_DISCRETE)
@@ -7,6 +7,7 @@ from tools import cpp
 from common.keys import *
 from common.result import *
 from common.logging import *
+from common.emitter import Emitter
 from base.generator_base import GeneratorBase
 from common.model_configuration_base import ModelConfigurationBase
 
@@ -34,7 +35,7 @@ class HppGenerator(GeneratorBase):
         LOG_DEBUG(f'Parsing common template: {self.common_template_file}')
 
         # First, parse the common interface template
-        data = cpp.read_file(self.common_template_file)
+        data = self.read_template(self.common_template_file, cpp.read_file)
 
         result = self.parse_template(
             data, KEY_NEW, has_argument=True, maximum=None)
@@ -115,7 +116,7 @@ class HppGenerator(GeneratorBase):
         # Then parse the engine template
         if self.engine_template_file:
             LOG_DEBUG(f'Parsing engine template: {self.engine_template_file}')
-            data = cpp.read_file(self.engine_template_file)
+            data = self.read_template(self.engine_template_file, cpp.read_file)
 
             result = self.parse_template(
                 data, KEY_CALLBACK, has_argument=True, maximum=10)
@@ -139,45 +140,43 @@ class HppGenerator(GeneratorBase):
         if not reading_templates.is_success():
             return reading_templates
 
-        file_contents = str()
+        emitter = Emitter(filters=[self.replace_calls, cpp.Indentation()])
 
         # Generate imports
         creation = self.generate_imports()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate states
         creation = self.generate_states()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate class
         creation = self.generate_class()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate run
         creation = self.generate_run()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate message handler
         creation = self.generate_message_handler()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         if self.callbacks[KEY_CLASS_NAME][KEY_BODY]:
-            file_contents += "};\n"
+            emitter.write("};\n")
 
-        file_contents = self.replace_calls(file_contents)
-
-        with open(self.output_file, "w") as file:
-            file.write(cpp.set_indentation(file_contents))
+        emitter.close()
+        emitter.write_to(self.output_file)
 
         return VoidResult()
 
@@ -201,52 +200,52 @@ class HppGenerator(GeneratorBase):
         return Result("")
 
     def generate_run(self) -> Result:
-        body = ""
+        body = []
 
         if self.callbacks[KEY_CONSTRUCTOR][KEY_PUBLIC][KEY_BODY] \
             or self.callbacks[KEY_DESTRUCTOR][KEY_PUBLIC][KEY_BODY] \
             or self.callbacks[KEY_METHOD][KEY_PUBLIC][KEY_BODY]\
             or self.callbacks[KEY_MEMBER][KEY_PUBLIC][KEY_BODY]:
-            body += "\npublic:\n"
+            body.append("\npublic:\n")
 
         if self.callbacks[KEY_CONSTRUCTOR][KEY_PUBLIC][KEY_BODY]:
-            body += self.callbacks[KEY_CONSTRUCTOR][KEY_PUBLIC][KEY_BODY]
+            body.append(self.callbacks[KEY_CONSTRUCTOR][KEY_PUBLIC][KEY_BODY])
 
         if self.callbacks[KEY_DESTRUCTOR][KEY_PUBLIC][KEY_BODY]:
-            body += self.callbacks[KEY_DESTRUCTOR][KEY_PUBLIC][KEY_BODY]
+            body.append(self.callbacks[KEY_DESTRUCTOR][KEY_PUBLIC][KEY_BODY])
 
         for member in self.callbacks[KEY_MEMBER][KEY_PUBLIC][KEY_BODY]:
-            body += member
+            body.append(member)
         for method in self.callbacks[KEY_METHOD][KEY_PUBLIC][KEY_BODY]:
-            body += method
+            body.append(method)
 
         if self.callbacks[KEY_RUN][KEY_BODY]:
-            body += self.callbacks[KEY_RUN][KEY_BODY]
+            body.append(self.callbacks[KEY_RUN][KEY_BODY])
 
         if self.callbacks[KEY_CALLBACK][KEY_RUN_MODEL][KEY_BODY]:
-            body += self.callbacks[KEY_CALLBACK][KEY_RUN_MODEL][KEY_BODY]
+            body.append(self.callbacks[KEY_CALLBACK][KEY_RUN_MODEL][KEY_BODY])
 
         if self.callbacks[KEY_RUN_SERVER][KEY_BODY]:
-            body += self.callbacks[KEY_RUN_SERVER][KEY_BODY]
+            body.append(self.callbacks[KEY_RUN_SERVER][KEY_BODY])
 
         if self.callbacks[KEY_CONSTRUCTOR][KEY_PRIVATE][KEY_BODY] \
             or self.callbacks[KEY_CONSTRUCTOR][KEY_PRIVATE][KEY_BODY] \
             or self.callbacks[KEY_METHOD][KEY_PRIVATE][KEY_BODY] \
             or self.callbacks[KEY_MEMBER][KEY_PRIVATE][KEY_BODY]:
-            body += "\nprivate:\n"
+            body.append("\nprivate:\n")
 
         if self.callbacks[KEY_CONSTRUCTOR][KEY_PRIVATE][KEY_BODY]:
-            body += self.callbacks[KEY_CONSTRUCTOR][KEY_PRIVATE][KEY_BODY]
+            body.append(self.callbacks[KEY_CONSTRUCTOR][KEY_PRIVATE][KEY_BODY])
 
         if self.callbacks[KEY_DESTRUCTOR][KEY_PRIVATE][KEY_BODY]:
-            body += self.callbacks[KEY_DESTRUCTOR][KEY_PRIVATE][KEY_BODY]
+            body.append(self.callbacks[KEY_DESTRUCTOR][KEY_PRIVATE][KEY_BODY])
 
         for member in self.callbacks[KEY_MEMBER][KEY_PRIVATE][KEY_BODY]:
-            body += member
+            body.append(member)
         for method in self.callbacks[KEY_METHOD][KEY_PRIVATE][KEY_BODY]:
-            body += method
+            body.append(method)
 
-        return Result(body)
+        return Result("".join(body))
 
     def generate_inherit(self) -> Result:
         body = ""
@@ -260,12 +259,12 @@ class HppGenerator(GeneratorBase):
         return Result(body.rstrip(","))
 
     def generate_message_parsers(self) -> Result:
-        body = ""
+        body = []
         for key, method in self.callbacks[KEY_PARSE].items():
             if method[KEY_BODY]:
-                body += method[KEY_BODY]
+                body.append(method[KEY_BODY])
 
-        return Result(body)
+        return Result("".join(body))
 
     def name_from_key(self, groups):
         name = groups[0]
@@ -327,7 +326,7 @@ class CppGenerator(GeneratorBase):
         LOG_DEBUG(f'Parsing common template: {self.common_template_file}')
 
         # First, parse the common interface template
-        data = cpp.read_file(self.common_template_file)
+        data = self.read_template(self.common_template_file, cpp.read_file)
 
         result = self.parse_template(
             data, KEY_CLASS_NAME, has_argument=False, maximum=None)
@@ -393,7 +392,7 @@ class CppGenerator(GeneratorBase):
         # Then parse the engine template
         if self.engine_template_file:
             LOG_DEBUG(f'Parsing engine template: {self.engine_template_file}')
-            data = cpp.read_file(self.engine_template_file)
+            data = self.read_template(self.engine_template_file, cpp.read_file)
 
             result = self.parse_template(
                 data, KEY_CALLBACK, has_argument=True, maximum=None)
@@ -412,46 +411,46 @@ class CppGenerator(GeneratorBase):
         if not reading_templates.is_success():
             return reading_templates
 
-        file_contents = str()
+        emitter = Emitter(filters=[self.replace_calls])
 
         # Generate imports
         creation = self.generate_imports()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate states
         creation = self.generate_states()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate constructor
         creation = self.generate_constructor()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate destructor
         creation = self.generate_destructor()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate run
         creation = self.generate_run()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate message handler
         creation = self.generate_message_handler()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
-        with open(self.output_file, "w") as file:
-            file.write(self.replace_calls(file_contents))
+        emitter.close()
+        emitter.write_to(self.output_file)
 
         # Create main file if @main is defined
         if self.callbacks[KEY_MAIN][KEY_BODY]:
@@ -7,6 +7,7 @@ from tools import matlab
 from common.keys import *
 from common.result import *
 from common.logging import *
+from common.emitter import Emitter
 from base.generator_base import GeneratorBase
 from common.model_configuration_base import ModelConfigurationBase
 
@@ -33,7 +34,7 @@ class ServerGenerator(GeneratorBase):
         LOG_DEBUG(f'Parsing common template: {self.common_template_file}')
 
         # First, parse the common interface template
-        data = matlab.read_file(self.common_template_file)
+        data = self.read_template(self.common_template_file, matlab.read_file)
 
         result = self.parse_template(
             data, KEY_CLASS_NAME, has_argument=False, maximum=1)
@@ -99,7 +100,7 @@ class ServerGenerator(GeneratorBase):
         # Then parse the engine template
         if self.engine_template_file:
             LOG_DEBUG(f'Parsing engine template: {self.engine_template_file}')
-            data = matlab.read_file(self.engine_template_file)
+            data = self.read_template(self.engine_template_file, matlab.read_file)
 
             result = self.parse_template(
                 data, KEY_CALLBACK, has_argument=True, maximum=None)
@@ -118,54 +119,52 @@ class ServerGenerator(GeneratorBase):
         if not reading_templates.is_success():
             return reading_templates
 
-        file_contents = str()
+        emitter = Emitter(filters=[self.replace_calls])
 
         # Generate imports
         creation = self.generate_imports()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate class
         creation = self.generate_class()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate main
         creation = self.generate_main()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate constructor
         creation = self.generate_constructor()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate destructor
         creation = self.generate_destructor()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate run
         creation = self.generate_run()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate message handler
         creation = self.generate_message_handler()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
-        file_contents = self.replace_calls(file_contents)
-
-        with open(self.output_file, "w") as file:
-            file.write(file_contents)
+        emitter.close()
+        emitter.write_to(self.output_file)
 
         # Generate states
         if self.callbacks[KEY_STATES]:
@@ -3,17 +3,21 @@ import subprocess
 
 import json
 
-from tools import python
+from tools import python, file_system
 
 from common.keys import *
 from common.result import *
 from common.logging import *
+from common.emitter import Emitter
 from base.generator_base import GeneratorBase
 from common.model_configuration_base import ModelConfigurationBase
 
 # Callbacks are defined at the module level
 module_folder = os.path.dirname(__file__)
 
+# Code shared by the generated servers and clients, copied next to their protos
+framing_file = module_folder + "/../common/languages/python/framing.py"
+
 class ServerGenerator(GeneratorBase):
     def __init__(self, output_file):
         super().__init__(output_file)
@@ -27,6 +31,8 @@ class ServerGenerator(GeneratorBase):
 
         self.callbacks = python.create_structure()
 
+        file_system.copy_archive(framing_file, f'{os.path.dirname(output_file)}/dtig/framing.py')
+
     def read_templates(self) -> VoidResult:
         self.common_template_file = module_folder + \
             "/templates/python_server_template.py"
@@ -37,7 +43,7 @@ class ServerGenerator(GeneratorBase):
         #     return formatting
 
         # First, parse the common interface template
-        data = python.read_file(self.common_template_file)
+        data = self.read_template(self.common_template_file, python.read_file)
 
         result = self.parse_template(
             data, KEY_CLASS_NAME, has_argument=False, maximum=1)
@@ -103,7 +109,7 @@ class ServerGenerator(GeneratorBase):
         # Then parse the engine template
         if self.engine_template_file:
             LOG_DEBUG(f'Parsing engine template: {self.engine_template_file}')
-            data = python.read_file(self.engine_template_file)
+            data = self.read_template(self.engine_template_file, python.read_file)
 
             result = self.parse_template(
                 data, KEY_CLASS_NAME, has_argument=False, maximum=1)
@@ -123,66 +129,75 @@ class ServerGenerator(GeneratorBase):
         return super().read_templates()
 
     def generate(self, config: ModelConfigurationBase) -> VoidResult:
+        runtime = config[KEY_RUNTIME] if config.has(KEY_RUNTIME) else RUNTIME_THREADS
+        if runtime not in [RUNTIME_THREADS, RUNTIME_ASYNCIO]:
+            return VoidResult.failed(f'Unknown runtime: {runtime}')
+
         reading_templates = self.read_templates()
         if not reading_templates.is_success():
             return reading_templates
 
-        file_contents = str()
+        emitter = Emitter(filters=[self.replace_calls], indentation=python.DEFAULT_INDENTATION)
 
         # Generate imports
         creation = self.generate_imports()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate states
         creation = self.generate_states()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate class
         creation = self.generate_class()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate constructor
         creation = self.generate_constructor()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate destructor
         creation = self.generate_destructor()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate run
         creation = self.generate_run()
         if not creation.is_success():
             return creation
-        file_contents += python.set_indentation(creation.value(), level=1)
+        emitter.write(creation.value(), level=1)
 
         # Generate message handler
         creation = self.generate_message_handler()
         if not creation.is_success():
             return creation
-        file_contents += python.set_indentation(creation.value(), level=1)
+        emitter.write(creation.value(), level=1)
 
         # Generate main
         creation = self.generate_main()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
-        file_contents = self.replace_calls(file_contents)
+        emitter.close()
+
+        # Format and check the code in memory, so the file is only written once
+        formatted = python.format_code(emitter.value(), self.output_file)
+        if not formatted:
+            return formatted
 
         with open(self.output_file, "w") as file:
-            file.write(file_contents)
+            file.write(formatted.value())
 
-        return python.format(self.output_file)
+        return VoidResult()
 
     def generate_class(self) -> Result:
         if self.callbacks[KEY_CLASS_NAME][KEY_BODY]:
@@ -191,26 +206,26 @@ class ServerGenerator(GeneratorBase):
         return Result("")
 
     def generate_constructor(self) -> Result:
-        body = ""
+        body = []
         for key, access in self.callbacks[KEY_CONSTRUCTOR].items():
             if access[KEY_BODY]:
-                body += python.set_indentation(access[KEY_BODY], level=1)
+                body.append(python.set_indentation(access[KEY_BODY], level=1))
 
         if self.callbacks[KEY_CALLBACK][KEY_CONSTRUCTOR][KEY_BODY]:
-            body += python.set_indentation(self.callbacks[KEY_CALLBACK][KEY_CONSTRUCTOR][KEY_BODY], level=2)
+            body.append(python.set_indentation(self.callbacks[KEY_CALLBACK][KEY_CONSTRUCTOR][KEY_BODY], level=2))
 
-        return Result(body)
+        return Result("".join(body))
 
     def generate_destructor(self) -> Result:
-        body = ""
+        body = []
         for key, access in self.callbacks[KEY_DESTRUCTOR].items():
             if access[KEY_BODY]:
-                body += python.set_indentation(access[KEY_BODY], level=1)
+                body.append(python.set_indentation(access[KEY_BODY], level=1))
 
         if self.callbacks[KEY_CALLBACK][KEY_DESTRUCTOR][KEY_BODY]:
-            body += python.set_indentation(self.callbacks[KEY_CALLBACK][KEY_DESTRUCTOR][KEY_BODY], level=2)
+            body.append(python.set_indentation(self.callbacks[KEY_CALLBACK][KEY_DESTRUCTOR][KEY_BODY], level=2))
 
-        return Result(body)
+        return Result("".join(body))
 
     def name_from_key(self, groups):
         name = groups[0]
@@ -260,6 +275,8 @@ class ClientGenerator(GeneratorBase):
 
         self.callbacks = python.create_structure()
 
+        file_system.copy_archive(framing_file, f'{os.path.dirname(output_file)}/dtig/framing.py')
+
     def read_templates(self) -> VoidResult:
         self.common_template_file = module_folder + \
             "/templates/python_client_template.py"
@@ -267,7 +284,7 @@ class ClientGenerator(GeneratorBase):
         LOG_DEBUG(f'Parsing common template: {self.common_template_file}')
 
         # First, parse the common interface template
-        data = python.read_file(self.common_template_file)
+        data = self.read_template(self.common_template_file, python.read_file)
 
         result = self.parse_template(
             data, KEY_CLASS_NAME, has_argument=False, maximum=1)
@@ -333,7 +350,7 @@ class ClientGenerator(GeneratorBase):
         # Then parse the engine template
         if self.engine_template_file:
             LOG_DEBUG(f'Parsing engine template: {self.engine_template_file}')
-            data = python.read_file(self.engine_template_file)
+            data = self.read_template(self.engine_template_file, python.read_file)
 
             result = self.parse_template(
                 data, KEY_CLASS_NAME, has_argument=False, maximum=1)
@@ -357,62 +374,67 @@ class ClientGenerator(GeneratorBase):
         if not reading_templates.is_success():
             return reading_templates
 
-        file_contents = str()
+        emitter = Emitter(filters=[self.replace_calls], indentation=python.DEFAULT_INDENTATION)
 
         # Generate imports
         creation = self.generate_imports()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate states
         creation = self.generate_states()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate class
         creation = self.generate_class()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate constructor
         creation = self.generate_constructor()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate destructor
         creation = self.generate_destructor()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
 
         # Generate run
         creation = self.generate_run()
         if not creation.is_success():
             return creation
-        file_contents += python.set_indentation(creation.value(), level=1)
+        emitter.write(creation.value(), level=1)
 
         # Generate message handler
         creation = self.generate_message_handler()
         if not creation.is_success():
             return creation
-        file_contents += python.set_indentation(creation.value(), level=1)
+        emitter.write(creation.value(), level=1)
 
         # Generate main
         creation = self.generate_main()
         if not creation.is_success():
             return creation
-        file_contents += creation.value()
+        emitter.write(creation.value())
+
+        emitter.close()
 
-        file_contents = self.replace_calls(file_contents)
+        # Format and check the code in memory, so the file is only written once
+        formatted = python.format_code(emitter.value(), self.output_file)
+        if not formatted:
+            return formatted
 
         with open(self.output_file, "w") as file:
-            file.write(file_contents)
+            file.write(formatted.value())
 
-        return python.format(self.output_file)
+        return VoidResult()
 
     def generate_class(self) -> Result:
         if self.callbacks[KEY_CLASS_NAME][KEY_BODY]:
@@ -421,26 +443,26 @@ class ClientGenerator(GeneratorBase):
         return Result("")
 
     def generate_constructor(self) -> Result:
-        body = ""
+        body = []
         for key, access in self.callbacks[KEY_CONSTRUCTOR].items():
             if access[KEY_BODY]:
-                body += python.set_indentation(access[KEY_BODY], level=1)
+                body.append(python.set_indentation(access[KEY_BODY], level=1))
 
         if self.callbacks[KEY_CALLBACK][KEY_CONSTRUCTOR][KEY_BODY]:
-            body += python.set_indentation(self.callbacks[KEY_CALLBACK][KEY_CONSTRUCTOR][KEY_BODY], level=2)
+            body.append(python.set_indentation(self.callbacks[KEY_CALLBACK][KEY_CONSTRUCTOR][KEY_BODY], level=2))
 
-        return Result(body)
+        return Result("".join(body))
 
     def generate_destructor(self) -> Result:
-        body = ""
+        body = []
         for key, access in self.callbacks[KEY_DESTRUCTOR].items():
             if access[KEY_BODY]:
-                body += python.set_indentation(access[KEY_BODY], level=1)
+                body.append(python.set_indentation(access[KEY_BODY], level=1))
 
         if self.callbacks[KEY_CALLBACK][KEY_DESTRUCTOR][KEY_BODY]:
-            body += python.set_indentation(self.callbacks[KEY_CALLBACK][KEY_DESTRUCTOR][KEY_BODY], level=2)
+            body.append(python.set_indentation(self.callbacks[KEY_CALLBACK][KEY_DESTRUCTOR][KEY_BODY], level=2))
 
-        return Result(body)
+        return Result("".join(body))
 
     def name_from_key(self, groups):
         name = groups[0]
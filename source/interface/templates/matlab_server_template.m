@@ -93,22 +93,27 @@ end
 
 <DTIG_METHOD(PUBLIC)>
 function readByteFcn(src, ~)
-  if src.NumBytesAvailable < 1
-    return
-  end
+  % Every message is preceded by its length as a 4 byte big endian integer
+  % Several messages may already be available, they are handled one by one
+  while src.NumBytesAvailable >= 4
+    header = uint8(read(src, 4, "uint8"));
+    messageSize = double(swapbytes(typecast(header, "uint32")));
+
+    % Read data and process it as a protobuf object
+    data = read(src, messageSize, "int8");
+    message = dtig.Helpers.parseFrom(data);
+    try
+      returnValue = DTIG>MESSAGEHANDLER(message);
+    catch exception
+      disp(getReport(exception));
+      returnValue = createReturn(dtig.EReturnCode.FAILURE, "Exception when handling message");
+    end
 
-  % Read data and process it as a protobuf object
-  data = read(src, src.NumBytesAvailable);
-  message = dtig.Helpers.parseFrom(data);
-  try
-    returnValue = DTIG>MESSAGEHANDLER(message);
-  catch exception
-    disp(getReport(exception));
-    returnValue = createReturn(dtig.EReturnCode.FAILURE, "Exception when handling message");
+    % Send the reply with its length first
+    reply = dtig.Helpers.toByteArray(returnValue);
+    write(src, typecast(swapbytes(uint32(numel(reply))), "uint8"), "uint8");
+    write(src, reply, "int8");
   end
-
-  % Send the reply
-  write(src, dtig.Helpers.toByteArray(returnValue), "int8");
 end
 
 <DTIG_METHOD(PUBLIC)>
@@ -134,27 +139,31 @@ end
 
 <DTIG_MESSAGEHANDLER>
 function returnValue = handleMessage(message)
-  if message.hasStop()
-    returnValue = DTIG>PARSE(STOP)(message.getStop());
-  elseif message.hasStart()
-    returnValue = DTIG>PARSE(START)(message.getStart());
-  elseif message.hasSetInput()
-    returnValue = DTIG>PARSE(SET_INPUT)(message.getSetInput());
-  elseif message.hasGetOutput()
-    returnValue = DTIG>PARSE(GET_OUTPUT)(message.getGetOutput());
-  elseif message.hasAdvance()
-    returnValue = DTIG>PARSE(ADVANCE)(message.getAdvance());
-  elseif message.hasInitialize()
-    returnValue = DTIG>PARSE(INITIALIZE)(message.getInitialize());
-  elseif message.hasSetParameter()
-    returnValue = DTIG>PARSE(SET_PARAMETER)(message.getSetParameter());
-  elseif message.hasGetParameter()
-    returnValue = DTIG>PARSE(GET_PARAMETER)(message.getGetParameter());
-  elseif message.hasGetStatus()
-    returnValue = DTIG>PARSE(GET_STATUS)();
-  else
-    returnValue = DTIG>PARSE(MODEL_INFO)();
+  % Handlers of the commands, by the name of their field in the message
+  persistent handlers;
+  if isempty(handlers)
+    handlers = containers.Map( ...
+      {'stop', 'start', 'set_input', 'get_output', 'advance', 'initialize', 'set_parameter', 'get_parameter', 'get_status', 'model_info'}, ...
+      {@(m) DTIG>PARSE(STOP)(m.getStop()), ...
+       @(m) DTIG>PARSE(START)(m.getStart()), ...
+       @(m) DTIG>PARSE(SET_INPUT)(m.getSetInput()), ...
+       @(m) DTIG>PARSE(GET_OUTPUT)(m.getGetOutput()), ...
+       @(m) DTIG>PARSE(ADVANCE)(m.getAdvance()), ...
+       @(m) DTIG>PARSE(INITIALIZE)(m.getInitialize()), ...
+       @(m) DTIG>PARSE(SET_PARAMETER)(m.getSetParameter()), ...
+       @(m) DTIG>PARSE(GET_PARAMETER)(m.getGetParameter()), ...
+       @(m) DTIG>PARSE(GET_STATUS)(), ...
+       @(m) DTIG>PARSE(MODEL_INFO)()});
   end
+
+  command = char(dtig.Helpers.command(message));
+  if ~isKey(handlers, command)
+    returnValue = createReturn(dtig.EReturnCode.UNKNOWN_COMMAND, "Unknown command");
+    return
+  end
+
+  handler = handlers(command);
+  returnValue = handler(message);
 end
 
 <DTIG_PARSE(INITIALIZE)>
@@ -19,12 +19,19 @@ import dtig.dt_message_pb2 as dtig_message
 import dtig.stop_mode_pb2 as dtig_stop_mode
 import dtig.return_value_pb2 as dtig_return
 
+from dtig.framing import FramedSocket
+
 argument_parser = argparse.ArgumentParser(description='Python DTIG client')
 argument_parser.add_argument('--host', action="store", dest="hostname", help='Hostname of the server', type=str, default="127.0.0.1")
 argument_parser.add_argument('--port', action="store", dest="port", help='Port of the server', type=int, default=8080)
 argument_parser.add_argument('--model', action="store", dest="model_name", help='Model name', type=str, default=None)
+argument_parser.add_argument('--log-level', action="store", dest="log_level", help='Log level, from 0 (errors) to 4 (trace)', type=int, default=int(LogLevel.INFO))
+argument_parser.add_argument('--log-rate', action="store", dest="log_rate", help='Minimum seconds between logs of the same call site', type=float, default=0.5)
 cmd_args = argument_parser.parse_args()
 
+# Responses are logged from a background thread, so the client does not wait for the output
+start_logger(LogLevel(cmd_args.log_level), background=True, rate_limit=cmd_args.log_rate)
+
 <DTIG_CLASSNAME>
 Client
 
@@ -39,7 +46,7 @@ def __init__(self, cmd_args):
 def run(self):
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         s.connect((self.hostname, self.port))
-        DTIG>CALLBACK(RUNCLIENT)(s)
+        DTIG>CALLBACK(RUNCLIENT)(FramedSocket(s))
 
 <DTIG_PARSE(STOP)>
 def stop(self, sock):
@@ -1,9 +1,18 @@
 <DTIG_IMPORTS>
 # Basic imports
 import sys
+import queue
+import atexit
 import socket
+import logging
 import argparse
 import threading
+import logging.handlers
+DTIG_IF(DTIG_RUNTIME == DTIG_RUNTIME_ASYNCIO)
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
+DTIG_END_IF
 
 from enum import Enum
 from time import sleep
@@ -23,6 +32,8 @@ from google.protobuf import any_pb2
 from google.protobuf.message import Message
 from google.protobuf.message import DecodeError
 
+from dtig.framing import FramedSocket, FRAME_HEADER, MAX_MESSAGE_SIZE
+
 DTIG_DEF DTIG_SET_DEFAULT(TYPE)
     if DTIG_STR(DTIG>TYPE) in default_value:
         info_DTIG_ITEM_NAME.default.DTIG>TYPE = default_value[DTIG_STR(DTIG>TYPE)]
@@ -40,12 +51,39 @@ def __init__(self):
     self.lock = threading.Lock()
     self.condition = threading.Condition(lock=self.lock)
 
+    # Engines are not thread safe, so every call into one holds this lock, the condition only guards the state
+    # It is taken after the condition, and never held while waiting on it
+    self.model_lock = threading.Lock()
+
+    # Handlers of the commands, by the name of their field in the message
+    self.message_handlers = {
+        "advance": lambda command: DTIG>PARSE(ADVANCE)(command),
+        "set_input": lambda command: DTIG>PARSE(SET_INPUT)(command),
+        "get_output": lambda command: DTIG>PARSE(GET_OUTPUT)(command),
+        "initialize": lambda command: DTIG>PARSE(INITIALIZE)(command),
+        "start": lambda command: DTIG>PARSE(START)(command),
+        "stop": lambda command: DTIG>PARSE(STOP)(command),
+        "set_parameter": lambda command: DTIG>PARSE(SET_PARAMETER)(command),
+        "get_parameter": lambda command: DTIG>PARSE(GET_PARAMETER)(command),
+        "get_status": lambda command: DTIG>PARSE(GET_STATUS)(),
+        "model_info": lambda command: DTIG>PARSE(MODEL_INFO)()
+    }
+
     self.server_thread = threading.Thread(
         target=DTIG>CALLBACK(RUNSERVER)
     )
     self.model_thread = threading.Thread(
         target=DTIG>CALLBACK(RUNMODEL)
     )
+DTIG_IF(DTIG_RUNTIME == DTIG_RUNTIME_ASYNCIO)
+
+    # Requests are handled by worker threads, so the event loop never blocks
+    # The observers have their own worker, so the requests of the controller never wait for theirs
+    self.executor = ThreadPoolExecutor(max_workers=1)
+    self.observer_executor = ThreadPoolExecutor(max_workers=1)
+    self.sessions = dict()
+    self.controller = None
+DTIG_END_IF
 
 <DTIG_DESTRUCTOR(PUBLIC)>
 def __del__(self):
@@ -99,17 +137,12 @@ def parse_set_input(message) -> Message:
     if self.state == dtig_state.UNINITIALIZED:
         return self.return_code(dtig_code.INVALID_STATE, f'Cannot set input in state {dtig_state.EState.Name(self.state)}')
 
-    ids_length = len(message.inputs.identifiers)
-    for i in range(ids_length):
-        identifier : str = message.inputs.identifiers[i]
-        any_value : any_pb2.Any = message.inputs.values[i]
+    if len(message.inputs.values) != len(message.inputs.identifiers):
+        return self.return_code(dtig_code.INVALID_OPTION, f'Got {len(message.inputs.values)} values for {len(message.inputs.identifiers)} inputs')
 
-        # Only the model knows the type, unpacking must be a responsibility of the callback function
-        ret = DTIG>CALLBACK(SET_INPUT)(identifier, any_value)
-        if ret.code != dtig_code.SUCCESS:
-            return ret
-
-    return self.return_code(dtig_code.SUCCESS)
+    # Only the model knows the types, unpacking must be a responsibility of the callback function
+    # All the values are given at once, so the engine can set them together
+    return DTIG>CALLBACK(SET_INPUT)(message.inputs.identifiers, message.inputs.values)
 
 <DTIG_PARSE(GET_OUTPUT)>
 def parse_get_output(message):
@@ -129,17 +162,12 @@ def parse_set_parameter(message):
     if self.state == dtig_state.UNINITIALIZED:
         return self.return_code(dtig_code.INVALID_STATE, f'Cannot set parameter in state {dtig_state.EState.Name(self.state)}')
 
-    ids_length = len(message.parameters.identifiers)
-    for i in range(ids_length):
-        identifier : str = message.parameters.identifiers[i]
-        any_value : any_pb2.Any = message.parameters.values[i]
+    if len(message.parameters.values) != len(message.parameters.identifiers):
+        return self.return_code(dtig_code.INVALID_OPTION, f'Got {len(message.parameters.values)} values for {len(message.parameters.identifiers)} parameters')
 
-        # Only the model knows the type, unpacking must be a responsibility of the callback function
-        ret = DTIG>CALLBACK(SET_PARAMETER)(identifier, any_value)
-        if ret.code != dtig_code.SUCCESS:
-            return ret
-
-    return self.return_code(dtig_code.SUCCESS)
+    # Only the model knows the types, unpacking must be a responsibility of the callback function
+    # All the values are given at once, so the engine can set them together
+    return DTIG>CALLBACK(SET_PARAMETER)(message.parameters.identifiers, message.parameters.values)
 
 <DTIG_PARSE(GET_PARAMETER)>
 def parse_get_parameter(message):
@@ -173,36 +201,20 @@ def parse_get_status() -> Message:
     return DTIG>CALLBACK(GET_STATUS)()
 
 <DTIG_MESSAGEHANDLER>
-def parse_message(self, data : str) -> Message:
+def parse_message(self, data : memoryview) -> Message:
     message = dtig_message.MDTMessage()
     try:
         message.ParseFromString(data)
     except DecodeError as e:
-        print('Failed to parse incoming message')
-        return bytes()
-
-    if message.HasField("advance"):
-        return DTIG>PARSE(ADVANCE)(message.advance)
-    elif message.HasField("set_input"):
-        return DTIG>PARSE(SET_INPUT)(message.set_input)
-    elif message.HasField("get_output"):
-        return DTIG>PARSE(GET_OUTPUT)(message.get_output)
-    elif message.HasField("initialize"):
-        return DTIG>PARSE(INITIALIZE)(message.initialize)
-    elif message.HasField("start"):
-        return DTIG>PARSE(START)(message.start)
-    elif message.HasField("stop"):
-        return DTIG>PARSE(STOP)(message.stop)
-    elif message.HasField("set_parameter"):
-        return DTIG>PARSE(SET_PARAMETER)(message.set_parameter)
-    elif message.HasField("get_parameter"):
-        return DTIG>PARSE(GET_PARAMETER)(message.get_parameter)
-    elif message.HasField("get_status"):
-        return DTIG>PARSE(GET_STATUS)()
-    else:
-        return DTIG>PARSE(MODEL_INFO)()
-
-    return self.return_code(dtig_code.UNKNOWN_COMMAND)
+        logger.error('Failed to parse incoming message')
+        return self.return_code(dtig_code.FAILURE, 'Failed to parse message')
+
+    command = message.WhichOneof(MESSAGE_COMMAND)
+    handler = self.message_handlers.get(command)
+    if handler is None:
+        return self.return_code(dtig_code.UNKNOWN_COMMAND, 'Unknown command')
+
+    return handler(getattr(message, command))
 
 <DTIG_METHOD(PUBLIC)>
 def return_code(self, code: dtig_code, message: str = None) -> dtig_return:
@@ -219,37 +231,49 @@ def create_connection(self) -> bool:
         s.bind((HOST, PORT))
         s.listen()
         self.server = s
-        print(f'Connected to {HOST}:{PORT}')
+        logger.info(f'Connected to {HOST}:{PORT}')
         return True
 
     except Exception as e:
-        print(f'Failed to create socket: {e}')
+        logger.error(f'Failed to create socket: {e}')
         return False
 
 <DTIG_RUNSERVER>
 def run_server(self) -> None:
+DTIG_IF(DTIG_RUNTIME == DTIG_RUNTIME_ASYNCIO)
+    # Every client is served by a coroutine on the event loop of this thread
+    asyncio.run(self.serve_clients())
+
+    with self.condition:
+        self.step = True
+        self.state = dtig_state.STOPPED
+        self.condition.notify_all()
+DTIG_ELSE
     sock, addr = self.server.accept()
     with sock:
-        print(f"{addr} connected in state {dtig_state.EState.Name(self.state)}")
+        logger.info(f"{addr} connected in state {dtig_state.EState.Name(self.state)}")
+        connection = FramedSocket(sock)
         try:
             while True:
                 # Wait for client command
-                data: str = sock.recv(1024)
-                if not data:
-                    print("Client disconnected")
+                data: memoryview = connection.receive()
+                if data is None:
+                    logger.info("Client disconnected")
                     break
 
                 # Parse client command
                 with self.condition:
-                    reply: bytes = DTIG>MESSAGEHANDLER(data).SerializeToString()
-                    sock.sendall(reply)
+                    with self.model_lock:
+                        reply: bytes = DTIG>MESSAGEHANDLER(data).SerializeToString()
+
+                    connection.send(reply)
                     self.condition.notify_all()
 
                     if self.state == dtig_state.STOPPED:
                         break
 
         except Exception as e:
-            print(f'Failed: {e}')
+            logger.error(f'Failed: {e}')
             sock.sendall(''.encode())
             sleep(1)
 
@@ -257,14 +281,112 @@ def run_server(self) -> None:
             self.step = True
             self.state = dtig_state.STOPPED
             self.condition.notify_all()
+DTIG_END_IF
+
+<DTIG_METHOD(PUBLIC)>
+DTIG_IF(DTIG_RUNTIME == DTIG_RUNTIME_ASYNCIO)
+async def serve_clients(self) -> None:
+    self.stopped = asyncio.Event()
+
+    try:
+        server = await asyncio.start_server(self.serve_client, sock=self.server)
+    except Exception as e:
+        logger.error(f'Failed to start server: {e}')
+        return
+
+    async with server:
+        await self.stopped.wait()
+
+        # The model stops with its controller, so the observers are disconnected too
+        sessions = list(self.sessions.items())
+        for writer, _ in sessions:
+            writer.close()
+
+        await asyncio.gather(*[session for _, session in sessions], return_exceptions=True)
+
+    # Waits for the requests still running without blocking the event loop
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, self.executor.shutdown)
+    await loop.run_in_executor(None, self.observer_executor.shutdown)
+
+async def serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    addr = writer.get_extra_info("peername")
+
+    # The first client drives the model, the others can only observe it
+    observer = self.controller is not None
+    if not observer:
+        self.controller = writer
+
+    self.sessions[writer] = asyncio.current_task()
+    loop = asyncio.get_running_loop()
+    executor = self.observer_executor if observer else self.executor
+    logger.info(f"{addr} connected as {'observer' if observer else 'controller'} in state {dtig_state.EState.Name(self.state)}")
+    try:
+        while not self.stopped.is_set():
+            # Wait for client command
+            size, = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+            if size > MAX_MESSAGE_SIZE:
+                raise ValueError(f'Message of {size} bytes is larger than {MAX_MESSAGE_SIZE}')
+
+            data = await reader.readexactly(size)
+
+            data = await loop.run_in_executor(executor, self.handle_request, data, observer)
+            writer.write(FRAME_HEADER.pack(len(data)) + data)
+            await writer.drain()
+
+            if self.state == dtig_state.STOPPED:
+                self.stopped.set()
+
+    except asyncio.IncompleteReadError:
+        logger.info(f"{addr} disconnected")
+    except Exception as e:
+        logger.error(f'Failed: {e}')
+    finally:
+        self.sessions.pop(writer, None)
+        writer.close()
+        if not observer:
+            self.stopped.set()
+
+def handle_request(self, data: bytes, observer: bool) -> bytes:
+    # Observers only read, so they do not take the condition and never wait for the state changes of the controller
+    # The engine is still only reached through the model lock, so they wait for a step or a request that uses it
+    if observer:
+        if not self.is_read_only(data):
+            return self.return_code(dtig_code.INVALID_STATE, 'Only the first client can control the model').SerializeToString()
+
+        with self.model_lock:
+            return DTIG>MESSAGEHANDLER(data).SerializeToString()
+
+    # Parse client command
+    with self.condition:
+        with self.model_lock:
+            reply: bytes = DTIG>MESSAGEHANDLER(data).SerializeToString()
+
+        self.condition.notify_all()
+
+    return reply
+
+def is_read_only(self, data: bytes) -> bool:
+    message = dtig_message.MDTMessage()
+    try:
+        message.ParseFromString(data)
+    except DecodeError:
+        return False
+
+    return message.WhichOneof(MESSAGE_COMMAND) in READ_ONLY_COMMANDS
+DTIG_END_IF
 
 <DTIG_MAIN>
 argument_parser = argparse.ArgumentParser(description='DTIG>CLASSNAME sever')
 argument_parser.add_argument('--host', action="store", dest="host", help='Server hostname/ip', type=str, default="127.0.0.1")
 argument_parser.add_argument('--port', action="store", dest="port", help='Server port', type=int, default=8080)
+argument_parser.add_argument('--log-level', action="store", dest="log_level", help='Log level, from 0 (errors) to 4 (trace)', type=int, default=2)
+argument_parser.add_argument('--log-rate', action="store", dest="log_rate", help='Minimum seconds between logs of the same call site', type=float, default=LOG_RATE_LIMIT)
 args = argument_parser.parse_args()
 
 if __name__ == "__main__":
+    start_logger(args.log_level, args.log_rate)
+
     if args.host:
         HOST = args.host
     if args.port:
@@ -277,6 +399,67 @@ if __name__ == "__main__":
 HOST = "127.0.0.1"
 PORT = 8080
 
+# Commands of a message are fields of its oneof, so the one that is set can be found without testing each of them
+# The oneof is found through one of its commands, so it does not depend on the order of the oneofs of the message
+MESSAGE_COMMAND = dtig_message.MDTMessage.DESCRIPTOR.fields_by_name["initialize"].containing_oneof.name
+DTIG_IF(DTIG_RUNTIME == DTIG_RUNTIME_ASYNCIO)
+
+# Clients connecting while another one drives the model can only send these
+READ_ONLY_COMMANDS = ("get_output", "get_parameter", "get_status", "model_info")
+DTIG_END_IF
+
+# Records are queued as they are, then formatted and written by a background thread, so the model loop never does either
+# Below warnings, each call site logs at most once per LOG_RATE_LIMIT seconds, the rest is counted
+LOG_RATE_LIMIT = 0.5
+LOG_LEVELS = [logging.ERROR, logging.WARNING, logging.INFO, logging.DEBUG, logging.DEBUG]
+
+class RateLimit(logging.Filter):
+    def __init__(self, interval: float):
+        super().__init__()
+        self.interval = interval
+        self.sites = dict()
+
+    def filter(self, record) -> bool:
+        if self.interval <= 0 or record.levelno >= logging.WARNING:
+            return True
+
+        site = (record.pathname, record.lineno)
+        last, suppressed = self.sites.get(site, (0.0, 0))
+        if record.created - last < self.interval:
+            self.sites[site] = (last, suppressed + 1)
+            return False
+
+        self.sites[site] = (record.created, 0)
+        if suppressed:
+            record.msg = f'{record.msg} ({suppressed} suppressed)'
+
+        return True
+
+# The default QueueHandler formats the message before queueing it, on the thread that logs
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        return record
+
+logger = logging.getLogger("dtig")
+
+def start_logger(level: int, rate_limit: float = LOG_RATE_LIMIT) -> logging.handlers.QueueListener:
+    log_queue = queue.SimpleQueue()
+
+    handler = DeferredQueueHandler(log_queue)
+    handler.addFilter(RateLimit(rate_limit))
+    logger.addHandler(handler)
+    logger.setLevel(LOG_LEVELS[min(max(level, 0), len(LOG_LEVELS) - 1)])
+    logger.propagate = False
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(logging.Formatter('%(asctime)s [%(levelname).1s] %(message)s'))
+
+    # Flushes the remaining records when the server exits
+    listener = logging.handlers.QueueListener(log_queue, output)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
 <DTIG_CALLBACK(INITIALIZE)>
 def initialize_callback(message) -> Message:
     return self.return_code(dtig_code.UNKNOWN_OPTION, f'Engine does not support initialize call')
@@ -434,7 +617,7 @@ def get_model_info():
     return return_value
 
 <DTIG_CALLBACK(SET_INPUT)>
-def set_input_callback() -> Message:
+def set_input_callback(identifiers, values) -> Message:
     return self.return_code(dtig_code.UNKNOWN_OPTION, f'Engine does not support set_input call')
 
 <DTIG_CALLBACK(GET_OUTPUT)>
@@ -442,7 +625,7 @@ def get_output_callback() -> Message:
     return self.return_code(dtig_code.UNKNOWN_OPTION, f'Engine does not support get_output call')
 
 <DTIG_CALLBACK(SET_PARAMETER)>
-def set_parameter_callback() -> Message:
+def set_parameter_callback(identifiers, values) -> Message:
     return self.return_code(dtig_code.UNKNOWN_OPTION, f'Engine does not support set_parameter call')
 
 <DTIG_CALLBACK(GET_PARAMETER)>
@@ -0,0 +1,128 @@
+import os
+import sys
+import marshal
+import hashlib
+
+from common.logging import *
+
+from language.nodes import *
+from language.parser_tokens import *
+
+# Part of the cache key, must change whenever the generated code does
+GENERATOR_VERSION = 3
+
+# Tokens whose value depends on the current item
+ITEM_TOKENS = [
+    TOKEN_INDEX,
+    TOKEN_ITEM_ID,
+    TOKEN_ITEM_NAME,
+    TOKEN_ITEM_TYPE,
+    TOKEN_ITEM_UNIT,
+    TOKEN_ITEM_NAMESPACE,
+    TOKEN_ITEM_MODIFIER,
+    TOKEN_ITEM_DESCRIPTION,
+    TOKEN_ITEM_DEFAULT
+]
+
+# Compiled templates are stored next to the language, as python does with __pycache__
+CACHE_ENABLED = True
+CACHE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__dtig_cache__")
+
+# Names available to the generated render functions
+template_globals = {
+    "ltrim": ltrim,
+    "render_string": render_string
+}
+
+class Template():
+    def __init__(self, code):
+        namespace = dict(template_globals)
+        exec(code, namespace)
+
+        self.function = namespace["render"]
+
+    def render(self, context) -> str:
+        return self.function(context)
+
+class CodeGenerator():
+    def __init__(self):
+        self.functions = []
+
+    def add_block(self, block) -> str:
+        # Reserve the slot first so nested blocks get the following ones
+        index = len(self.functions)
+        name = f'block_{index}'
+        self.functions.append(None)
+
+        lines = [f'def {name}(context):', f'{indent(1)}out = []', f'{indent(1)}append = out.append']
+        block.generate(self, lines, 1)
+        lines.append(f'{indent(1)}return ltrim("".join(out))')
+
+        self.functions[index] = "\n".join(lines)
+        return name
+
+    def call_block(self, block) -> str:
+        name = self.add_block(block)
+
+        # Definitions change the parser, so the block must always run
+        references = block.references()
+        if TOKEN_DEF in references:
+            return f'{name}(context.copy())'
+
+        # Macros and their arguments may read any field of the item
+        dynamic = MACRO_CALL in references or any([reference.startswith(ARGUMENT_PREFIX) for reference in references])
+        if dynamic:
+            reads = ITEM_TOKENS
+        else:
+            reads = [token for token in ITEM_TOKENS if token in references]
+
+        return f'context.expand({name}, {tuple(reads)!r}, {dynamic})'
+
+    def generate(self, block) -> str:
+        render = self.add_block(block)
+        return "\n\n".join(self.functions) + f'\n\nrender = {render}\n'
+
+def generate_code(block, name = "<dtig>"):
+    return compile(CodeGenerator().generate(block), name, "exec")
+
+def template_digest(text : str, macros = (), parameters = ()) -> str:
+    # The generated code depends on the template, the known macros, the language and the interpreter
+    digest = hashlib.sha256()
+    digest.update(f'{DTIG_VERSION}\0{GENERATOR_VERSION}\0{sys.implementation.cache_tag}\0'.encode())
+    digest.update("\0".join(sorted(macros)).encode())
+    digest.update(b"\0")
+    digest.update("\0".join(parameters).encode())
+    digest.update(b"\0")
+    digest.update(text.encode())
+
+    return digest.hexdigest()
+
+def load_code(digest : str):
+    if not CACHE_ENABLED:
+        return None
+
+    file = os.path.join(CACHE_DIRECTORY, f'{digest}.dtigc')
+    try:
+        with open(file, "rb") as f:
+            return marshal.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        LOG_WARNING(f'Ignoring invalid template cache {file}: {e}')
+        return None
+
+def store_code(digest : str, code):
+    if not CACHE_ENABLED:
+        return
+
+    file = os.path.join(CACHE_DIRECTORY, f'{digest}.dtigc')
+    try:
+        os.makedirs(CACHE_DIRECTORY, exist_ok=True)
+
+        # Write and rename so concurrent generators never read a partial file
+        temporary = f'{file}.{os.getpid()}'
+        with open(temporary, "wb") as f:
+            marshal.dump(code, f)
+        os.replace(temporary, file)
+    except Exception as e:
+        LOG_WARNING(f'Could not store template cache {file}: {e}')
@@ -0,0 +1,243 @@
+import re
+
+from common.logging import *
+from common import profiler
+
+from language.nodes import *
+from language.parser_tokens import *
+from language.code_generator import Template, generate_code, template_digest, load_code, store_code
+
+# Compiled templates, shared by all the parsers since they do not depend on the configuration
+compiled_templates = dict()
+
+call_regex      = re.compile(fr'{TOKEN_PREFIX}_[A-Z_]+')
+argument_regex  = re.compile(fr'\(.*?\)')
+open_regex      = re.compile(fr'\(')
+close_regex     = re.compile(fr'\)')
+
+if_start_regex  = re.compile(fr'\b({TOKEN_IF})\b')
+if_end_regex    = re.compile(fr'\b({TOKEN_ELSE}|{TOKEN_ELSE_IF}|{TOKEN_END_IF})\b')
+else_end_regex  = re.compile(fr'\b({TOKEN_END_IF})\b')
+for_start_regex = re.compile(fr'\b({TOKEN_FOR})\b')
+for_end_regex   = re.compile(fr'\b({TOKEN_END_FOR})\b')
+def_start_regex = re.compile(fr'\b({TOKEN_DEF})\b')
+def_end_regex   = re.compile(fr'\b({TOKEN_END_DEF})\b')
+
+def compile_template(text : str, macros = (), parameters = ()) -> Template:
+    # Whether a token is a macro call or a variable depends on the macros defined so far
+    key = (text, frozenset(macros), tuple(parameters))
+    if key not in compiled_templates:
+        digest = template_digest(text, macros, parameters)
+        code = load_code(digest)
+        if code is None:
+            with profiler.phase("dtig compile"):
+                code = generate_code(Compiler(text, macros, parameters).compile())
+            store_code(digest, code)
+
+        compiled_templates[key] = Template(code)
+
+    return compiled_templates[key]
+
+class Compiler():
+    def __init__(self, text, macros = (), parameters = ()):
+        self.text = text
+        self.macros = set(macros)
+
+        # Parameters of a macro body, DTIG>NAME, become slots filled when the macro is called
+        self.parameter_regex = None
+        self.parameters = dict()
+        for i, parameter in reversed(list(enumerate(parameters))):
+            self.parameters[parameter] = i
+
+        if self.parameters:
+            names = sorted(self.parameters.keys(), key=len, reverse=True)
+            self.parameter_regex = re.compile(fr'{TOKEN_PREFIX}>({"|".join([re.escape(name) for name in names])})')
+
+    def compile(self) -> Block:
+        return self.compile_block(0, len(self.text))
+
+    def compile_block(self, start, end) -> Block:
+        nodes = []
+        text = self.text
+        index = start
+        while True:
+            call_match = call_regex.search(text, index, end)
+            if not call_match:
+                self.add_text(nodes, text[index:end])
+                break
+
+            call = call_match.group()
+            before = text[index:call_match.start()]
+            LOG_TRACE('Found: %s', call)
+
+            if call == TOKEN_IF:
+                self.add_text(nodes, ltrim(before))
+
+                branches = []
+                condition, index = self.get_arguments(call_match.end(), end)
+                condition = self.translate(condition)
+                try:
+                    body_start, body_end, index, end_mode = self.get_end(index, end, if_start_regex, if_end_regex, TOKEN_END_IF)
+                except Exception as e:
+                    raise Exception(f"End of {TOKEN_IF} not found: {TOKEN_IF}({condition})")
+
+                branches.append((condition, self.compile_block(body_start, body_end)))
+
+                while end_mode == TOKEN_ELSE_IF:
+                    else_condition, index = self.get_arguments(index, end)
+                    else_condition = self.translate(else_condition)
+                    try:
+                        body_start, body_end, index, end_mode = self.get_end(index, end, if_start_regex, if_end_regex, TOKEN_END_IF)
+                    except Exception as e:
+                        raise Exception(f"End of {TOKEN_ELSE_IF} not found: {TOKEN_IF}({condition}) ... {TOKEN_ELSE_IF}({else_condition})")
+
+                    branches.append((else_condition, self.compile_block(body_start, body_end)))
+
+                if end_mode == TOKEN_ELSE:
+                    try:
+                        body_start, body_end, index, end_mode = self.get_end(index, end, if_start_regex, else_end_regex, TOKEN_END_IF)
+                    except Exception as e:
+                        raise Exception(f"End of {TOKEN_ELSE} not found: {TOKEN_IF}({condition})...{TOKEN_ELSE}")
+
+                    branches.append((None, self.compile_block(body_start, body_end)))
+
+                nodes.append(If(branches))
+
+            elif call == TOKEN_ELSE_IF:
+                raise Exception(f"{TOKEN_ELSE_IF} should never be found, maybe a missing {TOKEN_ELSE_IF}")
+
+            elif call == TOKEN_ELSE:
+                raise Exception(f"{TOKEN_ELSE} should never be found, maybe a missing {TOKEN_ELSE}")
+
+            elif call == TOKEN_END_IF:
+                raise Exception(f"{TOKEN_END_IF} should never be found, maybe a missing {TOKEN_END_IF}")
+
+            elif call == TOKEN_FOR:
+                self.add_text(nodes, ltrim(before))
+
+                condition, index = self.get_arguments(call_match.end(), end)
+                condition = self.translate(condition)
+                try:
+                    body_start, body_end, index, end_mode = self.get_end(index, end, for_start_regex, for_end_regex, TOKEN_END_FOR)
+                except Exception as e:
+                    raise Exception(f"End of {TOKEN_FOR} not found: {TOKEN_FOR}({condition})...{TOKEN_END_FOR}")
+
+                nodes.append(For(condition, self.compile_block(body_start, body_end)))
+
+            elif call == TOKEN_END_FOR:
+                raise Exception(f"{TOKEN_END_FOR} should never be found, maybe a missing {TOKEN_END_FOR}")
+
+            elif call == TOKEN_TO_PROTO_MESSAGE:
+                self.add_text(nodes, before)
+
+                argument, index = self.get_argument(call_match.end(), end, TOKEN_TO_PROTO_MESSAGE)
+                nodes.append(ToProtoMessage(self.translate(argument)))
+
+            elif call == TOKEN_TO_TYPE:
+                self.add_text(nodes, before)
+
+                argument, index = self.get_argument(call_match.end(), end, TOKEN_TO_TYPE)
+                nodes.append(ToType(self.translate(argument)))
+
+            elif call == TOKEN_STR:
+                self.add_text(nodes, before)
+
+                condition, index = self.get_arguments(call_match.end(), end)
+                nodes.append(Str(self.translate(condition)))
+
+            elif call == TOKEN_DEF:
+                self.add_text(nodes, ltrim(before))
+
+                name_match = call_regex.search(text, call_match.end(), end)
+                if not name_match:
+                    raise Exception(f'{TOKEN_DEF} with no name')
+
+                function_name = name_match.group()
+                function_args, index = self.get_arguments(name_match.end(), end)
+                body_start, body_end, index, end_mode = self.get_end(index, end, def_start_regex, def_end_regex, TOKEN_END_DEF)
+
+                # From now on, the name refers to the macro
+                self.macros.add(function_name)
+                nodes.append(Def(function_name, function_args, text[body_start:body_end]))
+
+            elif call == TOKEN_END_DEF:
+                raise Exception(f"{TOKEN_END_DEF} should never be found, maybe a missing {TOKEN_END_DEF}")
+
+            elif call in self.macros:
+                self.add_text(nodes, ltrim(before))
+
+                args, index = self.get_arguments(call_match.end(), end)
+                nodes.append(MacroCall(call, self.translate(args)))
+
+            else:
+                self.add_text(nodes, before)
+                nodes.append(Variable(call))
+                index = call_match.end()
+
+        return Block(nodes)
+
+    def add_text(self, nodes, text):
+        index = 0
+        if self.parameter_regex:
+            for match in self.parameter_regex.finditer(text):
+                if match.start() > index:
+                    nodes.append(Text(text[index:match.start()]))
+
+                nodes.append(Parameter(self.parameters[match.group(1)]))
+                index = match.end()
+
+        if index < len(text):
+            nodes.append(Text(text[index:]))
+
+    def translate(self, contents):
+        # Parameters used in conditions and arguments are replaced by their argument name
+        if not self.parameter_regex:
+            return contents
+
+        return self.parameter_regex.sub(lambda match: f'{ARGUMENT_PREFIX}{self.parameters[match.group(1)]}', contents)
+
+    def get_argument(self, start, end, token):
+        # Single argument, without nesting
+        match = argument_regex.search(self.text, start, end)
+        if not match:
+            raise Exception(f'{token} with no arguments')
+
+        return self.text[match.start() + 1:match.end() - 1], match.end()
+
+    def get_arguments(self, start, end):
+        match = open_regex.search(self.text, start, end)
+        if not match:
+            raise Exception(f'Could not find arguments: {self.text[start:end]}')
+
+        body_start, body_end, index, end_mode = self.get_end(match.end(), end, open_regex, close_regex, ")")
+
+        # Arguments and the index after them
+        return self.text[body_start:body_end], index
+
+    def get_end(self, start, end, start_regex, end_regex, end_marker):
+        index = start
+        level = 0
+        while index < end:
+            a = start_regex.search(self.text, index, end)
+            b = end_regex.search(self.text, index, end)
+
+            if not b:
+                break
+
+            # If nesting, continue
+            if a and a.start() < b.start():
+                level += 1
+                index = a.end()
+                continue
+
+            end_mode = b.group()
+            if level == 0:
+                # Start and end of the body, index after the end marker and the found marker
+                return start, b.start(), b.end(), end_mode
+
+            if end_mode == end_marker:
+                level -= 1
+
+            index = b.end()
+
+        raise Exception(f"Could not find: {end_marker}")
@@ -0,0 +1,245 @@
+# Nodes of a compiled DTIG template
+# A template is compiled once into a block of nodes that can then be rendered
+# as many times as needed against a context (configuration, current item, ...)
+
+import re
+
+from language.parser_tokens import *
+
+token_regex = re.compile(fr'{TOKEN_PREFIX}_[A-Z_]+')
+
+# Referenced by blocks that call a macro, it is not a valid variable name
+MACRO_CALL = f'{TOKEN_PREFIX}>CALL'
+
+# Parameters of a macro are compiled into numbered arguments of the context
+ARGUMENT_PREFIX = f'{TOKEN_PREFIX}_ARGUMENT_'
+argument_regex = re.compile(fr'{ARGUMENT_PREFIX}(\d+)')
+
+def argument_index(name : str):
+    match = argument_regex.fullmatch(name)
+    if not match:
+        return None
+
+    return int(match.group(1))
+
+# Names of the DTIG tokens used in a string
+def tokens(contents : str) -> set:
+    return set(token_regex.findall(contents))
+
+# Remove the last line break if only whitespaces follow it
+def ltrim(contents : str) -> str:
+    # Only looks at the end, instead of reversing the whole string
+    stripped = contents.rstrip(" \t")
+    if stripped.endswith("\n"):
+        return stripped[:-1]
+
+    return contents
+
+def render_string(context, condition):
+    to_string = context.parser.to_string
+    if to_string:
+        return f'{to_string(context.conditional(condition))}'
+
+    return f'{context.conditional(condition)}'
+
+def indent(level):
+    return "    " * level
+
+class Node():
+    def render(self, context) -> str:
+        raise Exception("render must be implemented")
+
+    # Add the python code equivalent to render to lines
+    def generate(self, generator, lines, level):
+        raise Exception("generate must be implemented")
+
+    # Names of the tokens this node, and the ones nested in it, depend on
+    def references(self) -> set:
+        return set()
+
+class Block(Node):
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+    def render(self, context) -> str:
+        return ltrim("".join([node.render(context) for node in self.nodes]))
+
+    def generate(self, generator, lines, level):
+        for node in self.nodes:
+            node.generate(generator, lines, level)
+
+    def references(self) -> set:
+        names = set()
+        for node in self.nodes:
+            names |= node.references()
+
+        return names
+
+class Text(Node):
+    def __init__(self, value):
+        self.value = value
+
+    def render(self, context) -> str:
+        return self.value
+
+    def generate(self, generator, lines, level):
+        lines.append(f'{indent(level)}append({self.value!r})')
+
+class Parameter(Node):
+    def __init__(self, index):
+        self.index = index
+
+    def render(self, context) -> str:
+        return context.render_argument(self.index)
+
+    def generate(self, generator, lines, level):
+        lines.append(f'{indent(level)}append(context.render_argument({self.index}))')
+
+    def references(self) -> set:
+        return {f'{ARGUMENT_PREFIX}{self.index}'}
+
+class Variable(Node):
+    def __init__(self, name):
+        self.name = name
+
+    def render(self, context) -> str:
+        return f'{context.get_variable(self.name)}'
+
+    def generate(self, generator, lines, level):
+        lines.append(f'{indent(level)}append(format(context.get_variable({self.name!r}), ""))')
+
+    def references(self) -> set:
+        return {self.name}
+
+class If(Node):
+    def __init__(self, branches):
+        # List of (condition, block), the condition of the else branch is None
+        self.branches = branches
+
+    def render(self, context) -> str:
+        for condition, block in self.branches:
+            if condition is None or context.conditional(condition):
+                return context.copy().render(block)
+
+        return ""
+
+    def generate(self, generator, lines, level):
+        for i, (condition, block) in enumerate(self.branches):
+            if condition is None:
+                lines.append(f'{indent(level)}else:')
+            elif i == 0:
+                lines.append(f'{indent(level)}if context.conditional({condition!r}):')
+            else:
+                lines.append(f'{indent(level)}elif context.conditional({condition!r}):')
+
+            lines.append(f'{indent(level + 1)}append({generator.call_block(block)})')
+
+    def references(self) -> set:
+        names = set()
+        for condition, block in self.branches:
+            if condition is not None:
+                names |= tokens(condition)
+            names |= block.references()
+
+        return names
+
+class For(Node):
+    def __init__(self, condition, block):
+        self.condition = condition
+        self.block = block
+
+    def render(self, context) -> str:
+        loop_condition = context.conditional(self.condition)
+        if not loop_condition:
+            return ""
+
+        body = []
+        for i, cfg in enumerate(loop_condition):
+            context.item = cfg
+            context.item_index = i
+
+            body.append(context.copy().render(self.block))
+
+        return "".join(body)
+
+    def generate(self, generator, lines, level):
+        call = generator.call_block(self.block)
+        lines.append(f'{indent(level)}loop_condition = context.conditional({self.condition!r})')
+        lines.append(f'{indent(level)}if loop_condition:')
+        lines.append(f'{indent(level + 1)}for i, cfg in enumerate(loop_condition):')
+        lines.append(f'{indent(level + 2)}context.item = cfg')
+        lines.append(f'{indent(level + 2)}context.item_index = i')
+        lines.append(f'{indent(level + 2)}append({call})')
+
+    def references(self) -> set:
+        return tokens(self.condition) | self.block.references()
+
+class Def(Node):
+    def __init__(self, name, args, body):
+        self.name = name
+        self.args = args
+        self.body = body
+
+    def render(self, context) -> str:
+        context.parser.define(self.name, self.args, self.body)
+        return ""
+
+    def generate(self, generator, lines, level):
+        lines.append(f'{indent(level)}context.parser.define({self.name!r}, {self.args!r}, {self.body!r})')
+
+    def references(self) -> set:
+        return {TOKEN_DEF}
+
+class MacroCall(Node):
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.arguments = tuple([arg.strip() for arg in args.split(",")])
+
+    def render(self, context) -> str:
+        return context.call(self.name, self.arguments)
+
+    def generate(self, generator, lines, level):
+        lines.append(f'{indent(level)}append(context.call({self.name!r}, {self.arguments!r}))')
+
+    def references(self) -> set:
+        return {MACRO_CALL} | tokens(self.args)
+
+class ToProtoMessage(Node):
+    def __init__(self, argument):
+        self.argument = argument
+
+    def render(self, context) -> str:
+        return f'{context.parser.to_proto_message(context.resolve(self.argument))}'
+
+    def generate(self, generator, lines, level):
+        lines.append(f'{indent(level)}append(format(context.parser.to_proto_message(context.resolve({self.argument!r})), ""))')
+
+    def references(self) -> set:
+        return {self.argument}
+
+class ToType(Node):
+    def __init__(self, argument):
+        self.argument = argument
+
+    def render(self, context) -> str:
+        return f'{context.parser.type_to_function(context.resolve(self.argument))}'
+
+    def generate(self, generator, lines, level):
+        lines.append(f'{indent(level)}append(format(context.parser.type_to_function(context.resolve({self.argument!r})), ""))')
+
+    def references(self) -> set:
+        return {self.argument}
+
+class Str(Node):
+    def __init__(self, condition):
+        self.condition = condition
+
+    def render(self, context) -> str:
+        return render_string(context, self.condition)
+
+    def generate(self, generator, lines, level):
+        lines.append(f'{indent(level)}append(render_string(context, {self.condition!r}))')
+
+    def references(self) -> set:
+        return tokens(self.condition)
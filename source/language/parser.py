@@ -1,9 +1,14 @@
-import re
+import operator
+
+from collections import OrderedDict
 
 from common.keys import *
 from common.logging import *
+from common.signals import Signals, Names
 
 from language.parser_tokens import *
+from language.nodes import ARGUMENT_PREFIX, argument_regex, argument_index, ltrim
+from language.compiler import compile_template
 
 from lark import Lark, Transformer, v_args
 
@@ -47,484 +52,375 @@ lark_grammar= r"""
     %ignore NEWLINE
 """
 
-@v_args(inline=True)    # Affects the signatures of the methods
-class Evaluator(Transformer):
-    from operator import add, sub, mul, truediv as div, neg
+# Single LALR parser shared by all the DTIG parsers
+# The grammar analysis is cached to disk by lark, so only the first run pays for it
+GRAMMAR_CACHE = True
+lark_parser = Lark(lark_grammar, parser='lalr', cache=GRAMMAR_CACHE)
+
+# Maximum number of rendered blocks kept by each parser
+EXPANSION_CACHE_SIZE = 4096
+
+# Variables that read a field of the current item
+item_keys = {
+    TOKEN_ITEM_ID: KEY_ID,
+    TOKEN_ITEM_NAME: KEY_NAME,
+    TOKEN_ITEM_TYPE: KEY_TYPE,
+    TOKEN_ITEM_UNIT: KEY_UNIT,
+    TOKEN_ITEM_NAMESPACE: KEY_NAMESPACE,
+    TOKEN_ITEM_MODIFIER: KEY_MODIFIER,
+    TOKEN_ITEM_DESCRIPTION: KEY_DESCRIPTION,
+    TOKEN_ITEM_DEFAULT: KEY_DEFAULT
+}
+
+# Conditions are compiled once into closures that take the context they are evaluated in
+compiled_conditions = dict()
+
+def compile_condition(contents : str):
+    if contents not in compiled_conditions:
+        LOG_TRACE('Compiling condition: %s', contents)
+        compiled_conditions[contents] = ConditionCompiler().transform(lark_parser.parse(contents))
+
+    return compiled_conditions[contents]
+
+def in_test(left, right):
+    return (right) and (left in right)
+
+def not_in_test(left, right):
+    return (not right) or (left not in right)
+
+comparison_operators = {
+    "<": operator.lt,
+    ">": operator.gt,
+    "==": operator.eq,
+    ">=": operator.ge,
+    "<=": operator.le,
+    "!=": operator.ne,
+    "IN": in_test,
+    "NOT IN": not_in_test,
+    "IS": operator.is_,
+    "IS NOT": operator.is_not
+}
+
+arithmetic_operators = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "%": operator.mod
+}
 
+@v_args(inline=True)    # Affects the signatures of the methods
+class ConditionCompiler(Transformer):
     def program(self, tree):
         return tree
 
     def or_test(self, left, right):
-        LOG_TRACE(f'{left} or {right}')
-        return left or right
+        return lambda context: left(context) or right(context)
 
     def and_test(self, left, right):
-        LOG_TRACE(f'{left} and {right}')
-        return left and right
+        return lambda context: left(context) and right(context)
 
     def not_test(self, left):
-        LOG_TRACE(f'not {left}')
-        return not left
+        return lambda context: not left(context)
 
     def has_test(self, left):
-        LOG_TRACE(f'has {left}')
-        return left is not None
+        return lambda context: left(context) is not None
 
     def comparison(self, left, op, right):
-        LOG_TRACE(f'{left} {op} {right}')
-        if op == "<":
-            return left < right
-        elif op == ">":
-            return left > right
-        elif op == "==":
-            return left == right
-        elif op == ">=":
-            return left >= right
-        elif op == "<=":
-            return left <= right
-        elif op == "!=":
-            return left != right
-        elif op == "IN":
-            return (right) and (left in right)
-        elif op == "NOT IN":
-            return (not right) or (left not in right)
-        elif op == "IS":
-            return left is right
-        elif op == "IS NOT":
-            return left is not right
-        else:
+        if op not in comparison_operators:
             raise Exception(f"Unknown operator: {op}")
 
+        function = comparison_operators[op]
+        return lambda context: function(left(context), right(context))
+
     def arith_expr(self, left, op, right):
-        LOG_TRACE(f'{left} {op} {right}')
-        if op == "+":
-            return left + right
-        elif op == "-":
-            return left - right
-        elif op == "*":
-            return left * right
-        elif op == "/":
-            return left / right
-        elif op == "%":
-            return left % right
-        else:
+        if op not in arithmetic_operators:
             raise Exception(f"Unknown arithmetic operator: {op}")
 
+        function = arithmetic_operators[op]
+        return lambda context: function(left(context), right(context))
+
     def arguments(self, first, *rest):
-        LOG_TRACE(f'argument: {first} {rest}')
         return first
 
     def function_call(self, name, args):
-        LOG_TRACE(f'function_call: {name}({args})')
-        if name == TOKEN_TO_PROTO_MESSAGE:
-            return self.to_proto_message(args)
-        elif name == TOKEN_TO_TYPE:
-            return self.type_to_function(args)
-        elif name == TOKEN_STR:
-            return self.to_string(args)
-        else:
-            raise Exception(f"Unknown function {name}")
+        def call(context):
+            function_name = name(context)
+            value = args(context) if args else None
+
+            parser = context.parser
+            if function_name == TOKEN_TO_PROTO_MESSAGE:
+                return parser.to_proto_message(value)
+            elif function_name == TOKEN_TO_TYPE:
+                return parser.type_to_function(value)
+            elif function_name == TOKEN_STR:
+                return parser.to_string(value)
+            else:
+                raise Exception(f"Unknown function {function_name}")
+
+        return call
 
     def var(self, name):
-        LOG_TRACE(f'var: {name}')
-        return self.get_variable(name)
+        index = argument_index(name)
+        if index is not None:
+            return lambda context: context.evaluate_argument(index)
+
+        return lambda context: context.get_variable(name)
 
     def NUMBER(self, n):
-        LOG_TRACE(f'num: {n}')
         try:
-            return int(n)
+            value = int(n)
         except:
             raise Exception(f'Only integers are supported: {n}')
 
+        return lambda context: value
+
     def NAME(self, n):
-        LOG_TRACE(f'name: {n}')
         return f'{n}'
 
     def comp_op(self, *op):
-        LOG_TRACE(f'comp_op {" ".join(op)}')
         return " ".join(op)
 
-class Parser(Evaluator):
-    def __init__(self, config):
-        self.cfg = config
-        self.item = None
-        self.item_index = 0
-        self.is_copy = False
-
-        self.index = 0
-        self.contents = None
-        self.else_flag = False
-
-        self.to_string = None
-        self.to_proto_message = None
-        self.type_to_function = None
-
-        self.functions = dict()
-
-        self.lark = Lark(lark_grammar, parser='lalr', transformer=self)
-
-    def _copy(self):
-        parser = Parser(self.cfg)
-        parser.is_copy = True
-        parser.item = self.item
-        parser.item_index = self.item_index
-
-        parser.functions = self.functions
-
-        parser.to_string = self.to_string
-        parser.to_proto_message = self.to_proto_message
-        parser.type_to_function = self.type_to_function
-
-        return parser
-
-    def parse(self, text):
-        # Reset all values before parsing
-        if not self.is_copy:
-            self.item = None
-            self.item_index = 0
-
-        self.index = 0
-        self.contents = text
-        self.else_flag = False
-        self.else_if_flag = False
-
-        # Start from self.index 0 with no brackets
-        return self.parse_ast(text)
-
-    def parse_ast(self, contents):
-        body = ""
-        iter_body = contents
-        while True:
-            call_match = re.search(fr'{TOKEN_PREFIX}_[A-Z_]+', iter_body)
-            if not call_match:
-                body += iter_body
-                break
-
-            call = iter_body[call_match.start():call_match.end()]
-            LOG_TRACE(f'Found: {call}')
-            if call == TOKEN_IF:
-                body += self.ltrim(iter_body[:call_match.start()])
-
-                iter_body = iter_body[call_match.end():]
-                self.index += call_match.end()
-
-                c_and_b = []
-                condition, iter_body, end = self.get_arguments(iter_body, TOKEN_IF)
-                self.index += end
-
-                # Here, we have the entire if body, from start to end
-                try:
-                    end, if_body, end_mode = self.get_end(iter_body, fr'\b({TOKEN_IF})\b', fr'\b({TOKEN_ELSE}|{TOKEN_ELSE_IF}|{TOKEN_END_IF})\b', TOKEN_END_IF)
-                except Exception as e:
-                    raise Exception(f"End of {TOKEN_IF} not found: {TOKEN_IF}({condition})")
-
-                self.index += end
-                iter_body = self.contents[self.index:]
-
-                c_and_b.append((condition, if_body))
-
-                while end_mode == TOKEN_ELSE_IF:
-                    else_condition, iter_body, end = self.get_arguments(iter_body, TOKEN_ELSE_IF)
-                    self.index += end
-
-                    try:
-                        end, else_if_body, end_mode = self.get_end(iter_body, fr'\b({TOKEN_IF})\b', fr'\b({TOKEN_ELSE}|{TOKEN_ELSE_IF}|{TOKEN_END_IF})\b', TOKEN_END_IF)
-                    except Exception as e:
-                        raise Exception(f"End of {TOKEN_ELSE_IF} not found: {TOKEN_IF}({condition}) ... {TOKEN_ELSE_IF}({else_condition})")
-
-                    self.index += end
-                    iter_body = self.contents[self.index:]
-
-                    c_and_b.append((else_condition, else_if_body))
-
-                if end_mode == TOKEN_ELSE:
-                    try:
-                         end, else_body, end_mode = self.get_end(iter_body, fr'\b({TOKEN_IF})\b', fr'\b({TOKEN_END_IF})\b', TOKEN_END_IF)
-                    except Exception as e:
-                        raise Exception(f"End of {TOKEN_ELSE} not found: {TOKEN_IF}({condition})...{TOKEN_ELSE}")
-
-                    self.index += end
-                    iter_body = self.contents[self.index:]
-
-                    c_and_b.append(("True", else_body))
-
-                for item in c_and_b:
-                    if self.conditional(item[0]):
-                        body += self._copy().parse(item[1])
-                        break
-
-            elif call == TOKEN_ELSE_IF:
-                raise Exception(f"{TOKEN_ELSE_IF} should never be found, maybe a missing {TOKEN_ELSE_IF}")
-
-            elif call == TOKEN_ELSE:
-                raise Exception(f"{TOKEN_ELSE} should never be found, maybe a missing {TOKEN_ELSE}")
-
-            elif call == TOKEN_END_IF:
-                raise Exception(f"{TOKEN_END_IF} should never be found, maybe a missing {TOKEN_END_IF}")
-
-            elif call == TOKEN_FOR:
-                body += self.ltrim(iter_body[:call_match.start()])
-                iter_body = iter_body[call_match.end():]
-                self.index += call_match.end()
-
-                condition, iter_body, end = self.get_arguments(iter_body, TOKEN_ELSE_IF)
-                self.index += end
-
-                try:
-                    end, for_body, end_mode = self.get_end(iter_body, fr"\b({TOKEN_FOR})\b", fr"\b({TOKEN_END_FOR})\b", TOKEN_END_FOR)
-                except Exception as e:
-                        raise Exception(f"End of {TOKEN_FOR} not found: {TOKEN_FOR}({condition})...{TOKEN_END_FOR}")
-
-                loop_condition = self.conditional(condition)
-                if loop_condition:
-                    for i, cfg in enumerate(loop_condition):
-                        self.item = cfg
-                        self.item_index = i
-
-                        # Here, we have the entire if body, from start to end
-                        body += self._copy().parse(for_body)
+# Per evaluation state, each nested block (branch, loop iteration, macro) is rendered with its own copy
+class Context():
+    __slots__ = ("parser", "item", "item_index", "arguments")
 
-                self.index += end
-                iter_body = self.contents[self.index:]
+    def __init__(self, parser, item=None, item_index=0, arguments=()):
+        self.parser = parser
+        self.item = item
+        self.item_index = item_index
+        self.arguments = arguments
 
-            elif call == TOKEN_END_FOR:
-                raise Exception(f"{TOKEN_END_FOR} should never be found, maybe a missing {TOKEN_END_FOR}")
+    def copy(self):
+        return Context(self.parser, self.item, self.item_index, self.arguments)
 
-            elif call == TOKEN_TO_PROTO_MESSAGE:
-                to_replace = iter_body[:call_match.start()]
+    def render(self, block):
+        return block.render(self)
 
-                iter_body = iter_body[call_match.end():]
-                self.index += call_match.end()
-
-                cond_match = re.search(fr'\(.*?\)', iter_body)
-                if not cond_match:
-                    raise Exception(f'{TOKEN_TO_PROTO_MESSAGE} with no arguments')
-
-                condition = iter_body[cond_match.start() + 1:cond_match.end() - 1]
-
-                iter_body = iter_body[cond_match.end():]
-                self.index += cond_match.end()
-
-                body += f'{to_replace}{self.to_proto_message(self.get_variable(condition))}'
-
-            elif call == TOKEN_TO_TYPE:
-                to_replace = iter_body[:call_match.start()]
-
-                iter_body = iter_body[call_match.end():]
-                self.index += call_match.end()
-
-                cond_match = re.search(fr'\(.*?\)', iter_body)
-                if not cond_match:
-                    raise Exception(f'{TOKEN_TO_TYPE} with no arguments')
-
-                condition = iter_body[cond_match.start() + 1:cond_match.end() - 1]
-
-                iter_body = iter_body[cond_match.end():]
-                self.index += cond_match.end()
-
-                var = self.get_variable(condition)
-                func = self.type_to_function(var)
-                body += f'{to_replace}{func}'
-
-            elif call == TOKEN_STR:
-                to_replace = iter_body[:call_match.start()]
+    def expand(self, function, reads, dynamic):
+        # Blocks are only rendered again if something they read changed
+        parser = self.parser
+        values = tuple([parser.get_variable(var, self.item, self.item_index) for var in reads])
+        if dynamic:
+            key = (function, parser.functions_version, self.arguments, values)
+        else:
+            key = (function, values)
 
-                iter_body = iter_body[call_match.end():]
-                self.index += call_match.end()
+        try:
+            return parser.expansions[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # Items with unhashable values are not cached
+            return function(self.copy())
+
+        contents = function(self.copy())
+        parser.expansions[key] = contents
+        return contents
 
-                condition, iter_body, end = self.get_arguments(iter_body, TOKEN_STR)
-                self.index += end
+    def call(self, name, arguments):
+        parser = self.parser
+        if name not in parser.functions:
+            raise Exception(f'Unknown function {name}')
 
-                if self.to_string:
-                    body += f'{to_replace}{self.to_string(self.conditional(condition))}'
-                else:
-                    body += f'{to_replace}{self.conditional(condition)}'
+        # Arguments are bound to the parameters of the macro, missing ones are left as they are written
+        parameters = parser.functions[name]["parameters"]
+        values = [self.substitute(argument) for argument in arguments[:len(parameters)]]
+        values += [f'{TOKEN_PREFIX}>{parameter}' for parameter in parameters[len(values):]]
 
-            elif call == TOKEN_DEF:
-                body += self.ltrim(iter_body[:call_match.start()])
-                iter_body = iter_body[call_match.end():]
-                self.index += call_match.end()
+        return Context(parser, self.item, self.item_index, tuple(values)).render(parser.compile_macro(name))
 
-                name_match = re.search(fr'({TOKEN_PREFIX}_[A-Z_]+)', iter_body)
-                function_name = iter_body[name_match.start():name_match.end()]
-                iter_body = iter_body[name_match.end():]
-                self.index += name_match.end()
+    def substitute(self, contents):
+        index = argument_index(contents)
+        if index is not None:
+            return self.arguments[index]
+        elif ARGUMENT_PREFIX in contents:
+            return argument_regex.sub(lambda match: self.arguments[int(match.group(1))], contents)
 
-                function_args, iter_body, end = self.get_arguments(iter_body, TOKEN_DEF)
-                self.index += end
+        return contents
 
-                end, function_body, end_mode = self.get_end(iter_body, fr"\b({TOKEN_DEF})\b", fr"\b({TOKEN_END_DEF})\b", TOKEN_END_DEF)
-                self.functions[function_name] = {
-                    "body": function_body,
-                    "args": function_args
-                }
+    def render_argument(self, index):
+        argument = self.arguments[index]
+        if f'{TOKEN_PREFIX}_' not in argument:
+            return ltrim(argument)
 
-                self.index += end
-                iter_body = iter_body[end:]
+        return self.copy().render(self.parser.compile(argument))
 
-            elif call == TOKEN_END_DEF:
-                raise Exception(f"{TOKEN_END_DEF} should never be found, maybe a missing {TOKEN_END_DEF}")
+    def evaluate_argument(self, index):
+        return self.conditional(self.arguments[index])
 
-            elif call in self.functions:
-                body += self.ltrim(iter_body[:call_match.start()])
-                iter_body = iter_body[call_match.end():]
-                self.index += call_match.end()
+    def conditional(self, contents):
+        return compile_condition(contents)(self)
 
-                # Get the function call
-                function_call = self.functions[call]
+    def resolve(self, var):
+        # Variable that may be a parameter of the macro being rendered
+        if ARGUMENT_PREFIX in var:
+            return self.get_variable(self.substitute(var))
 
-                # Replace all the arguments in the body by the found argument
-                args_body, iter_body, end = self.get_arguments(iter_body, call)
-                self.index += end
+        return self.get_variable(var)
 
-                args_values = [arg.strip() for arg in args_body.split(",")]
-                args_names = [arg.strip() for arg in function_call["args"].split(",")]
+    def get_variable(self, var):
+        return self.parser.get_variable(var, self.item, self.item_index)
 
-                function_body = function_call["body"]
-                for arg_value, arg_name in zip(args_values, args_names):
-                    function_body = re.sub(fr'{TOKEN_PREFIX}>{arg_name}', arg_value, function_body)
+# Least recently used cache of rendered blocks
+class ExpansionCache():
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
 
-                # Update iter body
-                body += self._copy().parse(function_body)
+    def __getitem__(self, key):
+        contents = self.entries[key]
+        self.entries.move_to_end(key)
+        return contents
 
-            else:
-                var = self.get_variable(call)
-                body += f'{iter_body[:call_match.start()]}{var}'
-                iter_body = iter_body[call_match.end():]
-                self.index += call_match.end()
-
-        return self.ltrim(body)
-
-    def ltrim(self, contents):
-        index = 1
-        for c in contents[::-1]:
-            if c == "\n":
-                return contents[:-index]
-            elif c == " " or c == "\t":
-                index += 1
-            else:
-                return contents
+    def __setitem__(self, key, contents):
+        self.entries[key] = contents
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
 
-        return contents
+    def __len__(self):
+        return len(self.entries)
 
-    def get_arguments(self, contents, token):
-        start = re.search(fr'\(', contents)
-        index, body, end_mode = self.get_end(contents[start.end():], fr'\(', fr'\)', ")")
+class Parser():
+    def __init__(self, config):
+        self.cfg = config
 
-        # Condition, body of condition and new index
-        return body, contents[start.end() + index:], index + start.end()
+        self.to_string = None
+        self.to_proto_message = None
+        self.type_to_function = None
 
-    def get_end(self, contents, start_regex, end_regex, end_marker):
-        index = 0
-        iter_body = contents
-        level = 0
-        while iter_body:
-            a = re.search(start_regex, iter_body)
-            b = re.search(end_regex, iter_body)
+        self.functions = dict()
+        self.functions_version = 0
 
-            if not b:
-                break
+        # Templates compiled with the macros known at that point
+        self.compiled = dict()
+        self.compiled_macros = dict()
 
-            # If nesting, continue
-            if a and a.start() < b.start():
-                level += 1
-                index += a.end()
-                iter_body = iter_body[a.end():]
-                continue
+        # The expansions depend on the configuration, so they are not shared between parsers
+        self.expansions = ExpansionCache(EXPANSION_CACHE_SIZE)
 
-            end_mode = iter_body[b.start():b.end()]
-            if level == 0:
-                return index + b.end(), contents[0:index + b.start()], end_mode
+        # Every variable resolves to a function of the current item and index
+        self.resolvers = dict()
+        self.add_resolvers()
 
-            if end_mode == end_marker:
-                level -= 1
+    def compile(self, text):
+        key = (text, self.functions_version)
+        if key not in self.compiled:
+            self.compiled[key] = compile_template(text, self.functions)
 
-            index += b.end()
-            iter_body = iter_body[b.end():]
+        return self.compiled[key]
 
-        raise Exception(f"Could not find: {end_marker}")
+    def compile_macro(self, name):
+        key = (name, self.functions_version)
+        if key not in self.compiled_macros:
+            function = self.functions[name]
+            self.compiled_macros[key] = compile_template(function["body"], self.functions, function["parameters"])
 
-    def conditional(self, contents):
-        return self.lark.parse(contents)
+        return self.compiled_macros[key]
 
-    def get_variable(self, var):
+    def parse(self, text):
+        # The template is only compiled once, then rendered with a fresh context
+        return Context(self).render(self.compile(text))
+
+    def define(self, name, args, body):
+        function = self.functions.get(name)
+        if function and function["body"] == body and function["args"] == args:
+            return
+
+        self.functions[name] = {
+            "body": body,
+            "args": args,
+            "parameters": [arg.strip() for arg in args.split(",")]
+        }
+        self.functions_version += 1
+
+    def get_variable(self, var, item=None, item_index=0):
+        resolver = self.resolvers.get(var)
+        if resolver is None:
+            resolver = self.add_resolver(var)
+
+        return resolver(item, item_index)
+
+    def add_resolvers(self):
+        for var in [TOKEN_INDEX] + list(item_keys.keys()):
+            self.add_resolver(var)
+
+        for list_name in [KEY_INPUTS, KEY_OUTPUTS, KEY_PARAMETERS]:
+            var = f'{TOKEN_PREFIX}_{list_name.upper()}'
+            for suffix in ["", "_NAMES", "_LENGTH"]:
+                self.add_resolver(f'{var}{suffix}')
+
+        # Types, formalisms, runtimes, pacings and configuration keys
+        for name in list(globals().keys()):
+            if name.startswith(("TYPE_", "FORMALISM_", "RUNTIME_", "PACING_")):
+                self.add_resolver(f'{TOKEN_PREFIX}_{name}')
+            elif name.startswith("KEY_"):
+                self.add_resolver(name.replace("KEY_", f"{TOKEN_PREFIX}_", 1))
+
+    def add_resolver(self, var):
+        # Unknown variables are resolved the first time they are found
+        resolver = self.make_resolver(var)
+        self.resolvers[var] = resolver
+        return resolver
+
+    def make_resolver(self, var):
         if var == TOKEN_INDEX:
-            return self.item_index
+            return lambda item, item_index: item_index
         # Item ============================
-        elif var == TOKEN_ITEM_ID:
-            if self.item and KEY_ID in self.item:
-                return self.item[KEY_ID]
-            return None
-        elif var == TOKEN_ITEM_NAME:
-            if self.item and KEY_NAME in self.item:
-                return self.item[KEY_NAME]
-            return None
-        elif var == TOKEN_ITEM_TYPE:
-            if self.item and KEY_TYPE in self.item:
-                return self.item[KEY_TYPE]
-            return None
-        elif var == TOKEN_ITEM_UNIT:
-            if self.item and KEY_UNIT in self.item:
-                return self.item[KEY_UNIT]
-            return None
-        elif var == TOKEN_ITEM_NAMESPACE:
-            if self.item and KEY_NAMESPACE in self.item:
-                return self.item[KEY_NAMESPACE]
-            return None
-        elif var == TOKEN_ITEM_MODIFIER:
-            if self.item and KEY_MODIFIER in self.item:
-                return self.item[KEY_MODIFIER]
-            return None
-        elif var == TOKEN_ITEM_DESCRIPTION:
-            if self.item and KEY_DESCRIPTION in self.item:
-                return self.item[KEY_DESCRIPTION]
-            return None
-        elif var == TOKEN_ITEM_DEFAULT:
-            if self.item and KEY_DEFAULT in self.item:
-                return self.item[KEY_DEFAULT]
-            return None
+        elif var in item_keys:
+            key = item_keys[var]
+            return lambda item, item_index: item[key] if item and key in item else None
         # Inputs ==========================
         elif "INPUTS" in var:
-            return self.get_from_list(var, KEY_INPUTS)
+            return self.make_list_resolver(var, KEY_INPUTS)
         # Outputs =========================
         elif "OUTPUTS" in var:
-            return self.get_from_list(var, KEY_OUTPUTS)
+            return self.make_list_resolver(var, KEY_OUTPUTS)
         # Parameters ======================
         elif "PARAMETERS" in var:
-            return self.get_from_list(var, KEY_PARAMETERS)
+            return self.make_list_resolver(var, KEY_PARAMETERS)
         # Model name ======================
         elif f"{TOKEN_PREFIX}_TYPE_" in var:
-            return self.find_globals(var[5:])
+            return self.make_globals_resolver(var[5:])
         elif f"{TOKEN_PREFIX}_FORMALISM_" in var:
-            return self.find_globals(var[5:])
+            return self.make_globals_resolver(var[5:])
+        elif f"{TOKEN_PREFIX}_RUNTIME_" in var:
+            return self.make_globals_resolver(var[5:])
+        elif f"{TOKEN_PREFIX}_PACING_" in var:
+            return self.make_globals_resolver(var[5:])
         else:
-            return self.find_globals(var)
-
-    def get_from_list(self, var, list_name):
-        if "NAMES" in var:
-            if not self.cfg.has(list_name):
-                return None
+            return self.make_globals_resolver(var)
 
-            return [d[KEY_NAME] for d in self.cfg[list_name] if KEY_NAME in self.cfg[list_name]]
-
-        else:
-            if not self.cfg.has(list_name):
-                return None
+    def make_list_resolver(self, var, list_name):
+        if "LENGTH" in var:
+            return lambda item, item_index: len(self.get_from_list(var, list_name) or [])
 
-            return self.cfg[list_name]
+        return lambda item, item_index: self.get_from_list(var, list_name)
 
-    def find_globals(self, call):
+    def make_globals_resolver(self, call):
         # See if we are dealing with a KEY or TYPE
         if call in globals():
-            return globals()[call]
+            value = globals()[call]
+            return lambda item, item_index: value
         elif call.replace(f"{TOKEN_PREFIX}_", "KEY_") in globals():
             key = globals()[call.replace(f"{TOKEN_PREFIX}_", "KEY_")]
-            if not self.cfg.has(key):
-                return None
-
-            return self.cfg[key]
+            return lambda item, item_index: self.cfg[key] if self.cfg.has(key) else None
         else:
-            return call
+            return lambda item, item_index: call
+
+    def get_from_list(self, var, list_name):
+        if not self.cfg.has(list_name):
+            return None
+
+        # The configuration keeps the signals indexed, the names are a set backed tuple
+        signals = self.cfg[list_name]
+        if "NAMES" in var:
+            if isinstance(signals, Signals):
+                return signals.names
+
+            return Names([d[KEY_NAME] for d in signals if KEY_NAME in d])
+
+        return signals
 
     def key_to_regex(self, call):
         if call == "KEY_ID":
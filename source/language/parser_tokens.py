@@ -21,4 +21,7 @@ TOKEN_ITEM_UNIT         = f'{TOKEN_PREFIX}_ITEM_UNIT'
 TOKEN_ITEM_NAMESPACE    = f'{TOKEN_PREFIX}_ITEM_NAMESPACE'
 TOKEN_ITEM_MODIFIER     = f'{TOKEN_PREFIX}_ITEM_MODIFIER'
 TOKEN_ITEM_DESCRIPTION  = f'{TOKEN_PREFIX}_ITEM_DESCRIPTION'
-TOKEN_ITEM_DEFAULT      = f'{TOKEN_PREFIX}_ITEM_DEFAULT'
\ No newline at end of file
+TOKEN_ITEM_DEFAULT      = f'{TOKEN_PREFIX}_ITEM_DEFAULT'
+
+# Version of the language, compiled templates are invalidated when it changes
+DTIG_VERSION            = "1.0"
@@ -0,0 +1,40 @@
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+
+from common.logging import *
+
+# Configurations in a directory (all json files) or in a manifest (one file per line, relative to the manifest)
+def find_configs(path : str) -> list:
+    if os.path.isdir(path):
+        return sorted([os.path.join(path, f) for f in os.listdir(path) if f.endswith(".json")])
+
+    configs = []
+    manifest_dir = os.path.dirname(os.path.abspath(path))
+    with open(path, "r") as manifest:
+        for line in manifest:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            configs.append(line if os.path.isabs(line) else os.path.join(manifest_dir, line))
+
+    return configs
+
+# Name of the output directory of a configuration in a batch
+def config_name(config_file : str) -> str:
+    return os.path.splitext(os.path.basename(config_file))[0]
+
+def duplicated_names(configs : list) -> list:
+    names = [config_name(config) for config in configs]
+    return sorted(set([name for name in names if names.count(name) > 1]))
+
+# Generate all the configurations in this process, so templates, grammar and protos are shared
+# With more than one job, the configurations are split over a pool of processes, each with its own caches
+def run(configs : list, function, jobs : int = 1, initializer = None, initargs = ()) -> dict:
+    LOG_INFO(f'Generating {len(configs)} configurations with {jobs} job(s)')
+    if jobs <= 1 or len(configs) <= 1:
+        return {config: function(config) for config in configs}
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initializer, initargs=initargs) as executor:
+        return dict(zip(configs, executor.map(function, configs)))
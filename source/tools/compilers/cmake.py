@@ -3,6 +3,7 @@ import os
 from tools.file_system import *
 from common.result import VoidResult
 from common.logging import LOG_DEBUG
+from common import profiler
 from base.compiler_base import CompilerBase
 
 class CMakeCompiler(CompilerBase):
@@ -10,6 +11,7 @@ class CMakeCompiler(CompilerBase):
         super().__init__(os.path.dirname(output_file) + "/CMakeLists.txt")
         self.set_compiler("cmake")
 
+    @profiler.profiled("cmake compile")
     def compile(self, options = []) -> VoidResult:
         base_dir = os.path.dirname(self.output_file)
         build_dir = base_dir + "/build"
@@ -4,6 +4,7 @@ import sys
 from tools.file_system import *
 from common.result import VoidResult
 from common.logging import LOG_DEBUG
+from common import profiler
 from base.compiler_base import CompilerBase
 
 class JavaCompiler(CompilerBase):
@@ -11,6 +12,7 @@ class JavaCompiler(CompilerBase):
         super().__init__(output_file)
         self.set_compiler("javac")
 
+    @profiler.profiled("javac compile")
     def compile(self, options = []) -> VoidResult:
         if not len(self.sources):
             return VoidResult.failed("No sources provided")
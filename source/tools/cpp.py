@@ -7,35 +7,48 @@ from common.default_structure import create_default_structure
 DEFAULT_INDENTATION = "  "
 
 def read_file(file : str) -> str:
-    data = ""
-    with open(file, "r") as file:
-        for line in file.readlines():
-            # Ignore comments
-            l_line = len(line.lstrip())
-            first_character = len(line) - l_line
+    with open(file, "r") as f:
+        # Use spaces instead of tabs
+        return f.read().replace("\t", DEFAULT_INDENTATION)
 
-            # Use spaces instead of tabs
-            data += line.replace("\t", DEFAULT_INDENTATION)
-    return data
+# Indents the code based on the braces, line by line
+# It can be fed the code in chunks, incomplete lines are kept until the rest arrives
+class Indentation():
+  def __init__(self):
+    self.indentation = ""
+    self.pending = ""
 
-def set_indentation(data : str) -> str:
-  new_data = ""
-  indentation = ""
+  def __call__(self, data : str) -> str:
+    lines = (self.pending + data).splitlines(keepends=True)
+
+    self.pending = ""
+    if lines and (lines[-1].endswith("\r") or lines[-1].splitlines()[0] == lines[-1]):
+      self.pending = lines.pop()
+
+    return "".join([self.indent(line) for line in lines])
 
-  data_with_breaks = data.splitlines(keepends=True)
-  for line in data_with_breaks:
+  def flush(self) -> str:
+    line = self.pending
+    self.pending = ""
+    return self.indent(line) if line else ""
+
+  def indent(self, line : str) -> str:
     if "}" in line and not "{" in line:
-        indentation = indentation[:-2]
+        self.indentation = self.indentation[:-2]
 
     if "public:" in line or "private:" in line:
-        new_data += line
+        new_line = line
     else:
-        new_data += indentation + line
+        new_line = self.indentation + line
 
     if "{" in line and not "}" in line:
-        indentation += DEFAULT_INDENTATION
+        self.indentation += DEFAULT_INDENTATION
+
+    return new_line
 
-  return new_data
+def set_indentation(data : str) -> str:
+  indentation = Indentation()
+  return indentation(data) + indentation.flush()
 
 def to_type(variable_type):
     if variable_type == TYPE_FLOAT_32:
@@ -3,34 +3,19 @@ import subprocess
 
 from common.keys import *
 from common.result import VoidResult
+from common.emitter import indent
 from common.default_structure import create_default_structure
 
 DEFAULT_INDENTATION = "  "
 
 def set_indentation(data : str, level : int = 1) -> str:
-  indentation = str()
-  for i in range(level):
-    indentation += DEFAULT_INDENTATION
-
-  new_data = str()
-  data_with_breaks = data.splitlines(keepends=True)
-  for line in data_with_breaks:
-    new_data += indentation + line
-
-  return new_data
+  return indent(data, DEFAULT_INDENTATION * level)
 
 # TODO: This is not robust at all :p
 def read_file(file : str) -> str:
-    data = ""
-    with open(file, "r") as file:
-        for line in file.readlines():
-            # Ignore comments
-            l_line = len(line.lstrip())
-            first_character = len(line) - l_line
-
-            # Use spaces instead of tabs
-            data += line.replace("\t", DEFAULT_INDENTATION)
-    return data
+    with open(file, "r") as f:
+        # Use spaces instead of tabs
+        return f.read().replace("\t", DEFAULT_INDENTATION)
 
 def to_type(variable_type):
     if variable_type == TYPE_FLOAT_32:
@@ -1,12 +1,17 @@
 import os
+import sys
+import glob
+import shutil
 import subprocess
 
 from tools.git import Git
 from common.logging import *
+from common import profiler
 from tools.file_system import *
 from common.result import VoidResult
 
-ENV_DIR = os.environ['VIRTUAL_ENV'] + "/"
+# Outside of a virtual environment, use the installation of the interpreter
+ENV_DIR = os.environ.get('VIRTUAL_ENV', sys.prefix) + "/"
 ROOT_DIR = ENV_DIR + "../"
 BIN_DIR = ENV_DIR + "bin/"
 INCLUDE_DIR = ENV_DIR + "include/"
@@ -18,8 +23,12 @@ PROTOBUF_DIR = ROOT_DIR + "protobuf/"
 PROTOBUF_DTIG_DIR = PROTOBUF_DIR + "dtig"
 LD_LIBRARY_PATH="LD_LIBRARY_PATH"
 
+def proto_files() -> list:
+    return sorted(glob.glob(f'{PROTOBUF_DTIG_DIR}/*.proto'))
+
 # Generic commands for all generators
 def protobuf_generator(func):
+    @profiler.profiled(f'protoc {func.__name__}')
     def wrapper_func(*args, **kwargs):
         LOG_TRACE(f'Generating protos at {args[0]}')
 
@@ -32,12 +41,43 @@ def protobuf_generator(func):
 
     return wrapper_func
 
+# Protos only have to be generated once per process and language
+# Other output directories get a copy of the first generated sources
+generated_protos = dict()
+
+def shared_protos(language : str):
+    def decorator(func):
+        def wrapper_func(out_dir : str):
+            source_dir = generated_protos.get(language)
+            if source_dir == out_dir:
+                return VoidResult()
+
+            if source_dir:
+                LOG_DEBUG(f'Copying {language} protos from {source_dir} to {out_dir}')
+                try:
+                    shutil.copytree(f'{source_dir}/dtig', f'{out_dir}/dtig', dirs_exist_ok=True)
+                    return VoidResult()
+                except Exception as e:
+                    return VoidResult.failed(f'Failed to copy protos: {e}')
+
+            generated = func(out_dir)
+            if generated:
+                generated_protos[language] = out_dir
+
+            return generated
+
+        return wrapper_func
+
+    return decorator
+
+@shared_protos("python")
 @protobuf_generator
 def generate_python(out_dir : str):
     command = f'{PROTOC} -I={PROTOBUF_DIR} --python_out={out_dir} {PROTOBUF_DTIG_DIR}/*.proto'
     LOG_DEBUG(f'Generating protos: {command}')
     return run_command(command)
 
+@shared_protos("cpp")
 @protobuf_generator
 def generate_cpp(out_dir : str):
     command = f'{PROTOC} -I={PROTOBUF_DIR} --cpp_out={out_dir} {PROTOBUF_DTIG_DIR}/*.proto'
@@ -56,6 +96,10 @@ def generate_java(out_dir : str):
         if not downloaded:
             return downloaded
 
+    return generate_java_sources(out_dir)
+
+@shared_protos("java")
+def generate_java_sources(out_dir : str):
     command = f'{PROTOC} -I={PROTOBUF_DIR} --java_out={out_dir} {PROTOBUF_DTIG_DIR}/*.proto'
     LOG_DEBUG(f'Generating protos: {command}')
     return run_command(command)
@@ -1,45 +1,66 @@
-import os
-import subprocess
-
 from common.keys import *
-from common.result import VoidResult
+from common.logging import *
+from common import profiler
+from common.result import Result, VoidResult
+from common.emitter import indent
 from common.default_structure import create_default_structure
 
 DEFAULT_INDENTATION = "    "
 
+# Formatting can be disabled for throw-away builds, the syntax is always checked
+FORMAT_ENABLED = True
+FORMAT_OPTIONS = {"aggressive": 1, "select": ["E1", "W1"]}
+
+# Formats the generated code in memory, before it is written
+@profiler.profiled("format")
+def format_code(contents : str, filename : str = "<generated>") -> Result:
+    if FORMAT_ENABLED:
+        try:
+            import autopep8
+            contents = autopep8.fix_code(contents, options=FORMAT_OPTIONS)
+        except ImportError:
+            disable_formatting("autopep8 is not installed, generated code is not formatted")
+        except Exception as e:
+            return Result.failed(f'Failed to format generated file: {e}')
+
+    try:
+        compile(contents, filename, "exec")
+    except SyntaxError as e:
+        # The formatting fixes the indentation of the templates, without it this is only a warning
+        message = f'Generated file is not valid python: {filename}:{e.lineno}: {e.msg}'
+        if not FORMAT_ENABLED:
+            LOG_WARNING(message)
+            return Result(contents)
+
+        return Result.failed(message)
+
+    return Result(contents)
+
+def disable_formatting(reason : str):
+    global FORMAT_ENABLED
+    FORMAT_ENABLED = False
+    LOG_WARNING(reason)
+
 def format(filename : str) -> VoidResult:
-    bin_dir = os.environ['VIRTUAL_ENV'] + "/bin/"
-    command = f"{bin_dir}autopep8 {filename} --aggressive --select=E1,W1 -i"
+    with open(filename, "r") as file:
+        formatted = format_code(file.read(), filename)
+
+    if not formatted:
+        return formatted
 
-    result = subprocess.run(command, shell=True)
-    if result.returncode != 0:
-      return VoidResult.failed(f'Failed to format generated file: {result.stderr}')
+    with open(filename, "w") as file:
+        file.write(formatted.value())
 
     return VoidResult()
 
 def set_indentation(data : str, level : int = 1) -> str:
-  indentation = ""
-  for i in range(level):
-    indentation += DEFAULT_INDENTATION
-
-  new_data = ""
-  data_with_breaks = data.splitlines(keepends=True)
-  for line in data_with_breaks:
-    new_data += indentation + line
-
-  return new_data
+  return indent(data, DEFAULT_INDENTATION * level)
 
 # TODO: This is not robust at all :p
 def read_file(file : str) -> str:
-    data = ""
-    with open(file, "r") as file:
-        for line in file.readlines():
-            # Ignore comments
-            l_line = len(line.lstrip())
-
-            # Use spaces instead of tabs
-            data += line.replace("\t", DEFAULT_INDENTATION)
-    return data
+    with open(file, "r") as f:
+        # Use spaces instead of tabs
+        return f.read().replace("\t", DEFAULT_INDENTATION)
 
 def to_type(variable_type):
     if variable_type == TYPE_FLOAT_32:
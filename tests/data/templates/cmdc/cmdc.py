@@ -0,0 +1,389 @@
+import sys
+import socket
+import argparse
+
+from common.logging import *
+
+# Import protobuf files once they were created
+from google.protobuf import message
+from google.protobuf import any_pb2
+from google.protobuf import wrappers_pb2
+
+import dtig.state_pb2 as dtig_state
+import dtig.utils_pb2 as dtig_utils
+import dtig.values_pb2 as dtig_values
+import dtig.return_code_pb2 as dtig_code
+import dtig.run_mode_pb2 as dtig_run_mode
+import dtig.dt_message_pb2 as dtig_message
+import dtig.stop_mode_pb2 as dtig_stop_mode
+import dtig.return_value_pb2 as dtig_return
+
+from dtig.framing import FramedSocket
+
+argument_parser = argparse.ArgumentParser(description='Python DTIG client')
+argument_parser.add_argument('--host', action="store", dest="hostname", help='Hostname of the server', type=str, default="127.0.0.1")
+argument_parser.add_argument('--port', action="store", dest="port", help='Port of the server', type=int, default=8080)
+argument_parser.add_argument('--model', action="store", dest="model_name", help='Model name', type=str, default=None)
+argument_parser.add_argument('--log-level', action="store", dest="log_level", help='Log level, from 0 (errors) to 4 (trace)', type=int, default=int(LogLevel.INFO))
+argument_parser.add_argument('--log-rate', action="store", dest="log_rate", help='Minimum seconds between logs of the same call site', type=float, default=0.5)
+cmd_args = argument_parser.parse_args()
+
+# Responses are logged from a background thread, so the client does not wait for the output
+start_logger(LogLevel(cmd_args.log_level), background=True, rate_limit=cmd_args.log_rate)
+
+class Client:    
+    def __init__(self, cmd_args):
+        self.running = True
+        self.model_name = cmd_args.model_name
+        self.hostname = cmd_args.hostname
+        self.port = cmd_args.port
+        
+        self.previous_message = None
+        
+        # Proto message of the values in the replies, by name, the parameters that cannot be shown have none
+        self.output_messages = {
+        }
+        self.parameter_messages = {
+            f"g": lambda: dtig_utils.MF64(),
+            f"e": lambda: dtig_utils.MF64(),
+            f"floor": lambda: dtig_utils.MF64(),
+            f"mass": lambda: dtig_utils.MF64(),
+            f"v0": lambda: dtig_utils.MF64(),
+            f"Material": None,
+            f"fixed": None,
+        }
+    
+    def dtig_run(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.connect((self.hostname, self.port))
+            self.dtig_run_client(FramedSocket(s))
+    def dtig_run_client(self, sock):
+        previous_option = "0"
+        while self.running:
+            option = self.print_menu()
+            if option == "0":
+                self.dtig_stop(sock)
+            elif option == "1":
+                self.dtig_initialize(sock)
+            elif option == "2":
+                self.dtig_start(sock)
+            elif option == "3":
+                self.dtig_advance(sock)
+            elif option == "4":
+                self.dtig_set_input(sock)
+            elif option == "5":
+                self.dtig_get_output(sock)
+            elif option == "6":
+                self.dtig_set_parameter(sock)
+            elif option == "7":
+                self.dtig_get_parameter(sock)
+            elif option == "8":
+                self.dtig_model_info(sock)
+            elif option == "9":
+                self.dtig_get_status(sock)
+            elif self.previous_message:
+                LOG_INFO(f'Using previous command')
+                self.send_message(sock, self.previous_message)
+            else:
+                LOG_ERROR(f'Unknown command: {option}')
+    
+    def send_message(self, sock, message, handler=None):
+        sock.send(message.SerializeToString())
+    
+        received_data = sock.receive()
+        if received_data is None:
+            print("Server stopped")
+            self.running = False
+            return
+    
+        self.previous_message = message
+    
+        response = dtig_return.MReturnValue()
+        response.ParseFromString(received_data)
+    
+        if response.code == dtig_code.SUCCESS:
+            if handler:
+                handler(response)
+            return
+    
+        LOG_ERROR(f'Failed with code: {response.code}')
+        if response.HasField("error_message"):
+            LOG_ERROR(f'Message: {response.error_message.value}')
+    
+    def print_menu(self):
+        print("Options:")
+        print("  0 - Stop model")
+        print("  1 - Initialize model")
+        print("  2 - Run model")
+        print("  3 - Advance model in stepped mode")
+        print("  4 - Set input")
+        print("  5 - Get output")
+        print("  6 - Set parameter")
+        print("  7 - Get Parameter")
+        print("  8 - Model info")
+        print("  9 - Model status")
+        return input("What should we do? ").strip()
+    
+    def print_info(self, info):
+        if info.HasField("name"):
+            print(f'  Name: {info.name.value}')
+        if info.HasField("id"):
+            print(f'    Id: {info.id.value}')
+        if info.HasField("description"):
+            print(f'    Description: {info.description.value}')
+        if info.HasField("type"):
+            print(f'    Type: {info.type.value}')
+        if info.HasField("unit"):
+            print(f'    Unit: {info.unit.value}')
+        if info.HasField("namespace"):
+            print(f'    Namespace: {info.namespace.value}')
+        if info.HasField("modifier"):
+            print(f'    Modifier: {info.modifier.value}')
+        if info.HasField("default"):
+            print(f'    Default: {info.default.value}')
+    
+    def dtig_stop(self, sock):
+        self.dtig_engine_stop(sock)
+        LOG_WARNING("Stopping client")
+        self.running = False
+    
+    def dtig_engine_stop(self, sock):
+        message = dtig_message.MDTMessage()
+        message.stop.mode = dtig_stop_mode.CLEAN
+        self.send_message(sock, message)
+    
+    def dtig_start(self, sock):
+        self.dtig_engine_start(sock)
+    
+    def dtig_engine_start(self, sock):
+        message = dtig_message.MDTMessage()
+        message.start.start_time.value = float(input("What start time? "))
+        message.start.stop_time.value  = float(input("What stop time? "))
+        message.start.step_size.step   = float(input("What step size? "))
+        print("Available modes:")
+        print(" 1 - Stepped")
+        print(" 2 - Continuous")
+        while True:
+            mode = int(input("What mode? ").strip())
+            if mode == 1:
+                message.start.run_mode = dtig_run_mode.STEPPED
+                break
+            elif mode == 2:
+                message.start.run_mode = dtig_run_mode.CONTINUOUS
+                break
+            else:
+                LOG_WARNING(f'Unknown mode: {mode}')
+    
+        self.send_message(sock, message)
+    
+    def dtig_set_input(self, sock):
+        self.dtig_engine_set_input(sock)
+    
+    def dtig_engine_set_input(self, sock):
+        pass
+    
+    def dtig_get_output(self, sock):
+        self.dtig_engine_get_output(sock)
+    
+    def dtig_engine_get_output(self, sock):
+        message = dtig_message.MDTMessage()
+    
+        output_name = "default"
+        while output_name:
+            output_name = input("Which output? ")
+            if not len(output_name):
+                break
+    
+            message.get_output.outputs.identifiers.append(output_name)
+    
+        def handler(response):
+            if response.HasField("values"):
+                for i in range(len(response.values.values)):
+                    param = response.values.identifiers[i]
+                    any_value = response.values.values[i]
+                    value_type = self.output_messages.get(param)
+                    if value_type is None:
+                        continue
+    
+                    value = value_type()
+                    if any_value.Unpack(value):
+                        LOG_INFO(f'{param}: {value.value}')
+    
+        self.send_message(sock, message, handler)
+    
+    def dtig_advance(self, sock):
+        self.dtig_engine_advance(sock)
+    
+    def dtig_engine_advance(self, sock):
+        message = dtig_message.MDTMessage()
+        message.advance.step_size.step = float(input("What step size? "))
+        self.send_message(sock, message)
+    
+    def dtig_initialize(self, sock):
+        self.dtig_engine_initialize(sock)
+    
+    def dtig_engine_initialize(self, sock):
+        message = dtig_message.MDTMessage()
+        model_name = input(f"What is the model name? (Current: {self.model_name})").strip()
+        if model_name:
+            self.model_name = model_name
+        elif not self.model_name:
+            LOG_ERROR("No model name provided")
+    
+        message.initialize.model_name.value = self.model_name
+        self.send_message(sock, message)
+    
+    def dtig_model_info(self, sock):
+        self.dtig_engine_model_info(sock)
+    
+    def dtig_engine_model_info(self, sock):
+        message = dtig_message.MDTMessage()
+        message.model_info.request = True
+    
+        def handler(response):
+            if response.HasField("model_info"):
+                if len(response.model_info.inputs):
+                    print(f'Input:')
+                    for info in response.model_info.inputs:
+                        self.print_info(info)
+    
+                if len(response.model_info.outputs):
+                    print(f'Output:')
+                    for info in response.model_info.outputs:
+                        self.print_info(info)
+    
+                if len(response.model_info.parameters):
+                    print(f'Parameter:')
+                    for info in response.model_info.parameters:
+                        self.print_info(info)
+    
+        self.send_message(sock, message, handler)
+    
+    def dtig_get_status(self, sock):
+        self.dtig_engine_get_status(sock)
+    
+    def dtig_engine_get_status(self, sock):
+        message = dtig_message.MDTMessage()
+        message.get_status.request = True
+    
+        def handler(response):
+            if response.HasField("status"):
+                LOG_INFO(f"Current status: {dtig_state.EState.Name(response.status.state)}")
+    
+        response = self.send_message(sock, message, handler)
+    
+    def dtig_set_parameter(self, sock):
+        self.dtig_engine_set_parameter(sock)
+    
+    def dtig_engine_set_parameter(self, sock):
+        message = dtig_message.MDTMessage()
+        print("Available parameters:")
+        print(f'  g - float64')
+        print(f'  e - float64')
+        print(f'  floor - float64')
+        print(f'  mass - float64')
+        print(f'  v0 - float64')
+        print(f'  Material - material')
+        print(f'  fixed - fixture')
+    
+        param_name = "default"
+        while param_name:
+            param_name = input("Which parameter? ")
+            if not len(param_name):
+                break
+    
+    
+            if param_name == f"g":
+                typed_value = dtig_utils.MF64()
+                param_value = float(input("Input value? ").strip())
+                typed_value.value = param_value
+    
+    
+            elif param_name == f"e":
+                typed_value = dtig_utils.MF64()
+                param_value = float(input("Input value? ").strip())
+                typed_value.value = param_value
+    
+    
+            elif param_name == f"floor":
+                typed_value = dtig_utils.MF64()
+                param_value = float(input("Input value? ").strip())
+                typed_value.value = param_value
+    
+    
+            elif param_name == f"mass":
+                typed_value = dtig_utils.MF64()
+                param_value = float(input("Input value? ").strip())
+                typed_value.value = param_value
+    
+    
+            elif param_name == f"v0":
+                typed_value = dtig_utils.MF64()
+                param_value = float(input("Input value? ").strip())
+                typed_value.value = param_value
+    
+    
+            elif param_name == f"Material":
+                typed_value = dtig_utils.MMaterial()
+                param_value = str(input("Input value? ").strip())
+                typed_value.value = param_value
+    
+    
+            elif param_name == f"fixed":
+                typed_value = dtig_utils.MConstraint()
+                param_value = float(input("Input value? ").strip())
+                typed_value.value = param_value
+    
+    
+            else:
+                LOG_WARNING(f'Unknown parameter: {param_name}')
+                continue
+    
+            any_msg = any_pb2.Any()
+            any_msg.Pack(typed_value)
+            message.set_parameter.parameters.identifiers.append(param_name)
+            message.set_parameter.parameters.values.append(any_msg)
+    
+        def handler(response):
+            pass
+    
+        self.send_message(sock, message, handler)
+    
+    def dtig_get_parameter(self, sock):
+        self.dtig_engine_get_parameter(sock)
+    
+    def dtig_engine_get_parameter(self, sock):
+        message = dtig_message.MDTMessage()
+            message.get_parameter.parameters.identifiers.append(f"g")
+            message.get_parameter.parameters.identifiers.append(f"e")
+            message.get_parameter.parameters.identifiers.append(f"floor")
+            message.get_parameter.parameters.identifiers.append(f"mass")
+            message.get_parameter.parameters.identifiers.append(f"v0")
+            message.get_parameter.parameters.identifiers.append(f"Material")
+            message.get_parameter.parameters.identifiers.append(f"fixed")
+    
+        def handler(response):
+            if response.HasField("values"):
+                for i in range(len(response.values.values)):
+                    param = response.values.identifiers[i]
+                    any_value = response.values.values[i]
+                    if param not in self.parameter_messages:
+                        continue
+    
+                    value_type = self.parameter_messages[param]
+                    if value_type is None:
+                        print(f"get_parameter for {param} is not implemented")
+                        continue
+    
+                    value = value_type()
+                    if any_value.Unpack(value):
+                        LOG_INFO(f'{param}: {value.value}')
+    
+        self.send_message(sock, message, handler)
+
+if __name__ == "__main__":
+    start_logger(LogLevel.DEBUG)
+    cmd_args = argument_parser.parse_args()
+
+    wrapper = Client(cmd_args)
+    wrapper.dtig_run()
\ No newline at end of file
@@ -0,0 +1,615 @@
+# Basic imports
+import sys
+import queue
+import atexit
+import socket
+import logging
+import argparse
+import threading
+import logging.handlers
+
+from enum import Enum
+from time import sleep
+
+# Protobuf imports
+import dtig.info_pb2 as dtig_info
+import dtig.utils_pb2 as dtig_utils
+import dtig.state_pb2 as dtig_state
+import dtig.status_pb2 as dtig_status
+import dtig.values_pb2 as dtig_values
+import dtig.return_code_pb2 as dtig_code
+import dtig.run_mode_pb2 as dtig_run_mode
+import dtig.dt_message_pb2 as dtig_message
+import dtig.return_value_pb2 as dtig_return
+
+from google.protobuf import any_pb2
+from google.protobuf.message import Message
+from google.protobuf.message import DecodeError
+
+from dtig.framing import FramedSocket, FRAME_HEADER, MAX_MESSAGE_SIZE
+HOST = "127.0.0.1"
+PORT = 8080
+
+# Commands of a message are fields of its oneof, so the one that is set can be found without testing each of them
+# The oneof is found through one of its commands, so it does not depend on the order of the oneofs of the message
+MESSAGE_COMMAND = dtig_message.MDTMessage.DESCRIPTOR.fields_by_name["initialize"].containing_oneof.name
+
+# Records are queued as they are, then formatted and written by a background thread, so the model loop never does either
+# Below warnings, each call site logs at most once per LOG_RATE_LIMIT seconds, the rest is counted
+LOG_RATE_LIMIT = 0.5
+LOG_LEVELS = [logging.ERROR, logging.WARNING, logging.INFO, logging.DEBUG, logging.DEBUG]
+
+class RateLimit(logging.Filter):
+    def __init__(self, interval: float):
+        super().__init__()
+        self.interval = interval
+        self.sites = dict()
+
+    def filter(self, record) -> bool:
+        if self.interval <= 0 or record.levelno >= logging.WARNING:
+            return True
+
+        site = (record.pathname, record.lineno)
+        last, suppressed = self.sites.get(site, (0.0, 0))
+        if record.created - last < self.interval:
+            self.sites[site] = (last, suppressed + 1)
+            return False
+
+        self.sites[site] = (record.created, 0)
+        if suppressed:
+            record.msg = f'{record.msg} ({suppressed} suppressed)'
+
+        return True
+
+# The default QueueHandler formats the message before queueing it, on the thread that logs
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        return record
+
+logger = logging.getLogger("dtig")
+
+def start_logger(level: int, rate_limit: float = LOG_RATE_LIMIT) -> logging.handlers.QueueListener:
+    log_queue = queue.SimpleQueue()
+
+    handler = DeferredQueueHandler(log_queue)
+    handler.addFilter(RateLimit(rate_limit))
+    logger.addHandler(handler)
+    logger.setLevel(LOG_LEVELS[min(max(level, 0), len(LOG_LEVELS) - 1)])
+    logger.propagate = False
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(logging.Formatter('%(asctime)s [%(levelname).1s] %(message)s'))
+
+    # Flushes the remaining records when the server exits
+    listener = logging.handlers.QueueListener(log_queue, output)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+class PythonWrapper:    
+    def __init__(self):
+        self.mode = dtig_run_mode.UNKNOWN
+        self.state = dtig_state.UNINITIALIZED
+        self.server: socket.socket = None
+    
+        self.lock = threading.Lock()
+        self.condition = threading.Condition(lock=self.lock)
+    
+        # Engines are not thread safe, so every call into one holds this lock, the condition only guards the state
+        # It is taken after the condition, and never held while waiting on it
+        self.model_lock = threading.Lock()
+    
+        # Handlers of the commands, by the name of their field in the message
+        self.message_handlers = {
+            "advance": lambda command: self.dtig_advance(command),
+            "set_input": lambda command: self.dtig_set_input(command),
+            "get_output": lambda command: self.dtig_get_output(command),
+            "initialize": lambda command: self.dtig_initialize(command),
+            "start": lambda command: self.dtig_start(command),
+            "stop": lambda command: self.dtig_stop(command),
+            "set_parameter": lambda command: self.dtig_set_parameter(command),
+            "get_parameter": lambda command: self.dtig_get_parameter(command),
+            "get_status": lambda command: self.dtig_get_status(),
+            "model_info": lambda command: self.dtig_model_info()
+        }
+    
+        self.server_thread = threading.Thread(
+            target=self.dtig_run_server
+        )
+        self.model_thread = threading.Thread(
+            target=self.dtig_run_model
+        )
+        
+        self.previous_message = None
+        
+        # Proto message of the values in the replies, by name, the parameters that cannot be shown have none
+        self.output_messages = {
+        }
+        self.parameter_messages = {
+            f"g": lambda: dtig_utils.MF64(),
+            f"e": lambda: dtig_utils.MF64(),
+            f"floor": lambda: dtig_utils.MF64(),
+            f"mass": lambda: dtig_utils.MF64(),
+            f"v0": lambda: dtig_utils.MF64(),
+            f"Material": None,
+            f"fixed": None,
+        }
+    
+    def __del__(self):
+        if self.server is not None:
+            self.server.close()
+    
+    def dtig_run(self):
+        if not self.create_connection():
+            return
+    
+        self.server_thread.start()
+        self.model_thread.start()
+    
+        self.server_thread.join()
+        self.model_thread.join()
+    def dtig_run_server(self):
+        sock, addr = self.server.accept()
+        with sock:
+            logger.info(f"{addr} connected in state {dtig_state.EState.Name(self.state)}")
+            connection = FramedSocket(sock)
+            try:
+                while True:
+                    # Wait for client command
+                    data: memoryview = connection.receive()
+                    if data is None:
+                        logger.info("Client disconnected")
+                        break
+    
+                    # Parse client command
+                    with self.condition:
+                        with self.model_lock:
+                            reply: bytes = self.dtig_handle_message(data).SerializeToString()
+    
+                        connection.send(reply)
+                        self.condition.notify_all()
+    
+                        if self.state == dtig_state.STOPPED:
+                            break
+    
+            except Exception as e:
+                logger.error(f'Failed: {e}')
+                sock.sendall(''.encode())
+                sleep(1)
+    
+            with self.condition:
+                self.step = True
+                self.state = dtig_state.STOPPED
+                self.condition.notify_all()
+    def dtig_run_client(self, sock):
+        previous_option = "0"
+        while self.running:
+            option = self.print_menu()
+            if option == "0":
+                self.dtig_stop(sock)
+            elif option == "1":
+                self.dtig_initialize(sock)
+            elif option == "2":
+                self.dtig_start(sock)
+            elif option == "3":
+                self.dtig_advance(sock)
+            elif option == "4":
+                self.dtig_set_input(sock)
+            elif option == "5":
+                self.dtig_get_output(sock)
+            elif option == "6":
+                self.dtig_set_parameter(sock)
+            elif option == "7":
+                self.dtig_get_parameter(sock)
+            elif option == "8":
+                self.dtig_model_info(sock)
+            elif option == "9":
+                self.dtig_get_status(sock)
+            elif self.previous_message:
+                LOG_INFO(f'Using previous command')
+                self.send_message(sock, self.previous_message)
+            else:
+                LOG_ERROR(f'Unknown command: {option}')
+    
+    def return_code(self, code: dtig_code, message: str = None):
+        if message is None:
+            return dtig_return.MReturnValue(code=code)
+    
+        return dtig_return.MReturnValue(code=code, error_message=dtig_utils.MString(value=message))
+    
+    def create_connection(self):
+        try:
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            s.bind((HOST, PORT))
+            s.listen()
+            self.server = s
+            logger.info(f'Connected to {HOST}:{PORT}')
+            return True
+    
+        except Exception as e:
+            logger.error(f'Failed to create socket: {e}')
+            return False
+    
+    
+    def send_message(self, sock, message, handler=None):
+        sock.send(message.SerializeToString())
+    
+        received_data = sock.receive()
+        if received_data is None:
+            print("Server stopped")
+            self.running = False
+            return
+    
+        self.previous_message = message
+    
+        response = dtig_return.MReturnValue()
+        response.ParseFromString(received_data)
+    
+        if response.code == dtig_code.SUCCESS:
+            if handler:
+                handler(response)
+            return
+    
+        LOG_ERROR(f'Failed with code: {response.code}')
+        if response.HasField("error_message"):
+            LOG_ERROR(f'Message: {response.error_message.value}')
+    
+    def print_menu(self):
+        print("Options:")
+        print("  0 - Stop model")
+        print("  1 - Initialize model")
+        print("  2 - Run model")
+        print("  3 - Advance model in stepped mode")
+        print("  4 - Set input")
+        print("  5 - Get output")
+        print("  6 - Set parameter")
+        print("  7 - Get Parameter")
+        print("  8 - Model info")
+        print("  9 - Model status")
+        return input("What should we do? ").strip()
+    
+    def print_info(self, info):
+        if info.HasField("name"):
+            print(f'  Name: {info.name.value}')
+        if info.HasField("id"):
+            print(f'    Id: {info.id.value}')
+        if info.HasField("description"):
+            print(f'    Description: {info.description.value}')
+        if info.HasField("type"):
+            print(f'    Type: {info.type.value}')
+        if info.HasField("unit"):
+            print(f'    Unit: {info.unit.value}')
+        if info.HasField("namespace"):
+            print(f'    Namespace: {info.namespace.value}')
+        if info.HasField("modifier"):
+            print(f'    Modifier: {info.modifier.value}')
+        if info.HasField("default"):
+            print(f'    Default: {info.default.value}')
+    
+    def dtig_handle_message(self, data : memoryview):
+        message = dtig_message.MDTMessage()
+        try:
+            message.ParseFromString(data)
+        except DecodeError as e:
+            logger.error('Failed to parse incoming message')
+            return self.return_code(dtig_code.FAILURE, 'Failed to parse message')
+    
+        command = message.WhichOneof(MESSAGE_COMMAND)
+        handler = self.message_handlers.get(command)
+        if handler is None:
+            return self.return_code(dtig_code.UNKNOWN_COMMAND, 'Unknown command')
+    
+        return handler(getattr(message, command))
+    def dtig_stop(self, message):
+        ret = self.dtig_engine_stop(message)
+        if ret.code != dtig_code.SUCCESS:
+            return ret
+    
+        self.step = True
+        self.state = dtig_state.STOPPED
+        return self.return_code(dtig_code.SUCCESS)
+    
+    def dtig_engine_stop(self, sock):
+        message = dtig_message.MDTMessage()
+        message.stop.mode = dtig_stop_mode.CLEAN
+        self.send_message(sock, message)
+    
+    def dtig_start(self, message):
+        # If the model was not yet initialized, we cannot start
+        if self.state == dtig_state.UNINITIALIZED:
+            return self.return_code(dtig_code.INVALID_STATE, f'Cannot start in state {dtig_state.EState.Name(self.state)}')
+    
+        return self.dtig_engine_start(message)
+    
+    def dtig_engine_start(self, sock):
+        message = dtig_message.MDTMessage()
+        message.start.start_time.value = float(input("What start time? "))
+        message.start.stop_time.value  = float(input("What stop time? "))
+        message.start.step_size.step   = float(input("What step size? "))
+        print("Available modes:")
+        print(" 1 - Stepped")
+        print(" 2 - Continuous")
+        while True:
+            mode = int(input("What mode? ").strip())
+            if mode == 1:
+                message.start.run_mode = dtig_run_mode.STEPPED
+                break
+            elif mode == 2:
+                message.start.run_mode = dtig_run_mode.CONTINUOUS
+                break
+            else:
+                LOG_WARNING(f'Unknown mode: {mode}')
+    
+        self.send_message(sock, message)
+    
+    def dtig_set_input(self, message):
+        # If the model was not yet initialized, we cannot set inputs
+        if self.state == dtig_state.UNINITIALIZED:
+            return self.return_code(dtig_code.INVALID_STATE, f'Cannot set input in state {dtig_state.EState.Name(self.state)}')
+    
+        if len(message.inputs.values) != len(message.inputs.identifiers):
+            return self.return_code(dtig_code.INVALID_OPTION, f'Got {len(message.inputs.values)} values for {len(message.inputs.identifiers)} inputs')
+    
+        # Only the model knows the types, unpacking must be a responsibility of the callback function
+        # All the values are given at once, so the engine can set them together
+        return self.dtig_engine_set_input(message.inputs.identifiers, message.inputs.values)
+    
+    def dtig_engine_set_input(self, sock):
+        pass
+    
+    def dtig_get_output(self, message):
+        if self.state == dtig_state.UNINITIALIZED:
+            return self.return_code(dtig_code.INVALID_STATE, f'Cannot get output in state {dtig_state.EState.Name(self.state)}')
+    
+        ids_length = len(message.outputs.identifiers)
+        return_message = self.dtig_engine_get_output(message.outputs.identifiers)
+        if len(return_message.values.identifiers) != ids_length and return_message.code == dtig_code.SUCCESS:
+            return_message.code = dtig_code.FAILURE
+            return_message.error_message.value = 'Failed to get all outputs'
+    
+        return return_message
+    
+    def dtig_engine_get_output(self, sock):
+        message = dtig_message.MDTMessage()
+    
+        output_name = "default"
+        while output_name:
+            output_name = input("Which output? ")
+            if not len(output_name):
+                break
+    
+            message.get_output.outputs.identifiers.append(output_name)
+    
+        def handler(response):
+            if response.HasField("values"):
+                for i in range(len(response.values.values)):
+                    param = response.values.identifiers[i]
+                    any_value = response.values.values[i]
+                    value_type = self.output_messages.get(param)
+                    if value_type is None:
+                        continue
+    
+                    value = value_type()
+                    if any_value.Unpack(value):
+                        LOG_INFO(f'{param}: {value.value}')
+    
+        self.send_message(sock, message, handler)
+    
+    def dtig_advance(self, message):
+        if self.state != dtig_state.WAITING:
+            return self.return_code(dtig_code.INVALID_STATE, f'Cannot advance in state {dtig_state.EState.Name(self.state)}')
+    
+        return self.dtig_engine_advance(message)
+    
+    def dtig_engine_advance(self, sock):
+        message = dtig_message.MDTMessage()
+        message.advance.step_size.step = float(input("What step size? "))
+        self.send_message(sock, message)
+    
+    def dtig_initialize(self, message):
+        if self.state != dtig_state.UNINITIALIZED:
+            return self.return_code(dtig_code.INVALID_STATE, f'Cannot initialize in state {dtig_state.EState.Name(self.state)}')
+    
+        ret = self.dtig_engine_initialize(message)
+        if ret.code != dtig_code.SUCCESS:
+            return ret
+    
+        self.state = dtig_state.INITIALIZED
+        return self.return_code(dtig_code.SUCCESS)
+    
+    def dtig_engine_initialize(self, sock):
+        message = dtig_message.MDTMessage()
+        model_name = input(f"What is the model name? (Current: {self.model_name})").strip()
+        if model_name:
+            self.model_name = model_name
+        elif not self.model_name:
+            LOG_ERROR("No model name provided")
+    
+        message.initialize.model_name.value = self.model_name
+        self.send_message(sock, message)
+    
+    def dtig_model_info(self):
+        if self.state == dtig_state.UNINITIALIZED:
+            return self.return_code(dtig_code.INVALID_STATE, f'Cannot get model info in state {dtig_state.EState.Name(self.state)}')
+    
+        return self.dtig_engine_model_info()
+    
+    def dtig_engine_model_info(self, sock):
+        message = dtig_message.MDTMessage()
+        message.model_info.request = True
+    
+        def handler(response):
+            if response.HasField("model_info"):
+                if len(response.model_info.inputs):
+                    print(f'Input:')
+                    for info in response.model_info.inputs:
+                        self.print_info(info)
+    
+                if len(response.model_info.outputs):
+                    print(f'Output:')
+                    for info in response.model_info.outputs:
+                        self.print_info(info)
+    
+                if len(response.model_info.parameters):
+                    print(f'Parameter:')
+                    for info in response.model_info.parameters:
+                        self.print_info(info)
+    
+        self.send_message(sock, message, handler)
+    
+    def dtig_get_status(self):
+        return self.dtig_engine_get_status()
+    
+    def dtig_engine_get_status(self, sock):
+        message = dtig_message.MDTMessage()
+        message.get_status.request = True
+    
+        def handler(response):
+            if response.HasField("status"):
+                LOG_INFO(f"Current status: {dtig_state.EState.Name(response.status.state)}")
+    
+        response = self.send_message(sock, message, handler)
+    
+    def dtig_set_parameter(self, message):
+        if self.state == dtig_state.UNINITIALIZED:
+            return self.return_code(dtig_code.INVALID_STATE, f'Cannot set parameter in state {dtig_state.EState.Name(self.state)}')
+    
+        if len(message.parameters.values) != len(message.parameters.identifiers):
+            return self.return_code(dtig_code.INVALID_OPTION, f'Got {len(message.parameters.values)} values for {len(message.parameters.identifiers)} parameters')
+    
+        # Only the model knows the types, unpacking must be a responsibility of the callback function
+        # All the values are given at once, so the engine can set them together
+        return self.dtig_engine_set_parameter(message.parameters.identifiers, message.parameters.values)
+    
+    def dtig_engine_set_parameter(self, sock):
+        message = dtig_message.MDTMessage()
+        print("Available parameters:")
+        print(f'  g - float64')
+        print(f'  e - float64')
+        print(f'  floor - float64')
+        print(f'  mass - float64')
+        print(f'  v0 - float64')
+        print(f'  Material - material')
+        print(f'  fixed - fixture')
+    
+        param_name = "default"
+        while param_name:
+            param_name = input("Which parameter? ")
+            if not len(param_name):
+                break
+    
+    
+            if param_name == f"g":
+                typed_value = dtig_utils.MF64()
+                param_value = float(input("Input value? ").strip())
+                typed_value.value = param_value
+    
+    
+            elif param_name == f"e":
+                typed_value = dtig_utils.MF64()
+                param_value = float(input("Input value? ").strip())
+                typed_value.value = param_value
+    
+    
+            elif param_name == f"floor":
+                typed_value = dtig_utils.MF64()
+                param_value = float(input("Input value? ").strip())
+                typed_value.value = param_value
+    
+    
+            elif param_name == f"mass":
+                typed_value = dtig_utils.MF64()
+                param_value = float(input("Input value? ").strip())
+                typed_value.value = param_value
+    
+    
+            elif param_name == f"v0":
+                typed_value = dtig_utils.MF64()
+                param_value = float(input("Input value? ").strip())
+                typed_value.value = param_value
+    
+    
+            elif param_name == f"Material":
+                typed_value = dtig_utils.MMaterial()
+                param_value = str(input("Input value? ").strip())
+                typed_value.value = param_value
+    
+    
+            elif param_name == f"fixed":
+                typed_value = dtig_utils.MConstraint()
+                param_value = float(input("Input value? ").strip())
+                typed_value.value = param_value
+    
+    
+            else:
+                LOG_WARNING(f'Unknown parameter: {param_name}')
+                continue
+    
+            any_msg = any_pb2.Any()
+            any_msg.Pack(typed_value)
+            message.set_parameter.parameters.identifiers.append(param_name)
+            message.set_parameter.parameters.values.append(any_msg)
+    
+        def handler(response):
+            pass
+    
+        self.send_message(sock, message, handler)
+    
+    def dtig_get_parameter(self, message):
+        if self.state == dtig_state.UNINITIALIZED:
+            return self.return_code(dtig_code.INVALID_STATE, f'Cannot get parameter in state {dtig_state.EState.Name(self.state)}')
+    
+        ids_length = len(message.parameters.identifiers)
+        return_message = self.dtig_engine_get_parameter(message.parameters.identifiers)
+        if len(return_message.values.identifiers) != ids_length and return_message.code == dtig_code.SUCCESS:
+            return_message.code = dtig_code.FAILURE
+            return_message.error_message.value = 'Failed to get all parameters'
+    
+        return return_message
+    
+    def dtig_engine_get_parameter(self, sock):
+        message = dtig_message.MDTMessage()
+            message.get_parameter.parameters.identifiers.append(f"g")
+            message.get_parameter.parameters.identifiers.append(f"e")
+            message.get_parameter.parameters.identifiers.append(f"floor")
+            message.get_parameter.parameters.identifiers.append(f"mass")
+            message.get_parameter.parameters.identifiers.append(f"v0")
+            message.get_parameter.parameters.identifiers.append(f"Material")
+            message.get_parameter.parameters.identifiers.append(f"fixed")
+    
+        def handler(response):
+            if response.HasField("values"):
+                for i in range(len(response.values.values)):
+                    param = response.values.identifiers[i]
+                    any_value = response.values.values[i]
+                    if param not in self.parameter_messages:
+                        continue
+    
+                    value_type = self.parameter_messages[param]
+                    if value_type is None:
+                        print(f"get_parameter for {param} is not implemented")
+                        continue
+    
+                    value = value_type()
+                    if any_value.Unpack(value):
+                        LOG_INFO(f'{param}: {value.value}')
+    
+        self.send_message(sock, message, handler)
+
+argument_parser = argparse.ArgumentParser(description='PythonWrapper sever')
+argument_parser.add_argument('--host', action="store", dest="host", help='Server hostname/ip', type=str, default="127.0.0.1")
+argument_parser.add_argument('--port', action="store", dest="port", help='Server port', type=int, default=8080)
+argument_parser.add_argument('--log-level', action="store", dest="log_level", help='Log level, from 0 (errors) to 4 (trace)', type=int, default=2)
+argument_parser.add_argument('--log-rate', action="store", dest="log_rate", help='Minimum seconds between logs of the same call site', type=float, default=LOG_RATE_LIMIT)
+args = argument_parser.parse_args()
+
+if __name__ == "__main__":
+    start_logger(args.log_level, args.log_rate)
+
+    if args.host:
+        HOST = args.host
+    if args.port:
+        PORT = args.port
+
+    wrapper = PythonWrapper()
+    wrapper.dtig_run()
\ No newline at end of file
@@ -0,0 +1,794 @@
+# Basic imports
+import sys
+import queue
+import atexit
+import socket
+import logging
+import argparse
+import threading
+import logging.handlers
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
+
+from enum import Enum
+from time import sleep
+
+# Protobuf imports
+import dtig.info_pb2 as dtig_info
+import dtig.utils_pb2 as dtig_utils
+import dtig.state_pb2 as dtig_state
+import dtig.status_pb2 as dtig_status
+import dtig.values_pb2 as dtig_values
+import dtig.return_code_pb2 as dtig_code
+import dtig.run_mode_pb2 as dtig_run_mode
+import dtig.dt_message_pb2 as dtig_message
+import dtig.return_value_pb2 as dtig_return
+
+from google.protobuf import any_pb2
+from google.protobuf.message import Message
+from google.protobuf.message import DecodeError
+
+from dtig.framing import FramedSocket, FRAME_HEADER, MAX_MESSAGE_SIZE
+from fmpy import read_model_description, extract
+from fmpy.fmi2 import FMU2Slave
+from fmpy.util import plot_result
+
+import csv
+import shutil
+import numpy as np
+
+from time import monotonic
+
+HOST = "127.0.0.1"
+PORT = 8080
+
+# Commands of a message are fields of its oneof, so the one that is set can be found without testing each of them
+# The oneof is found through one of its commands, so it does not depend on the order of the oneofs of the message
+MESSAGE_COMMAND = dtig_message.MDTMessage.DESCRIPTOR.fields_by_name["initialize"].containing_oneof.name
+
+# Clients connecting while another one drives the model can only send these
+READ_ONLY_COMMANDS = ("get_output", "get_parameter", "get_status", "model_info")
+
+# Records are queued as they are, then formatted and written by a background thread, so the model loop never does either
+# Below warnings, each call site logs at most once per LOG_RATE_LIMIT seconds, the rest is counted
+LOG_RATE_LIMIT = 0.5
+LOG_LEVELS = [logging.ERROR, logging.WARNING, logging.INFO, logging.DEBUG, logging.DEBUG]
+
+class RateLimit(logging.Filter):
+    def __init__(self, interval: float):
+        super().__init__()
+        self.interval = interval
+        self.sites = dict()
+
+    def filter(self, record) -> bool:
+        if self.interval <= 0 or record.levelno >= logging.WARNING:
+            return True
+
+        site = (record.pathname, record.lineno)
+        last, suppressed = self.sites.get(site, (0.0, 0))
+        if record.created - last < self.interval:
+            self.sites[site] = (last, suppressed + 1)
+            return False
+
+        self.sites[site] = (record.created, 0)
+        if suppressed:
+            record.msg = f'{record.msg} ({suppressed} suppressed)'
+
+        return True
+
+# The default QueueHandler formats the message before queueing it, on the thread that logs
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        return record
+
+logger = logging.getLogger("dtig")
+
+def start_logger(level: int, rate_limit: float = LOG_RATE_LIMIT) -> logging.handlers.QueueListener:
+    log_queue = queue.SimpleQueue()
+
+    handler = DeferredQueueHandler(log_queue)
+    handler.addFilter(RateLimit(rate_limit))
+    logger.addHandler(handler)
+    logger.setLevel(LOG_LEVELS[min(max(level, 0), len(LOG_LEVELS) - 1)])
+    logger.propagate = False
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(logging.Formatter('%(asctime)s [%(levelname).1s] %(message)s'))
+
+    # Flushes the remaining records when the server exits
+    listener = logging.handlers.QueueListener(log_queue, output)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+class FMI2Wrapper:    
+    def __init__(self):
+        self.mode = dtig_run_mode.UNKNOWN
+        self.state = dtig_state.UNINITIALIZED
+        self.server: socket.socket = None
+    
+        self.lock = threading.Lock()
+        self.condition = threading.Condition(lock=self.lock)
+    
+        # Engines are not thread safe, so every call into one holds this lock, the condition only guards the state
+        # It is taken after the condition, and never held while waiting on it
+        self.model_lock = threading.Lock()
+    
+        # Handlers of the commands, by the name of their field in the message
+        self.message_handlers = {
+            "advance": lambda command: self.dtig_advance(command),
+            "set_input": lambda command: self.dtig_set_input(command),
+            "get_output": lambda command: self.dtig_get_output(command),
+            "initialize": lambda command: self.dtig_initialize(command),
+            "start": lambda command: self.dtig_start(command),
+            "stop": lambda command: self.dtig_stop(command),
+            "set_parameter": lambda command: self.dtig_set_parameter(command),
+            "get_parameter": lambda command: self.dtig_get_parameter(command),
+            "get_status": lambda command: self.dtig_get_status(),
+            "model_info": lambda command: self.dtig_model_info()
+        }
+    
+        self.server_thread = threading.Thread(
+            target=self.dtig_run_server
+        )
+        self.model_thread = threading.Thread(
+            target=self.dtig_run_model
+        )
+    
+        # Requests are handled by worker threads, so the event loop never blocks
+        # The observers have their own worker, so the requests of the controller never wait for theirs
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.observer_executor = ThreadPoolExecutor(max_workers=1)
+        self.sessions = dict()
+        self.controller = None
+        
+        # Engine specific members
+        self.start_time : float  = 0.0
+        self.stop_time  : float  = 10.0
+        self.step_size  : float  = 1e-3
+        
+        # Continuous runs advance speed simulated seconds per second of wall time, a speed of 0 runs as fast as possible
+        self.speed : float = 1.0
+        self.missed_deadlines : int = 0
+        
+        # While running, missed deadlines are reported at most once per interval, in seconds
+        self.deadline_warning_interval : float = 1.0
+        
+        self.fmu = None
+        self.model_name = None
+        self.parameters = []
+        self.value_references = {}
+        
+        # Proto message and FMU accessors of every signal, by name, types without an FMI accessor have none
+        self.input_signals = {
+        }
+        self.output_signals = {
+            f"h": (lambda: dtig_utils.MF64(), FMU2Slave.getReal, FMU2Slave.setReal),
+            f"v": (lambda: dtig_utils.MF64(), FMU2Slave.getReal, FMU2Slave.setReal),
+        }
+        self.parameter_signals = {
+            f"g": (lambda: dtig_utils.MF64(), FMU2Slave.getReal, FMU2Slave.setReal),
+            f"e": (lambda: dtig_utils.MF64(), FMU2Slave.getReal, FMU2Slave.setReal),
+        }
+        
+        # Signals of each kind grouped by accessor with their value references, filled once the FMU is initialized
+        self.signal_groups = {}
+    
+    def __del__(self):
+        if self.server is not None:
+            self.server.close()
+    
+    def dtig_run(self):
+        if not self.create_connection():
+            return
+    
+        self.server_thread.start()
+        self.model_thread.start()
+    
+        self.server_thread.join()
+        self.model_thread.join()
+    def dtig_run_model(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.state == dtig_state.INITIALIZED or self.state == dtig_state.STOPPED)
+                if self.state == dtig_state.STOPPED:
+                    return
+    
+            logger.info(f'Initializing FMU: {self.model_name}')
+    
+            # read the model description
+            try:
+                model_description = read_model_description(self.model_name)
+                break
+            except Exception as e:
+                logger.error(f'Failed to open model: {self.model_name}')
+                with self.condition:
+                    self.state = dtig_state.UNINITIALIZED
+    
+        # collect the value references
+        for variable in model_description.modelVariables:
+            self.value_references[variable.name] = variable.valueReference
+    
+        # extract the FMU
+        unzipdir = extract(self.model_name)
+    
+        with self.model_lock:
+            self.fmu = FMU2Slave(guid=model_description.guid,
+                                 unzipDirectory=unzipdir,
+                                 modelIdentifier=model_description.coSimulation.modelIdentifier,
+                                 instanceName='instance1')
+    
+            # initialize
+            self.fmu.instantiate()
+            self.fmu.setupExperiment(startTime=self.start_time)
+            self.fmu.enterInitializationMode()
+            self.fmu.exitInitializationMode()
+    
+            # Requests only reach the FMU through its signal groups, so they are published once it is initialized
+            self.signal_groups = {
+                "input": self.group_signals(self.input_signals),
+                "output": self.group_signals(self.output_signals),
+                "parameter": self.group_signals(self.parameter_signals)
+            }
+    
+        first_run = True
+        while self.state != dtig_state.STOPPED:
+            with self.condition:
+                self.condition.wait_for(lambda: self.state == dtig_state.RUNNING or self.state == dtig_state.STOPPED)
+    
+            if self.mode == dtig_run_mode.CONTINUOUS and not first_run:
+                # reset() erases our current parameters, so we must save and restore them manually
+                with self.model_lock:
+                    self.store_parameters()
+                    self.fmu.reset()
+                    self.fmu.setupExperiment(startTime=self.start_time)
+                    self.fmu.enterInitializationMode()
+                    self.load_parameters()
+                    self.fmu.exitInitializationMode()
+    
+            first_run = False
+            rows : list = []  # list to record the results
+            time : float = self.start_time
+    
+            # Every step has a deadline on the monotonic clock counted from the start of the run, so the pacing does not drift
+            # A stepped run is paced by the client instead
+            paced = self.speed > 0 and self.mode == dtig_run_mode.CONTINUOUS
+            run_start = monotonic()
+            steps = 0
+            self.missed_deadlines = 0
+            last_warning = None
+    
+            logger.info(f'Running with state: {dtig_state.EState.Name(self.state)} and {time} vs {self.start_time}')
+            # simulation loop
+            while time < self.stop_time and self.state != dtig_state.STOPPED:
+                with self.condition:
+                    if self.mode == dtig_run_mode.STEPPED:
+                        self.condition.wait_for(lambda: self.state == dtig_state.RUNNING or self.state == dtig_state.STOPPED)
+                        logger.debug('Step: %0.4f out of %0.4f', time, self.stop_time)
+    
+                # perform one step, requests reach the FMU between steps
+                with self.model_lock:
+                    self.fmu.doStep(currentCommunicationPoint=time, communicationStepSize=self.step_size)
+                    outputs = self.fmu.getReal(self.value_references.values())[1:]
+    
+                # advance the time
+                time += self.step_size
+    
+                rows.append((time, *outputs))
+                steps += 1
+    
+                if paced:
+                    delay = run_start + (time - self.start_time) / self.speed - monotonic()
+                    if delay > 0:
+                        with self.condition:
+                            self.condition.wait_for(lambda: self.state == dtig_state.STOPPED, timeout=delay)
+                    else:
+                        self.missed_deadlines += 1
+    
+                        now = monotonic()
+                        if last_warning is None or now - last_warning >= self.deadline_warning_interval:
+                            logger.warning('Behind real time by %0.4fs at %0.4f, %d of %d steps missed their deadline', -delay, time, self.missed_deadlines, steps)
+                            last_warning = now
+    
+                with self.condition:
+                    if self.mode == dtig_run_mode.STEPPED and self.state != dtig_state.STOPPED:
+                        self.state = dtig_state.WAITING
+    
+            if paced:
+                logger.info(f'FMU simulation done, {self.missed_deadlines} of {steps} steps missed their deadline')
+            else:
+                logger.info(f'FMU simulation done')
+    
+            with self.condition:
+                if self.state != dtig_state.STOPPED:
+                    self.state = dtig_state.IDLE
+    
+            if len(rows) > 0:
+                with open("fmi.csv", "w") as file:
+                    writer = csv.writer(file, delimiter=',')
+                    writer.writerows(rows)
+            #     # convert the results to a structured NumPy array
+                result = np.array(rows, dtype=np.dtype([(k, np.float64) for k in self.value_references.keys()]))
+                plot_result(result)
+    
+        # The FMU is freed, so requests are refused again
+        with self.model_lock:
+            self.signal_groups = {}
+            self.fmu.terminate()
+            self.fmu.freeInstance()
+    
+        # clean up
+        shutil.rmtree(unzipdir, ignore_errors=True)
+    
+    def dtig_run_server(self):
+        # Every client is served by a coroutine on the event loop of this thread
+        asyncio.run(self.serve_clients())
+    
+        with self.condition:
+            self.step = True
+            self.state = dtig_state.STOPPED
+            self.condition.notify_all()
+    def return_code(self, code: dtig_code, message: str = None):
+        if message is None:
+            return dtig_return.MReturnValue(code=code)
+    
+        return dtig_return.MReturnValue(code=code, error_message=dtig_utils.MString(value=message))
+    
+    def create_connection(self):
+        try:
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            s.bind((HOST, PORT))
+            s.listen()
+            self.server = s
+            logger.info(f'Connected to {HOST}:{PORT}')
+            return True
+    
+        except Exception as e:
+            logger.error(f'Failed to create socket: {e}')
+            return False
+    
+    async def serve_clients(self):
+        self.stopped = asyncio.Event()
+    
+        try:
+            server = await asyncio.start_server(self.serve_client, sock=self.server)
+        except Exception as e:
+            logger.error(f'Failed to start server: {e}')
+            return
+    
+        async with server:
+            await self.stopped.wait()
+    
+            # The model stops with its controller, so the observers are disconnected too
+            sessions = list(self.sessions.items())
+            for writer, _ in sessions:
+                writer.close()
+    
+            await asyncio.gather(*[session for _, session in sessions], return_exceptions=True)
+    
+        # Waits for the requests still running without blocking the event loop
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.executor.shutdown)
+        await loop.run_in_executor(None, self.observer_executor.shutdown)
+    
+    async def serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        addr = writer.get_extra_info("peername")
+    
+        # The first client drives the model, the others can only observe it
+        observer = self.controller is not None
+        if not observer:
+            self.controller = writer
+    
+        self.sessions[writer] = asyncio.current_task()
+        loop = asyncio.get_running_loop()
+        executor = self.observer_executor if observer else self.executor
+        logger.info(f"{addr} connected as {'observer' if observer else 'controller'} in state {dtig_state.EState.Name(self.state)}")
+        try:
+            while not self.stopped.is_set():
+                # Wait for client command
+                size, = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+                if size > MAX_MESSAGE_SIZE:
+                    raise ValueError(f'Message of {size} bytes is larger than {MAX_MESSAGE_SIZE}')
+    
+                data = await reader.readexactly(size)
+    
+                data = await loop.run_in_executor(executor, self.handle_request, data, observer)
+                writer.write(FRAME_HEADER.pack(len(data)) + data)
+                await writer.drain()
+    
+                if self.state == dtig_state.STOPPED:
+                    self.stopped.set()
+    
+        except asyncio.IncompleteReadError:
+            logger.info(f"{addr} disconnected")
+        except Exception as e:
+            logger.error(f'Failed: {e}')
+        finally:
+            self.sessions.pop(writer, None)
+            writer.close()
+            if not observer:
+                self.stopped.set()
+    
+    def handle_request(self, data: bytes, observer: bool) -> bytes:
+        # Observers only read, so they do not take the condition and never wait for the state changes of the controller
+        # The engine is still only reached through the model lock, so they wait for a step or a request that uses it
+        if observer:
+            if not self.is_read_only(data):
+                return self.return_code(dtig_code.INVALID_STATE, 'Only the first client can control the model').SerializeToString()
+    
+            with self.model_lock:
+                return self.dtig_handle_message(data).SerializeToString()
+    
+        # Parse client command
+        with self.condition:
+            with self.model_lock:
+                reply: bytes = self.dtig_handle_message(data).SerializeToString()
+    
+            self.condition.notify_all()
+    
+        return reply
+    
+    def is_read_only(self, data: bytes) -> bool:
+        message = dtig_message.MDTMessage()
+        try:
+            message.ParseFromString(data)
+        except DecodeError:
+            return False
+    
+        return message.WhichOneof(MESSAGE_COMMAND) in READ_ONLY_COMMANDS
+    
+    def variable_to_info(self, variable):
+        info = dtig_info.MInfo()
+        if variable.valueReference:
+            info.id.value = variable.valueReference
+    
+        if variable:
+            info.value = variable
+    
+        if variable.type:
+            info.type.value = variable.type
+    
+        if variable.quantity:
+            info.unit.value = variable.quantity
+    
+        return info
+    
+    def group_signals(self, signals):
+        # One list of value references per accessor, each signal knows its group and its position in the list
+        # Signals the FMU does not have are left out, signals without an FMI accessor have no group
+        groups = []
+        group_of = dict()
+        index = dict()
+        for name, (message, get_value, set_value) in signals.items():
+            ref = self.value_references.get(name)
+            if ref is None:
+                continue
+    
+            if get_value is None:
+                index[name] = (message, None, None)
+                continue
+    
+            group = group_of.get(get_value)
+            if group is None:
+                group = group_of[get_value] = len(groups)
+                groups.append((get_value, set_value, []))
+    
+            index[name] = (message, group, len(groups[group][2]))
+            groups[group][2].append(ref)
+    
+        return groups, index
+    
+    def get_values(self, kind, references):
+        signal_groups = self.signal_groups.get(kind)
+        if signal_groups is None:
+            return self.return_code(dtig_code.INVALID_STATE, "Model is not loaded yet")
+    
+        groups, index = signal_groups
+    
+        # Only the requested signals are read, with a single call for each FMI type
+        reads = dict()
+        signals = []
+        for reference in references:
+            signal = index.get(reference)
+            if signal is None:
+                return self.return_code(dtig_code.UNKNOWN_OPTION, f"Unknown {kind}: {reference}")
+    
+            message, group, position = signal
+            if group is None:
+                return self.return_code(dtig_code.INVALID_OPTION, f"Unsupported type: {reference}")
+    
+            read = reads.get(group)
+            if read is None:
+                read = reads[group] = []
+            signals.append((reference, message, group, len(read)))
+            read.append(groups[group][2][position])
+    
+        values = {group: groups[group][0](self.fmu, value_references) for group, value_references in reads.items()}
+    
+        return_message = self.return_code(dtig_code.SUCCESS)
+        for reference, message, group, position in signals:
+            any_value = message()
+            any_value.value = values[group][position]
+    
+            any_msg = any_pb2.Any()
+            any_msg.Pack(any_value)
+            return_message.values.identifiers.append(reference)
+            return_message.values.values.append(any_msg)
+    
+        return return_message
+    
+    def set_values(self, kind, references, any_values):
+        signal_groups = self.signal_groups.get(kind)
+        if signal_groups is None:
+            return self.return_code(dtig_code.INVALID_STATE, "Model is not loaded yet")
+    
+        groups, index = signal_groups
+    
+        # Values are grouped by accessor, so each FMI type is written with a single call
+        writes = dict()
+        for reference, any_value in zip(references, any_values):
+            signal = index.get(reference)
+            if signal is None:
+                return self.return_code(dtig_code.UNKNOWN_OPTION, f"Unknown {kind}: {reference}")
+    
+            message, group, position = signal
+            if group is None:
+                return self.return_code(dtig_code.INVALID_OPTION, f"Unsupported type: {reference}")
+    
+            value = message()
+            if not any_value.Unpack(value):
+                return self.return_code(dtig_code.FAILURE, f"Failed to unpack value: {reference}")
+    
+            write = writes.get(group)
+            if write is None:
+                write = writes[group] = ([], [])
+            write[0].append(groups[group][2][position])
+            write[1].append(value.value)
+    
+        # Nothing is written unless every value could be unpacked
+        for group, (value_references, values) in writes.items():
+            groups[group][1](self.fmu, value_references, values)
+    
+        return self.return_code(dtig_code.SUCCESS)
+    
+    def store_parameters(self):
+        groups, _ = self.signal_groups["parameter"]
+        self.parameters = [get_value(self.fmu, value_references) for get_value, _, value_references in groups]
+    
+    def load_parameters(self):
+        groups, _ = self.signal_groups["parameter"]
+        for (_, set_value, value_references), values in zip(groups, self.parameters):
+            set_value(self.fmu, value_references, values)
+    
+    def dtig_handle_message(self, data : memoryview):
+        message = dtig_message.MDTMessage()
+        try:
+            message.ParseFromString(data)
+        except DecodeError as e:
+            logger.error('Failed to parse incoming message')
+            return self.return_code(dtig_code.FAILURE, 'Failed to parse message')
+    
+        command = message.WhichOneof(MESSAGE_COMMAND)
+        handler = self.message_handlers.get(command)
+        if handler is None:
+            return self.return_code(dtig_code.UNKNOWN_COMMAND, 'Unknown command')
+    
+        return handler(getattr(message, command))
+    def dtig_stop(self, message):
+        ret = self.dtig_engine_stop(message)
+        if ret.code != dtig_code.SUCCESS:
+            return ret
+    
+        self.step = True
+        self.state = dtig_state.STOPPED
+        return self.return_code(dtig_code.SUCCESS)
+    
+    def dtig_engine_stop(self, message):
+        logger.info(f'Stopping with: {message.mode}')
+        return dtig_return.MReturnValue(code=dtig_code.SUCCESS)
+    
+    def dtig_start(self, message):
+        # If the model was not yet initialized, we cannot start
+        if self.state == dtig_state.UNINITIALIZED:
+            return self.return_code(dtig_code.INVALID_STATE, f'Cannot start in state {dtig_state.EState.Name(self.state)}')
+    
+        return self.dtig_engine_start(message)
+    
+    def dtig_engine_start(self, message):
+        if message.HasField("start_time"):
+            self.start_time = message.start_time.value
+    
+        if message.HasField("stop_time"):
+            self.stop_time = message.stop_time.value
+    
+        if message.HasField("step_size"):
+            self.step_size = message.step_size.step
+    
+        # For now, we accept either continuous or stepped simulation
+        if message.run_mode == dtig_run_mode.UNKNOWN:
+            return self.return_code(dtig_code.INVALID_OPTION, f'Unknown run mode: {message.run_mode}')
+    
+        self.mode = message.run_mode
+        self.state = dtig_state.WAITING if self.mode == dtig_run_mode.STEPPED else dtig_state.RUNNING
+    
+        logger.info(f'Starting with: {dtig_run_mode.ERunMode.Name(self.mode)}.')
+        logger.info(f'Running from {self.start_time:0.4f} to {self.stop_time:0.4f} with {self.step_size:0.4f}')
+    
+        return dtig_return.MReturnValue(code=dtig_code.SUCCESS)
+    
+    def dtig_set_input(self, message):
+        # If the model was not yet initialized, we cannot set inputs
+        if self.state == dtig_state.UNINITIALIZED:
+            return self.return_code(dtig_code.INVALID_STATE, f'Cannot set input in state {dtig_state.EState.Name(self.state)}')
+    
+        if len(message.inputs.values) != len(message.inputs.identifiers):
+            return self.return_code(dtig_code.INVALID_OPTION, f'Got {len(message.inputs.values)} values for {len(message.inputs.identifiers)} inputs')
+    
+        # Only the model knows the types, unpacking must be a responsibility of the callback function
+        # All the values are given at once, so the engine can set them together
+        return self.dtig_engine_set_input(message.inputs.identifiers, message.inputs.values)
+    
+    def dtig_engine_set_input(self, references, any_values):
+        return self.return_code(dtig_code.FAILURE, "Model has no inputs")
+    
+    def dtig_get_output(self, message):
+        if self.state == dtig_state.UNINITIALIZED:
+            return self.return_code(dtig_code.INVALID_STATE, f'Cannot get output in state {dtig_state.EState.Name(self.state)}')
+    
+        ids_length = len(message.outputs.identifiers)
+        return_message = self.dtig_engine_get_output(message.outputs.identifiers)
+        if len(return_message.values.identifiers) != ids_length and return_message.code == dtig_code.SUCCESS:
+            return_message.code = dtig_code.FAILURE
+            return_message.error_message.value = 'Failed to get all outputs'
+    
+        return return_message
+    
+    def dtig_engine_get_output(self, references):
+        return self.get_values("output", references)
+    
+    def dtig_advance(self, message):
+        if self.state != dtig_state.WAITING:
+            return self.return_code(dtig_code.INVALID_STATE, f'Cannot advance in state {dtig_state.EState.Name(self.state)}')
+    
+        return self.dtig_engine_advance(message)
+    
+    def dtig_engine_advance(self, message):
+        if message.HasField("step_size"):
+            self.step_size = message.step_size.step
+    
+        self.state = dtig_state.RUNNING
+        return self.return_code(dtig_code.SUCCESS)
+    
+    def dtig_initialize(self, message):
+        if self.state != dtig_state.UNINITIALIZED:
+            return self.return_code(dtig_code.INVALID_STATE, f'Cannot initialize in state {dtig_state.EState.Name(self.state)}')
+    
+        ret = self.dtig_engine_initialize(message)
+        if ret.code != dtig_code.SUCCESS:
+            return ret
+    
+        self.state = dtig_state.INITIALIZED
+        return self.return_code(dtig_code.SUCCESS)
+    
+    def dtig_engine_initialize(self, message):
+        if message.HasField("model_name"):
+            self.model_name = message.model_name.value
+        else:
+            return self.return_code(dtig_code.INVALID_OPTION, f'No model provided')
+    
+        return dtig_return.MReturnValue(code=dtig_code.SUCCESS)
+    
+    def dtig_model_info(self):
+        if self.state == dtig_state.UNINITIALIZED:
+            return self.return_code(dtig_code.INVALID_STATE, f'Cannot get model info in state {dtig_state.EState.Name(self.state)}')
+    
+        return self.dtig_engine_model_info()
+    
+    def dtig_engine_model_info(self):
+        return_value = self.return_code(dtig_code.SUCCESS)
+    
+        # Inputs
+    
+        # Outputs
+        # h =================================
+        info_h = dtig_info.MInfo()
+        info_h.id.value = 0
+        info_h.name.value = f"h"
+        info_h.description.value = f"Height of the ball"
+        info_h.type.value = f"float64"
+        info_h.unit.value = f"m"
+        info_h.namespace.value = f"InteractionRoot"
+        info_h.default.value = f"0.0"
+        return_value.model_info.outputs.append(info_h)
+    
+        # v =================================
+        info_v = dtig_info.MInfo()
+        info_v.id.value = 1
+        info_v.name.value = f"v"
+        info_v.description.value = f"Velocity of the ball"
+        info_v.type.value = f"float64"
+        info_v.unit.value = f"m/s"
+        info_v.namespace.value = f"InteractionRoot"
+        info_v.default.value = f"0.0"
+        return_value.model_info.outputs.append(info_v)
+    
+    
+        # Parameters
+        # g =================================
+        info_g = dtig_info.MInfo()
+        info_g.id.value = 0
+        info_g.name.value = f"g"
+        info_g.description.value = f"Gravity"
+        info_g.type.value = f"float64"
+        info_g.unit.value = f"m/s^2"
+        info_g.namespace.value = f"InteractionRoot.Parameters"
+        info_g.default.value = Real(9.81)
+        return_value.model_info.parameters.append(info_g)
+    
+        # e =================================
+        info_e = dtig_info.MInfo()
+        info_e.id.value = 1
+        info_e.name.value = f"e"
+        info_e.description.value = f"Coefficient of restitution"
+        info_e.type.value = f"float64"
+        info_e.namespace.value = f"InteractionRoot.Parameters"
+        info_e.default.value = Real(0.7)
+        return_value.model_info.parameters.append(info_e)
+    
+        return return_value
+    
+    def dtig_get_status(self):
+        return self.dtig_engine_get_status()
+    
+    def dtig_engine_get_status(self):
+        return_value = dtig_return.MReturnValue(code=dtig_code.SUCCESS)
+        return_value.status.state = self.state
+        return return_value
+    
+    def dtig_set_parameter(self, message):
+        if self.state == dtig_state.UNINITIALIZED:
+            return self.return_code(dtig_code.INVALID_STATE, f'Cannot set parameter in state {dtig_state.EState.Name(self.state)}')
+    
+        if len(message.parameters.values) != len(message.parameters.identifiers):
+            return self.return_code(dtig_code.INVALID_OPTION, f'Got {len(message.parameters.values)} values for {len(message.parameters.identifiers)} parameters')
+    
+        # Only the model knows the types, unpacking must be a responsibility of the callback function
+        # All the values are given at once, so the engine can set them together
+        return self.dtig_engine_set_parameter(message.parameters.identifiers, message.parameters.values)
+    
+    def dtig_engine_set_parameter(self, references, any_values):
+        return self.set_values("parameter", references, any_values)
+    
+    def dtig_get_parameter(self, message):
+        if self.state == dtig_state.UNINITIALIZED:
+            return self.return_code(dtig_code.INVALID_STATE, f'Cannot get parameter in state {dtig_state.EState.Name(self.state)}')
+    
+        ids_length = len(message.parameters.identifiers)
+        return_message = self.dtig_engine_get_parameter(message.parameters.identifiers)
+        if len(return_message.values.identifiers) != ids_length and return_message.code == dtig_code.SUCCESS:
+            return_message.code = dtig_code.FAILURE
+            return_message.error_message.value = 'Failed to get all parameters'
+    
+        return return_message
+    
+    def dtig_engine_get_parameter(self, references):
+        return self.get_values("parameter", references)
+
+argument_parser = argparse.ArgumentParser(description='FMI2Wrapper sever')
+argument_parser.add_argument('--host', action="store", dest="host", help='Server hostname/ip', type=str, default="127.0.0.1")
+argument_parser.add_argument('--port', action="store", dest="port", help='Server port', type=int, default=8080)
+argument_parser.add_argument('--log-level', action="store", dest="log_level", help='Log level, from 0 (errors) to 4 (trace)', type=int, default=2)
+argument_parser.add_argument('--log-rate', action="store", dest="log_rate", help='Minimum seconds between logs of the same call site', type=float, default=LOG_RATE_LIMIT)
+args = argument_parser.parse_args()
+
+if __name__ == "__main__":
+    start_logger(args.log_level, args.log_rate)
+
+    if args.host:
+        HOST = args.host
+    if args.port:
+        PORT = args.port
+
+    wrapper = FMI2Wrapper()
+    wrapper.dtig_run()
\ No newline at end of file
@@ -0,0 +1,874 @@
+# Basic imports
+import sys
+import queue
+import atexit
+import socket
+import logging
+import argparse
+import threading
+import logging.handlers
+
+from enum import Enum
+from time import sleep
+
+# Protobuf imports
+import dtig.info_pb2 as dtig_info
+import dtig.utils_pb2 as dtig_utils
+import dtig.state_pb2 as dtig_state
+import dtig.status_pb2 as dtig_status
+import dtig.values_pb2 as dtig_values
+import dtig.return_code_pb2 as dtig_code
+import dtig.run_mode_pb2 as dtig_run_mode
+import dtig.dt_message_pb2 as dtig_message
+import dtig.return_value_pb2 as dtig_return
+
+from google.protobuf import any_pb2
+from google.protobuf.message import Message
+from google.protobuf.message import DecodeError
+
+from dtig.framing import FramedSocket, FRAME_HEADER, MAX_MESSAGE_SIZE
+import re
+import sys
+import csv
+
+# Should this should be modified with the env?
+PATH='/media/felaze/NotAnExternalDrive/Projects/squashfs-root/usr/'
+FREECADPATH = PATH + 'lib/'
+FREECADFEMPATH = PATH + 'Mod/Fem/'
+FREECADPYSIDEPATH = PATH + 'Ext/'
+
+
+sys.path.append(FREECADPATH)
+sys.path.append(FREECADFEMPATH)
+sys.path.append(FREECADPYSIDEPATH)
+
+import FreeCAD, FreeCADGui, Part
+import ObjectsFem
+
+HOST = "127.0.0.1"
+PORT = 8080
+
+# Commands of a message are fields of its oneof, so the one that is set can be found without testing each of them
+# The oneof is found through one of its commands, so it does not depend on the order of the oneofs of the message
+MESSAGE_COMMAND = dtig_message.MDTMessage.DESCRIPTOR.fields_by_name["initialize"].containing_oneof.name
+
+# Records are queued as they are, then formatted and written by a background thread, so the model loop never does either
+# Below warnings, each call site logs at most once per LOG_RATE_LIMIT seconds, the rest is counted
+LOG_RATE_LIMIT = 0.5
+LOG_LEVELS = [logging.ERROR, logging.WARNING, logging.INFO, logging.DEBUG, logging.DEBUG]
+
+class RateLimit(logging.Filter):
+    def __init__(self, interval: float):
+        super().__init__()
+        self.interval = interval
+        self.sites = dict()
+
+    def filter(self, record) -> bool:
+        if self.interval <= 0 or record.levelno >= logging.WARNING:
+            return True
+
+        site = (record.pathname, record.lineno)
+        last, suppressed = self.sites.get(site, (0.0, 0))
+        if record.created - last < self.interval:
+            self.sites[site] = (last, suppressed + 1)
+            return False
+
+        self.sites[site] = (record.created, 0)
+        if suppressed:
+            record.msg = f'{record.msg} ({suppressed} suppressed)'
+
+        return True
+
+# The default QueueHandler formats the message before queueing it, on the thread that logs
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        return record
+
+logger = logging.getLogger("dtig")
+
+def start_logger(level: int, rate_limit: float = LOG_RATE_LIMIT) -> logging.handlers.QueueListener:
+    log_queue = queue.SimpleQueue()
+
+    handler = DeferredQueueHandler(log_queue)
+    handler.addFilter(RateLimit(rate_limit))
+    logger.addHandler(handler)
+    logger.setLevel(LOG_LEVELS[min(max(level, 0), len(LOG_LEVELS) - 1)])
+    logger.propagate = False
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(logging.Formatter('%(asctime)s [%(levelname).1s] %(message)s'))
+
+    # Flushes the remaining records when the server exits
+    listener = logging.handlers.QueueListener(log_queue, output)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+class FreeCADWrapper:    
+    def __init__(self):
+        self.mode = dtig_run_mode.UNKNOWN
+        self.state = dtig_state.UNINITIALIZED
+        self.server: socket.socket = None
+    
+        self.lock = threading.Lock()
+        self.condition = threading.Condition(lock=self.lock)
+    
+        # Engines are not thread safe, so every call into one holds this lock, the condition only guards the state
+        # It is taken after the condition, and never held while waiting on it
+        self.model_lock = threading.Lock()
+    
+        # Handlers of the commands, by the name of their field in the message
+        self.message_handlers = {
+            "advance": lambda command: self.dtig_advance(command),
+            "set_input": lambda command: self.dtig_set_input(command),
+            "get_output": lambda command: self.dtig_get_output(command),
+            "initialize": lambda command: self.dtig_initialize(command),
+            "start": lambda command: self.dtig_start(command),
+            "stop": lambda command: self.dtig_stop(command),
+            "set_parameter": lambda command: self.dtig_set_parameter(command),
+            "get_parameter": lambda command: self.dtig_get_parameter(command),
+            "get_status": lambda command: self.dtig_get_status(),
+            "model_info": lambda command: self.dtig_model_info()
+        }
+    
+        self.server_thread = threading.Thread(
+            target=self.dtig_run_server
+        )
+        self.model_thread = threading.Thread(
+            target=self.dtig_run_model
+        )
+        
+        # Engine specific members
+        self.stop_time  : float  = 10.0
+        self.step_size  : float  = 1e-3
+        self.model_name : str = None
+        self.mesh_index = 0
+        
+        self.app = None
+        
+        self.results_mutex = threading.Lock()
+        
+        self.force_update = False
+        self.solver = None
+        self.results = None
+        self.box_object = None
+        self.mesh_object = None
+        self.analysis_object = None
+        
+        # Proto message and handler of every signal, by name
+        self.input_setters = self.create_input_setters()
+        self.output_getters = self.create_output_getters()
+        self.parameter_setters = self.create_parameter_setters()
+        self.parameter_getters = self.create_parameter_getters()
+    
+    def __del__(self):
+        if self.server is not None:
+            self.server.close()
+    
+    def dtig_run(self):
+        if not self.create_connection():
+            return
+    
+        self.server_thread.start()
+        self.model_thread.start()
+    
+        self.server_thread.join()
+        self.model_thread.join()
+    def dtig_run_model(self):
+        with self.condition:
+            self.condition.wait_for(lambda: self.state == dtig_state.INITIALIZED or self.state == dtig_state.STOPPED)
+            if self.state == dtig_state.STOPPED:
+                return
+    
+        logger.info(f'Initializing FreeCAD FEM model')
+    
+        # Simulation loop
+        from femtools import ccxtools
+    
+        logger.info("Waiting for start")
+        while self.state != dtig_state.STOPPED:
+            with self.condition:
+                self.condition.wait_for(lambda: self.state == dtig_state.RUNNING or self.state == dtig_state.STOPPED)
+                if self.state == dtig_state.STOPPED:
+                    break
+    
+            if self.force_update:
+                logger.debug('Running with state: %s', dtig_state.EState.Name(self.state))
+    
+                self.force_update = False
+    
+                # Requests change the document, so they wait for the analysis
+                # The condition is never taken while holding the model lock
+                with self.model_lock:
+                    fea = ccxtools.FemToolsCcx(analysis=self.analysis_object, solver=self.solver)
+                    fea.purge_results()
+                    solved = fea.run()
+                    if solved:
+                        with self.results_mutex:
+                            for obj in self.analysis_object.Group:
+                                if obj.isDerivedFrom('Fem::FemResultObject'):
+                                    self.results = obj
+                                    self.mesh_index += 1
+                                    break
+    
+                    # Save document with results
+                    self.app.save()
+    
+                if not solved:
+                    logger.error("Simulation failed")
+                    with self.condition:
+                        self.state == dtig_state.STOPPED
+    
+                logger.info(f'FreeCAD FEM simulation done')
+    
+            with self.condition:
+                if self.state != dtig_state.STOPPED:
+                    self.state = dtig_state.IDLE
+    
+    def dtig_run_server(self):
+        sock, addr = self.server.accept()
+        with sock:
+            logger.info(f"{addr} connected in state {dtig_state.EState.Name(self.state)}")
+            connection = FramedSocket(sock)
+            try:
+                while True:
+                    # Wait for client command
+                    data: memoryview = connection.receive()
+                    if data is None:
+                        logger.info("Client disconnected")
+                        break
+    
+                    # Parse client command
+                    with self.condition:
+                        with self.model_lock:
+                            reply: bytes = self.dtig_handle_message(data).SerializeToString()
+    
+                        connection.send(reply)
+                        self.condition.notify_all()
+    
+                        if self.state == dtig_state.STOPPED:
+                            break
+    
+            except Exception as e:
+                logger.error(f'Failed: {e}')
+                sock.sendall(''.encode())
+                sleep(1)
+    
+            with self.condition:
+                self.step = True
+                self.state = dtig_state.STOPPED
+                self.condition.notify_all()
+    def return_code(self, code: dtig_code, message: str = None):
+        if message is None:
+            return dtig_return.MReturnValue(code=code)
+    
+        return dtig_return.MReturnValue(code=code, error_message=dtig_utils.MString(value=message))
+    
+    def create_connection(self):
+        try:
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            s.bind((HOST, PORT))
+            s.listen()
+            self.server = s
+            logger.info(f'Connected to {HOST}:{PORT}')
+            return True
+    
+        except Exception as e:
+            logger.error(f'Failed to create socket: {e}')
+            return False
+    
+    
+    def variable_to_info(self, variable):
+        info = dtig_info.MInfo()
+        if variable.valueReference:
+            info.id.value = variable.valueReference
+    
+        if variable:
+            info.value = variable
+    
+        if variable.type:
+            info.type.value = variable.type
+    
+        if variable.quantity:
+            info.unit.value = variable.quantity
+    
+        return info
+    
+    def direction_to_freecad(self, direction):
+        match = re.search(fr'(-)?(\w)', direction)
+        if not match:
+            return None, None
+    
+        return match.groups()[0] != None, self.app.getObject(f'{match.groups()[1].capitalize()}_Axis')
+    
+    def get_object(self, label):
+        obj_list = self.app.getObjectsByLabel(label)
+        if len(obj_list) > 0:
+            return obj_list[0]
+    
+        return None
+    
+    def create_input_setters(self):
+        handlers = dict()
+    
+        def set_input(reference, value):
+    
+            if value.value > 1000:
+                # If force already exists, use that
+                constraint = self.get_object(reference)
+                if not constraint:
+                    # constraint = Real(self.app, reference)
+                    constraint = ObjectsFem.makeConstraintForce(self.app, reference)
+    
+                obj_ref = self.app.getObject("Box")
+                if not obj_ref:
+                    return self.return_code(dtig_code.UNKNOWN_OPTION, f"Unknown output: {reference}")
+    
+                logger.debug('Setting force magnitude to: %s', value.value)
+    
+                constraint.References = [(obj_ref, "Face2")]
+                # reverse, direction = self.direction_to_freecad(value.direction.value)
+                constraint.Direction = (self.app.getObject(f'Z_Axis'), [""])
+                constraint.Reversed = True
+                constraint.Force = value.value
+    
+                self.analysis_object.addObject(constraint)
+    
+                self.app.recompute()
+                self.app.save()
+    
+                self.force_update = True
+    
+            with open('force.csv', 'a') as file:
+                file.write(f'{value.value}\n')
+    
+    
+            return self.return_code(dtig_code.SUCCESS)
+    
+        handlers[f"force"] = (lambda: dtig_utils.MF64(), set_input)
+    
+        return handlers
+    
+    def create_output_getters(self):
+        handlers = dict()
+    
+        def get_output(reference, any_value):
+            import Mesh
+            from femmesh.femmesh2mesh import femmesh_2_mesh
+    
+            out_mesh = femmesh_2_mesh(self.mesh_object.FemMesh, self.results)
+            name_parts = f"Result.obj".split(".")
+            filename = f'{name_parts[0]}.{self.mesh_index}.{name_parts[1]}'
+            Mesh.Mesh(out_mesh).write(filename)
+            any_value.value = filename
+    
+    
+        handlers[f"Mesh"] = (lambda: dtig_utils.MString(), get_output)
+    
+        def get_output(reference, any_value):
+    
+            property_value = self.results.getPropertyByName(reference)
+            if not property_value:
+                return self.return_code(dtig_code.FAILURE, f'No property: {reference}')
+    
+            any_value.value = max(property_value)
+    
+    
+        handlers[f"vonMises"] = (lambda: dtig_utils.MF64(), get_output)
+    
+        def get_output(reference, any_value):
+    
+            property_value = self.results.getPropertyByName(reference)
+            if not property_value:
+                return self.return_code(dtig_code.FAILURE, f'No property: {reference}')
+    
+            any_value.value = max(property_value)
+    
+    
+        handlers[f"DisplacementLengths"] = (lambda: dtig_utils.MF64(), get_output)
+    
+        return handlers
+    
+    def create_parameter_setters(self):
+        handlers = dict()
+    
+        def set_parameter(reference, value):
+            # If object already exists, use that
+            parameter = self.get_object(reference)
+            if not parameter:
+                parameter = ObjectsFem.makeMaterialSolid(self.app, reference)
+    
+    
+            # Update material
+            mat = parameter.Material
+            mat['Name'] = value.name
+            mat['YoungsModulus'] = value.youngs_modulus
+            mat['PoissonRatio'] = value.poisson_ratio
+            mat['Density'] = value.density
+            parameter.Material = mat
+    
+    
+            self.analysis_object.addObject(parameter)
+    
+            self.app.recompute()
+            self.app.save()
+            return self.return_code(dtig_code.SUCCESS)
+    
+        handlers[f"Material"] = (lambda: dtig_utils.MMaterial(), set_parameter)
+    
+        def set_parameter(reference, value):
+            # If object already exists, use that
+            parameter = self.get_object(reference)
+            if not parameter:
+                parameter = ObjectsFem.makeConstraintFixed(self.app, reference)
+    
+    
+            if not value.object:
+                return self.return_code(dtig_code.FAILURE, f"No object provided: {reference}")
+    
+            if not value.reference:
+                return self.return_code(dtig_code.FAILURE, f"No reference provided: {reference}")
+    
+            obj_ref = self.app.getObject(value.object.value)
+            if not obj_ref:
+                return self.return_code(dtig_code.UNKNOWN_OPTION, f"Unknown output: {reference}")
+    
+            parameter.References = [(obj_ref, value.reference.value)]
+    
+    
+            self.analysis_object.addObject(parameter)
+    
+            self.app.recompute()
+            self.app.save()
+            return self.return_code(dtig_code.SUCCESS)
+    
+        handlers[f"fixed"] = (lambda: dtig_utils.MConstraint(), set_parameter)
+    
+        return handlers
+    
+    def create_parameter_getters(self):
+        handlers = dict()
+    
+        def get_parameter(reference, any_value):
+            property_value = self.get_object(reference)
+            if not property_value:
+                return self.return_code(dtig_code.FAILURE, f'No property: {reference}')
+    
+            any_value.name.value = property_value.Material['Name']
+            any_value.youngs_modulus.value = property_value.Material['YoungsModulus']
+            any_value.poisson_ratio.value = property_value.Material['PoissonRatio']
+            any_value.density.value = property_value.Material['Density']
+    
+    
+        handlers[f"Material"] = (lambda: dtig_utils.MMaterial(), get_parameter)
+    
+        def get_parameter(reference, any_value):
+            property_value = self.get_object(reference)
+            if not property_value:
+                return self.return_code(dtig_code.FAILURE, f'No property: {reference}')
+    
+            any_value.object.value    = property_value.References[0][0].Label
+            any_value.reference.value = ", ".join(map(str, property_value.References[0][1]))
+    
+    
+        handlers[f"fixed"] = (lambda: dtig_utils.MConstraint(), get_parameter)
+    
+        return handlers
+    
+    def dtig_handle_message(self, data : memoryview):
+        message = dtig_message.MDTMessage()
+        try:
+            message.ParseFromString(data)
+        except DecodeError as e:
+            logger.error('Failed to parse incoming message')
+            return self.return_code(dtig_code.FAILURE, 'Failed to parse message')
+    
+        command = message.WhichOneof(MESSAGE_COMMAND)
+        handler = self.message_handlers.get(command)
+        if handler is None:
+            return self.return_code(dtig_code.UNKNOWN_COMMAND, 'Unknown command')
+    
+        return handler(getattr(message, command))
+    def dtig_stop(self, message):
+        ret = self.dtig_engine_stop(message)
+        if ret.code != dtig_code.SUCCESS:
+            return ret
+    
+        self.step = True
+        self.state = dtig_state.STOPPED
+        return self.return_code(dtig_code.SUCCESS)
+    
+    def dtig_engine_stop(self, message):
+        logger.info(f'Stopping with: {message.mode}')
+        return dtig_return.MReturnValue(code=dtig_code.SUCCESS)
+    
+    def dtig_start(self, message):
+        # If the model was not yet initialized, we cannot start
+        if self.state == dtig_state.UNINITIALIZED:
+            return self.return_code(dtig_code.INVALID_STATE, f'Cannot start in state {dtig_state.EState.Name(self.state)}')
+    
+        return self.dtig_engine_start(message)
+    
+    def dtig_engine_start(self, message):
+        if message.HasField("stop_time"):
+            self.stop_time = message.stop_time.value
+    
+        if message.HasField("step_size"):
+            # TODO: Add support for micro steps
+            self.step_size = message.step_size.step
+    
+        # For now, we accept either continuous or stepped simulation
+        if message.run_mode == dtig_run_mode.UNKNOWN:
+            return self.return_code(dtig_code.INVALID_OPTION, f'Unknown run mode: {message.run_mode}')
+    
+        self.mode = message.run_mode
+        self.state = dtig_state.WAITING if self.mode == dtig_run_mode.STEPPED else dtig_state.RUNNING
+    
+        if not self.analysis_object:
+            return self.return_code(dtig_code.INVALID_OPTION, f'Model not yet initialized')
+    
+        logger.info(f'Starting with: {dtig_run_mode.ERunMode.Name(self.mode)}.')
+        logger.info(f'Running until {self.stop_time:0.4f} with {self.step_size:0.4f}')
+    
+        return dtig_return.MReturnValue(code=dtig_code.SUCCESS)
+    
+    def dtig_set_input(self, message):
+        # If the model was not yet initialized, we cannot set inputs
+        if self.state == dtig_state.UNINITIALIZED:
+            return self.return_code(dtig_code.INVALID_STATE, f'Cannot set input in state {dtig_state.EState.Name(self.state)}')
+    
+        if len(message.inputs.values) != len(message.inputs.identifiers):
+            return self.return_code(dtig_code.INVALID_OPTION, f'Got {len(message.inputs.values)} values for {len(message.inputs.identifiers)} inputs')
+    
+        # Only the model knows the types, unpacking must be a responsibility of the callback function
+        # All the values are given at once, so the engine can set them together
+        return self.dtig_engine_set_input(message.inputs.identifiers, message.inputs.values)
+    
+    def dtig_engine_set_input(self, references, any_values):
+        for reference, any_value in zip(references, any_values):
+            handler = self.input_setters.get(reference)
+            if handler is None:
+                return self.return_code(dtig_code.UNKNOWN_OPTION, f"Unknown input: {reference}")
+    
+            message, set_value = handler
+            value = message()
+            if not any_value.Unpack(value):
+                return self.return_code(dtig_code.FAILURE, f"Failed to unpack value: {reference}")
+    
+            ret = set_value(reference, value)
+            if ret.code != dtig_code.SUCCESS:
+                return ret
+    
+        return self.return_code(dtig_code.SUCCESS)
+    
+    def dtig_get_output(self, message):
+        if self.state == dtig_state.UNINITIALIZED:
+            return self.return_code(dtig_code.INVALID_STATE, f'Cannot get output in state {dtig_state.EState.Name(self.state)}')
+    
+        ids_length = len(message.outputs.identifiers)
+        return_message = self.dtig_engine_get_output(message.outputs.identifiers)
+        if len(return_message.values.identifiers) != ids_length and return_message.code == dtig_code.SUCCESS:
+            return_message.code = dtig_code.FAILURE
+            return_message.error_message.value = 'Failed to get all outputs'
+    
+        return return_message
+    
+    def dtig_engine_get_output(self, references):
+    
+        # Check whether results are available, for FreeCAD, the outputs are only available once the model finished running
+        with self.results_mutex:
+            if not self.results:
+                return self.return_code(dtig_code.FAILURE, "No output available")
+    
+            return_message = self.return_code(dtig_code.SUCCESS)
+            for reference in references:
+                handler = self.output_getters.get(reference)
+                if handler is None:
+                    return self.return_code(dtig_code.UNKNOWN_OPTION, f"Unknown output: {reference}")
+    
+                message, get_value = handler
+                any_value = message()
+                error = get_value(reference, any_value)
+                if error is not None:
+                    return error
+    
+                any_msg = any_pb2.Any()
+                any_msg.Pack(any_value)
+                return_message.values.identifiers.append(reference)
+                return_message.values.values.append(any_msg)
+    
+            return return_message
+    
+    def dtig_advance(self, message):
+        if self.state != dtig_state.WAITING:
+            return self.return_code(dtig_code.INVALID_STATE, f'Cannot advance in state {dtig_state.EState.Name(self.state)}')
+    
+        return self.dtig_engine_advance(message)
+    
+    def dtig_engine_advance(self, message):
+        if message.HasField("step_size"):
+            self.step_size = message.step_size.step
+    
+        self.state = dtig_state.RUNNING
+        return self.return_code(dtig_code.SUCCESS)
+    
+    def dtig_initialize(self, message):
+        if self.state != dtig_state.UNINITIALIZED:
+            return self.return_code(dtig_code.INVALID_STATE, f'Cannot initialize in state {dtig_state.EState.Name(self.state)}')
+    
+        ret = self.dtig_engine_initialize(message)
+        if ret.code != dtig_code.SUCCESS:
+            return ret
+    
+        self.state = dtig_state.INITIALIZED
+        return self.return_code(dtig_code.SUCCESS)
+    
+    def dtig_engine_initialize(self, message):
+        if not message.HasField("model_name"):
+            return self.return_code(dtig_code.INVALID_OPTION, f'No model provided')
+    
+        self.model_name = message.model_name.value
+        try:
+            self.app = FreeCAD.open(self.model_name)
+    
+            logger.info(f'Running with file: {self.model_name}')
+    
+            # Check if an analysis object already exists
+            create_solver = True
+            create_analysis = True
+            for obj in self.app.Objects:
+                if obj.isDerivedFrom('Fem::FemAnalysis'):
+                    logger.info("Using existing analysis")
+                    self.analysis_object = obj
+                    create_analysis = False
+                elif obj.isDerivedFrom('Fem::FemSolverObjectPython'):
+                    self.solver = obj
+                    create_solver = False
+    
+            # Otherwise, create a new one
+            if create_analysis:
+                logger.info("Adding new analysis")
+                self.analysis_object = ObjectsFem.makeAnalysis(self.app)
+    
+            if create_solver:
+                logger.info("Adding new solver")
+                self.solver = ObjectsFem.makeSolverCalculixCcxTools(self.app)
+    
+            self.solver.GeometricalNonlinearity = 'linear'
+            self.solver.ThermoMechSteadyState = True
+            self.solver.MatrixSolverType = 'default'
+            self.solver.IterationsControlParameterTimeUse = False
+            self.solver.TimeInitialStep = 0.01
+            self.solver.TimeEnd = 1
+    
+            if create_solver:
+                self.analysis_object.addObject(self.solver)
+    
+            self.mesh_object = self.get_object("MainMesh")
+            if not self.mesh_object:
+                logger.info("No MainMesh found, adding a new one")
+                self.mesh_object = ObjectsFem.makeMeshGmsh(self.app, "MainMesh")
+    
+                mesh_part = self.get_object("MainBody")
+                if not mesh_part:
+                    return self.return_code(dtig_code.INVALID_OPTION, f'Could not find part: {"MainBody"}')
+    
+                self.mesh_object.Part = mesh_part
+    
+            # Here we just compute the mesh using the desired algorithm
+            from femmesh.gmshtools import GmshTools
+    
+            logger.info("Computing mesh")
+            gmsh_mesh = GmshTools(self.mesh_object)
+            error = gmsh_mesh.create_mesh()
+            if error:
+                return dtig_return.MReturnValue(code=dtig_code.FAILURE, message=f'GMESH error: {error}')
+    
+            self.analysis_object.addObject(self.mesh_object)
+            self.app.save()
+    
+        except Exception as e:
+            return self.return_code(dtig_code.FAILURE, f'{e}')
+    
+        return self.return_code(dtig_code.SUCCESS)
+    
+    def dtig_model_info(self):
+        if self.state == dtig_state.UNINITIALIZED:
+            return self.return_code(dtig_code.INVALID_STATE, f'Cannot get model info in state {dtig_state.EState.Name(self.state)}')
+    
+        return self.dtig_engine_model_info()
+    
+    def dtig_engine_model_info(self):
+        return_value = self.return_code(dtig_code.SUCCESS)
+    
+        # Inputs
+        # force =================================
+        info_force = dtig_info.MInfo()
+        info_force.id.value = 0
+        info_force.name.value = f"force"
+        info_force.description.value = f"Force acting on the beam"
+        info_force.type.value = f"float64"
+        info_force.unit.value = f"N.m"
+        info_force.namespace.value = f"InteractionRoot"
+        return_value.model_info.inputs.append(info_force)
+    
+    
+        # Outputs
+        # Mesh =================================
+        info_Mesh = dtig_info.MInfo()
+        info_Mesh.id.value = 0
+        info_Mesh.name.value = f"Mesh"
+        info_Mesh.description.value = f"Resulting mesh after applying forces on the beam"
+        info_Mesh.type.value = f"mesh"
+        info_Mesh.namespace.value = f"InteractionRoot"
+        info_Mesh.default.value = f"Result.obj"
+        return_value.model_info.outputs.append(info_Mesh)
+    
+        # vonMises =================================
+        info_vonMises = dtig_info.MInfo()
+        info_vonMises.id.value = 1
+        info_vonMises.name.value = f"vonMises"
+        info_vonMises.description.value = f"Maximum von Mises stress"
+        info_vonMises.type.value = f"float64"
+        info_vonMises.namespace.value = f"InteractionRoot"
+        return_value.model_info.outputs.append(info_vonMises)
+    
+        # DisplacementLengths =================================
+        info_DisplacementLengths = dtig_info.MInfo()
+        info_DisplacementLengths.id.value = 2
+        info_DisplacementLengths.name.value = f"DisplacementLengths"
+        info_DisplacementLengths.description.value = f"Maximum displacement"
+        info_DisplacementLengths.type.value = f"float64"
+        info_DisplacementLengths.namespace.value = f"InteractionRoot"
+        return_value.model_info.outputs.append(info_DisplacementLengths)
+    
+    
+        # Parameters
+        # Material =================================
+        info_Material = dtig_info.MInfo()
+        info_Material.id.value = 0
+        info_Material.name.value = f"Material"
+        info_Material.description.value = f"Material of the beam"
+        info_Material.type.value = f"material"
+        info_Material.namespace.value = f"InteractionRoot.Parameters"
+        default_value = {'state': 'solid', 'name': 'Aluminium-Generic', 'youngs_modulus': '70 GPa', 'poisson_ratio': '0.350', 'density': '2700 kg/m^3'}
+        if f"material" in default_value:
+            info_Material.default.material = default_value[f"material"]
+        if f"state" in default_value:
+            info_Material.default.state = default_value[f"state"]
+        if f"name" in default_value:
+            info_Material.default.name = default_value[f"name"]
+        if f"youngs_modulus" in default_value:
+            info_Material.default.youngs_modulus = default_value[f"youngs_modulus"]
+        if f"poisson_ratio" in default_value:
+            info_Material.default.poisson_ratio = default_value[f"poisson_ratio"]
+        if f"density" in default_value:
+            info_Material.default.density = default_value[f"density"]
+        return_value.model_info.parameters.append(info_Material)
+    
+        # fixed =================================
+        info_fixed = dtig_info.MInfo()
+        info_fixed.id.value = 1
+        info_fixed.name.value = f"fixed"
+        info_fixed.description.value = f"Fixed constraint of the beam"
+        info_fixed.type.value = f"fixture"
+        info_fixed.namespace.value = f"InteractionRoot.Parameters"
+        default_value = {'object': 'Box', 'reference': 'Face1'}
+        if f"object" in default_value:
+            info_fixed.default.object = default_value[f"object"]
+        if f"magnitude" in default_value:
+            info_fixed.default.magnitude = default_value[f"magnitude"]
+        if f"reference" in default_value:
+            info_fixed.default.reference = default_value[f"reference"]
+        if f"direction" in default_value:
+            info_fixed.default.direction = default_value[f"direction"]
+        return_value.model_info.parameters.append(info_fixed)
+    
+        return return_value
+    
+    def dtig_get_status(self):
+        return self.dtig_engine_get_status()
+    
+    def dtig_engine_get_status(self):
+        return_value = dtig_return.MReturnValue(code=dtig_code.SUCCESS)
+        return_value.status.state = self.state
+        return return_value
+    
+    def dtig_set_parameter(self, message):
+        if self.state == dtig_state.UNINITIALIZED:
+            return self.return_code(dtig_code.INVALID_STATE, f'Cannot set parameter in state {dtig_state.EState.Name(self.state)}')
+    
+        if len(message.parameters.values) != len(message.parameters.identifiers):
+            return self.return_code(dtig_code.INVALID_OPTION, f'Got {len(message.parameters.values)} values for {len(message.parameters.identifiers)} parameters')
+    
+        # Only the model knows the types, unpacking must be a responsibility of the callback function
+        # All the values are given at once, so the engine can set them together
+        return self.dtig_engine_set_parameter(message.parameters.identifiers, message.parameters.values)
+    
+    def dtig_engine_set_parameter(self, references, any_values):
+        for reference, any_value in zip(references, any_values):
+            handler = self.parameter_setters.get(reference)
+            if handler is None:
+                return self.return_code(dtig_code.UNKNOWN_OPTION, f"Unknown parameter: {reference}")
+    
+            message, set_value = handler
+            value = message()
+            if not any_value.Unpack(value):
+                return self.return_code(dtig_code.FAILURE, f"Failed to unpack value: {reference}")
+    
+            ret = set_value(reference, value)
+            if ret.code != dtig_code.SUCCESS:
+                return ret
+    
+        return self.return_code(dtig_code.SUCCESS)
+    
+    def dtig_get_parameter(self, message):
+        if self.state == dtig_state.UNINITIALIZED:
+            return self.return_code(dtig_code.INVALID_STATE, f'Cannot get parameter in state {dtig_state.EState.Name(self.state)}')
+    
+        ids_length = len(message.parameters.identifiers)
+        return_message = self.dtig_engine_get_parameter(message.parameters.identifiers)
+        if len(return_message.values.identifiers) != ids_length and return_message.code == dtig_code.SUCCESS:
+            return_message.code = dtig_code.FAILURE
+            return_message.error_message.value = 'Failed to get all parameters'
+    
+        return return_message
+    
+    def dtig_engine_get_parameter(self, references):
+        return_message = self.return_code(dtig_code.SUCCESS)
+    
+        for reference in references:
+            handler = self.parameter_getters.get(reference)
+            if handler is None:
+                return self.return_code(dtig_code.UNKNOWN_OPTION, f"Unknown parameter: {reference}")
+    
+            message, get_value = handler
+            any_value = message()
+            error = get_value(reference, any_value)
+            if error is not None:
+                return error
+    
+            any_msg = any_pb2.Any()
+            any_msg.Pack(any_value)
+            return_message.values.identifiers.append(reference)
+            return_message.values.values.append(any_msg)
+    
+        return return_message
+
+argument_parser = argparse.ArgumentParser(description='FreeCADWrapper sever')
+argument_parser.add_argument('--host', action="store", dest="host", help='Server hostname/ip', type=str, default="127.0.0.1")
+argument_parser.add_argument('--port', action="store", dest="port", help='Server port', type=int, default=8080)
+argument_parser.add_argument('--log-level', action="store", dest="log_level", help='Log level, from 0 (errors) to 4 (trace)', type=int, default=2)
+argument_parser.add_argument('--log-rate', action="store", dest="log_rate", help='Minimum seconds between logs of the same call site', type=float, default=LOG_RATE_LIMIT)
+args = argument_parser.parse_args()
+
+if __name__ == "__main__":
+    start_logger(args.log_level, args.log_rate)
+
+    if args.host:
+        HOST = args.host
+    if args.port:
+        PORT = args.port
+
+    wrapper = FreeCADWrapper()
+    wrapper.dtig_run()
\ No newline at end of file
@@ -0,0 +1,641 @@
+% Clear the prompt
+clc;
+clear server;
+
+% Include jar paths
+javaaddpath('./');
+javaaddpath('./build');
+
+% import states
+import Status.*;
+
+% Define global variables
+global status modelName;
+global startTime stopTime stepSize simulationTime;
+
+startTime = 0.0;
+stopTime = 0.0;
+stepSize = 0.001;
+
+status = Status;
+status.wait = true;
+status.state = dtig.EState.UNINITIALIZED;
+status.mode = dtig.ERunMode.UNKNOWN;
+
+% Inputs
+global v;
+v = 0.0;
+
+
+% Outputs
+global force;
+
+
+% Parameters
+global floor;
+floor = 0.0;
+global mass;
+mass = 50;
+global v0;
+v0 = 0.0;
+
+
+% ======================================================================
+% Main
+% ======================================================================
+server = tcpserver("127.0.0.1", 8083, "ConnectionChangedFcn", @connectionFcn);
+
+configureCallback(server, "byte", 4, @readByteFcn);
+
+try
+  disp("Server is running");
+
+  disp("Waiting for initialization");
+  if waitForState([dtig.EState.INITIALIZED])
+    while status.state ~= dtig.EState.STOPPED
+      dtigRunModel();
+      waitForState([dtig.EState.IDLE]);
+      disp("Model done");
+    end
+  end
+catch exception
+  disp(getReport(exception));
+end
+
+disp("Server stopped");
+clear server;
+
+% ======================================================================
+% Functions
+% ======================================================================
+function dtigRunModel()
+  global status;
+  global startTime stopTime stepSize;
+
+  % Initial values
+  global floor;
+  global mass;
+  global v0;
+
+  global v;
+
+  global force;
+
+  disp("Waiting for start");
+  if ~waitForState([dtig.EState.WAITING, dtig.EState.RUNNING])
+    return;
+  end
+
+  fprintf("Starting with: %s\n", string(status.state));
+  fprintf("Running from %.4f to %.4f with step size %.4f\n", startTime, stopTime, stepSize);
+
+  force = force_calculator_script(v, v0, mass, stepSize);
+  v0 = v;
+  if status.state ~= dtig.EState.STOPPED
+    status.state = dtig.EState.IDLE;
+  end
+end
+
+function connectionFcn(src, ~)
+  if src.Connected
+    disp("Client has connected")
+  else
+    disp("Client has disconnected.")
+  end
+end
+
+function readByteFcn(src, ~)
+  % Every message is preceded by its length as a 4 byte big endian integer
+  % Several messages may already be available, they are handled one by one
+  while src.NumBytesAvailable >= 4
+    header = uint8(read(src, 4, "uint8"));
+    messageSize = double(swapbytes(typecast(header, "uint32")));
+
+    % Read data and process it as a protobuf object
+    data = read(src, messageSize, "int8");
+    message = dtig.Helpers.parseFrom(data);
+    try
+      returnValue = dtigHandleMessage(message);
+    catch exception
+      disp(getReport(exception));
+      returnValue = createReturn(dtig.EReturnCode.FAILURE, "Exception when handling message");
+    end
+
+    % Send the reply with its length first
+    reply = dtig.Helpers.toByteArray(returnValue);
+    write(src, typecast(swapbytes(uint32(numel(reply))), "uint8"), "uint8");
+    write(src, reply, "int8");
+  end
+end
+
+function message = createReturn(code, errorMessage)
+  message = dtig.MReturnValue.newBuilder();
+  message.setCode(code);
+  if (nargin == 2)
+    message.setErrorMessage(dtig.MString.newBuilder().setValue(errorMessage));
+  end
+end
+
+function returnValue = waitForState(expectedStates)
+  global status;
+
+  while ~ismember(string(status.state), string([expectedStates, dtig.EState.STOPPED]))
+    waitfor(status, "wait", false);
+    status.wait = true;
+  end
+
+   returnValue = status.state ~= dtig.EState.STOPPED;
+end
+
+function returnValue = dtigHandleMessage(message)
+  % Handlers of the commands, by the name of their field in the message
+  persistent handlers;
+  if isempty(handlers)
+    handlers = containers.Map( ...
+      {'stop', 'start', 'set_input', 'get_output', 'advance', 'initialize', 'set_parameter', 'get_parameter', 'get_status', 'model_info'}, ...
+      {@(m) dtigStop(m.getStop()), ...
+       @(m) dtigStart(m.getStart()), ...
+       @(m) dtigSetInput(m.getSetInput()), ...
+       @(m) dtigGetOutput(m.getGetOutput()), ...
+       @(m) dtigAdvance(m.getAdvance()), ...
+       @(m) dtigInitialize(m.getInitialize()), ...
+       @(m) dtigSetParameter(m.getSetParameter()), ...
+       @(m) dtigGetParameter(m.getGetParameter()), ...
+       @(m) dtigGetStatus(), ...
+       @(m) dtigModelInfo()});
+  end
+
+  command = char(dtig.Helpers.command(message));
+  if ~isKey(handlers, command)
+    returnValue = createReturn(dtig.EReturnCode.UNKNOWN_COMMAND, "Unknown command");
+    return
+  end
+
+  handler = handlers(command);
+  returnValue = handler(message);
+end
+function returnValue = dtigStop(message)
+  global status;
+
+  try
+    returnValue = dtigEngineStop(message);
+    if returnValue.getCode() ~= dtig.EReturnCode.SUCCESS
+      return
+    end
+  catch exception
+    returnValue = createReturn(dtig.EReturnCode.FAILURE, "Exception when trying to stop, stopping anyway");
+  end
+
+  status.state = dtig.EState.STOPPED;
+  status.wait = false;
+end
+
+function returnValue = dtigEngineStop(~)
+  returnValue = createReturn(dtig.EReturnCode.SUCCESS);
+end
+
+function returnValue = dtigStart(message)
+  global status;
+  % If the model was not yet initialized, we cannot start
+  if (status.state == dtig.EState.UNINITIALIZED)
+    returnValue = createReturn(dtig.EReturnCode.INVALID_STATE, "Cannot start while UNINITIALIZED");
+    return;
+  end
+
+  returnValue = dtigEngineStart(message);
+end
+
+function returnValue = dtigEngineStart(message)
+  global status;
+  global startTime stopTime stepSize;
+
+  if message.hasStartTime()
+    startTime = message.getStartTime().getValue();
+  end
+
+  if message.hasStopTime()
+    stopTime = message.getStopTime().getValue();
+  end
+
+  if message.hasStepSize()
+    stepSize = message.getStepSize().getStep();
+  end
+
+  % For now, we accept either continuous or stepped simulation
+  status.mode = message.getRunMode();
+  if status.mode == dtig.ERunMode.STEPPED
+    status.state = dtig.EState.WAITING;
+  else
+    status.state = dtig.EState.RUNNING;
+  end
+  status.wait = false;
+
+  returnValue = createReturn(dtig.EReturnCode.SUCCESS);
+end
+
+function returnValue = dtigSetInput(message)
+  global status;
+  if (status.state == dtig.EState.UNINITIALIZED)
+    returnValue = createReturn(dtig.EReturnCode.INVALID_STATE, "Cannot set input while UNINITIALIZED");
+    return
+  end
+
+  returnValue = createReturn(dtig.EReturnCode.SUCCESS);
+  nIds = message.getInputs().getIdentifiersCount() - 1;
+  for i = 0:nIds
+    identifier = string(message.getInputs().getIdentifiers(i));
+    anyValue = message.getInputs().getValues(i);
+    returnValue = dtigEngineSetInput(identifier, anyValue);
+    if returnValue.getCode() ~= dtig.EReturnCode.SUCCESS
+      return;
+    end
+  end
+end
+
+function returnValue = dtigEngineSetInput(reference, anyValue)
+
+  global v;
+
+  % Check that the reference is valid
+  value = dtig.Helpers.unpack(anyValue);
+  if isempty(value)
+    returnValue = createReturn(dtig.EReturnCode.FAILURE, strcat("Failed to unpack value: ", reference));
+    return;
+  end
+
+
+  if string(reference) == "v"
+    v = value.getValue();
+  else
+    returnValue = createReturn(dtig.EReturnCode.UNKNOWN_OPTION, strcat("Unknown input: ", reference));
+    return;
+  end
+
+  returnValue = createReturn(dtig.EReturnCode.SUCCESS);
+end
+
+function returnValue = dtigGetOutput(message)
+  global status;
+  if (status.state == dtig.EState.UNINITIALIZED)
+    returnValue = createReturn(dtig.EReturnCode.INVALID_STATE, "Cannot get output while UNINITIALIZED");
+    return;
+  end
+
+  nIds = message.getOutputs().getIdentifiersCount();
+  returnValue = dtigEngineGetOutput(message.getOutputs().getIdentifiersList());
+  if returnValue.getValues().getIdentifiersCount() ~= nIds && returnValue.getCode() == dtig.EReturnCode.SUCCESS
+    returnValue.setCode(dtig.EReturnCode.FAILURE);
+    returnValue.setErrorMessage("Failed to get all parameters");
+  end
+end
+
+function returnValue = dtigEngineGetOutput(references)
+
+  global force;
+
+  dtigOutputs = dtig.MValues.newBuilder();
+  nIds = references.size() - 1;
+
+  returnValue = createReturn(dtig.EReturnCode.SUCCESS);
+  for i = 0:nIds
+    reference = references.get(i);
+    dtigOutputs.addIdentifiers(reference);
+
+    if string(reference) == "force"
+      anyValue = dtig.MF64.newBuilder().setValue(force);
+    else
+      returnValue = createReturn(dtig.EReturnCode.UNKNOWN_OPTION, strcat("Unknown input: ", reference));
+      return;
+    end
+
+    dtigOutputs.addValues(dtig.Helpers.pack(anyValue));
+  end
+
+  returnValue.setValues(dtigOutputs);
+end
+
+function returnValue = dtigAdvance(message)
+  global status;
+  if status.mode ~= dtig.ERunMode.STEPPED
+    returnValue = createReturn(dtig.EReturnCode.INVALID_STATE, 'Cannot advance, not in STEPPING mode');
+    return;
+  end
+
+  if status.state ~= dtig.EState.WAITING
+    returnValue = createReturn(dtig.EReturnCode.INVALID_STATE, 'Cannot advance, still running');
+    return;
+  end
+
+  returnValue = dtigEngineAdvance(message);
+end
+
+function returnValue = dtigEngineAdvance(message)
+  global status;
+  global stepSize;
+  if message.hasStepSize()
+    stepSize = message.getStepSize().getStep();
+  end
+
+  status.state = dtig.EState.RUNNING;
+  status.wait = false;
+  returnValue = createReturn(dtig.EReturnCode.SUCCESS);
+end
+
+function returnValue = dtigInitialize(message)
+  global status;
+  returnValue = dtigEngineInitialize(message);
+  if (returnValue.getCode() ~= dtig.EReturnCode.SUCCESS)
+    return;
+  end
+
+  status.state = dtig.EState.INITIALIZED;
+  status.wait = false;
+end
+
+function returnValue = dtigEngineInitialize(message)
+  global status;
+  global modelName;
+
+  if message.hasModelName()
+    modelName = string(message.getModelName().getValue());
+    returnValue = createReturn(dtig.EReturnCode.SUCCESS);
+  else
+    returnValue = createReturn(dtig.EReturnCode.INVALID_OPTION, "No model provided");
+  end
+end
+
+function returnValue = dtigModelInfo()
+  returnValue = dtigEngineModelInfo();
+end
+
+function returnValue = dtigEngineModelInfo()
+    returnValue = createReturn(dtig.EReturnCode.SUCCESS);
+
+    dtigModelInfo = dtig.MModelInfo.newBuilder();
+
+    % Inputs
+    info_v = dtig.MInfo.newBuilder();
+
+    info_v...
+      .setId(dtig.MU32.newBuilder()...
+        .setValue(0));
+
+    info_v...
+      .setName(dtig.MString.newBuilder()...
+        .setValue("v"));
+
+    info_v...
+      .setDescription(dtig.MString.newBuilder()...
+        .setValue("Velocity of object"));
+
+    info_v...
+      .setType(dtig.MString.newBuilder()...
+        .setValue("float64"));
+
+    info_v...
+      .setUnit(dtig.MString.newBuilder()...
+        .setValue("m/s"));
+
+    info_v...
+      .setNamespace(dtig.MString.newBuilder()...
+        .setValue("InteractionRoot"));
+
+    info_v...
+      .setDefault(dtig.MString.newBuilder()...
+        .setValue("0.0"));
+
+    dtigModelInfo.addInputs(info_v);
+
+    % Outputs
+    info_force = dtig.MInfo.newBuilder();
+
+    info_force...
+      .setId(dtig.MU32.newBuilder()...
+        .setValue(0));
+
+    info_force...
+      .setName(dtig.MString.newBuilder()...
+        .setValue("force"));
+
+    info_force...
+      .setDescription(dtig.MString.newBuilder()...
+        .setValue("Resulting force"));
+
+    info_force...
+      .setType(dtig.MString.newBuilder()...
+        .setValue("float64"));
+
+    info_force...
+      .setUnit(dtig.MString.newBuilder()...
+        .setValue("N.m"));
+
+    info_force...
+      .setNamespace(dtig.MString.newBuilder()...
+        .setValue("InteractionRoot"));
+
+
+    dtigModelInfo.addOutputs(info_force);
+
+    % Parameters
+    info_floor = dtig.MInfo.newBuilder();
+
+    info_floor...
+      .setId(dtig.MU32.newBuilder()...
+        .setValue(0));
+
+    info_floor...
+      .setName(dtig.MString.newBuilder()...
+        .setValue("floor"));
+
+    info_floor...
+      .setDescription(dtig.MString.newBuilder()...
+        .setValue("Floor height"));
+
+    info_floor...
+      .setType(dtig.MString.newBuilder()...
+        .setValue("float64"));
+
+    info_floor...
+      .setUnit(dtig.MString.newBuilder()...
+        .setValue("m"));
+
+    info_floor...
+      .setNamespace(dtig.MString.newBuilder()...
+        .setValue("InteractionRoot.Parameters"));
+
+    info_floor...
+      .setDefault(dtig.MString.newBuilder()...
+        .setValue("0.0"));
+
+    dtigModelInfo.addParameters(info_floor);
+    info_mass = dtig.MInfo.newBuilder();
+
+    info_mass...
+      .setId(dtig.MU32.newBuilder()...
+        .setValue(1));
+
+    info_mass...
+      .setName(dtig.MString.newBuilder()...
+        .setValue("mass"));
+
+    info_mass...
+      .setDescription(dtig.MString.newBuilder()...
+        .setValue("Mass of the object"));
+
+    info_mass...
+      .setType(dtig.MString.newBuilder()...
+        .setValue("float64"));
+
+    info_mass...
+      .setUnit(dtig.MString.newBuilder()...
+        .setValue("kg"));
+
+    info_mass...
+      .setNamespace(dtig.MString.newBuilder()...
+        .setValue("InteractionRoot.Parameters"));
+
+    info_mass...
+      .setDefault(dtig.MString.newBuilder()...
+        .setValue("50"));
+
+    dtigModelInfo.addParameters(info_mass);
+    info_v0 = dtig.MInfo.newBuilder();
+
+    info_v0...
+      .setId(dtig.MU32.newBuilder()...
+        .setValue(2));
+
+    info_v0...
+      .setName(dtig.MString.newBuilder()...
+        .setValue("v0"));
+
+    info_v0...
+      .setDescription(dtig.MString.newBuilder()...
+        .setValue("Initial velocity"));
+
+    info_v0...
+      .setType(dtig.MString.newBuilder()...
+        .setValue("float64"));
+
+    info_v0...
+      .setUnit(dtig.MString.newBuilder()...
+        .setValue("m/s"));
+
+    info_v0...
+      .setNamespace(dtig.MString.newBuilder()...
+        .setValue("InteractionRoot.Parameters"));
+
+    info_v0...
+      .setDefault(dtig.MString.newBuilder()...
+        .setValue("0.0"));
+
+    dtigModelInfo.addParameters(info_v0);
+
+    returnValue.setModelInfo(dtigModelInfo)
+end
+
+function returnValue = dtigGetStatus()
+  returnValue = dtigEngineGetStatus();
+end
+
+function returnValue = dtigEngineGetStatus()
+  global status
+  returnValue = createReturn(dtig.EReturnCode.SUCCESS);
+  returnValue.setStatus(dtig.MStatus.newBuilder()...
+    .setState(status.state));
+end
+
+function returnValue = dtigSetParameter(message)
+  global status;
+  if (status.state == dtig.EState.UNINITIALIZED)
+    returnValue = createReturn(dtig.EReturnCode.INVALID_STATE, "Cannot set parameter while UNINITIALIZED");
+    return
+  end
+
+  returnValue = createReturn(dtig.EReturnCode.SUCCESS);
+  nIds = message.getParameters().getIdentifiersCount() - 1;
+  for i = 0:nIds
+    identifier = message.getParameters().getIdentifiers(i);
+    anyValue = message.getParameters().getValues(i);
+    returnValue = dtigEngineSetParameter(identifier, anyValue);
+    if returnValue.getCode() ~= dtig.EReturnCode.SUCCESS
+      return;
+    end
+  end
+end
+
+function returnValue = dtigEngineSetParameter(reference, anyValue)
+
+  global floor;
+  global mass;
+  global v0;
+
+  % Check that the reference is valid
+  value = dtig.Helpers.unpack(anyValue);
+  if isempty(value)
+    returnValue = createReturn(dtig.EReturnCode.FAILURE, strcat("Failed to unpack value: ", reference));
+    return;
+  end
+
+
+  if string(reference) == "floor"
+    floor = value.getValue();
+
+  elseif string(reference) == "mass"
+    mass = value.getValue();
+
+  elseif string(reference) == "v0"
+    v0 = value.getValue();
+  else
+    returnValue = createReturn(dtig.EReturnCode.UNKNOWN_OPTION, strcat("Unknown input: ", reference));
+    return;
+  end
+
+  returnValue = createReturn(dtig.EReturnCode.SUCCESS);
+end
+
+function returnValue = dtigGetParameter(message)
+  global status;
+  if (status.state == dtig.EState.UNINITIALIZED)
+    returnValue = createReturn(dtig.EReturnCode.INVALID_STATE, "Cannot get parameter while UNINITIALIZED");
+    return;
+  end
+
+  nIds = message.getParameters().getIdentifiersCount();
+  returnValue = dtigEngineGetParameter(message.getParameters().getIdentifiersList());
+  if returnValue.getValues().getIdentifiersCount() ~= nIds && returnValue.getCode() == dtig.EReturnCode.SUCCESS
+    returnValue.setCode(dtig.EReturnCode.FAILURE);
+    returnValue.setErrorMessage("Failed to get all parameters");
+  end
+end
+
+function returnValue = dtigEngineGetParameter(references)
+
+  global floor;
+  global mass;
+  global v0;
+
+  dtigParameters = dtig.MValues.newBuilder();
+  nIds = references.size() - 1;
+
+  returnValue = createReturn(dtig.EReturnCode.SUCCESS);
+  for i = 0:nIds
+    reference = references.get(i);
+    dtigParameters.addIdentifiers(reference);
+
+    if string(reference) == "floor"
+      anyValue = dtig.MF64.newBuilder().setValue(floor);
+    elseif string(reference) == "mass"
+      anyValue = dtig.MF64.newBuilder().setValue(mass);
+    elseif string(reference) == "v0"
+      anyValue = dtig.MF64.newBuilder().setValue(v0);
+    else
+      returnValue = createReturn(dtig.EReturnCode.UNKNOWN_OPTION, strcat("Unknown input: ", reference));
+      return;
+    end
+
+    dtigParameters.addValues(dtig.Helpers.pack(anyValue));
+  end
+
+  returnValue.setValues(dtigParameters);
+end
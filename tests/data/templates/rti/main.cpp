@@ -0,0 +1,76 @@
+#include "rti_federate.h"
+
+#include <chrono>
+#include <cstring>
+#include <thread>
+
+#include <unistd.h>
+#include <sys/types.h>
+#include <sys/wait.h>
+
+int main(int argc, char *argv[])
+{
+  std::string federateName, fomPath, rtiAddress;
+  std::string port;
+  bool name = false;
+  bool fom = false;
+  bool address = false;
+
+  for (int i = 0; i < argc; i++)
+  {
+    if (strcmp(argv[i], "--name") == 0)
+    {
+        federateName = argv[i + 1];
+        name = true;
+    }
+    else if (strcmp(argv[i], "--fom") == 0)
+    {
+        fom = true;
+        fomPath = argv[i + 1];
+    }
+    else if (strcmp(argv[i], "--host") == 0)
+    {
+        address = true;
+        rtiAddress = argv[i + 1];
+    }
+    else if (strcmp(argv[i], "--port") == 0)
+    {
+      port = argv[i + 1];
+    }
+  }
+
+  int child_status;
+  pid_t childPid = 1; // fork();
+
+  if (childPid > 0)
+  {
+    // Give some time for the server to start
+    // std::this_thread::sleep_for(std::chrono::seconds(1));
+
+    if (name && fom)
+    {
+      if (!address)
+        rtiAddress = "127.0.0.1";
+
+      // create and run the federate
+      auto federate = std::make_shared<HLAFederate>();
+      federate->dtigRun(federateName, fomPath, rtiAddress, std::stoi(port));
+
+      waitpid(childPid, 0, 0);
+    }
+    else
+    {
+      if (!name)
+        std::cout << "No name given" << std::endl;
+      if (!fom)
+        std::cout << "No FOM location given" << std::endl;
+    }
+  }
+  else
+  {
+    std::cout << "Fork failed" << std::endl;
+    return -1;
+  }
+
+  return 0;
+}
\ No newline at end of file
@@ -0,0 +1,731 @@
+#include "rti_federate.h"
+#include <RTI/LogicalTimeInterval.h>
+#include <RTI/RTI1516fedTime.h>
+#include <RTI/RTIambassador.h>
+#include <RTI/RTIambassadorFactory.h>
+
+#include <algorithm>
+#include <locale>
+#include <codecvt>
+#include <memory>
+
+#include <chrono>
+#include <fstream>
+#include <string>
+#include <thread>
+
+#include "rti_ambassador.h"
+
+#include "dtig/dt_message.pb.h"
+#include "dtig/initialize.pb.h"
+#include "dtig/return_code.pb.h"
+#include "dtig/advance.pb.h"
+#include "dtig/start.pb.h"
+#include "dtig/stop.pb.h"
+#include "dtig/state.pb.h"
+#include "dtig/output.pb.h"
+#include "dtig/get_status.pb.h"
+#include "dtig/set_parameter.pb.h"
+#include "dtig/get_parameter.pb.h"
+
+#define MAX_MESSAGE_SIZE (256 * 1024 * 1024)
+
+using namespace std;
+using namespace rti1516;
+
+static const double STEP = 0.005;
+static const double STOP_TIME = 5.0;
+
+
+
+
+HLAFederate::HLAFederate()
+{
+}
+
+HLAFederate::~HLAFederate()
+{
+  if (mClient >= 0)
+    close(mClient);
+}
+
+void HLAFederate::dtigRun(const std::string& federateName, const std::string& fom, const std::string& address, uint32_t port)
+{
+  rti1516::RTIambassadorFactory* factory = new rti1516::RTIambassadorFactory();
+  std::vector<std::wstring> args;
+  args.push_back(L"protocol=rti");
+  args.push_back(L"address=" + convertStringToWstring(address));
+
+  rtiamb = factory->createRTIambassador(args);
+
+  try
+  {
+    rtiamb->createFederationExecution(L"ExampleFederation", convertStringToWstring(fom));
+    std::cout << "Created Federation" << std::endl;
+  }
+  catch (FederationExecutionAlreadyExists exists)
+  {
+    std::cout << "Didn't create federation, it already existed" << std::endl;
+  }
+  catch (ErrorReadingFDD error)
+  {
+    std::wcout << error.what() << std::endl;
+    return;
+  }
+
+  fedamb = std::make_shared<HLAAmbassador>();
+
+  mName = federateName;
+
+  rtiamb->joinFederationExecution(convertStringToWstring(federateName), convertStringToWstring("ExampleFederation"), *fedamb);
+  std::cout << "Joined Federation as " << federateName << std::endl;
+
+  if ((mClient = socket(AF_INET, SOCK_STREAM, 0)) < 0)
+  {
+    std::cout << "Socket creation error" << std::endl;
+    return;
+  }
+
+  mPort = port;
+  struct sockaddr_in serv_addr;
+  serv_addr.sin_family = AF_INET;
+  serv_addr.sin_port = htons(port);
+
+  // Convert IPv4 and IPv6 addresses from text to binary form
+  if (inet_pton(AF_INET, address.c_str(), &serv_addr.sin_addr) <= 0)
+  {
+    std::cout << "Invalid address/ Address not supported" << std::endl;
+    return;
+  }
+
+  std::cout << "Connection to common server at " << address << ":" << port << std::endl;
+  if (connect(mClient, (struct sockaddr*)&serv_addr, sizeof(serv_addr)) < 0)
+  {
+    std::cout << "Connection Failed" << std::endl;
+    return;
+  }
+
+
+  dtig::MDTMessage message;
+  dtig::MInitialize initializeMessage;
+  initializeMessage.mutable_model_name()->set_value("/media/felaze/NotAnExternalDrive/TUe/Graduation/code/InterfaceGenerator/experiments/combined/models/fmi2.fmu");
+  *message.mutable_initialize() = initializeMessage;
+
+  auto initRet = SendMessage(message);
+  if (initRet.code() != dtig::ReturnCode::SUCCESS)
+  {
+    std::cout << "Failed to initialize: " << initRet.error_message().value() << std::endl;
+    return;
+  }
+
+  dtigEngineInitialize();
+
+  rtiamb->registerFederationSynchronizationPoint(convertStringToWstring(READY_TO_RUN), toVariableLengthData(""));
+  std::cout << "SynchronizationPoint registered" << std::endl;
+  while (fedamb->isAnnounced == false)
+  {
+    rtiamb->evokeCallback(12.0);
+  }
+
+  std::cout << "Initialized model. Continue?" << std::endl;
+  waitForUser();
+
+  rtiamb->synchronizationPointAchieved(convertStringToWstring(READY_TO_RUN));
+  std::cout << "Achieved sync point: " << READY_TO_RUN << ", waiting for federation..." << std::endl;
+  while (fedamb->isReadyToRun == false)
+  {
+    rtiamb->evokeCallback(12.0);
+  }
+
+  enableTimePolicy();
+  std::cout << "Time Policy Enabled" << std::endl;
+
+  publishAndSubscribe();
+  std::cout << "Published and Subscribed" << std::endl;
+
+  std::cout << "Starting loop" << std::endl;
+  dtigRunClient();
+
+  std::cout << "Simulation done: " << fedamb->federateTime << std::endl;
+  waitForUser();
+
+  dtig::MDTMessage dtMessage;
+  dtig::MStop stopMessage;
+  stopMessage.set_mode(dtig::Stop::CLEAN);
+  *dtMessage.mutable_stop() = stopMessage;
+
+  auto stopRet = SendMessage(dtMessage);
+  if (stopRet.code() != dtig::ReturnCode::SUCCESS)
+    std::cout << "Failed to start: " << stopRet.error_message().value() << std::endl;
+
+  rtiamb->resignFederationExecution(NO_ACTION);
+  std::cout << "Resigned from Federation" << std::endl;
+
+  try
+  {
+    rtiamb->destroyFederationExecution(L"ExampleFederation");
+    std::cout << "Destroyed Federation" << std::endl;
+  }
+  catch (FederationExecutionDoesNotExist dne)
+  {
+    std::cout << "No need to destroy federation, it doesn't exist" << std::endl;
+  }
+  catch (FederatesCurrentlyJoined fcj)
+  {
+    std::cout << "Didn't destroy federation, federates still joined" << std::endl;
+  }
+}
+bool HLAFederate::dtigRunClient()
+{
+  // Publish all parameters on start up
+  dtigEngineGetParameter();
+
+  dtig::MReturnValue ret;
+
+  dtig::MGetStatus statusValue;
+  dtig::MDTMessage statusMessage;
+  statusValue.set_request(true);
+  *statusMessage.mutable_get_status() = statusValue;
+
+  // Running with a continuous model
+  dtig::MStart startvalue;
+  startvalue.mutable_start_time()->set_value(0.0f);
+  startvalue.mutable_stop_time()->set_value(STOP_TIME);
+  startvalue.mutable_step_size()->set_step(STEP);
+  startvalue.set_run_mode(dtig::Run::STEPPED);
+
+  dtig::MAdvance advanceValue;
+  advanceValue.mutable_step_size()->set_step(STEP);
+
+  dtig::MDTMessage startMessage;
+  *startMessage.mutable_start() = startvalue;
+
+  dtig::MDTMessage advanceMessage;
+  *advanceMessage.mutable_advance() = advanceValue;
+
+  // Start the model
+  ret = SendMessage(startMessage);
+  if (ret.code() != dtig::ReturnCode::SUCCESS)
+  {
+    std::cout << "Stopped: " << ret.error_message().value() << std::endl;
+    return false;
+  }
+
+  std::cout << "Waiting for model to start" << std::endl;
+  do
+  {
+    ret = SendMessage(statusMessage);
+    std::this_thread::sleep_for(std::chrono::milliseconds(5));
+  } while (ret.has_status() &&
+           ret.status().state() != dtig::State::EState::INITIALIZED &&
+           ret.status().state() != dtig::State::EState::RUNNING &&
+           ret.status().state() != dtig::State::EState::WAITING &&
+           ret.status().state() != dtig::State::EState::STOPPED);
+
+
+  while (fedamb->federateTime < STOP_TIME)
+  {
+    ret = SendMessage(advanceMessage);
+    if (ret.code() != dtig::ReturnCode::SUCCESS)
+    {
+      std::cout << "Stopped: " << ret.error_message().value() << std::endl;
+      break;
+    }
+
+    do
+    {
+      // Wait until outputs are ready
+      ret = SendMessage(statusMessage);
+      if (ret.has_status() && ret.status().state() == dtig::State::EState::RUNNING)
+        std::this_thread::sleep_for(std::chrono::milliseconds(5));
+      else
+        break;
+    } while (true);
+
+    // std::cout << "Current status: " << dtig::State::EState_Name(ret.status().state()) << std::endl;
+    dtigEngineGetOutput();
+
+    advanceTime(STEP);
+    std::cout << "Time Advanced to " << fedamb->federateTime << std::endl;
+  }
+
+  return true;
+}
+
+std::wstring HLAFederate::convertStringToWstring(const std::string& str)
+{
+  const std::ctype<wchar_t>& CType = std::use_facet<std::ctype<wchar_t> >(std::locale());
+  std::vector<wchar_t> wideStringBuffer(str.length());
+  CType.widen(str.data(), str.data() + str.length(), &wideStringBuffer[0]);
+  return std::wstring(&wideStringBuffer[0], wideStringBuffer.size());
+}
+
+void HLAFederate::waitForUser()
+{
+  std::cout << ">>>>>>>>>> Press Enter to Continue <<<<<<<<<<" << std::endl;
+  (void)getchar();
+}
+
+void HLAFederate::enableTimePolicy()
+{
+  HLAfloat64Interval lookahead(fedamb->federateLookahead);
+  rtiamb->enableTimeRegulation(lookahead);
+
+  // wait for callback
+  while (fedamb->isRegulating == false)
+  {
+    rtiamb->evokeCallback(12.0);
+  }
+
+  rtiamb->enableTimeConstrained();
+
+  // wait for callback
+  while (fedamb->isConstrained == false)
+  {
+    rtiamb->evokeCallback(12.0);
+  }
+}
+
+void HLAFederate::publishAndSubscribe()
+{
+  fedamb->interactionReceived = [this](rti1516::InteractionClassHandle theInteraction, const rti1516::ParameterHandleValueMap& theParameterValues) {
+    InteractionReceived(theInteraction, theParameterValues);
+  };
+
+  dtigEngineSubscribe();
+  dtigEnginePublish();
+}
+
+rti1516::VariableLengthData HLAFederate::toVariableLengthData(const char* s)
+{
+  return toData(s);
+}
+
+void HLAFederate::advanceTime(double timestep)
+{
+  /// request the advance
+  fedamb->isAdvancing = true;
+  RTI1516fedTime newTime = (fedamb->federateTime + timestep);
+  rtiamb->timeAdvanceRequest(newTime);
+
+  /// wait for the time advance to be granted. ticking will tell the
+  /// LRC to start delivering callbacks to the federate
+  while (fedamb->isAdvancing)
+  {
+    rtiamb->evokeCallback(12.0);
+  }
+}
+
+bool HLAFederate::SendAll(const char* data, size_t size)
+{
+  while (size > 0)
+  {
+    auto sent = send(mClient, data, size, 0);
+    if (sent <= 0)
+      return false;
+
+    data += sent;
+    size -= sent;
+  }
+
+  return true;
+}
+
+bool HLAFederate::ReadAll(char* data, size_t size)
+{
+  while (size > 0)
+  {
+    auto bytesRead = read(mClient, data, size);
+    if (bytesRead <= 0)
+      return false;
+
+    data += bytesRead;
+    size -= bytesRead;
+  }
+
+  return true;
+}
+
+dtig::MReturnValue HLAFederate::SendMessage(const google::protobuf::Message& message)
+{
+  dtig::MReturnValue result;
+
+  // Every message is preceded by its length as a 4 byte big endian integer
+  uint32_t header = 0;
+  std::string toSend(sizeof(header), '\0');
+  message.AppendToString(&toSend);
+
+  header = htonl(static_cast<uint32_t>(toSend.size() - sizeof(header)));
+  toSend.replace(0, sizeof(header), reinterpret_cast<const char*>(&header), sizeof(header));
+
+  if (!SendAll(toSend.data(), toSend.size()) || !ReadAll(reinterpret_cast<char*>(&header), sizeof(header)))
+  {
+    result.set_code(dtig::ReturnCode::INVALID_STATE);
+    result.mutable_error_message()->set_value("Server disconnected");
+    return result;
+  }
+
+  uint32_t size = ntohl(header);
+  if (size > MAX_MESSAGE_SIZE)
+  {
+    result.set_code(dtig::ReturnCode::FAILURE);
+    result.mutable_error_message()->set_value("Response is too large");
+    return result;
+  }
+
+  // The buffer is reused for every response, it only grows when a larger one arrives
+  if (size > mBuffer.size())
+    mBuffer.resize(size);
+
+  if (!ReadAll(mBuffer.data(), size))
+  {
+    result.set_code(dtig::ReturnCode::INVALID_STATE);
+    result.mutable_error_message()->set_value("Server disconnected");
+    return result;
+  }
+
+  if (!result.ParseFromArray(mBuffer.data(), size))
+  {
+    result.set_code(dtig::ReturnCode::FAILURE);
+    result.mutable_error_message()->set_value("Failed to parse response");
+    return result;
+  }
+
+  return result;
+}
+
+void HLAFederate::InteractionReceived(rti1516::InteractionClassHandle interaction, const rti1516::ParameterHandleValueMap& values)
+{
+  auto handler = mInteractionHandlers.find(interaction);
+  if (handler != mInteractionHandlers.end())
+    handler->second(values);
+}
+
+// ===================================================
+// SET_INPUT callback
+void HLAFederate::dtigEngineSetInput(const rti1516::InteractionClassHandle& interaction, const rti1516::ParameterHandleValueMap& parameterValues)
+{
+  return;
+}
+
+
+
+// ===================================================
+// GET_OUTPUT callback
+void HLAFederate::dtigEngineGetOutput()
+{
+  dtig::MOutput outputMessage;
+  *outputMessage.mutable_outputs()->add_identifiers() = "h";
+  *outputMessage.mutable_outputs()->add_identifiers() = "v";
+
+  dtig::MDTMessage message;
+  *message.mutable_get_output() = outputMessage;
+  dtig::MReturnValue ret = SendMessage(message);
+  if (ret.code() != dtig::ReturnCode::SUCCESS)
+  {
+    std::cout << "Failed to get outputs: " << ret.error_message().value() << std::endl;
+    return;
+  }
+
+  ParameterHandleValueMap paramh = OutputFromh(ret.values().values(0));
+  rtiamb->sendInteraction(mOh, paramh, toVariableLengthData(mName.c_str()));
+
+  ParameterHandleValueMap paramv = OutputFromv(ret.values().values(1));
+  rtiamb->sendInteraction(mOv, paramv, toVariableLengthData(mName.c_str()));
+}
+
+// Update the output h:
+rti1516::ParameterHandleValueMap HLAFederate::OutputFromh(const google::protobuf::Any& anyMessage)
+{
+  ParameterHandleValueMap toWrite;
+
+  dtig::MF64 message;
+  if (!anyMessage.UnpackTo(&message))
+  {
+    std::cout << "Failed to unpack output: h" << std::endl;
+    return toWrite;
+  }
+
+  double tmpvalue = message.value();
+  toWrite[mOsh.at("value")] = toData<double>(&tmpvalue);
+
+  return toWrite;
+}
+// Update the output v:
+rti1516::ParameterHandleValueMap HLAFederate::OutputFromv(const google::protobuf::Any& anyMessage)
+{
+  ParameterHandleValueMap toWrite;
+
+  dtig::MF64 message;
+  if (!anyMessage.UnpackTo(&message))
+  {
+    std::cout << "Failed to unpack output: v" << std::endl;
+    return toWrite;
+  }
+
+  double tmpvalue = message.value();
+  toWrite[mOsv.at("value")] = toData<double>(&tmpvalue);
+
+  return toWrite;
+}
+
+// ===================================================
+// INITIALIZE callback
+void HLAFederate::dtigEngineInitialize()
+{
+  // Parameters
+  try
+  {
+    mPg = rtiamb->getInteractionClassHandle(L"InteractionRoot.Parameters.g");
+    mInteractionHandlers[mPg] = [this](const rti1516::ParameterHandleValueMap& values) { SetParameterg(values); };
+    mPsg.insert({"value", rtiamb->getParameterHandle(mPg, L"value")});
+  }
+  catch (rti1516::NameNotFound e)
+  {
+    std::wcout << "Failed to initialize parameter handle g" << e.what() << std::endl;
+    return;
+  }
+  try
+  {
+    mPe = rtiamb->getInteractionClassHandle(L"InteractionRoot.Parameters.e");
+    mInteractionHandlers[mPe] = [this](const rti1516::ParameterHandleValueMap& values) { SetParametere(values); };
+    mPse.insert({"value", rtiamb->getParameterHandle(mPe, L"value")});
+  }
+  catch (rti1516::NameNotFound e)
+  {
+    std::wcout << "Failed to initialize parameter handle e" << e.what() << std::endl;
+    return;
+  }
+
+  // Inputs
+
+  // Outputs
+  try
+  {
+    mOh = rtiamb->getInteractionClassHandle(L"InteractionRoot.h");
+    mOsh.insert({"value", rtiamb->getParameterHandle(mOh, L"value")});
+  }
+  catch (rti1516::NameNotFound e)
+  {
+    std::wcout << "Failed to initialize output handle h:" << e.what() << std::endl;
+    return;
+  }
+  try
+  {
+    mOv = rtiamb->getInteractionClassHandle(L"InteractionRoot.v");
+    mOsv.insert({"value", rtiamb->getParameterHandle(mOv, L"value")});
+  }
+  catch (rti1516::NameNotFound e)
+  {
+    std::wcout << "Failed to initialize output handle v:" << e.what() << std::endl;
+    return;
+  }
+}
+
+// ===================================================
+// PUBLISH callback
+void HLAFederate::dtigEnginePublish()
+{
+  // Define attributes (parameters) published by this class
+  try
+  {
+    rtiamb->publishInteractionClass(mPg);
+  }
+  catch (rti1516::ObjectClassNotDefined e)
+  {
+    std::wcout << "Publish parameter class is not defined: g" << std::endl;
+    return;
+  }
+  try
+  {
+    rtiamb->publishInteractionClass(mPe);
+  }
+  catch (rti1516::ObjectClassNotDefined e)
+  {
+    std::wcout << "Publish parameter class is not defined: e" << std::endl;
+    return;
+  }
+
+  // Define outputs published by this class
+  try
+  {
+    std::cout << "Setup publisher: h" << std::endl;
+    rtiamb->publishInteractionClass(mOh);
+  }
+  catch (rti1516::InteractionClassNotDefined e)
+  {
+    std::wcout << "Parameter class is not defined: h" << std::endl;
+    return;
+  }
+  try
+  {
+    std::cout << "Setup publisher: v" << std::endl;
+    rtiamb->publishInteractionClass(mOv);
+  }
+  catch (rti1516::InteractionClassNotDefined e)
+  {
+    std::wcout << "Parameter class is not defined: v" << std::endl;
+    return;
+  }
+}
+
+// ===================================================
+// SUBSCRIBE callback
+void HLAFederate::dtigEngineSubscribe()
+{
+  // Define attributes (parameters) to which this class subscribes
+  try
+  {
+    rtiamb->subscribeInteractionClass(mPg);
+  }
+  catch (rti1516::ObjectClassNotDefined e)
+  {
+    std::wcout << "Publish parameter class is not defined: g" << std::endl;
+    return;
+  }
+  try
+  {
+    rtiamb->subscribeInteractionClass(mPe);
+  }
+  catch (rti1516::ObjectClassNotDefined e)
+  {
+    std::wcout << "Publish parameter class is not defined: e" << std::endl;
+    return;
+  }
+  // Define inputs to which this class subscribes
+}
+
+// ===================================================
+// SET_PARAMETER callback
+void HLAFederate::dtigEngineSetParameter(const rti1516::InteractionClassHandle& handler, const rti1516::ParameterHandleValueMap& parameterValues)
+{
+  return;
+}
+
+// Set the attribute (parameter) g:
+void HLAFederate::SetParameterg(const rti1516::ParameterHandleValueMap& attributes)
+{
+  dtig::MF64 anyValue;
+  for (auto it = attributes.begin(); it != attributes.end(); ++it)
+  {
+    std::string item = GetHandleg(it->first);
+    if (item.empty())
+      continue;
+
+    if (item == "value")
+      anyValue.set_value(fromData<double>(it->second));
+    else
+      std::cout << "Unknown handle: " << item << std::endl;
+  }
+
+  dtig::MSetParameter paramMessage;
+  *paramMessage.mutable_parameters()->add_identifiers() = "g";
+  paramMessage.mutable_parameters()->add_values()->PackFrom(anyValue);
+
+  dtig::MDTMessage message;
+  *message.mutable_set_parameter() = paramMessage;
+  dtig::MReturnValue ret = SendMessage(message);
+  if (ret.code() != dtig::ReturnCode::SUCCESS)
+    std::cout << "Failed to set parameters: " << ret.error_message().value() << std::endl;
+}
+
+std::string HLAFederate::GetHandleg(const rti1516::ParameterHandle& handle) const
+{
+  for (auto it = mPsg.begin(); it != mPsg.end(); ++it)
+    if (it->second == handle)
+      return it->first;
+
+  return std::string();
+}
+// Set the attribute (parameter) e:
+void HLAFederate::SetParametere(const rti1516::ParameterHandleValueMap& attributes)
+{
+  dtig::MF64 anyValue;
+  for (auto it = attributes.begin(); it != attributes.end(); ++it)
+  {
+    std::string item = GetHandlee(it->first);
+    if (item.empty())
+      continue;
+
+    if (item == "value")
+      anyValue.set_value(fromData<double>(it->second));
+    else
+      std::cout << "Unknown handle: " << item << std::endl;
+  }
+
+  dtig::MSetParameter paramMessage;
+  *paramMessage.mutable_parameters()->add_identifiers() = "e";
+  paramMessage.mutable_parameters()->add_values()->PackFrom(anyValue);
+
+  dtig::MDTMessage message;
+  *message.mutable_set_parameter() = paramMessage;
+  dtig::MReturnValue ret = SendMessage(message);
+  if (ret.code() != dtig::ReturnCode::SUCCESS)
+    std::cout << "Failed to set parameters: " << ret.error_message().value() << std::endl;
+}
+
+std::string HLAFederate::GetHandlee(const rti1516::ParameterHandle& handle) const
+{
+  for (auto it = mPse.begin(); it != mPse.end(); ++it)
+    if (it->second == handle)
+      return it->first;
+
+  return std::string();
+}
+
+// ===================================================
+// GET_PARAMETER callback
+void HLAFederate::dtigEngineGetParameter()
+{
+  dtig::MGetParameter paramMessage;
+  *paramMessage.mutable_parameters()->add_identifiers() = "g";
+  *paramMessage.mutable_parameters()->add_identifiers() = "e";
+
+  dtig::MDTMessage message;
+  *message.mutable_get_parameter() = paramMessage;
+  dtig::MReturnValue ret = SendMessage(message);
+  if (ret.code() != dtig::ReturnCode::SUCCESS)
+  {
+    std::cout << "Failed to get parameters: " << ret.error_message().value() << std::endl;
+    return;
+  }
+
+  ParameterHandleValueMap paramg = ParameterFromg(ret.values().values(0));
+  rtiamb->sendInteraction(mPg, paramg, toVariableLengthData(mName.c_str()));
+
+  ParameterHandleValueMap parame = ParameterFrome(ret.values().values(1));
+  rtiamb->sendInteraction(mPe, parame, toVariableLengthData(mName.c_str()));
+}
+
+rti1516::ParameterHandleValueMap HLAFederate::ParameterFromg(const google::protobuf::Any& anyMessage)
+{
+  ParameterHandleValueMap toWrite;
+
+  dtig::MF64 message;
+  if (!anyMessage.UnpackTo(&message))
+  {
+    std::cout << "Failed to unpack output: g" << std::endl;
+    return toWrite;
+  }
+
+  double tmpvalue = message.value();
+  toWrite[mPsg.at("value")] = toData<double>(&tmpvalue);
+
+  return toWrite;
+}
+rti1516::ParameterHandleValueMap HLAFederate::ParameterFrome(const google::protobuf::Any& anyMessage)
+{
+  ParameterHandleValueMap toWrite;
+
+  dtig::MF64 message;
+  if (!anyMessage.UnpackTo(&message))
+  {
+    std::cout << "Failed to unpack output: e" << std::endl;
+    return toWrite;
+  }
+
+  double tmpvalue = message.value();
+  toWrite[mPse.at("value")] = toData<double>(&tmpvalue);
+
+  return toWrite;
+}
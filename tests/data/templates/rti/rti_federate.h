@@ -0,0 +1,143 @@
+#pragma once
+#include "rti_ambassador.h"
+#include <RTI/RTIambassador.h>
+
+#include <condition_variable>
+#include <functional>
+#include <map>
+#include <memory>
+#include <mutex>
+#include <vector>
+
+// TODO: This are platform specific
+#include <arpa/inet.h>
+#include <sys/socket.h>
+#include <unistd.h>
+
+#include <google/protobuf/any.h>
+
+#include "dtig/return_value.pb.h"
+
+#define READY_TO_RUN "ReadyToRun"
+
+class HLAFederate
+{
+public:
+  
+  HLAFederate();
+  
+  virtual ~HLAFederate();
+  std::shared_ptr<HLAAmbassador> fedamb;
+  std::auto_ptr<rti1516::RTIambassador> rtiamb;
+  
+  void dtigRun(const std::string& federateName, const std::string& fom, const std::string& address, uint32_t port);
+private:
+  uint16_t mPort;
+  std::string mName;
+  
+  int mClient = -1;
+  std::vector<char> mBuffer = std::vector<char>(64 * 1024);
+  
+  // Parameter handles
+  rti1516::InteractionClassHandle mPg;
+  std::map<std::string, rti1516::ParameterHandle> mPsg;
+  rti1516::InteractionClassHandle mPe;
+  std::map<std::string, rti1516::ParameterHandle> mPse;
+  
+  // Input handles
+  
+  // Output handles
+  rti1516::InteractionClassHandle mOh;
+  std::map<std::string, rti1516::ParameterHandle> mOsh;
+  rti1516::InteractionClassHandle mOv;
+  std::map<std::string, rti1516::ParameterHandle> mOsv;
+  
+  // Setters of the inputs and parameters, by interaction class
+  std::map<rti1516::InteractionClassHandle, std::function<void(const rti1516::ParameterHandleValueMap&)>> mInteractionHandlers;
+  
+  enum class State
+  {
+      IDLE = 0,
+      RUN = 1,
+      STOP = 2
+  } mState;
+  
+  std::mutex mMutex;
+  std::condition_variable mCv;
+  
+  std::wstring convertStringToWstring(const std::string& str);
+  rti1516::VariableLengthData toVariableLengthData(const char* s);
+  
+  // ==============================
+  // Model specific calls
+  void dtigEnginePublish();
+  void dtigEngineSubscribe();
+  void dtigEngineInitialize();
+  void dtigEngineSetParameter(const rti1516::InteractionClassHandle& interaction, const rti1516::ParameterHandleValueMap& parameterValues);
+  void dtigEngineGetParameter();
+  void dtigEngineSetInput(const rti1516::InteractionClassHandle& interaction, const rti1516::ParameterHandleValueMap& parameterValues);
+  void dtigEngineGetOutput();
+  
+  bool dtigRunClient();
+  
+  // ==============================
+  // Generated methods
+  // Parameters
+  void SetParameterg(const rti1516::ParameterHandleValueMap& handles);
+  std::string GetHandleg(const rti1516::ParameterHandle& handle) const;
+  rti1516::ParameterHandleValueMap ParameterFromg(const google::protobuf::Any& anyMessage);
+  void SetParametere(const rti1516::ParameterHandleValueMap& handles);
+  std::string GetHandlee(const rti1516::ParameterHandle& handle) const;
+  rti1516::ParameterHandleValueMap ParameterFrome(const google::protobuf::Any& anyMessage);
+  
+  // Inputs
+  
+  // Outpus
+  rti1516::ParameterHandleValueMap OutputFromh(const google::protobuf::Any& anyMessage);
+  rti1516::ParameterHandleValueMap OutputFromv(const google::protobuf::Any& anyMessage);
+  
+  void InteractionReceived(rti1516::InteractionClassHandle theInteraction, const rti1516::ParameterHandleValueMap& theParameterValues);
+  
+  // ==============================
+  // Common calls
+  void waitForUser();
+  void enableTimePolicy();
+  void publishAndSubscribe();
+  void sendInteraction();
+  void advanceTime(double timestep);
+  
+  bool SendAll(const char* data, size_t size);
+  bool ReadAll(char* data, size_t size);
+  dtig::MReturnValue SendMessage(const google::protobuf::Message& message);
+  
+  
+  template<typename T>
+  rti1516::VariableLengthData toData(const T* s)
+  {
+      rti1516::VariableLengthData variableLengthData;
+      if (s)
+        variableLengthData.setData(s, sizeof(T));
+    
+      return variableLengthData;
+  }
+  
+  rti1516::VariableLengthData toData(std::string* s)
+  {
+      rti1516::VariableLengthData variableLengthData;
+      if (s)
+        variableLengthData.setData(s->c_str(), s->size());
+    
+      return variableLengthData;
+  }
+  
+  template<typename T>
+  T fromData(rti1516::VariableLengthData data)
+  {
+      return *(T*)data.data();
+  }
+  
+  std::string fromData(rti1516::VariableLengthData data)
+  {
+      return std::string((char*)data.data(), data.size());
+  }
+};
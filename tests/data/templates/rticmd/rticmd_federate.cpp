@@ -0,0 +1,1222 @@
+#include "rticmd_federate.h"
+#include <RTI/LogicalTimeInterval.h>
+#include <RTI/RTI1516fedTime.h>
+#include <RTI/RTIambassador.h>
+#include <RTI/RTIambassadorFactory.h>
+
+#include <algorithm>
+#include <locale>
+#include <codecvt>
+#include <memory>
+
+#include <chrono>
+#include <fstream>
+#include <string>
+#include <thread>
+
+#include "rticmd_ambassador.h"
+
+#include "dtig/dt_message.pb.h"
+#include "dtig/initialize.pb.h"
+#include "dtig/return_code.pb.h"
+#include "dtig/advance.pb.h"
+#include "dtig/start.pb.h"
+#include "dtig/stop.pb.h"
+#include "dtig/state.pb.h"
+#include "dtig/output.pb.h"
+#include "dtig/get_status.pb.h"
+#include "dtig/set_parameter.pb.h"
+#include "dtig/get_parameter.pb.h"
+
+#define MAX_MESSAGE_SIZE (256 * 1024 * 1024)
+
+using namespace std;
+using namespace rti1516;
+
+static const double STEP = 0.005;
+static const double STOP_TIME = 5.0;
+
+
+
+
+HLAFederate::HLAFederate()
+{
+}
+
+HLAFederate::~HLAFederate()
+{
+  if (mClient >= 0)
+    close(mClient);
+}
+
+void HLAFederate::dtigRun(const std::string& federateName, const std::string& fom, const std::string& address, uint32_t port)
+{
+  rti1516::RTIambassadorFactory* factory = new rti1516::RTIambassadorFactory();
+  std::vector<std::wstring> args;
+  args.push_back(L"protocol=rti");
+  args.push_back(L"address=" + convertStringToWstring(address));
+
+  rtiamb = factory->createRTIambassador(args);
+
+  try
+  {
+    rtiamb->createFederationExecution(L"ExampleFederation", convertStringToWstring(fom));
+    std::cout << "Created Federation" << std::endl;
+  }
+  catch (FederationExecutionAlreadyExists exists)
+  {
+    std::cout << "Didn't create federation, it already existed" << std::endl;
+  }
+  catch (ErrorReadingFDD error)
+  {
+    std::wcout << error.what() << std::endl;
+    return;
+  }
+
+  fedamb = std::make_shared<HLAAmbassador>();
+
+  mName = federateName;
+
+  rtiamb->joinFederationExecution(convertStringToWstring(federateName), convertStringToWstring("ExampleFederation"), *fedamb);
+  std::cout << "Joined Federation as " << federateName << std::endl;
+
+  if ((mClient = socket(AF_INET, SOCK_STREAM, 0)) < 0)
+  {
+    std::cout << "Socket creation error" << std::endl;
+    return;
+  }
+
+  mPort = port;
+
+  dtigEngineInitialize();
+
+  rtiamb->registerFederationSynchronizationPoint(convertStringToWstring(READY_TO_RUN), toVariableLengthData(""));
+  std::cout << "SynchronizationPoint registered" << std::endl;
+  while (fedamb->isAnnounced == false)
+  {
+    rtiamb->evokeCallback(12.0);
+  }
+
+  std::cout << "Initialized model. Continue?" << std::endl;
+  waitForUser();
+
+  rtiamb->synchronizationPointAchieved(convertStringToWstring(READY_TO_RUN));
+  std::cout << "Achieved sync point: " << READY_TO_RUN << ", waiting for federation..." << std::endl;
+  while (fedamb->isReadyToRun == false)
+  {
+    rtiamb->evokeCallback(12.0);
+  }
+
+  enableTimePolicy();
+  std::cout << "Time Policy Enabled" << std::endl;
+
+  publishAndSubscribe();
+  std::cout << "Published and Subscribed" << std::endl;
+
+  std::cout << "Starting loop" << std::endl;
+  dtigRunClient();
+
+  std::cout << "Simulation done: " << fedamb->federateTime << std::endl;
+  if (mThread.joinable())
+    mThread.join();
+
+  rtiamb->resignFederationExecution(NO_ACTION);
+  std::cout << "Resigned from Federation" << std::endl;
+
+  try
+  {
+    rtiamb->destroyFederationExecution(L"ExampleFederation");
+    std::cout << "Destroyed Federation" << std::endl;
+  }
+  catch (FederationExecutionDoesNotExist dne)
+  {
+    std::cout << "No need to destroy federation, it doesn't exist" << std::endl;
+  }
+  catch (FederatesCurrentlyJoined fcj)
+  {
+    std::cout << "Didn't destroy federation, federates still joined" << std::endl;
+  }
+}
+bool HLAFederate::dtigRunClient()
+{
+  mThread = std::thread([this] { RunMenu(); });
+
+  while (fedamb->federateTime < STOP_TIME && mRun)
+  {
+    std::this_thread::sleep_for(std::chrono::duration<double>(STEP));
+    advanceTime(STEP);
+  }
+
+  return true;
+}
+
+std::wstring HLAFederate::convertStringToWstring(const std::string& str)
+{
+  const std::ctype<wchar_t>& CType = std::use_facet<std::ctype<wchar_t> >(std::locale());
+  std::vector<wchar_t> wideStringBuffer(str.length());
+  CType.widen(str.data(), str.data() + str.length(), &wideStringBuffer[0]);
+  return std::wstring(&wideStringBuffer[0], wideStringBuffer.size());
+}
+
+void HLAFederate::waitForUser()
+{
+  std::cout << ">>>>>>>>>> Press Enter to Continue <<<<<<<<<<" << std::endl;
+  (void)getchar();
+}
+
+void HLAFederate::enableTimePolicy()
+{
+  HLAfloat64Interval lookahead(fedamb->federateLookahead);
+  rtiamb->enableTimeRegulation(lookahead);
+
+  // wait for callback
+  while (fedamb->isRegulating == false)
+  {
+    rtiamb->evokeCallback(12.0);
+  }
+
+  rtiamb->enableTimeConstrained();
+
+  // wait for callback
+  while (fedamb->isConstrained == false)
+  {
+    rtiamb->evokeCallback(12.0);
+  }
+}
+
+void HLAFederate::publishAndSubscribe()
+{
+  fedamb->interactionReceived = [this](rti1516::InteractionClassHandle theInteraction, const rti1516::ParameterHandleValueMap& theParameterValues) {
+    InteractionReceived(theInteraction, theParameterValues);
+  };
+
+  dtigEngineSubscribe();
+  dtigEnginePublish();
+}
+
+rti1516::VariableLengthData HLAFederate::toVariableLengthData(const char* s)
+{
+  return toData(s);
+}
+
+void HLAFederate::advanceTime(double timestep)
+{
+  /// request the advance
+  fedamb->isAdvancing = true;
+  RTI1516fedTime newTime = (fedamb->federateTime + timestep);
+  rtiamb->timeAdvanceRequest(newTime);
+
+  /// wait for the time advance to be granted. ticking will tell the
+  /// LRC to start delivering callbacks to the federate
+  while (fedamb->isAdvancing)
+  {
+    rtiamb->evokeCallback(12.0);
+  }
+}
+
+bool HLAFederate::SendAll(const char* data, size_t size)
+{
+  while (size > 0)
+  {
+    auto sent = send(mClient, data, size, 0);
+    if (sent <= 0)
+      return false;
+
+    data += sent;
+    size -= sent;
+  }
+
+  return true;
+}
+
+bool HLAFederate::ReadAll(char* data, size_t size)
+{
+  while (size > 0)
+  {
+    auto bytesRead = read(mClient, data, size);
+    if (bytesRead <= 0)
+      return false;
+
+    data += bytesRead;
+    size -= bytesRead;
+  }
+
+  return true;
+}
+
+dtig::MReturnValue HLAFederate::SendMessage(const google::protobuf::Message& message)
+{
+  dtig::MReturnValue result;
+
+  // Every message is preceded by its length as a 4 byte big endian integer
+  uint32_t header = 0;
+  std::string toSend(sizeof(header), '\0');
+  message.AppendToString(&toSend);
+
+  header = htonl(static_cast<uint32_t>(toSend.size() - sizeof(header)));
+  toSend.replace(0, sizeof(header), reinterpret_cast<const char*>(&header), sizeof(header));
+
+  if (!SendAll(toSend.data(), toSend.size()) || !ReadAll(reinterpret_cast<char*>(&header), sizeof(header)))
+  {
+    result.set_code(dtig::ReturnCode::INVALID_STATE);
+    result.mutable_error_message()->set_value("Server disconnected");
+    return result;
+  }
+
+  uint32_t size = ntohl(header);
+  if (size > MAX_MESSAGE_SIZE)
+  {
+    result.set_code(dtig::ReturnCode::FAILURE);
+    result.mutable_error_message()->set_value("Response is too large");
+    return result;
+  }
+
+  // The buffer is reused for every response, it only grows when a larger one arrives
+  if (size > mBuffer.size())
+    mBuffer.resize(size);
+
+  if (!ReadAll(mBuffer.data(), size))
+  {
+    result.set_code(dtig::ReturnCode::INVALID_STATE);
+    result.mutable_error_message()->set_value("Server disconnected");
+    return result;
+  }
+
+  if (!result.ParseFromArray(mBuffer.data(), size))
+  {
+    result.set_code(dtig::ReturnCode::FAILURE);
+    result.mutable_error_message()->set_value("Failed to parse response");
+    return result;
+  }
+
+  return result;
+}
+
+void HLAFederate::InteractionReceived(rti1516::InteractionClassHandle interaction, const rti1516::ParameterHandleValueMap& values)
+{
+  std::unique_lock<std::mutex> lock(mMutex);
+  auto handler = mInteractionHandlers.find(interaction);
+  if (handler != mInteractionHandlers.end())
+    handler->second(values);
+}
+
+int HLAFederate::PrintMenuAndGetOption()
+{
+  {
+    std::unique_lock<std::mutex> lock(mMutex);
+    std::cout << "Options:" << std::endl;
+    std::cout << "  0 - Stop federate" << std::endl;
+    std::cout << "  1 - Set parameter" << std::endl;
+  }
+
+  int option;
+  std::cin >> option;
+  std::cin.ignore(std::numeric_limits<std::streamsize>::max(), '\n');
+  return option;
+}
+
+void HLAFederate::RunMenu()
+{
+  while (true)
+  {
+    int option = PrintMenuAndGetOption();
+    if (option == 0)
+    {
+      mRun = false;
+      break;
+    }
+    else if (option == 1)
+    {
+      dtigEngineSetParameter();
+    }
+    else
+    {
+      std::cout << "Unknown option: " << option << std::endl;
+    }
+  }
+
+  std::cout << "Loop done" << std::endl;
+}
+
+// ===================================================
+// SET_INPUT callback
+void HLAFederate::dtigEngineSetInput(const rti1516::InteractionClassHandle& interaction, const rti1516::ParameterHandleValueMap& parameterValues)
+{
+  return;
+}
+
+
+// ===================================================
+// GET_OUTPUT callback
+void HLAFederate::dtigEngineGetOutput()
+{
+  return;
+}
+
+
+// ===================================================
+// INITIALIZE callback
+void HLAFederate::dtigEngineInitialize()
+{
+  // Parameters
+  try
+  {
+    mPg = rtiamb->getInteractionClassHandle(L"InteractionRoot.Parameters.g");
+    mInteractionHandlers[mPg] = [this](const rti1516::ParameterHandleValueMap& values) { SetParameterg(values); };
+    mPsg.insert({"value", rtiamb->getParameterHandle(mPg, L"value")});
+  }
+  catch (rti1516::NameNotFound e)
+  {
+    std::wcout << "Failed to initialize parameter handle g" << e.what() << std::endl;
+    return;
+  }
+  try
+  {
+    mPe = rtiamb->getInteractionClassHandle(L"InteractionRoot.Parameters.e");
+    mInteractionHandlers[mPe] = [this](const rti1516::ParameterHandleValueMap& values) { SetParametere(values); };
+    mPse.insert({"value", rtiamb->getParameterHandle(mPe, L"value")});
+  }
+  catch (rti1516::NameNotFound e)
+  {
+    std::wcout << "Failed to initialize parameter handle e" << e.what() << std::endl;
+    return;
+  }
+  try
+  {
+    mPfloor = rtiamb->getInteractionClassHandle(L"InteractionRoot.Parameters.floor");
+    mInteractionHandlers[mPfloor] = [this](const rti1516::ParameterHandleValueMap& values) { SetParameterfloor(values); };
+    mPsfloor.insert({"value", rtiamb->getParameterHandle(mPfloor, L"value")});
+  }
+  catch (rti1516::NameNotFound e)
+  {
+    std::wcout << "Failed to initialize parameter handle floor" << e.what() << std::endl;
+    return;
+  }
+  try
+  {
+    mPmass = rtiamb->getInteractionClassHandle(L"InteractionRoot.Parameters.mass");
+    mInteractionHandlers[mPmass] = [this](const rti1516::ParameterHandleValueMap& values) { SetParametermass(values); };
+    mPsmass.insert({"value", rtiamb->getParameterHandle(mPmass, L"value")});
+  }
+  catch (rti1516::NameNotFound e)
+  {
+    std::wcout << "Failed to initialize parameter handle mass" << e.what() << std::endl;
+    return;
+  }
+  try
+  {
+    mPv0 = rtiamb->getInteractionClassHandle(L"InteractionRoot.Parameters.v0");
+    mInteractionHandlers[mPv0] = [this](const rti1516::ParameterHandleValueMap& values) { SetParameterv0(values); };
+    mPsv0.insert({"value", rtiamb->getParameterHandle(mPv0, L"value")});
+  }
+  catch (rti1516::NameNotFound e)
+  {
+    std::wcout << "Failed to initialize parameter handle v0" << e.what() << std::endl;
+    return;
+  }
+  try
+  {
+    mPMaterial = rtiamb->getInteractionClassHandle(L"InteractionRoot.Parameters.Material");
+    mInteractionHandlers[mPMaterial] = [this](const rti1516::ParameterHandleValueMap& values) { SetParameterMaterial(values); };
+    mPsMaterial.insert({"state", rtiamb->getParameterHandle(mPMaterial, L"state")});
+    mPsMaterial.insert({"name", rtiamb->getParameterHandle(mPMaterial, L"name")});
+    mPsMaterial.insert({"youngs_modulus", rtiamb->getParameterHandle(mPMaterial, L"youngs_modulus")});
+    mPsMaterial.insert({"poisson_ratio", rtiamb->getParameterHandle(mPMaterial, L"poisson_ratio")});
+    mPsMaterial.insert({"density", rtiamb->getParameterHandle(mPMaterial, L"density")});
+  }
+  catch (rti1516::NameNotFound e)
+  {
+    std::wcout << "Failed to initialize parameter handle Material" << e.what() << std::endl;
+    return;
+  }
+  try
+  {
+    mPfixed = rtiamb->getInteractionClassHandle(L"InteractionRoot.Parameters.fixed");
+    mInteractionHandlers[mPfixed] = [this](const rti1516::ParameterHandleValueMap& values) { SetParameterfixed(values); };
+    mPsfixed.insert({"magnitude", rtiamb->getParameterHandle(mPfixed, L"magnitude")});
+    mPsfixed.insert({"object", rtiamb->getParameterHandle(mPfixed, L"object")});
+    mPsfixed.insert({"reference", rtiamb->getParameterHandle(mPfixed, L"reference")});
+    mPsfixed.insert({"direction", rtiamb->getParameterHandle(mPfixed, L"direction")});
+  }
+  catch (rti1516::NameNotFound e)
+  {
+    std::wcout << "Failed to initialize parameter handle fixed" << e.what() << std::endl;
+    return;
+  }
+
+  // Inputs
+
+  // Outputs
+}
+
+// ===================================================
+// PUBLISH callback
+void HLAFederate::dtigEnginePublish()
+{
+  // Define attributes (parameters) published by this class
+  try
+  {
+    rtiamb->publishInteractionClass(mPg);
+  }
+  catch (rti1516::ObjectClassNotDefined e)
+  {
+    std::wcout << "Publish parameter class is not defined: g" << std::endl;
+    return;
+  }
+  try
+  {
+    rtiamb->publishInteractionClass(mPe);
+  }
+  catch (rti1516::ObjectClassNotDefined e)
+  {
+    std::wcout << "Publish parameter class is not defined: e" << std::endl;
+    return;
+  }
+  try
+  {
+    rtiamb->publishInteractionClass(mPfloor);
+  }
+  catch (rti1516::ObjectClassNotDefined e)
+  {
+    std::wcout << "Publish parameter class is not defined: floor" << std::endl;
+    return;
+  }
+  try
+  {
+    rtiamb->publishInteractionClass(mPmass);
+  }
+  catch (rti1516::ObjectClassNotDefined e)
+  {
+    std::wcout << "Publish parameter class is not defined: mass" << std::endl;
+    return;
+  }
+  try
+  {
+    rtiamb->publishInteractionClass(mPv0);
+  }
+  catch (rti1516::ObjectClassNotDefined e)
+  {
+    std::wcout << "Publish parameter class is not defined: v0" << std::endl;
+    return;
+  }
+  try
+  {
+    rtiamb->publishInteractionClass(mPMaterial);
+  }
+  catch (rti1516::ObjectClassNotDefined e)
+  {
+    std::wcout << "Publish parameter class is not defined: Material" << std::endl;
+    return;
+  }
+  try
+  {
+    rtiamb->publishInteractionClass(mPfixed);
+  }
+  catch (rti1516::ObjectClassNotDefined e)
+  {
+    std::wcout << "Publish parameter class is not defined: fixed" << std::endl;
+    return;
+  }
+
+  // Define outputs published by this class
+}
+
+// ===================================================
+// SUBSCRIBE callback
+void HLAFederate::dtigEngineSubscribe()
+{
+  // Define attributes (parameters) to which this class subscribes
+  try
+  {
+    rtiamb->subscribeInteractionClass(mPg);
+  }
+  catch (rti1516::ObjectClassNotDefined e)
+  {
+    std::wcout << "Publish parameter class is not defined: g" << std::endl;
+    return;
+  }
+  try
+  {
+    rtiamb->subscribeInteractionClass(mPe);
+  }
+  catch (rti1516::ObjectClassNotDefined e)
+  {
+    std::wcout << "Publish parameter class is not defined: e" << std::endl;
+    return;
+  }
+  try
+  {
+    rtiamb->subscribeInteractionClass(mPfloor);
+  }
+  catch (rti1516::ObjectClassNotDefined e)
+  {
+    std::wcout << "Publish parameter class is not defined: floor" << std::endl;
+    return;
+  }
+  try
+  {
+    rtiamb->subscribeInteractionClass(mPmass);
+  }
+  catch (rti1516::ObjectClassNotDefined e)
+  {
+    std::wcout << "Publish parameter class is not defined: mass" << std::endl;
+    return;
+  }
+  try
+  {
+    rtiamb->subscribeInteractionClass(mPv0);
+  }
+  catch (rti1516::ObjectClassNotDefined e)
+  {
+    std::wcout << "Publish parameter class is not defined: v0" << std::endl;
+    return;
+  }
+  try
+  {
+    rtiamb->subscribeInteractionClass(mPMaterial);
+  }
+  catch (rti1516::ObjectClassNotDefined e)
+  {
+    std::wcout << "Publish parameter class is not defined: Material" << std::endl;
+    return;
+  }
+  try
+  {
+    rtiamb->subscribeInteractionClass(mPfixed);
+  }
+  catch (rti1516::ObjectClassNotDefined e)
+  {
+    std::wcout << "Publish parameter class is not defined: fixed" << std::endl;
+    return;
+  }
+  // Define inputs to which this class subscribes
+}
+
+// ===================================================
+// CMD stuff
+
+// ===================================================
+// SET_PARAMETER callback
+void HLAFederate::dtigEngineSetParameter()
+{
+  // Hold the mutex so we stop printing
+  std::unique_lock<std::mutex> lock(mMutex);
+  std::cout << "Available parameters:" << std::endl;
+  std::cout << "g - float64" << std::endl;
+  std::cout << "e - float64" << std::endl;
+  std::cout << "floor - float64" << std::endl;
+  std::cout << "mass - float64" << std::endl;
+  std::cout << "v0 - float64" << std::endl;
+  std::cout << "Material - material" << std::endl;
+  std::cout << "fixed - fixture" << std::endl;
+
+  while (true)
+  {
+    std::string param_name;
+    std::cout << "Which parameter? ";
+    std::cin >> param_name;
+    std::cin.ignore(std::numeric_limits<std::streamsize>::max(), '\n');
+
+    std::cout << "Param: " << param_name << std::endl;
+    if (param_name.empty() || param_name == "stop")
+      return;
+
+    rti1516::ParameterHandleValueMap parameterValues;
+    if (param_name == "g")
+    {
+      double value;
+      std::cout << "What is the value? ";
+      std::cin >> value;
+      std::cin.ignore(std::numeric_limits<std::streamsize>::max(), '\n');
+      std::cout << "Setting value: " << value << std::endl;
+      parameterValues[mPsg.at("value")] = toData<double>(&value);
+      rtiamb->sendInteraction(mPg, parameterValues, toVariableLengthData(mName.c_str()));
+    }
+    else if (param_name == "e")
+    {
+      double value;
+      std::cout << "What is the value? ";
+      std::cin >> value;
+      std::cin.ignore(std::numeric_limits<std::streamsize>::max(), '\n');
+      std::cout << "Setting value: " << value << std::endl;
+      parameterValues[mPse.at("value")] = toData<double>(&value);
+      rtiamb->sendInteraction(mPe, parameterValues, toVariableLengthData(mName.c_str()));
+    }
+    else if (param_name == "floor")
+    {
+      double value;
+      std::cout << "What is the value? ";
+      std::cin >> value;
+      std::cin.ignore(std::numeric_limits<std::streamsize>::max(), '\n');
+      std::cout << "Setting value: " << value << std::endl;
+      parameterValues[mPsfloor.at("value")] = toData<double>(&value);
+      rtiamb->sendInteraction(mPfloor, parameterValues, toVariableLengthData(mName.c_str()));
+    }
+    else if (param_name == "mass")
+    {
+      double value;
+      std::cout << "What is the value? ";
+      std::cin >> value;
+      std::cin.ignore(std::numeric_limits<std::streamsize>::max(), '\n');
+      std::cout << "Setting value: " << value << std::endl;
+      parameterValues[mPsmass.at("value")] = toData<double>(&value);
+      rtiamb->sendInteraction(mPmass, parameterValues, toVariableLengthData(mName.c_str()));
+    }
+    else if (param_name == "v0")
+    {
+      double value;
+      std::cout << "What is the value? ";
+      std::cin >> value;
+      std::cin.ignore(std::numeric_limits<std::streamsize>::max(), '\n');
+      std::cout << "Setting value: " << value << std::endl;
+      parameterValues[mPsv0.at("value")] = toData<double>(&value);
+      rtiamb->sendInteraction(mPv0, parameterValues, toVariableLengthData(mName.c_str()));
+    }
+    else if (param_name == "Material")
+    {
+      std::string value;
+      std::cout << "What is the value? ";
+      std::cin >> value;
+      std::cin.ignore(std::numeric_limits<std::streamsize>::max(), '\n');
+      std::cout << "Setting value: " << value << std::endl;
+      parameterValues[mPsMaterial.at("value")] = toData<std::string>(&value);
+      rtiamb->sendInteraction(mPMaterial, parameterValues, toVariableLengthData(mName.c_str()));
+    }
+    else if (param_name == "fixed")
+    {
+      double value;
+      std::cout << "What is the value? ";
+      std::cin >> value;
+      std::cin.ignore(std::numeric_limits<std::streamsize>::max(), '\n');
+      std::cout << "Setting value: " << value << std::endl;
+      parameterValues[mPsfixed.at("value")] = toData<double>(&value);
+      rtiamb->sendInteraction(mPfixed, parameterValues, toVariableLengthData(mName.c_str()));
+    }
+    else
+    {
+      std::cout << "Unknown parameter: " << param_name << std::endl;
+      continue;
+    }
+  }
+}
+
+// Set the attribute (parameter) g:
+void HLAFederate::SetParameterg(const rti1516::ParameterHandleValueMap& attributes)
+{
+  dtig::MF64 anyValue;
+  for (auto it = attributes.begin(); it != attributes.end(); ++it)
+  {
+    std::string item = GetHandleg(it->first);
+    if (item.empty())
+      continue;
+
+    if (item == "value")
+    {
+      double data = fromData<double>((*it).second);
+      std::cout << "Read g (value): " << data << std::endl;
+    }
+    else
+      std::cout << "Unknown handle: " << item << std::endl;
+  }
+}
+
+std::string HLAFederate::GetHandleg(const rti1516::ParameterHandle& handle) const
+{
+  for (auto it = mPsg.begin(); it != mPsg.end(); ++it)
+    if (it->second == handle)
+      return it->first;
+
+  return std::string();
+}
+// Set the attribute (parameter) e:
+void HLAFederate::SetParametere(const rti1516::ParameterHandleValueMap& attributes)
+{
+  dtig::MF64 anyValue;
+  for (auto it = attributes.begin(); it != attributes.end(); ++it)
+  {
+    std::string item = GetHandlee(it->first);
+    if (item.empty())
+      continue;
+
+    if (item == "value")
+    {
+      double data = fromData<double>((*it).second);
+      std::cout << "Read e (value): " << data << std::endl;
+    }
+    else
+      std::cout << "Unknown handle: " << item << std::endl;
+  }
+}
+
+std::string HLAFederate::GetHandlee(const rti1516::ParameterHandle& handle) const
+{
+  for (auto it = mPse.begin(); it != mPse.end(); ++it)
+    if (it->second == handle)
+      return it->first;
+
+  return std::string();
+}
+// Set the attribute (parameter) floor:
+void HLAFederate::SetParameterfloor(const rti1516::ParameterHandleValueMap& attributes)
+{
+  dtig::MF64 anyValue;
+  for (auto it = attributes.begin(); it != attributes.end(); ++it)
+  {
+    std::string item = GetHandlefloor(it->first);
+    if (item.empty())
+      continue;
+
+    if (item == "value")
+    {
+      double data = fromData<double>((*it).second);
+      std::cout << "Read floor (value): " << data << std::endl;
+    }
+    else
+      std::cout << "Unknown handle: " << item << std::endl;
+  }
+}
+
+std::string HLAFederate::GetHandlefloor(const rti1516::ParameterHandle& handle) const
+{
+  for (auto it = mPsfloor.begin(); it != mPsfloor.end(); ++it)
+    if (it->second == handle)
+      return it->first;
+
+  return std::string();
+}
+// Set the attribute (parameter) mass:
+void HLAFederate::SetParametermass(const rti1516::ParameterHandleValueMap& attributes)
+{
+  dtig::MF64 anyValue;
+  for (auto it = attributes.begin(); it != attributes.end(); ++it)
+  {
+    std::string item = GetHandlemass(it->first);
+    if (item.empty())
+      continue;
+
+    if (item == "value")
+    {
+      double data = fromData<double>((*it).second);
+      std::cout << "Read mass (value): " << data << std::endl;
+    }
+    else
+      std::cout << "Unknown handle: " << item << std::endl;
+  }
+}
+
+std::string HLAFederate::GetHandlemass(const rti1516::ParameterHandle& handle) const
+{
+  for (auto it = mPsmass.begin(); it != mPsmass.end(); ++it)
+    if (it->second == handle)
+      return it->first;
+
+  return std::string();
+}
+// Set the attribute (parameter) v0:
+void HLAFederate::SetParameterv0(const rti1516::ParameterHandleValueMap& attributes)
+{
+  dtig::MF64 anyValue;
+  for (auto it = attributes.begin(); it != attributes.end(); ++it)
+  {
+    std::string item = GetHandlev0(it->first);
+    if (item.empty())
+      continue;
+
+    if (item == "value")
+    {
+      double data = fromData<double>((*it).second);
+      std::cout << "Read v0 (value): " << data << std::endl;
+    }
+    else
+      std::cout << "Unknown handle: " << item << std::endl;
+  }
+}
+
+std::string HLAFederate::GetHandlev0(const rti1516::ParameterHandle& handle) const
+{
+  for (auto it = mPsv0.begin(); it != mPsv0.end(); ++it)
+    if (it->second == handle)
+      return it->first;
+
+  return std::string();
+}
+// Set the attribute (parameter) Material:
+void HLAFederate::SetParameterMaterial(const rti1516::ParameterHandleValueMap& attributes)
+{
+  dtig::MMaterial anyValue;
+  for (auto it = attributes.begin(); it != attributes.end(); ++it)
+  {
+    std::string item = GetHandleMaterial(it->first);
+    if (item.empty())
+      continue;
+
+    if (item == "state")
+    {
+      std::string data = fromData((*it).second);
+      std::cout << "Read Material (state): " << data << std::endl;
+    }
+    else if (item == "name")
+    {
+      std::string data = fromData((*it).second);
+      std::cout << "Read Material (name): " << data << std::endl;
+    }
+    else if (item == "youngs_modulus")
+    {
+      std::string data = fromData((*it).second);
+      std::cout << "Read Material (youngs_modulus): " << data << std::endl;
+    }
+    else if (item == "poisson_ratio")
+    {
+      std::string data = fromData((*it).second);
+      std::cout << "Read Material (poisson_ratio): " << data << std::endl;
+    }
+    else if (item == "density")
+    {
+      std::string data = fromData((*it).second);
+      std::cout << "Read Material (density): " << data << std::endl;
+    }
+    else
+      std::cout << "Unknown handle: " << item << std::endl;
+  }
+}
+
+std::string HLAFederate::GetHandleMaterial(const rti1516::ParameterHandle& handle) const
+{
+  for (auto it = mPsMaterial.begin(); it != mPsMaterial.end(); ++it)
+    if (it->second == handle)
+      return it->first;
+
+  return std::string();
+}
+// Set the attribute (parameter) fixed:
+void HLAFederate::SetParameterfixed(const rti1516::ParameterHandleValueMap& attributes)
+{
+  dtig::MConstraint anyValue;
+  for (auto it = attributes.begin(); it != attributes.end(); ++it)
+  {
+    std::string item = GetHandlefixed(it->first);
+    if (item.empty())
+      continue;
+
+    if (item == "magnitude")
+    {
+      double data = fromData<double>((*it).second);
+      std::cout << "Read fixed (magnitude): " << data << std::endl;
+    }
+    else if (item == "object")
+    {
+      std::string data = fromData((*it).second);
+      std::cout << "Read fixed (object): " << data << std::endl;
+    }
+    else if (item == "reference")
+    {
+      std::string data = fromData((*it).second);
+      std::cout << "Read fixed (reference): " << data << std::endl;
+    }
+    else if (item == "direction")
+    {
+      std::string data = fromData((*it).second);
+      std::cout << "Read fixed (direction): " << data << std::endl;
+    }
+    else
+      std::cout << "Unknown handle: " << item << std::endl;
+  }
+}
+
+std::string HLAFederate::GetHandlefixed(const rti1516::ParameterHandle& handle) const
+{
+  for (auto it = mPsfixed.begin(); it != mPsfixed.end(); ++it)
+    if (it->second == handle)
+      return it->first;
+
+  return std::string();
+}
+
+// ===================================================
+// GET_PARAMETER callback
+void HLAFederate::dtigEngineGetParameter(const InteractionClassHandle& handler)
+{
+  if (handler == mPg)
+    GetParameterg();
+  else if (handler == mPe)
+    GetParametere();
+  else if (handler == mPfloor)
+    GetParameterfloor();
+  else if (handler == mPmass)
+    GetParametermass();
+  else if (handler == mPv0)
+    GetParameterv0();
+  else if (handler == mPMaterial)
+    GetParameterMaterial();
+  else if (handler == mPfixed)
+    GetParameterfixed();
+  else
+    std::wcout << "Unknow parameter handler: " << handler.toString() << std::endl;
+}
+
+// Get the attribute (parameter) g:
+void HLAFederate::GetParameterg()
+{
+  dtig::MGetParameter paramMessage;
+  *paramMessage.mutable_parameters()->add_identifiers() = "g";
+
+  dtig::MDTMessage message;
+  *message.mutable_get_parameter() = paramMessage;
+  dtig::MReturnValue ret = SendMessage(message);
+  if (ret.code() != dtig::ReturnCode::SUCCESS)
+  {
+    std::cout << "Failed to get parameters: " << ret.error_message().value() << std::endl;
+    return;
+  }
+
+  ParameterHandleValueMap paramg = ParameterFromg(ret.values().values(0));
+  rtiamb->sendInteraction(mPg, paramg, toVariableLengthData(mName.c_str()));
+}
+
+rti1516::ParameterHandleValueMap HLAFederate::ParameterFromg(const google::protobuf::Any& anyMessage)
+{
+  ParameterHandleValueMap toWrite;
+
+  dtig::MF64 message;
+  if (!anyMessage.UnpackTo(&message))
+  {
+    std::cout << "Failed to unpack output: g" << std::endl;
+    return toWrite;
+  }
+
+  double tmpvalue = message.value();
+  toWrite[mPsg.at("value")] = toData<double>(&tmpvalue);
+
+  return toWrite;
+}
+
+// Get the attribute (parameter) e:
+void HLAFederate::GetParametere()
+{
+  dtig::MGetParameter paramMessage;
+  *paramMessage.mutable_parameters()->add_identifiers() = "e";
+
+  dtig::MDTMessage message;
+  *message.mutable_get_parameter() = paramMessage;
+  dtig::MReturnValue ret = SendMessage(message);
+  if (ret.code() != dtig::ReturnCode::SUCCESS)
+  {
+    std::cout << "Failed to get parameters: " << ret.error_message().value() << std::endl;
+    return;
+  }
+
+  ParameterHandleValueMap parame = ParameterFrome(ret.values().values(0));
+  rtiamb->sendInteraction(mPe, parame, toVariableLengthData(mName.c_str()));
+}
+
+rti1516::ParameterHandleValueMap HLAFederate::ParameterFrome(const google::protobuf::Any& anyMessage)
+{
+  ParameterHandleValueMap toWrite;
+
+  dtig::MF64 message;
+  if (!anyMessage.UnpackTo(&message))
+  {
+    std::cout << "Failed to unpack output: e" << std::endl;
+    return toWrite;
+  }
+
+  double tmpvalue = message.value();
+  toWrite[mPse.at("value")] = toData<double>(&tmpvalue);
+
+  return toWrite;
+}
+
+// Get the attribute (parameter) floor:
+void HLAFederate::GetParameterfloor()
+{
+  dtig::MGetParameter paramMessage;
+  *paramMessage.mutable_parameters()->add_identifiers() = "floor";
+
+  dtig::MDTMessage message;
+  *message.mutable_get_parameter() = paramMessage;
+  dtig::MReturnValue ret = SendMessage(message);
+  if (ret.code() != dtig::ReturnCode::SUCCESS)
+  {
+    std::cout << "Failed to get parameters: " << ret.error_message().value() << std::endl;
+    return;
+  }
+
+  ParameterHandleValueMap paramfloor = ParameterFromfloor(ret.values().values(0));
+  rtiamb->sendInteraction(mPfloor, paramfloor, toVariableLengthData(mName.c_str()));
+}
+
+rti1516::ParameterHandleValueMap HLAFederate::ParameterFromfloor(const google::protobuf::Any& anyMessage)
+{
+  ParameterHandleValueMap toWrite;
+
+  dtig::MF64 message;
+  if (!anyMessage.UnpackTo(&message))
+  {
+    std::cout << "Failed to unpack output: floor" << std::endl;
+    return toWrite;
+  }
+
+  double tmpvalue = message.value();
+  toWrite[mPsfloor.at("value")] = toData<double>(&tmpvalue);
+
+  return toWrite;
+}
+
+// Get the attribute (parameter) mass:
+void HLAFederate::GetParametermass()
+{
+  dtig::MGetParameter paramMessage;
+  *paramMessage.mutable_parameters()->add_identifiers() = "mass";
+
+  dtig::MDTMessage message;
+  *message.mutable_get_parameter() = paramMessage;
+  dtig::MReturnValue ret = SendMessage(message);
+  if (ret.code() != dtig::ReturnCode::SUCCESS)
+  {
+    std::cout << "Failed to get parameters: " << ret.error_message().value() << std::endl;
+    return;
+  }
+
+  ParameterHandleValueMap parammass = ParameterFrommass(ret.values().values(0));
+  rtiamb->sendInteraction(mPmass, parammass, toVariableLengthData(mName.c_str()));
+}
+
+rti1516::ParameterHandleValueMap HLAFederate::ParameterFrommass(const google::protobuf::Any& anyMessage)
+{
+  ParameterHandleValueMap toWrite;
+
+  dtig::MF64 message;
+  if (!anyMessage.UnpackTo(&message))
+  {
+    std::cout << "Failed to unpack output: mass" << std::endl;
+    return toWrite;
+  }
+
+  double tmpvalue = message.value();
+  toWrite[mPsmass.at("value")] = toData<double>(&tmpvalue);
+
+  return toWrite;
+}
+
+// Get the attribute (parameter) v0:
+void HLAFederate::GetParameterv0()
+{
+  dtig::MGetParameter paramMessage;
+  *paramMessage.mutable_parameters()->add_identifiers() = "v0";
+
+  dtig::MDTMessage message;
+  *message.mutable_get_parameter() = paramMessage;
+  dtig::MReturnValue ret = SendMessage(message);
+  if (ret.code() != dtig::ReturnCode::SUCCESS)
+  {
+    std::cout << "Failed to get parameters: " << ret.error_message().value() << std::endl;
+    return;
+  }
+
+  ParameterHandleValueMap paramv0 = ParameterFromv0(ret.values().values(0));
+  rtiamb->sendInteraction(mPv0, paramv0, toVariableLengthData(mName.c_str()));
+}
+
+rti1516::ParameterHandleValueMap HLAFederate::ParameterFromv0(const google::protobuf::Any& anyMessage)
+{
+  ParameterHandleValueMap toWrite;
+
+  dtig::MF64 message;
+  if (!anyMessage.UnpackTo(&message))
+  {
+    std::cout << "Failed to unpack output: v0" << std::endl;
+    return toWrite;
+  }
+
+  double tmpvalue = message.value();
+  toWrite[mPsv0.at("value")] = toData<double>(&tmpvalue);
+
+  return toWrite;
+}
+
+// Get the attribute (parameter) Material:
+void HLAFederate::GetParameterMaterial()
+{
+  dtig::MGetParameter paramMessage;
+  *paramMessage.mutable_parameters()->add_identifiers() = "Material";
+
+  dtig::MDTMessage message;
+  *message.mutable_get_parameter() = paramMessage;
+  dtig::MReturnValue ret = SendMessage(message);
+  if (ret.code() != dtig::ReturnCode::SUCCESS)
+  {
+    std::cout << "Failed to get parameters: " << ret.error_message().value() << std::endl;
+    return;
+  }
+
+  ParameterHandleValueMap paramMaterial = ParameterFromMaterial(ret.values().values(0));
+  rtiamb->sendInteraction(mPMaterial, paramMaterial, toVariableLengthData(mName.c_str()));
+}
+
+rti1516::ParameterHandleValueMap HLAFederate::ParameterFromMaterial(const google::protobuf::Any& anyMessage)
+{
+  ParameterHandleValueMap toWrite;
+
+  dtig::MMaterial message;
+  if (!anyMessage.UnpackTo(&message))
+  {
+    std::cout << "Failed to unpack output: Material" << std::endl;
+    return toWrite;
+  }
+
+  std::string tmpname = message.name().value();
+  toWrite[mPsMaterial.at("name")] = toData<std::string>(&tmpname);
+  std::string tmpstate = message.state().value();
+  toWrite[mPsMaterial.at("state")] = toData<std::string>(&tmpstate);
+  std::string tmpdensity = message.density().value();
+  toWrite[mPsMaterial.at("density")] = toData<std::string>(&tmpdensity);
+  std::string tmpyoungs_modulus = message.youngs_modulus().value();
+  toWrite[mPsMaterial.at("youngs_modulus")] = toData<std::string>(&tmpyoungs_modulus);
+  std::string tmppoisson_ratio = message.poisson_ratio().value();
+  toWrite[mPsMaterial.at("poisson_ratio")] = toData<std::string>(&tmppoisson_ratio);
+
+  return toWrite;
+}
+
+// Get the attribute (parameter) fixed:
+void HLAFederate::GetParameterfixed()
+{
+  dtig::MGetParameter paramMessage;
+  *paramMessage.mutable_parameters()->add_identifiers() = "fixed";
+
+  dtig::MDTMessage message;
+  *message.mutable_get_parameter() = paramMessage;
+  dtig::MReturnValue ret = SendMessage(message);
+  if (ret.code() != dtig::ReturnCode::SUCCESS)
+  {
+    std::cout << "Failed to get parameters: " << ret.error_message().value() << std::endl;
+    return;
+  }
+
+  ParameterHandleValueMap paramfixed = ParameterFromfixed(ret.values().values(0));
+  rtiamb->sendInteraction(mPfixed, paramfixed, toVariableLengthData(mName.c_str()));
+}
+
+rti1516::ParameterHandleValueMap HLAFederate::ParameterFromfixed(const google::protobuf::Any& anyMessage)
+{
+  ParameterHandleValueMap toWrite;
+
+  dtig::MConstraint message;
+  if (!anyMessage.UnpackTo(&message))
+  {
+    std::cout << "Failed to unpack output: fixed" << std::endl;
+    return toWrite;
+  }
+
+  double tmpmagnitude = message.magnitude().value();
+  toWrite[mPsfixed.at("magnitude")] = toData<double>(&tmpmagnitude);
+  std::string tmpdirection = message.direction().value();
+  toWrite[mPsfixed.at("direction")] = toData<std::string>(&tmpdirection);
+  std::string tmpobject = message.object().value();
+  toWrite[mPsfixed.at("object")] = toData<std::string>(&tmpobject);
+  std::string tmpreference = message.reference().value();
+  toWrite[mPsfixed.at("reference")] = toData<std::string>(&tmpreference);
+
+  return toWrite;
+}
+
@@ -0,0 +1,27 @@
+classdef Status < handle
+  properties
+    state
+    mode
+    wait
+  end
+  methods
+    function set.state(obj, val)
+        obj.state = val;
+    end
+    function ret = get.state(obj)
+        ret = obj.state;
+    end
+    function set.wait(obj, val)
+      obj.wait = val;
+    end
+    function ret = get.wait(obj)
+        ret = obj.wait;
+    end
+    function set.mode(obj, val)
+      obj.mode = val;
+    end
+    function ret = get.mode(obj)
+        ret = obj.mode;
+    end
+  end
+end
\ No newline at end of file
@@ -0,0 +1,741 @@
+% Clear the prompt
+clc;
+clear server;
+
+% Include jar paths
+javaaddpath('./');
+javaaddpath('./build');
+
+% import states
+import Status.*;
+
+% Define global variables
+global status modelName;
+global startTime stopTime stepSize simulationTime;
+
+startTime = 0.0;
+stopTime = 0.0;
+stepSize = 0.001;
+
+status = Status;
+status.wait = true;
+status.state = dtig.EState.UNINITIALIZED;
+status.mode = dtig.ERunMode.UNKNOWN;
+global sm;
+
+
+% Outputs
+global h;
+h = 0.0;
+global v;
+v = 0.0;
+
+% Parameters
+global g;
+g = 9.81;
+global e;
+e = 0.7;
+global h0;
+h0 = 5;
+global v0;
+v0 = 0.0;
+
+
+% ======================================================================
+% Main
+% ======================================================================
+server = tcpserver("127.0.0.1", 8083, "ConnectionChangedFcn", @connectionFcn);
+
+configureCallback(server, "byte", 4, @readByteFcn);
+
+try
+  disp("Server is running");
+
+  disp("Waiting for initialization");
+  if waitForState([dtig.EState.INITIALIZED])
+    while status.state ~= dtig.EState.STOPPED
+      dtigRunModel();
+      waitForState([dtig.EState.IDLE]);
+      disp("Model done");
+    end
+  end
+catch exception
+  disp(getReport(exception));
+end
+
+disp("Server stopped");
+clear server;
+
+% ======================================================================
+% Functions
+% ======================================================================
+function dtigRunModel()
+  global sm;
+  global status modelName;
+  global startTime stopTime stepSize;
+
+  % Initial values
+  global g;
+  global e;
+  global h0;
+  global v0;
+
+
+  global h;
+  global v;
+
+  disp("Waiting for start");
+  if ~waitForState([dtig.EState.WAITING, dtig.EState.RUNNING])
+    return;
+  end
+
+  % Reset simulation for multiple runs
+  if sm.Status ~= "inactive"
+    terminate(sm);
+  end
+
+  disp("Starting the model")
+  sm = setModelParameter(sm, ...
+    StartTime=string(startTime), ...
+    StopTime=string(stopTime), ...
+    FixedStep=string(stepSize)...
+  );
+
+  % Make sure simulink stops once the simulation is done
+  set_param(modelName, "StopFcn", "if status.state ~= dtig.EState.STOPPED status.state = dtig.EState.IDLE; end");
+
+  if status.mode == dtig.ERunMode.STEPPED
+    initialize(sm)
+    start(sm)
+    pause(sm)
+    status.state = dtig.EState.WAITING;
+  else
+    initialize(sm)
+    start(sm)
+    status.state = dtig.EState.RUNNING;
+  end
+
+  % Pause a bit otherwise Simulink fails to start
+  pause(1);
+
+  fprintf("Starting with: %s\n", string(status.state));
+  fprintf("Running from %.4f to %.4f with step size %.4f\n", startTime, stopTime, stepSize);
+end
+
+function connectionFcn(src, ~)
+  if src.Connected
+    disp("Client has connected")
+  else
+    disp("Client has disconnected.")
+  end
+end
+
+function readByteFcn(src, ~)
+  % Every message is preceded by its length as a 4 byte big endian integer
+  % Several messages may already be available, they are handled one by one
+  while src.NumBytesAvailable >= 4
+    header = uint8(read(src, 4, "uint8"));
+    messageSize = double(swapbytes(typecast(header, "uint32")));
+
+    % Read data and process it as a protobuf object
+    data = read(src, messageSize, "int8");
+    message = dtig.Helpers.parseFrom(data);
+    try
+      returnValue = dtigHandleMessage(message);
+    catch exception
+      disp(getReport(exception));
+      returnValue = createReturn(dtig.EReturnCode.FAILURE, "Exception when handling message");
+    end
+
+    % Send the reply with its length first
+    reply = dtig.Helpers.toByteArray(returnValue);
+    write(src, typecast(swapbytes(uint32(numel(reply))), "uint8"), "uint8");
+    write(src, reply, "int8");
+  end
+end
+
+function message = createReturn(code, errorMessage)
+  message = dtig.MReturnValue.newBuilder();
+  message.setCode(code);
+  if (nargin == 2)
+    message.setErrorMessage(dtig.MString.newBuilder().setValue(errorMessage));
+  end
+end
+
+function returnValue = waitForState(expectedStates)
+  global status;
+
+  while ~ismember(string(status.state), string([expectedStates, dtig.EState.STOPPED]))
+    waitfor(status, "wait", false);
+    status.wait = true;
+  end
+
+   returnValue = status.state ~= dtig.EState.STOPPED;
+end
+
+function returnValue = dtigHandleMessage(message)
+  % Handlers of the commands, by the name of their field in the message
+  persistent handlers;
+  if isempty(handlers)
+    handlers = containers.Map( ...
+      {'stop', 'start', 'set_input', 'get_output', 'advance', 'initialize', 'set_parameter', 'get_parameter', 'get_status', 'model_info'}, ...
+      {@(m) dtigStop(m.getStop()), ...
+       @(m) dtigStart(m.getStart()), ...
+       @(m) dtigSetInput(m.getSetInput()), ...
+       @(m) dtigGetOutput(m.getGetOutput()), ...
+       @(m) dtigAdvance(m.getAdvance()), ...
+       @(m) dtigInitialize(m.getInitialize()), ...
+       @(m) dtigSetParameter(m.getSetParameter()), ...
+       @(m) dtigGetParameter(m.getGetParameter()), ...
+       @(m) dtigGetStatus(), ...
+       @(m) dtigModelInfo()});
+  end
+
+  command = char(dtig.Helpers.command(message));
+  if ~isKey(handlers, command)
+    returnValue = createReturn(dtig.EReturnCode.UNKNOWN_COMMAND, "Unknown command");
+    return
+  end
+
+  handler = handlers(command);
+  returnValue = handler(message);
+end
+function returnValue = dtigStop(message)
+  global status;
+
+  try
+    returnValue = dtigEngineStop(message);
+    if returnValue.getCode() ~= dtig.EReturnCode.SUCCESS
+      return
+    end
+  catch exception
+    returnValue = createReturn(dtig.EReturnCode.FAILURE, "Exception when trying to stop, stopping anyway");
+  end
+
+  status.state = dtig.EState.STOPPED;
+  status.wait = false;
+end
+
+function returnValue = dtigEngineStop(~)
+  global sm;
+  if ~isempty(sm) && sm.Status ~= "inactive"
+    pause(sm);
+  end
+
+  stop(sm);
+  returnValue = createReturn(dtig.EReturnCode.SUCCESS);
+end
+
+function returnValue = dtigStart(message)
+  global status;
+  % If the model was not yet initialized, we cannot start
+  if (status.state == dtig.EState.UNINITIALIZED)
+    returnValue = createReturn(dtig.EReturnCode.INVALID_STATE, "Cannot start while UNINITIALIZED");
+    return;
+  end
+
+  returnValue = dtigEngineStart(message);
+end
+
+function returnValue = dtigEngineStart(message)
+  global status;
+  global startTime stopTime stepSize;
+
+  if message.hasStartTime()
+    startTime = message.getStartTime().getValue();
+  end
+
+  if message.hasStopTime()
+    stopTime = message.getStopTime().getValue();
+  end
+
+  if message.hasStepSize()
+    stepSize = message.getStepSize().getStep();
+  end
+
+  % For now, we accept either continuous or stepped simulation
+  status.mode = message.getRunMode();
+  if status.mode == dtig.ERunMode.STEPPED
+    status.state = dtig.EState.WAITING;
+  else
+    status.state = dtig.EState.RUNNING;
+  end
+  status.wait = false;
+
+  returnValue = createReturn(dtig.EReturnCode.SUCCESS);
+end
+
+function returnValue = dtigSetInput(message)
+  global status;
+  if (status.state == dtig.EState.UNINITIALIZED)
+    returnValue = createReturn(dtig.EReturnCode.INVALID_STATE, "Cannot set input while UNINITIALIZED");
+    return
+  end
+
+  returnValue = createReturn(dtig.EReturnCode.SUCCESS);
+  nIds = message.getInputs().getIdentifiersCount() - 1;
+  for i = 0:nIds
+    identifier = string(message.getInputs().getIdentifiers(i));
+    anyValue = message.getInputs().getValues(i);
+    returnValue = dtigEngineSetInput(identifier, anyValue);
+    if returnValue.getCode() ~= dtig.EReturnCode.SUCCESS
+      return;
+    end
+  end
+end
+
+function returnValue = dtigEngineSetInput(reference, anyValue)
+  returnValue = createReturn(dtig.EReturnCode.DOES_NOT_EXIST, "Model has no inputs");
+end
+
+function returnValue = dtigGetOutput(message)
+  global status;
+  if (status.state == dtig.EState.UNINITIALIZED)
+    returnValue = createReturn(dtig.EReturnCode.INVALID_STATE, "Cannot get output while UNINITIALIZED");
+    return;
+  end
+
+  nIds = message.getOutputs().getIdentifiersCount();
+  returnValue = dtigEngineGetOutput(message.getOutputs().getIdentifiersList());
+  if returnValue.getValues().getIdentifiersCount() ~= nIds && returnValue.getCode() == dtig.EReturnCode.SUCCESS
+    returnValue.setCode(dtig.EReturnCode.FAILURE);
+    returnValue.setErrorMessage("Failed to get all parameters");
+  end
+end
+
+function returnValue = dtigEngineGetOutput(references)
+  global sm;
+  global h;
+  global v;
+
+  % Proto message of every output, by name
+  persistent outputTypes;
+  if isempty(outputTypes)
+    outputTypes = containers.Map('KeyType', 'char', 'ValueType', 'any');
+    outputTypes('h') = @(value) dtig.MF64.newBuilder().setValue(value);
+    outputTypes('v') = @(value) dtig.MF64.newBuilder().setValue(value);
+  end
+
+  isRunning = (sm.Status == "running");
+
+  if isRunning
+    pause(sm);
+  end
+
+  dtigOutputs = dtig.MValues.newBuilder();
+  nIds = references.size() - 1;
+  returnValue = createReturn(dtig.EReturnCode.SUCCESS);
+
+  for i = 0:nIds
+    reference = references.get(i);
+    simulinkReference = find(sm.SimulationOutput, string(reference));
+    if isempty(simulinkReference)
+      continue
+    end
+
+    name = char(reference);
+    if ~isKey(outputTypes, name)
+      returnValue = createReturn(dtig.EReturnCode.UNKNOWN_OPTION, strcat("Unknown output: ", reference));
+      return;
+    end
+
+    createValue = outputTypes(name);
+    anyValue = createValue(simulinkReference.Data(end));
+    dtigOutputs.addIdentifiers(reference);
+    dtigOutputs.addValues(dtig.Helpers.pack(anyValue));
+  end
+
+  returnValue.setValues(dtigOutputs);
+
+  if isRunning
+    resume(sm);
+  end
+end
+
+function returnValue = dtigAdvance(message)
+  global status;
+  if status.mode ~= dtig.ERunMode.STEPPED
+    returnValue = createReturn(dtig.EReturnCode.INVALID_STATE, 'Cannot advance, not in STEPPING mode');
+    return;
+  end
+
+  if status.state ~= dtig.EState.WAITING
+    returnValue = createReturn(dtig.EReturnCode.INVALID_STATE, 'Cannot advance, still running');
+    return;
+  end
+
+  returnValue = dtigEngineAdvance(message);
+end
+
+function returnValue = dtigEngineAdvance(message)
+  global status sm;
+  global stepSize;
+  if message.hasStepSize()
+    stepSize = message.getStepSize().getStep();
+  end
+
+  status.state = dtig.EState.RUNNING;
+  step(sm);
+  status.state = dtig.EState.WAITING;
+
+  returnValue = createReturn(dtig.EReturnCode.SUCCESS);
+end
+
+function returnValue = dtigInitialize(message)
+  global status;
+  returnValue = dtigEngineInitialize(message);
+  if (returnValue.getCode() ~= dtig.EReturnCode.SUCCESS)
+    return;
+  end
+
+  status.state = dtig.EState.INITIALIZED;
+  status.wait = false;
+end
+
+function returnValue = dtigEngineInitialize(message)
+  global status;
+  global sm;
+  global modelName;
+
+  if message.hasModelName()
+    modelName = string(message.getModelName().getValue());
+    disp(strcat("Using model: ", modelName));
+    returnValue = createReturn(dtig.EReturnCode.SUCCESS);
+
+    sm = simulation(modelName);
+  else
+    returnValue = createReturn(dtig.EReturnCode.INVALID_OPTION, "No model provided");
+  end
+end
+
+function returnValue = dtigModelInfo()
+  returnValue = dtigEngineModelInfo();
+end
+
+function returnValue = dtigEngineModelInfo()
+    returnValue = createReturn(dtig.EReturnCode.SUCCESS);
+
+    dtigModelInfo = dtig.MModelInfo.newBuilder();
+
+    % Inputs
+
+    % Outputs
+    info_h = dtig.MInfo.newBuilder();
+
+    info_h...
+      .setId(dtig.MU32.newBuilder()...
+        .setValue(0));
+
+    info_h...
+      .setName(dtig.MString.newBuilder()...
+        .setValue("h"));
+
+    info_h...
+      .setDescription(dtig.MString.newBuilder()...
+        .setValue("Height of the ball"));
+
+    info_h...
+      .setType(dtig.MString.newBuilder()...
+        .setValue("float64"));
+
+    info_h...
+      .setUnit(dtig.MString.newBuilder()...
+        .setValue("m"));
+
+    info_h...
+      .setNamespace(dtig.MString.newBuilder()...
+        .setValue("InteractionRoot"));
+
+    info_h...
+      .setDefault(dtig.MString.newBuilder()...
+        .setValue("0.0"));
+
+    dtigModelInfo.addOutputs(info_h);
+    info_v = dtig.MInfo.newBuilder();
+
+    info_v...
+      .setId(dtig.MU32.newBuilder()...
+        .setValue(1));
+
+    info_v...
+      .setName(dtig.MString.newBuilder()...
+        .setValue("v"));
+
+    info_v...
+      .setDescription(dtig.MString.newBuilder()...
+        .setValue("Velocity of the ball"));
+
+    info_v...
+      .setType(dtig.MString.newBuilder()...
+        .setValue("float64"));
+
+    info_v...
+      .setUnit(dtig.MString.newBuilder()...
+        .setValue("m/s"));
+
+    info_v...
+      .setNamespace(dtig.MString.newBuilder()...
+        .setValue("InteractionRoot"));
+
+    info_v...
+      .setDefault(dtig.MString.newBuilder()...
+        .setValue("0.0"));
+
+    dtigModelInfo.addOutputs(info_v);
+
+    % Parameters
+    info_g = dtig.MInfo.newBuilder();
+
+    info_g...
+      .setId(dtig.MU32.newBuilder()...
+        .setValue(0));
+
+    info_g...
+      .setName(dtig.MString.newBuilder()...
+        .setValue("g"));
+
+    info_g...
+      .setDescription(dtig.MString.newBuilder()...
+        .setValue("Gravity"));
+
+    info_g...
+      .setType(dtig.MString.newBuilder()...
+        .setValue("float64"));
+
+    info_g...
+      .setUnit(dtig.MString.newBuilder()...
+        .setValue("m/s^2"));
+
+    info_g...
+      .setNamespace(dtig.MString.newBuilder()...
+        .setValue("InteractionRoot.Parameters"));
+
+    info_g...
+      .setDefault(dtig.MString.newBuilder()...
+        .setValue("9.81"));
+
+    dtigModelInfo.addParameters(info_g);
+    info_e = dtig.MInfo.newBuilder();
+
+    info_e...
+      .setId(dtig.MU32.newBuilder()...
+        .setValue(1));
+
+    info_e...
+      .setName(dtig.MString.newBuilder()...
+        .setValue("e"));
+
+    info_e...
+      .setDescription(dtig.MString.newBuilder()...
+        .setValue("Coefficient of restitution"));
+
+    info_e...
+      .setType(dtig.MString.newBuilder()...
+        .setValue("float64"));
+
+
+    info_e...
+      .setNamespace(dtig.MString.newBuilder()...
+        .setValue("InteractionRoot.Parameters"));
+
+    info_e...
+      .setDefault(dtig.MString.newBuilder()...
+        .setValue("0.7"));
+
+    dtigModelInfo.addParameters(info_e);
+    info_h0 = dtig.MInfo.newBuilder();
+
+    info_h0...
+      .setId(dtig.MU32.newBuilder()...
+        .setValue(2));
+
+    info_h0...
+      .setName(dtig.MString.newBuilder()...
+        .setValue("h0"));
+
+    info_h0...
+      .setDescription(dtig.MString.newBuilder()...
+        .setValue("Initial height of the ball"));
+
+    info_h0...
+      .setType(dtig.MString.newBuilder()...
+        .setValue("float64"));
+
+    info_h0...
+      .setUnit(dtig.MString.newBuilder()...
+        .setValue("m"));
+
+    info_h0...
+      .setNamespace(dtig.MString.newBuilder()...
+        .setValue("InteractionRoot.Parameters"));
+
+    info_h0...
+      .setDefault(dtig.MString.newBuilder()...
+        .setValue("5"));
+
+    dtigModelInfo.addParameters(info_h0);
+    info_v0 = dtig.MInfo.newBuilder();
+
+    info_v0...
+      .setId(dtig.MU32.newBuilder()...
+        .setValue(3));
+
+    info_v0...
+      .setName(dtig.MString.newBuilder()...
+        .setValue("v0"));
+
+    info_v0...
+      .setDescription(dtig.MString.newBuilder()...
+        .setValue("Initial velocity of the ball"));
+
+    info_v0...
+      .setType(dtig.MString.newBuilder()...
+        .setValue("float64"));
+
+    info_v0...
+      .setUnit(dtig.MString.newBuilder()...
+        .setValue("m/s"));
+
+    info_v0...
+      .setNamespace(dtig.MString.newBuilder()...
+        .setValue("InteractionRoot.Parameters"));
+
+    info_v0...
+      .setDefault(dtig.MString.newBuilder()...
+        .setValue("0.0"));
+
+    dtigModelInfo.addParameters(info_v0);
+
+    returnValue.setModelInfo(dtigModelInfo)
+end
+
+function returnValue = dtigGetStatus()
+  returnValue = dtigEngineGetStatus();
+end
+
+function returnValue = dtigEngineGetStatus()
+  global status
+  returnValue = createReturn(dtig.EReturnCode.SUCCESS);
+  returnValue.setStatus(dtig.MStatus.newBuilder()...
+    .setState(status.state));
+end
+
+function returnValue = dtigSetParameter(message)
+  global status;
+  if (status.state == dtig.EState.UNINITIALIZED)
+    returnValue = createReturn(dtig.EReturnCode.INVALID_STATE, "Cannot set parameter while UNINITIALIZED");
+    return
+  end
+
+  returnValue = createReturn(dtig.EReturnCode.SUCCESS);
+  nIds = message.getParameters().getIdentifiersCount() - 1;
+  for i = 0:nIds
+    identifier = message.getParameters().getIdentifiers(i);
+    anyValue = message.getParameters().getValues(i);
+    returnValue = dtigEngineSetParameter(identifier, anyValue);
+    if returnValue.getCode() ~= dtig.EReturnCode.SUCCESS
+      return;
+    end
+  end
+end
+
+function returnValue = dtigEngineSetParameter(reference, anyValue)
+  global modelName;
+  global g;
+  global e;
+  global h0;
+  global v0;
+
+  handle = getSimulinkBlockHandle(strcat(modelName, "/", string(reference)), true);
+  if handle < 0
+    returnValue = createReturn(dtig.EReturnCode.UNKNOWN_OPTION, strcat("Unknown parameter: ", reference));
+    return;
+  end
+
+  value = dtig.Helpers.unpack(anyValue);
+  if isempty(value)
+    returnValue = createReturn(dtig.EReturnCode.FAILURE, strcat("Failed to unpack value: ", reference));
+    return;
+  end
+
+  % Update variable as well
+  if string(reference) == "g"
+    g = value.getValue();
+    set_param(handle, "Value", "g");
+  elseif string(reference) == "e"
+    e = value.getValue();
+    set_param(handle, "Value", "e");
+  elseif string(reference) == "h0"
+    h0 = value.getValue();
+    set_param(handle, "Value", "h0");
+  elseif string(reference) == "v0"
+    v0 = value.getValue();
+    set_param(handle, "Value", "v0");
+  end
+  returnValue = createReturn(dtig.EReturnCode.SUCCESS);
+end
+
+function returnValue = dtigGetParameter(message)
+  global status;
+  if (status.state == dtig.EState.UNINITIALIZED)
+    returnValue = createReturn(dtig.EReturnCode.INVALID_STATE, "Cannot get parameter while UNINITIALIZED");
+    return;
+  end
+
+  nIds = message.getParameters().getIdentifiersCount();
+  returnValue = dtigEngineGetParameter(message.getParameters().getIdentifiersList());
+  if returnValue.getValues().getIdentifiersCount() ~= nIds && returnValue.getCode() == dtig.EReturnCode.SUCCESS
+    returnValue.setCode(dtig.EReturnCode.FAILURE);
+    returnValue.setErrorMessage("Failed to get all parameters");
+  end
+end
+
+function returnValue = dtigEngineGetParameter(references)
+  global modelName;
+  global g;
+  global e;
+  global h0;
+  global v0;
+
+  % Proto message of every parameter, by name, whether its value has to be evaluated and the block property holding it
+  persistent parameterTypes;
+  if isempty(parameterTypes)
+    parameterTypes = containers.Map('KeyType', 'char', 'ValueType', 'any');
+    parameterTypes('g') = {@(value) dtig.MF64.newBuilder().setValue(value), true, "Value"};
+    parameterTypes('e') = {@(value) dtig.MF64.newBuilder().setValue(value), true, "Value"};
+    parameterTypes('h0') = {@(value) dtig.MF64.newBuilder().setValue(value), true, "Value"};
+    parameterTypes('v0') = {@(value) dtig.MF64.newBuilder().setValue(value), true, "Value"};
+  end
+
+  dtigParameters = dtig.MValues.newBuilder();
+  nIds = references.size() - 1;
+  returnValue = createReturn(dtig.EReturnCode.SUCCESS);
+
+  for i = 0:nIds
+    reference = references.get(i);
+    handle = getSimulinkBlockHandle(strcat(modelName, "/", string(reference)), true);
+    if handle < 0
+      returnValue = createReturn(dtig.EReturnCode.UNKNOWN_OPTION, strcat("Unknown parameter: ", reference));
+      return;
+    end
+
+    name = char(reference);
+    if ~isKey(parameterTypes, name)
+      returnValue = createReturn(dtig.EReturnCode.UNKNOWN_OPTION, strcat("Unknown parameter: ", reference));
+      return;
+    end
+
+    % Evaluated here, where the parameters are declared as globals
+    parameterType = parameterTypes(name);
+    param_value = get_param(handle, parameterType{3});
+    if parameterType{2}
+      param_value = eval(param_value);
+    end
+    createValue = parameterType{1};
+    anyValue = createValue(param_value);
+    dtigParameters.addIdentifiers(reference);
+    dtigParameters.addValues(dtig.Helpers.pack(anyValue));
+  end
+
+  returnValue.setValues(dtigParameters);
+end
@@ -0,0 +1,55 @@
+import os
+import sys
+import json
+import shutil
+import importlib
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMBINED_DIR = os.path.join(ROOT_DIR, "experiments", "combined")
+sys.path.insert(0, os.path.join(ROOT_DIR, "source"))
+sys.path.insert(0, COMBINED_DIR)
+
+from common.result import VoidResult
+
+def load_main(monkeypatch, batch_dir):
+    monkeypatch.setattr(sys, "argv", ["main.py", "-b", str(batch_dir), "--server", "-g", "--no-format", "-l", "1"])
+    sys.modules.pop("main", None)
+    return importlib.import_module("main")
+
+def test_batch_of_one_engine_keeps_every_output(tmp_path, monkeypatch):
+    batch_dir = tmp_path / "configs"
+    batch_dir.mkdir()
+    for name in ["first", "second"]:
+        shutil.copy(os.path.join(COMBINED_DIR, "fmi_config.json"), batch_dir / f"{name}.json")
+
+    main = load_main(monkeypatch, batch_dir)
+
+    # Protoc is not needed to check where the interfaces are written
+    monkeypatch.setattr(main.protobuf, "generate_python", lambda out_dir: VoidResult())
+    monkeypatch.chdir(tmp_path)
+
+    main.generate_all()
+
+    for name in ["first", "second"]:
+        output_dir = tmp_path / "generated" / name / "fmi2"
+        assert (output_dir / "fmi2_server.py").is_file()
+
+        with open(output_dir / "dtig_manifest.json") as file:
+            manifest = json.load(file)
+        assert manifest["server"]["outputs"] == ["fmi2_server.py"]
+
+def test_batch_rejects_configurations_with_the_same_name(tmp_path, monkeypatch):
+    for directory in ["a", "b"]:
+        (tmp_path / directory).mkdir()
+        shutil.copy(os.path.join(COMBINED_DIR, "fmi_config.json"), tmp_path / directory / "fmi_config.json")
+
+    batch_file = tmp_path / "batch.txt"
+    batch_file.write_text("a/fmi_config.json\nb/fmi_config.json\n")
+
+    main = load_main(monkeypatch, batch_file)
+    monkeypatch.setattr(main.protobuf, "generate_python", lambda out_dir: VoidResult())
+    monkeypatch.chdir(tmp_path)
+
+    main.generate_all()
+
+    assert not (tmp_path / "generated").exists()
@@ -0,0 +1,59 @@
+import os
+import sys
+import json
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMBINED_DIR = os.path.join(ROOT_DIR, "experiments", "combined")
+sys.path.insert(0, os.path.join(ROOT_DIR, "source"))
+
+from common.keys import *
+from common import json_configuration
+from common.json_configuration import JsonConfiguration
+from common.signals import SIGNAL_LISTS
+
+def write_config(tmp_path) -> tuple:
+    with open(os.path.join(COMBINED_DIR, "fmi_config.json")) as file:
+        data = json.load(file)
+
+    # Keys the generator does not know are kept with the signal
+    data[KEY_OUTPUTS][0]["causality"] = "output"
+    data[KEY_PARAMETERS][1]["range"] = {"min": 0.0, "max": 1.0}
+
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps(data))
+    return str(config_file), data
+
+def check_signals(config, data):
+    for key in SIGNAL_LISTS:
+        if key not in data:
+            continue
+
+        assert [signal.to_dict() for signal in config[key]] == data[key]
+        for signal, entry in zip(config[key], data[key]):
+            for field, value in entry.items():
+                assert signal[field] == value
+                assert signal.get(field) == value
+                assert field in signal
+
+    assert json.loads(str(config)) == data
+
+def test_cached_configuration_keeps_every_signal_field(tmp_path, monkeypatch):
+    monkeypatch.setattr(json_configuration, "CACHE_DIRECTORY", str(tmp_path / "__dtig_cache__"))
+    config_file, data = write_config(tmp_path)
+
+    parsed = JsonConfiguration()
+    parsed.parse(config_file)
+    check_signals(parsed, data)
+    assert len(os.listdir(tmp_path / "__dtig_cache__")) == 1
+
+    # The second parse must come from the cache
+    def json_loads(contents):
+        raise AssertionError("The configuration was parsed again")
+
+    monkeypatch.setattr(json_configuration, "json_loads", json_loads)
+    cached = JsonConfiguration()
+    cached.parse(config_file)
+    check_signals(cached, data)
+
+    assert cached[KEY_PARAMETERS][1]["range"]["max"] == 1.0
+    assert "causality" not in cached[KEY_OUTPUTS][1]
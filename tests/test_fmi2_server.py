@@ -0,0 +1,164 @@
+import os
+import sys
+import time
+import atexit
+import threading
+import concurrent.futures
+import importlib.util
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMBINED_DIR = os.path.join(ROOT_DIR, "experiments", "combined")
+sys.path.insert(0, os.path.join(ROOT_DIR, "source"))
+
+fmpy = pytest.importorskip("fmpy")
+
+from tools import python
+from common.keys import *
+from common.json_configuration import JsonConfiguration
+from engines.fmi2.generator_fmi2 import ServerGeneratorFMI2
+
+MODEL_FILE = os.path.join(COMBINED_DIR, "models", "fmi2.fmu")
+
+def load_server(tmp_path, monkeypatch, runtime : str = RUNTIME_THREADS):
+    # The protos come from the dtig repository, they are only on the path once generated
+    pytest.importorskip("dtig.dt_message_pb2")
+
+    monkeypatch.setattr(python, "FORMAT_ENABLED", False)
+    config = JsonConfiguration()
+    config.parse(os.path.join(COMBINED_DIR, "fmi_config.json"))
+    config[KEY_RUNTIME] = runtime
+    assert ServerGeneratorFMI2(str(tmp_path / "fmi2")).generate(config)
+
+    # The generated server parses its arguments when imported
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(sys, "argv", ["fmi2_server.py"])
+    spec = importlib.util.spec_from_file_location("fmi2_server", tmp_path / "fmi2_server.py")
+    server = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(server)
+    return server
+
+def request(wrapper, message):
+    # Same as a request of the client, handled while holding the condition and the model lock
+    with wrapper.condition:
+        with wrapper.model_lock:
+            reply = wrapper.dtig_handle_message(message.SerializeToString())
+
+        wrapper.condition.notify_all()
+
+    return reply
+
+def test_requests_before_the_fmu_is_ready_are_refused(tmp_path, monkeypatch):
+    server = load_server(tmp_path, monkeypatch)
+
+    # The model thread is held while it extracts the FMU, after the model description is read
+    extracting = threading.Event()
+    extracted = threading.Event()
+    def extract(filename):
+        extracting.set()
+        extracted.wait(10)
+        return fmpy.extract(filename)
+
+    monkeypatch.setattr(server, "extract", extract)
+
+    # A failed test must not keep the runner waiting for the model
+    wrapper = server.FMI2Wrapper()
+    wrapper.model_thread.daemon = True
+    wrapper.model_thread.start()
+
+    initialize = server.dtig_message.MDTMessage()
+    initialize.initialize.model_name.value = MODEL_FILE
+    assert request(wrapper, initialize).code == server.dtig_code.SUCCESS
+
+    get_output = server.dtig_message.MDTMessage()
+    get_output.get_output.outputs.identifiers.append("h")
+
+    value = server.any_pb2.Any()
+    value.Pack(server.dtig_utils.MF64(value=3.7))
+    set_parameter = server.dtig_message.MDTMessage()
+    set_parameter.set_parameter.parameters.identifiers.append("g")
+    set_parameter.set_parameter.parameters.values.append(value)
+
+    try:
+        assert extracting.wait(10)
+        assert request(wrapper, get_output).code == server.dtig_code.INVALID_STATE
+        assert request(wrapper, set_parameter).code == server.dtig_code.INVALID_STATE
+    finally:
+        extracted.set()
+
+    deadline = time.monotonic() + 10
+    while not wrapper.signal_groups and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert request(wrapper, set_parameter).code == server.dtig_code.SUCCESS
+    reply = request(wrapper, get_output)
+    assert reply.code == server.dtig_code.SUCCESS
+    assert list(reply.values.identifiers) == ["h"]
+
+    stop = server.dtig_message.MDTMessage()
+    stop.stop.SetInParent()
+    assert request(wrapper, stop).code == server.dtig_code.SUCCESS
+    wrapper.model_thread.join(10)
+    assert not wrapper.model_thread.is_alive()
+
+    # Once the FMU is freed, requests are refused again
+    assert request(wrapper, get_output).code == server.dtig_code.INVALID_STATE
+
+def test_observers_only_wait_for_the_model_lock(tmp_path, monkeypatch):
+    server = load_server(tmp_path, monkeypatch, RUNTIME_ASYNCIO)
+    wrapper = server.FMI2Wrapper()
+
+    get_status = server.dtig_message.MDTMessage()
+    get_status.get_status.request = True
+    data = get_status.SerializeToString()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        # The condition only guards the state, observers do not wait for it
+        with wrapper.condition:
+            reply = executor.submit(wrapper.handle_request, data, True).result(10)
+        assert server.dtig_return.MReturnValue.FromString(reply).code == server.dtig_code.SUCCESS
+
+        # The engine is only reached through the model lock, so observers wait for the model thread
+        with wrapper.model_lock:
+            pending = executor.submit(wrapper.handle_request, data, True)
+            with pytest.raises(concurrent.futures.TimeoutError):
+                pending.result(0.1)
+
+        reply = pending.result(10)
+        assert server.dtig_return.MReturnValue.FromString(reply).code == server.dtig_code.SUCCESS
+
+# Records the thread that formats it
+class Formatted:
+    def __init__(self):
+        self.threads = []
+
+    def __str__(self):
+        self.threads.append(threading.current_thread())
+        return "formatted"
+
+def test_logs_are_formatted_in_the_background(tmp_path, monkeypatch, capsys):
+    server = load_server(tmp_path, monkeypatch)
+
+    # Every call comes from the same site
+    def log(i, argument):
+        server.logger.info("step %d %s", i, argument)
+
+    argument = Formatted()
+    listener = server.start_logger(2, 60)
+    try:
+        for i in range(3):
+            log(i, argument)
+        server.logger.warning("not limited %s", argument)
+        server.logger.warning("not limited %s", argument)
+        server.logger.debug("below the level %s", argument)
+    finally:
+        # Flushes the queued records, as it does at exit
+        listener.stop()
+        atexit.unregister(listener.stop)
+        for handler in list(server.logger.handlers):
+            server.logger.removeHandler(handler)
+
+    lines = [line.split(" ", 2)[2] for line in capsys.readouterr().out.splitlines()]
+    assert lines == ["[I] step 0 formatted", "[W] not limited formatted", "[W] not limited formatted"]
+    assert len(argument.threads) == 3 and threading.current_thread() not in argument.threads
@@ -0,0 +1,78 @@
+import os
+import socket
+import importlib.util
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Shipped next to the generated code as dtig/framing.py, so it is not part of a package here
+spec = importlib.util.spec_from_file_location("framing", os.path.join(ROOT_DIR, "source", "common", "languages", "python", "framing.py"))
+framing = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(framing)
+
+# Hands out the stream in the given pieces, whatever the size of the receiving buffer
+class ChunkedSocket:
+    def __init__(self, chunks):
+        self.chunks = [bytes(chunk) for chunk in chunks]
+
+    def recv_into(self, view):
+        if not self.chunks:
+            return 0
+
+        chunk = self.chunks[0]
+        count = min(len(chunk), len(view))
+        view[:count] = chunk[:count]
+        if count < len(chunk):
+            self.chunks[0] = chunk[count:]
+        else:
+            self.chunks.pop(0)
+
+        return count
+
+def frame(data : bytes) -> bytes:
+    return framing.FRAME_HEADER.pack(len(data)) + data
+
+def test_split_headers_and_payloads():
+    first = frame(b"first message")
+    second = frame(b"second")
+    stream = first + second
+    chunks = [stream[:1], stream[1:3], stream[3:6], stream[6:10], stream[10:len(first) + 2], stream[len(first) + 2:]]
+
+    connection = framing.FramedSocket(ChunkedSocket(chunks))
+    assert bytes(connection.receive()) == b"first message"
+    assert bytes(connection.receive()) == b"second"
+    assert connection.receive() is None
+
+def test_messages_larger_than_the_buffer():
+    data = bytes(range(256)) * 8
+    connection = framing.FramedSocket(ChunkedSocket([frame(data), frame(b"")]), size=16)
+    assert bytes(connection.receive()) == data
+    assert bytes(connection.receive()) == b""
+
+def test_oversized_header():
+    connection = framing.FramedSocket(ChunkedSocket([framing.FRAME_HEADER.pack(framing.MAX_MESSAGE_SIZE + 1)]))
+    with pytest.raises(ValueError):
+        connection.receive()
+
+@pytest.mark.parametrize("sent", [2, framing.FRAME_HEADER.size + 3])
+def test_peer_closing_mid_frame(sent):
+    server, client = socket.socketpair()
+    with server, client:
+        client.sendall(frame(b"complete"))
+        client.sendall(frame(b"never completed")[:sent])
+        client.close()
+
+        connection = framing.FramedSocket(server)
+        assert bytes(connection.receive()) == b"complete"
+        assert connection.receive() is None
+
+def test_send_round_trip():
+    server, client = socket.socketpair()
+    with server, client:
+        framing.FramedSocket(client).send(b"request")
+        framing.FramedSocket(client).send(b"")
+
+        connection = framing.FramedSocket(server)
+        assert bytes(connection.receive()) == b"request"
+        assert bytes(connection.receive()) == b""
@@ -0,0 +1,249 @@
+import os
+import sys
+import json
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "source"))
+
+from tools import python
+from common.keys import *
+from common import json_configuration
+from common.json_configuration import JsonConfiguration
+from language import parser, compiler, code_generator
+from language.parser import Parser, Context, ExpansionCache, compile_condition
+
+CONFIG = {
+    "name": "Test model",
+    "server": "fmi2",
+    "formalism": "discrete",
+    "step_size": 0.1,
+    "outputs": [
+        {"id": 0, "name": "h", "type": "float64", "unit": "m", "description": "Height"},
+        {"id": 1, "name": "n", "type": "int32"},
+        {"id": 2, "name": "label", "type": "string", "unit": "-"}
+    ],
+    "parameters": [
+        {"id": 0, "name": "g", "type": "float64", "default": 9.81},
+        {"id": 1, "name": "on", "type": "bool", "default": True}
+    ]
+}
+
+# Templates and what the interpreting parser that the compiler replaced rendered for them
+TEMPLATES = {
+"conditions": ("""
+DTIG_IF(DTIG_INPUTS)
+has inputs
+DTIG_ELSE
+no inputs
+DTIG_END_IF
+DTIG_IF(DTIG_FORMALISM == DTIG_FORMALISM_CONTINUOUS)
+continuous
+DTIG_ELSE_IF(HAS DTIG_STEP_SIZE)
+stepped
+DTIG_ELSE
+unknown
+DTIG_END_IF
+DTIG_IF(NOT DTIG_PARAMETERS)
+no parameters
+DTIG_ELSE_IF(DTIG_STEP_SIZE IS NOT DTIG_INPUTS AND 7 - 4 == 3)
+parameters
+DTIG_END_IF
+DTIG_IF(DTIG_SERVER == DTIG_SERVER AND (DTIG_INPUTS OR 0 > 1 - 2))
+arithmetic
+DTIG_END_IF
+""", "\nno inputs\nstepped\nparameters\narithmetic"),
+
+"loops": ("""
+values = {
+    DTIG_FOR(DTIG_OUTPUTS)
+    DTIG_IF(DTIG_INDEX == 0)
+    DTIG_STR(DTIG_ITEM_NAME): DTIG_TO_PROTO_MESSAGE(DTIG_ITEM_TYPE),
+    DTIG_ELSE
+    DTIG_STR(DTIG_ITEM_NAME): DTIG_TO_TYPE(DTIG_ITEM_TYPE), # DTIG_INDEX DTIG_ITEM_UNIT
+    DTIG_END_IF
+    DTIG_IF(HAS DTIG_ITEM_DESCRIPTION)
+    # DTIG_ITEM_DESCRIPTION
+    DTIG_END_IF
+    DTIG_END_FOR
+}
+DTIG_FOR(DTIG_PARAMETERS)
+DTIG_FOR(DTIG_OUTPUTS)
+pair DTIG_INDEX DTIG_ITEM_NAME
+DTIG_END_FOR
+DTIG_END_FOR
+""", '\nvalues = {\n    "h": dtig_utils.MF64(),\n    # Height\n    "n": Integer, # 1 None\n    "label": String, # 2 -\n}'
+     '\npair 0 h\npair 1 n\npair 2 label\npair 0 h\npair 1 n\npair 2 label'),
+
+"macros": ("""
+DTIG_DEF DTIG_SET(NAME, VALUE)
+    DTIG>NAME = DTIG>VALUE
+DTIG_END_DEF
+DTIG_DEF DTIG_CHECK(TYPE)
+    DTIG_IF(DTIG>TYPE == DTIG_TYPE_FLOAT_64)
+    float DTIG_STR(DTIG>TYPE)
+    DTIG_ELSE
+    other DTIG_STR(DTIG>TYPE)
+    DTIG_END_IF
+DTIG_END_DEF
+DTIG_FOR(DTIG_PARAMETERS)
+DTIG_SET(DTIG_ITEM_NAME, DTIG_ITEM_DEFAULT)
+DTIG_CHECK(DTIG_ITEM_TYPE)
+DTIG_END_FOR
+DTIG_SET(total, DTIG_FORMALISM)
+DTIG_DEF DTIG_SET(NAME, VALUE)
+    set(DTIG>NAME, DTIG>VALUE)
+DTIG_END_DEF
+DTIG_SET(again, 1)
+""", '\n    g = 9.81\n    float "float64"\n    on = True\n    other "bool"\n    total = discrete\n    set(again, 1)'),
+}
+
+TYPES = {TYPE_FLOAT_64: "Real", TYPE_INT_32: "Integer", TYPE_BOOL: "Boolean"}
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    monkeypatch.setattr(json_configuration, "CONFIG_CACHE_ENABLED", False)
+
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps(CONFIG))
+
+    config = JsonConfiguration()
+    config.parse(str(config_file))
+    return config
+
+@pytest.fixture
+def template_cache(tmp_path, monkeypatch):
+    # Every test starts without compiled templates, in memory or on disk
+    cache_directory = tmp_path / "__dtig_cache__"
+    monkeypatch.setattr(code_generator, "CACHE_DIRECTORY", str(cache_directory))
+    monkeypatch.setattr(compiler, "compiled_templates", dict())
+    return cache_directory
+
+def new_parser(config) -> Parser:
+    dtig_parser = Parser(config)
+    dtig_parser.type_to_function = lambda variable_type: TYPES.get(variable_type, "String")
+    dtig_parser.to_proto_message = lambda variable_type: python.to_proto_message(variable_type)
+    dtig_parser.to_string = lambda variable_type: f'"{variable_type}"'
+    return dtig_parser
+
+@pytest.mark.parametrize("name", TEMPLATES.keys())
+def test_render_matches_the_interpreter(config, template_cache, name):
+    text, expected = TEMPLATES[name]
+    assert new_parser(config).parse(text) == expected
+
+    # The nodes render the same as the code generated from them
+    dtig_parser = new_parser(config)
+    assert Context(dtig_parser).render(compiler.Compiler(text).compile()) == expected
+
+    # Loaded from the disk cache
+    compiler.compiled_templates.clear()
+    assert new_parser(config).parse(text) == expected
+
+def test_list_lengths(config, template_cache):
+    text = """
+DTIG_IF(NOT DTIG_INPUTS_LENGTH)
+DTIG_OUTPUTS_LENGTH outputs and DTIG_PARAMETERS_LENGTH parameters
+DTIG_END_IF
+"""
+    assert new_parser(config).parse(text) == "\n3 outputs and 2 parameters"
+
+def test_templates_are_cached_on_disk(config, template_cache, monkeypatch):
+    text, expected = TEMPLATES["loops"]
+
+    first = compiler.compile_template(text)
+    assert compiler.compile_template(text) is first
+    assert len(list(template_cache.glob("*.dtigc"))) == 1
+
+    # A new process only reads the generated code back
+    def generate_code(block):
+        raise AssertionError("The template was compiled again")
+
+    monkeypatch.setattr(compiler, "compiled_templates", dict())
+    monkeypatch.setattr(compiler, "generate_code", generate_code)
+    assert new_parser(config).parse(text) == expected
+
+def test_changed_template_is_compiled_again(config, template_cache, monkeypatch):
+    text, _ = TEMPLATES["conditions"]
+    assert new_parser(config).parse(text).endswith("arithmetic")
+
+    compiled = []
+    generate_code = compiler.generate_code
+    monkeypatch.setattr(compiler, "generate_code", lambda block: compiled.append(block) or generate_code(block))
+
+    changed = text.replace("arithmetic", "changed")
+    assert new_parser(config).parse(changed).endswith("changed")
+    assert len(compiled) == 1
+    assert len(list(template_cache.glob("*.dtigc"))) == 2
+
+    # So is every template once the generated code changes
+    monkeypatch.setattr(compiler, "compiled_templates", dict())
+    monkeypatch.setattr(code_generator, "GENERATOR_VERSION", code_generator.GENERATOR_VERSION + 1)
+    assert new_parser(config).parse(changed).endswith("changed")
+    assert len(compiled) == 2
+
+def test_invalid_cache_entry_is_replaced(config, template_cache):
+    text, expected = TEMPLATES["macros"]
+    assert new_parser(config).parse(text) == expected
+
+    for entry in template_cache.glob("*.dtigc"):
+        entry.write_bytes(b"not marshalled code")
+
+    compiler.compiled_templates.clear()
+    assert new_parser(config).parse(text) == expected
+
+    compiler.compiled_templates.clear()
+    for entry in template_cache.glob("*.dtigc"):
+        assert code_generator.load_code(entry.stem) is not None
+
+def test_conditions_are_compiled_once(config, template_cache, monkeypatch):
+    # Every parser shares the one grammar and the conditions compiled with it
+    parsed = []
+    parse = parser.lark_parser.parse
+    monkeypatch.setattr(parser, "compiled_conditions", dict())
+    monkeypatch.setattr(parser.lark_parser, "parse", lambda contents: parsed.append(contents) or parse(contents))
+
+    condition = compile_condition("HAS DTIG_ITEM_UNIT AND DTIG_INDEX > 0")
+    assert compile_condition("HAS DTIG_ITEM_UNIT AND DTIG_INDEX > 0") is condition
+
+    # The closure only depends on the context it is evaluated in
+    dtig_parser = new_parser(config)
+    outputs = config[KEY_OUTPUTS]
+    assert [condition(Context(dtig_parser, output, i)) for i, output in enumerate(outputs)] == [False, False, True]
+
+    text = "DTIG_IF(DTIG_STEP_SIZE)\nstep\nDTIG_END_IF"
+    assert new_parser(config).parse(text) == "\nstep"
+    compiler.compiled_templates.clear()
+    assert new_parser(config).parse(text) == "\nstep"
+    assert parsed == ["HAS DTIG_ITEM_UNIT AND DTIG_INDEX > 0", "DTIG_STEP_SIZE"]
+
+def test_expansion_cache_drops_the_least_recently_used():
+    cache = ExpansionCache(2)
+    cache["a"] = "first"
+    cache["b"] = "second"
+    assert cache["a"] == "first"
+
+    cache["c"] = "third"
+    assert len(cache) == 2
+    assert cache["a"] == "first" and cache["c"] == "third"
+    with pytest.raises(KeyError):
+        cache["b"]
+
+def test_expansions_are_not_shared_between_configurations(config, template_cache, tmp_path, monkeypatch):
+    text, expected = TEMPLATES["loops"]
+    assert new_parser(config).parse(text) == expected
+
+    other = dict(CONFIG, outputs=[{"id": 0, "name": "x", "type": "bool"}])
+    config_file = tmp_path / "other.json"
+    config_file.write_text(json.dumps(other))
+    other_config = JsonConfiguration()
+    other_config.parse(str(config_file))
+
+    assert new_parser(other_config).parse(text) == '\nvalues = {\n    "x": dtig_utils.MBool(),\n}\npair 0 x\npair 0 x'
+
+def test_expansions_follow_the_item_they_read(config, template_cache):
+    dtig_parser = new_parser(config)
+    text = "DTIG_FOR(DTIG_OUTPUTS)\nDTIG_ITEM_NAME DTIG_ITEM_UNIT\nDTIG_END_FOR"
+    assert dtig_parser.parse(text) == "\nh m\nn None\nlabel -"
+    assert dtig_parser.parse(text) == "\nh m\nn None\nlabel -"
+    assert len(dtig_parser.expansions) > 0
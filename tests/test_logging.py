@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+import threading
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "source"))
+
+from common import logging
+from common.logging import *
+
+@pytest.fixture(autouse=True)
+def logger_state(monkeypatch):
+    monkeypatch.setattr(logging, "CURRENT_LOG_LEVEL", logging.CURRENT_LOG_LEVEL)
+    monkeypatch.setattr(logging, "RATE_LIMIT", logging.RATE_LIMIT)
+    monkeypatch.setattr(logging, "log_sites", dict())
+    yield
+    stop_logger()
+
+# Records the thread that formats it
+class Formatted:
+    def __init__(self):
+        self.threads = []
+
+    def __str__(self):
+        self.threads.append(threading.current_thread())
+        return "formatted"
+
+def log_messages():
+    LOG_INFO("%d of %s", 3, "signals")
+    LOG_DEBUG(lambda: "built when written")
+    LOG_WARNING("plain %s message")
+    LOG_TRACE("%s", "not written")
+
+def messages(output : str) -> list:
+    # The time and the call site of every line differ between the runs
+    return [line.split(": ", 1)[1] for line in output.splitlines()]
+
+def test_background_writes_the_same_messages(capsys):
+    start_logger(LogLevel.DEBUG)
+    log_messages()
+    direct = capsys.readouterr().out
+
+    start_logger(LogLevel.DEBUG, background=True)
+    log_messages()
+    stop_logger()
+    background = capsys.readouterr().out
+
+    assert messages(background) == messages(direct) == ["3 of signals", "built when written", "plain %s message"]
+
+def test_background_formats_and_flushes_at_stop(capsys):
+    start_logger(LogLevel.INFO, background=True)
+    thread = logging.log_thread
+
+    argument = Formatted()
+    for i in range(100):
+        LOG_INFO("%d %s", i, argument)
+    LOG_ERROR("%d", "not a number")
+    stop_logger()
+
+    lines = messages(capsys.readouterr().out)
+    assert lines[:100] == [f"{i} formatted" for i in range(100)]
+    assert lines[100].startswith("Failed to format log message '%d'")
+    assert len(lines) == 101
+
+    # The caller only queues the records
+    assert set(argument.threads) == {thread}
+    assert logging.log_queue is None and not thread.is_alive()
+
+def test_rate_limit(capsys):
+    start_logger(LogLevel.INFO, rate_limit=0.1)
+
+    # Every call comes from the same site
+    def log(i):
+        LOG_INFO("limited %d", i)
+
+    for i in range(3):
+        log(i)
+    for i in range(3):
+        LOG_WARNING("warning %d", i)
+
+    time.sleep(0.15)
+    for i in range(3, 5):
+        log(i)
+
+    assert messages(capsys.readouterr().out) == ["limited 0", "warning 0", "warning 1", "warning 2", "limited 3 (2 suppressed)"]
@@ -0,0 +1,110 @@
+import os
+import sys
+import shutil
+import filecmp
+import importlib
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMBINED_DIR = os.path.join(ROOT_DIR, "experiments", "combined")
+TEMPLATES_DIR = os.path.join(ROOT_DIR, "tests", "data", "templates")
+sys.path.insert(0, os.path.join(ROOT_DIR, "source"))
+
+from tools import python
+from common.keys import *
+from common import json_configuration
+from common.json_configuration import JsonConfiguration
+from base import template_index
+from language import compiler, code_generator
+from engines.fmi2 import generator_fmi2
+
+# Outputs of the bundled engine templates, compared with tests/data/templates/<case>
+# Except for fmi2_asyncio they are the same as the interpreting parser the compiler replaced generated
+CASES = {
+    "fmi2": ("fmi_config.json", "engines.fmi2.generator_fmi2", "ServerGeneratorFMI2", {}),
+    "fmi2_asyncio": ("fmi_config.json", "engines.fmi2.generator_fmi2", "ServerGeneratorFMI2", {KEY_RUNTIME: RUNTIME_ASYNCIO}),
+    "rti": ("fmi_config.json", "engines.openrti1516.generator_openrti", "ClientGeneratorRTI1516", {}),
+    "freecad": ("freecad_config.json", "engines.freecad.generator_freecad", "ServerGeneratorFreeCAD", {}),
+    "cmds": ("cmd_config.json", "engines.cmd.cmd_generator", "ServerGeneratorCMD", {}),
+    "cmdc": ("cmd_config.json", "engines.cmd.cmd_generator", "ClientGeneratorCMD", {}),
+    "rticmd": ("cmd_config.json", "engines.openrti1516.generator_openrti_cmd", "ClientGeneratorRTI1516CMD", {}),
+    "matlab": ("matlab_config.json", "engines.matlab2024a.generator_matlab2024a", "ServerGeneratorMatlab2024a", {}),
+    "simulink": ("simulink_config.json", "engines.matlab2024a.generator_simulink2024a", "ServerGeneratorSimulink2024a", {}),
+}
+
+@pytest.fixture
+def template_cache(tmp_path, monkeypatch):
+    # Nothing is compiled or indexed yet, and the compiled templates are not written to the source tree
+    monkeypatch.setattr(python, "FORMAT_ENABLED", False)
+    monkeypatch.setattr(json_configuration, "CONFIG_CACHE_ENABLED", False)
+    monkeypatch.setattr(code_generator, "CACHE_DIRECTORY", str(tmp_path / "__dtig_cache__"))
+    monkeypatch.setattr(compiler, "compiled_templates", dict())
+    monkeypatch.setattr(template_index, "indexed_templates", dict())
+    return tmp_path / "__dtig_cache__"
+
+def generate(case : str, output_dir : str):
+    config_file, module, generator, overrides = CASES[case]
+
+    config = JsonConfiguration()
+    config.parse(os.path.join(COMBINED_DIR, config_file))
+    for key, value in overrides.items():
+        config[key] = value
+
+    os.makedirs(output_dir, exist_ok=True)
+    result = getattr(importlib.import_module(module), generator)(os.path.join(output_dir, case.split("_")[0])).generate(config)
+    assert result, result
+
+def generated_files(output_dir : str) -> list:
+    # The dtig package is copied, not generated from the templates
+    return sorted(entry for entry in os.listdir(output_dir) if os.path.isfile(os.path.join(output_dir, entry)))
+
+@pytest.mark.parametrize("case", CASES.keys())
+def test_bundled_templates(tmp_path, template_cache, case):
+    expected_dir = os.path.join(TEMPLATES_DIR, case)
+
+    generate(case, str(tmp_path / "compiled"))
+    assert len(list(template_cache.glob("*.dtigc"))) > 0
+
+    # The second run reads the code of every template from the disk cache
+    compiler.compiled_templates.clear()
+    generate(case, str(tmp_path / "cached"))
+
+    for output_dir in [tmp_path / "compiled", tmp_path / "cached"]:
+        files = generated_files(output_dir)
+        assert files == generated_files(expected_dir)
+
+        _, mismatch, errors = filecmp.cmpfiles(expected_dir, output_dir, files, shallow=False)
+        assert mismatch == [] and errors == []
+
+def test_changed_template_is_generated_again(tmp_path, template_cache, monkeypatch):
+    template_folder = tmp_path / "fmi2_templates"
+    shutil.copytree(generator_fmi2.template_folder, template_folder)
+    monkeypatch.setattr(generator_fmi2, "template_folder", str(template_folder))
+
+    generate("fmi2", str(tmp_path / "first"))
+    with open(tmp_path / "first" / "fmi2_server.py") as file:
+        assert "self.step_size  : float  = 1e-3" in file.read()
+
+    # Same size, so only the modification time tells the index the template changed
+    template_file = template_folder / "server_callbacks.py"
+    status = os.stat(template_file)
+    template_file.write_text(template_file.read_text().replace("= 1e-3", "= 2e-3"))
+    os.utime(template_file, ns=(status.st_atime_ns, status.st_mtime_ns + 1_000_000_000))
+
+    generate("fmi2", str(tmp_path / "second"))
+    with open(tmp_path / "second" / "fmi2_server.py") as file:
+        generated = file.read()
+    assert "self.step_size  : float  = 2e-3" in generated
+    assert "1e-3" not in generated
+
+# Writes the expected outputs again, after an intended change of the templates
+if __name__ == "__main__":
+    python.FORMAT_ENABLED = False
+    json_configuration.CONFIG_CACHE_ENABLED = False
+
+    for case in CASES:
+        output_dir = os.path.join(TEMPLATES_DIR, case)
+        shutil.rmtree(output_dir, ignore_errors=True)
+        generate(case, output_dir)
+        shutil.rmtree(os.path.join(output_dir, "dtig"), ignore_errors=True)